@@ -0,0 +1,440 @@
+"""
+Optional durability for the in-memory repositories: snapshot + append-only log.
+
+Reads stay in memory; every write is also described on disk so that the
+repositories can be rebuilt quickly after a restart.
+
+Files kept in the data directory:
+- operations.log : append-only journal, one framed record per add, update or
+                   delete ([4-byte length][pickled record]).
+- snapshot.bin   : compact binary image of every repository, rewritten
+                   periodically; the journal is emptied once it is on disk.
+- operations.log.1 : journal segment set aside for the background snapshot
+                   (see below), deleted once the new snapshot is on disk.
+
+At startup the snapshot is memory-mapped and unpickled straight from the
+mapping, then the set-aside segment (if any) and the journal tail are
+replayed. A record cut short by a crash at the end of the journal is ignored
+and truncated.
+
+The periodic snapshot never runs in the request that crosses
+'snapshot_every': that write only renames the journal to operations.log.1
+and opens a new one (under the lock, a few milliseconds), then a background
+thread rebuilds a private copy of the repositories from the previous
+snapshot and that segment, pickles it and deletes the segment. The live
+objects are never read by that thread, so writers are not blocked while it
+runs; it needs as much memory again as the repositories while it runs.
+
+Entities reference each other (review.user, place.amenities, ...):
+- the snapshot pickles every repository (objects and secondary indexes) in
+  one pass, so pickle itself keeps shared references and no index has to be
+  rebuilt object by object at startup;
+- each journal record pickles one entity on its own, the entities it
+  references being stored as (class, id) persistent ids and resolved on
+  replay to the single instance of that id.
+Either way the object graph keeps the same identities as before the restart.
+
+Classes:
+- DurableStore: journal, snapshots and recovery for a set of repositories.
+- DurableInMemoryRepository: InMemoryRepository recording its writes in a DurableStore.
+
+Durability: every record is handed to the operating system immediately (a
+crash of the process loses nothing) but fsync is batched: a power failure
+can lose up to 'fsync_every' records or 'fsync_interval' seconds of writes.
+
+Threads: the writes of every DurableInMemoryRepository of a store are
+serialized by the lock of the store, which also orders their records in the
+journal; reads take no lock (see InMemoryRepository).
+"""
+
+import atexit
+import gc
+import io
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+
+from app.models.BaseModel import BaseModel
+from app.persistence.repository import InMemoryRepository
+
+LOG_FILE = 'operations.log'
+SEGMENT_FILE = 'operations.log.1'
+SNAPSHOT_FILE = 'snapshot.bin'
+_SNAPSHOT_MAGIC = b'HBNBSNAP1\n'
+_FRAME = struct.Struct('<I')
+
+
+class _EntityPickler(pickle.Pickler):
+    """ Pickler storing every entity met inside a state as a (class, id) reference """
+
+    def persistent_id(self, obj):
+        if isinstance(obj, BaseModel):
+            return (type(obj), obj.id)
+        return None
+
+
+class _EntityUnpickler(pickle.Unpickler):
+    """ Unpickler resolving (class, id) references with a callable """
+
+    def __init__(self, file, resolve):
+        super().__init__(file)
+        self._resolve = resolve
+
+    def persistent_load(self, pid):
+        cls, obj_id = pid
+        return self._resolve(cls, obj_id)
+
+
+def _dumps(record):
+    """ Pickle a record, entities inside it being stored as references """
+    buffer = io.BytesIO()
+    _EntityPickler(buffer, pickle.HIGHEST_PROTOCOL).dump(record)
+    return buffer.getvalue()
+
+
+class DurableStore:
+    """
+    Journal and snapshots shared by several repositories, so that references
+    between their entities survive a restart.
+
+    Attributes:
+        directory: Folder holding operations.log and snapshot.bin.
+        fsync_every: Number of records written between two fsync.
+        fsync_interval: Maximum number of seconds between two fsync.
+        snapshot_every: Number of records after which a snapshot is taken (0 disables it).
+    """
+
+    def __init__(self, directory, fsync_every=100, fsync_interval=1.0, snapshot_every=100_000):
+        self.directory = directory
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self._repositories = {}
+        self._registry = {}
+        self._lock = threading.RLock()
+        self._log = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+        self._loading = False
+        # Thread de la sauvegarde en arrière-plan en cours, s'il y en a une
+        self._compaction = None
+        os.makedirs(directory, exist_ok=True)
+
+    def attach(self, name, repository):
+        """ Register a repository under the name used in the files """
+        self._repositories[name] = repository
+
+    def load(self):
+        """
+        Rebuild the attached repositories from the snapshot and the journal,
+        then open the journal for the next writes.
+        """
+        with self._lock:
+            self._loading = True
+            try:
+                self._load_snapshot()
+                # Segment mis de côté par une sauvegarde interrompue, puis la fin du journal
+                self._replay_log(self._path(SEGMENT_FILE))
+                self._replay_log(self._path(LOG_FILE))
+            finally:
+                self._loading = False
+            self._log = open(self._path(LOG_FILE), 'ab')
+            atexit.register(self.close)
+
+    def record(self, op, name, obj_id, obj=None):
+        """ Append one operation ('add', 'update' or 'delete') to the journal """
+        if self._loading or self._log is None:
+            return
+        state = None if obj is None else obj.__dict__
+        data = _dumps((op, name, type(obj) if obj is not None else None, obj_id, state))
+        with self._lock:
+            self._log.write(_FRAME.pack(len(data)) + data)
+            self._log.flush()
+            self._unsynced += 1
+            self._since_snapshot += 1
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._fsync()
+            if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+                self._start_compaction()
+
+    def sync(self):
+        """ Force the pending records of the journal to disk """
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+                self._fsync()
+
+    def snapshot(self):
+        """
+        Write every repository to snapshot.bin and empty the journal, in the
+        calling thread and holding the lock (for explicit calls: shutdown,
+        benchmarks). The automatic snapshots run in the background instead.
+
+        The snapshot is written to a temporary file and renamed, so a crash
+        leaves either the old or the new one. A crash before the journal is
+        emptied only replays records already included in the snapshot, which
+        is harmless: each record holds the whole state of its entity.
+        """
+        while True:
+            self.wait_for_snapshot()
+            with self._lock:
+                if self._compaction is not None and self._compaction.is_alive():
+                    # une sauvegarde automatique a démarré entre-temps
+                    continue
+                self.sync()
+                self._write_snapshot({name: repository._dump_state()
+                                      for name, repository in self._repositories.items()})
+                if os.path.exists(self._path(SEGMENT_FILE)):
+                    os.remove(self._path(SEGMENT_FILE))
+                if self._log is not None:
+                    self._log.truncate(0)
+                    self._fsync()
+                self._since_snapshot = 0
+                return
+
+    def wait_for_snapshot(self):
+        """ Wait until the background snapshot in progress, if any, is on disk """
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def close(self):
+        """ Wait for the background snapshot, then sync and close the journal """
+        self.wait_for_snapshot()
+        with self._lock:
+            if self._log is not None:
+                self.sync()
+                self._log.close()
+                self._log = None
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _start_compaction(self):
+        """
+        Set the journal aside as operations.log.1 and start the thread that
+        folds it into the snapshot. Called with the lock held.
+        """
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        # Un segment resté d'une sauvegarde qui a échoué est repris tel quel :
+        # les nouveaux enregistrements restent dans le journal
+        if not os.path.exists(self._path(SEGMENT_FILE)):
+            self._log.flush()
+            self._fsync()
+            self._log.close()
+            os.replace(self._path(LOG_FILE), self._path(SEGMENT_FILE))
+            self._log = open(self._path(LOG_FILE), 'ab')
+            self._fsync_directory()
+        self._since_snapshot = 0
+        self._compaction = threading.Thread(target=self._compact, name='hbnb-snapshot', daemon=True)
+        self._compaction.start()
+
+    def _compact(self):
+        """
+        Rebuild the repositories from snapshot.bin and operations.log.1 in a
+        private store, write them as the new snapshot and delete the segment.
+        """
+        with _gc_paused():
+            shadow = DurableStore(self.directory, snapshot_every=0)
+            shadow._loading = True
+            for name, repository in self._repositories.items():
+                DurableInMemoryRepository(shadow, name, indexes=tuple(repository._multi),
+                                          unique_indexes=tuple(repository._unique))
+            shadow._load_snapshot(mapped=False)
+            shadow._replay_log(self._path(SEGMENT_FILE))
+            self._write_snapshot({name: repository._dump_state()
+                                  for name, repository in shadow._repositories.items()})
+            # La copie est vidée objet par objet avant de réactiver le ramasse-miettes :
+            # ses cycles (review.place <-> place.reviews, ...) sont rompus et libérés par
+            # comptage de références, dans une boucle que les autres threads peuvent
+            # interrompre, au lieu d'une collecte qui garderait l'interpréteur d'un bloc
+            for repository in shadow._repositories.values():
+                for obj in repository._storage.values():
+                    obj.__dict__.clear()
+            for obj in shadow._registry.values():
+                obj.__dict__.clear()
+            shadow._repositories.clear()
+            shadow._registry.clear()
+        os.remove(self._path(SEGMENT_FILE))
+        self._fsync_directory()
+
+    def _write_snapshot(self, states):
+        """ Write states to snapshot.bin through a temporary file and a rename """
+        temporary = self._path(SNAPSHOT_FILE + '.tmp')
+        with open(temporary, 'wb') as file, _gc_paused():
+            file.write(_SNAPSHOT_MAGIC)
+            pickle.dump(states, file, pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._path(SNAPSHOT_FILE))
+        self._fsync_directory()
+
+    def _fsync(self):
+        os.fsync(self._log.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _fsync_directory(self):
+        """ Make the rename of the snapshot durable (not supported on every platform) """
+        try:
+            descriptor = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
+
+    def _load_snapshot(self, mapped=True):
+        """
+        Load snapshot.bin into the repositories. With mapped=False the file is
+        read with plain reads, which let the other threads run between two
+        pickle frames (background snapshot); the memory mapping is faster
+        but keeps the interpreter for the whole load (startup).
+        """
+        path = self._path(SNAPSHOT_FILE)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb', buffering=0) as file, \
+                (mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if mapped else file) as source:
+            if source.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not an HBnB snapshot")
+            # Le unpickler lit directement dans le fichier (projeté en mémoire au démarrage)
+            with _gc_paused():
+                states = pickle.load(source)
+        for name, state in states.items():
+            self._repositories[name]._load_state(state)
+
+    def _replay_log(self, path):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offset, size = 0, len(mapped)
+            while offset + _FRAME.size <= size:
+                (length,) = _FRAME.unpack_from(mapped, offset)
+                end = offset + _FRAME.size + length
+                if end > size:
+                    break
+                try:
+                    record = _EntityUnpickler(
+                        io.BytesIO(mapped[offset + _FRAME.size:end]), self._instance).load()
+                except Exception:
+                    # Enregistrement partiellement écrit lors d'un arrêt brutal
+                    break
+                self._apply(*record)
+                offset = end
+        if offset < size:
+            # On retire la fin incomplète pour que les prochains ajouts restent lisibles
+            with open(path, 'r+b') as file:
+                file.truncate(offset)
+
+    def _instance(self, cls, obj_id):
+        """
+        Return the single instance of obj_id: the one stored in a repository,
+        or one met earlier in the journal, or a new empty one filled later by
+        its own record.
+        """
+        obj = self._registry.get(obj_id)
+        if obj is None:
+            for repository in self._repositories.values():
+                obj = repository.get(obj_id)
+                if obj is not None:
+                    break
+            else:
+                obj = cls.__new__(cls)
+                obj.__dict__['id'] = obj_id
+            self._registry[obj_id] = obj
+        return obj
+
+    def _apply(self, op, name, cls, obj_id, state):
+        repository = self._repositories[name]
+        if op == 'delete':
+            repository._forget(obj_id)
+            return
+        obj = self._instance(cls, obj_id)
+        obj.__dict__.clear()
+        obj.__dict__.update(state)
+        repository._restore(obj)
+
+
+class _gc_paused:
+    """ Suspend the garbage collector while millions of objects are (un)pickled """
+
+    def __enter__(self):
+        self._enabled = gc.isenabled()
+        gc.disable()
+
+    def __exit__(self, *exc):
+        if self._enabled:
+            gc.enable()
+        return False
+
+
+class DurableInMemoryRepository(InMemoryRepository):
+    """
+    InMemoryRepository whose add, update and delete are also written to the
+    journal of a DurableStore. Reads never touch the disk.
+
+    The writes hold the lock of the store, so the repository can be shared
+    by the threads of a server: a write and its record are never interleaved
+    with another write of the same store, and the journal replays them in
+    the order they were applied in memory.
+    """
+
+    def __init__(self, store, name, indexes=(), unique_indexes=()):
+        super().__init__(indexes, unique_indexes)
+        self.name = name
+        self._store = store
+        store.attach(name, self)
+
+    def add(self, obj):
+        with self._store._lock:
+            super().add(obj)
+            self._store.record('add', self.name, obj.id, obj)
+
+    def update(self, obj_id, data):
+        with self._store._lock:
+            try:
+                super().update(obj_id, data)
+            finally:
+                # l'état enregistré est celui de l'objet en mémoire, même après une validation échouée
+                obj = self.get(obj_id)
+                if obj:
+                    self._store.record('update', self.name, obj_id, obj)
+
+    def delete(self, obj_id):
+        with self._store._lock:
+            if self.get(obj_id):
+                super().delete(obj_id)
+                self._store.record('delete', self.name, obj_id)
+
+    def _dump_state(self):
+        """ Return the objects and the secondary indexes, as written in a snapshot """
+        return {'storage': self._storage, 'unique': self._unique,
+                'multi': self._multi, 'keys': self._keys}
+
+    def _load_state(self, state):
+        """ Take over the objects and the indexes read from a snapshot """
+        if set(state['unique']) == set(self._unique) and set(state['multi']) == set(self._multi):
+            self._storage, self._unique = state['storage'], state['unique']
+            self._multi, self._keys = state['multi'], state['keys']
+            return
+        # Index déclarés différents de ceux de la sauvegarde : on les reconstruit
+        for obj in state['storage'].values():
+            self._restore(obj)
+
+    def _restore(self, obj):
+        """ Put back an object read from the disk, without writing it again """
+        super().add(obj)
+
+    def _forget(self, obj_id):
+        """ Remove an object deleted in the journal, without writing it again """
+        super().delete(obj_id)
@@ -4,6 +4,8 @@ Defines an abstract base class and an in-memory implementation for a generic rep
 Classes:
 - Repository (ABC): Abstract base class specifying the interface for a repository managing CRUD operations.
 - InMemoryRepository: Concrete implementation of Repository that stores objects in memory using a dictionary.
+- ShardedInMemoryRepository: Thread-safe variant splitting the objects over several
+  InMemoryRepository shards, for multi-threaded servers.
 
 Responsibilities:
 - add(obj): Add a new object to the repository.
@@ -12,16 +14,30 @@ Responsibilities:
 - update(obj_id, data): Update an existing object identified by obj_id with provided data.
 - delete(obj_id): Remove an object by its identifier.
 - get_by_attribute(attr_name, attr_value): Retrieve an object matching a specific attribute value.
+- find_all_by_attribute(attr_name, attr_value): Retrieve every object matching a specific attribute value.
 
 Details:
 - InMemoryRepository stores objects in a dictionary keyed by their 'id' attribute.
 - The update method assumes the stored objects implement their own update(data) method.
 - get_by_attribute enables lookup by arbitrary attribute, useful for searching without knowing the ID.
+- InMemoryRepository can keep secondary hash indexes declared at construction:
+  unique ones (e.g. 'email', one object per value) and multi-valued ones
+  (e.g. 'owner_id' or the dotted path 'place.id', several objects per value).
+  They are maintained by add, update and delete, so lookups on an indexed
+  attribute cost O(1) whatever the number of stored objects; other
+  attributes are still found by scanning every object.
+- A unique index rejects a second object with the same value (ValueError).
+- InMemoryRepository takes no lock: it is meant for one thread at a time.
+  ShardedInMemoryRepository serializes the writes of each shard and never
+  locks the reads (see its docstring).
 
 This design abstracts persistence mechanisms and enables easy swapping or extension with other storage backends.
 """
 
+import threading
 from abc import ABC, abstractmethod
+from contextlib import ExitStack, contextmanager
+from operator import attrgetter
 
 
 class Repository(ABC):
@@ -49,15 +65,30 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def find_all_by_attribute(self, attr_name, attr_value):
+        pass
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    def __init__(self, indexes=(), unique_indexes=()):
         self._storage = {}
         # dictionnaire pour stocker des objets avec comme clé leur id
+        self._unique = {attr: {} for attr in unique_indexes}
+        # index uniques : valeur de l'attribut -> objet
+        self._multi = {attr: {} for attr in indexes}
+        # index multi-valués : valeur de l'attribut -> {id: objet}, dans l'ordre d'ajout
+        self._getters = {attr: attrgetter(attr) for attr in (*unique_indexes, *indexes)}
+        # attrgetter accepte les chemins pointés comme 'place.id'
+        self._keys = {}
+        # id -> valeurs indexées de l'objet, pour le retirer des index sans les parcourir
 
     def add(self, obj):
+        values = self._index_values(obj)
+        self._check_unique(obj.id, values)
         self._storage[obj.id] = obj
         # On a joute l'objet à storage en utilisant obj.id comme clé
+        self._index(obj, values)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -70,19 +101,196 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._check_unique(obj_id, {attr: data[attr] for attr in self._unique if attr in data})
+            try:
+                obj.update(data)
+            finally:
+                # même si la validation échoue à mi-chemin, les index suivent l'objet
+                self._index(obj, self._index_values(obj))
     # on récupère les objets existants. On appelé la méthode update(data)
     # donc les objets doivent aussi avoir une méthode update
     # la classe user devra donc contenir cette méthode pour que
     # l'utilisateur puisse mettre à jour ses informations
+    # les index sont recalculés après la mise à jour : un attribut indexé
+    # ne doit donc être modifié qu'à travers cette méthode
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
             # supprime l'objet avec l'identifiant donné
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+        if attr_name == 'id':
+            return self._storage.get(attr_value)
+        if attr_name in self._unique:
+            return self._unique[attr_name].get(attr_value)
+        if attr_name in self._multi:
+            found = list(self._multi[attr_name].get(attr_value, {}).values())
+            return found[0] if found else None
+        # list() copie les valeurs en une fois : un ajout concurrent ne peut pas interrompre le parcours
+        return next((obj for obj in list(self._storage.values()) if getattr(obj, attr_name) == attr_value), None)
         # on veux récupérer un utilisateur dont l’email est par ex "alice@gmail.com" sans connaître son identifiant.
-        # la méthode va regarder tous les objets stockés et retournerle premier utilisateur dont
-        # l'attribut email correspond à "alice@gmail.com"
+        # si l'attribut est indexé, la recherche est un simple accès au dictionnaire ;
+        # sinon la méthode regarde tous les objets stockés et retourne le premier
+        # dont l'attribut email correspond à "alice@gmail.com"
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        """ Return the list of the objects whose attribute equals attr_value, in insertion order """
+        if attr_name == 'id':
+            obj = self._storage.get(attr_value)
+            return [obj] if obj else []
+        if attr_name in self._unique:
+            obj = self._unique[attr_name].get(attr_value)
+            return [obj] if obj else []
+        if attr_name in self._multi:
+            return list(self._multi[attr_name].get(attr_value, {}).values())
+        getter = attrgetter(attr_name)
+        return [obj for obj in list(self._storage.values()) if getter(obj) == attr_value]
+
+    def _index_values(self, obj):
+        """ Return the current value of every indexed attribute of obj """
+        values = {}
+        for attr, getter in self._getters.items():
+            try:
+                values[attr] = getter(obj)
+            except AttributeError:
+                # chemin pointé interrompu (ex : review.place à None)
+                values[attr] = None
+        return values
+
+    def _check_unique(self, obj_id, values):
+        """ Raise ValueError if another object already holds one of the unique values """
+        for attr, value in values.items():
+            if attr in self._unique:
+                other = self._unique[attr].get(value)
+                if other is not None and other.id != obj_id:
+                    raise ValueError(f"{attr} must be unique: {value} is already used.")
+
+    def _index(self, obj, values):
+        """
+        Index obj under the given values, then drop the entries of the values
+        it was indexed under before (if any) that changed. The new entries
+        exist before the stale ones go, so a reader without lock always finds
+        the object under its old or its new value and never misses it.
+        """
+        previous = self._keys.get(obj.id, {})
+        for attr, value in values.items():
+            if attr in self._unique:
+                self._unique[attr][value] = obj
+            else:
+                self._multi[attr].setdefault(value, {})[obj.id] = obj
+        self._keys[obj.id] = values
+        self._drop_entries(obj.id, {attr: value for attr, value in previous.items()
+                                    if values.get(attr) != value})
+
+    def _unindex(self, obj_id):
+        """ Remove obj_id from every index, using the values it was indexed under """
+        self._drop_entries(obj_id, self._keys.pop(obj_id, {}))
+
+    def _drop_entries(self, obj_id, values):
+        """ Remove the index entries of obj_id under the given values """
+        for attr, value in values.items():
+            if attr in self._unique:
+                other = self._unique[attr].get(value)
+                if other is not None and other.id == obj_id:
+                    del self._unique[attr][value]
+                continue
+            bucket = self._multi[attr].get(value)
+            if bucket is not None:
+                bucket.pop(obj_id, None)
+                if not bucket:
+                    del self._multi[attr][value]
+
+
+class ShardedInMemoryRepository(Repository):
+    """
+    Thread-safe in-memory repository for multi-threaded servers.
+
+    Objects are spread over several InMemoryRepository shards by the hash of
+    their id, each shard with its own lock:
+    - writes (add, update, delete) lock only the shard of the object, so
+      writes to different shards run concurrently and the read-then-mutate
+      of update() is never interleaved with another write of the same object;
+    - the values of unique indexes are checked across every shard while
+      holding a lock chosen by the hash of the value (lock striping), so two
+      threads can never both register the same email;
+    - reads take no lock at all and never wait for a writer: they only do
+      single dictionary operations or copies, which are atomic in Python.
+      A reader may see an object while update() is modifying it, but never
+      a repository in an inconsistent state: the indexes gain the new values
+      of an object before losing the old ones, so an existing object is
+      always found by an indexed lookup.
+
+    Locks are always taken in the same order (value locks sorted, then the
+    shard lock), so writers cannot deadlock.
+    get_all() returns the objects shard by shard, not in insertion order.
+    """
+
+    def __init__(self, shards=16, indexes=(), unique_indexes=()):
+        self._shards = [InMemoryRepository(indexes, unique_indexes) for _ in range(shards)]
+        self._shard_locks = [threading.Lock() for _ in range(shards)]
+        self._value_locks = [threading.Lock() for _ in range(shards)]
+        self._unique = tuple(unique_indexes)
+
+    def add(self, obj):
+        position = self._position(obj.id)
+        values = self._shards[position]._index_values(obj)
+        unique_values = {attr: values[attr] for attr in self._unique}
+        with self._locked(position, unique_values):
+            self._check_unique(obj.id, unique_values)
+            self._shards[position].add(obj)
+
+    def get(self, obj_id):
+        return self._shards[self._position(obj_id)].get(obj_id)
+
+    def get_all(self):
+        return [obj for shard in self._shards for obj in shard.get_all()]
+
+    def update(self, obj_id, data):
+        position = self._position(obj_id)
+        unique_values = {attr: data[attr] for attr in self._unique if attr in data}
+        with self._locked(position, unique_values):
+            self._check_unique(obj_id, unique_values)
+            self._shards[position].update(obj_id, data)
+
+    def delete(self, obj_id):
+        position = self._position(obj_id)
+        with self._shard_locks[position]:
+            self._shards[position].delete(obj_id)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if attr_name == 'id':
+            return self.get(attr_value)
+        for shard in self._shards:
+            obj = shard.get_by_attribute(attr_name, attr_value)
+            if obj is not None:
+                return obj
+        return None
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        if attr_name == 'id':
+            return self._shards[self._position(attr_value)].find_all_by_attribute('id', attr_value)
+        return [obj for shard in self._shards
+                for obj in shard.find_all_by_attribute(attr_name, attr_value)]
+
+    def _position(self, obj_id):
+        """ Return the number of the shard holding obj_id """
+        return hash(obj_id) % len(self._shards)
+
+    @contextmanager
+    def _locked(self, position, unique_values):
+        """ Hold the locks of the unique values (sorted) then the lock of the shard """
+        value_positions = sorted({hash((attr, value)) % len(self._value_locks)
+                                  for attr, value in unique_values.items()})
+        with ExitStack() as stack:
+            for value_position in value_positions:
+                stack.enter_context(self._value_locks[value_position])
+            with self._shard_locks[position]:
+                yield
+
+    def _check_unique(self, obj_id, unique_values):
+        """ Raise ValueError if an object of any shard already holds one of the values """
+        for shard in self._shards:
+            shard._check_unique(obj_id, unique_values)
+
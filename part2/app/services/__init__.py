@@ -1,6 +1,12 @@
+import os
 from app.services.facade import HBnBFacade
 
-facade = HBnBFacade()
+facade = HBnBFacade(data_dir=os.getenv('HBNB_DATA_DIR'),
+                    shards=int(os.getenv('HBNB_REPOSITORY_SHARDS', '0')))
+# Sans HBNB_DATA_DIR les données restent uniquement en mémoire ;
+# avec, elles sont journalisées dans ce dossier et rechargées au démarrage.
+# HBNB_REPOSITORY_SHARDS (ex : 16) active les dépôts partagés entre threads
+# (pas avec HBNB_DATA_DIR : les dépôts durables sont déjà sûrs entre threads)
 
 # Cette facadeinstance sera utilisée comme singleton pour garantir qu'une 
 # seule instance de la HBnBFacadeclasse est créée et utilisée 
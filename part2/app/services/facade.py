@@ -25,11 +25,18 @@ Exceptions:
 
 Note:
 - Uses in-memory repositories to store entity instances.
+- Optionally (HBNB_DATA_DIR), the repositories are durable: writes go to an
+  append-only log with periodic snapshots, replayed at startup. They are
+  thread-safe, their writes being serialized by the log.
+- Optionally (HBNB_REPOSITORY_SHARDS), the repositories are thread-safe and
+  sharded, for a server running several threads. Sharding cannot be
+  combined with a data folder (see __init__).
 - The facade abstracts persistence details from higher-level API layers.
 """
 
 
-from app.persistence.repository import InMemoryRepository
+from app.persistence.repository import InMemoryRepository, ShardedInMemoryRepository
+from app.persistence.durable import DurableStore, DurableInMemoryRepository
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
@@ -39,12 +46,39 @@ class HBnBFacade:
 
     """ Front end for managing business operations related to the HBnB application."""
 
-    def __init__(self):
-        """ Initialises the HBnBFacade object with in-memory repositories for each entity. """
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+    def __init__(self, data_dir=None, shards=0):
+        """
+        Initialises the HBnBFacade object with in-memory repositories for each entity.
+        If data_dir is given, the repositories are rebuilt from the snapshot and
+        the operation log of that folder, and every write is appended to it.
+        Otherwise, if shards is given, thread-safe repositories split into that
+        many shards are used (for a multi-threaded server).
+
+        Raises ValueError if both are given: the durable repositories are
+        already safe under a multi-threaded server, and every durable write
+        goes through the single journal, so shards would not let writes run
+        in parallel; silently ignoring one of the settings would hide it.
+        """
+        if data_dir and shards:
+            raise ValueError("HBNB_DATA_DIR and HBNB_REPOSITORY_SHARDS cannot be combined: "
+                             "the durable repositories are already thread-safe")
+        self.store = DurableStore(data_dir) if data_dir else None
+        self.shards = shards
+        # Index secondaires : recherches par email, par propriétaire et par lieu sans parcourir tout le dépôt
+        self.user_repo = self._repository('users', unique_indexes=('email',))
+        self.place_repo = self._repository('places', indexes=('owner_id',))
+        self.review_repo = self._repository('reviews', indexes=('place.id', 'user.id'))
+        self.amenity_repo = self._repository('amenities', indexes=('name',))
+        if self.store:
+            self.store.load()
+
+    def _repository(self, name, **indexes):
+        """ Create an in-memory repository, durable when a data folder is configured """
+        if self.store:
+            return DurableInMemoryRepository(self.store, name, **indexes)
+        if self.shards:
+            return ShardedInMemoryRepository(self.shards, **indexes)
+        return InMemoryRepository(**indexes)
 
     def create_user(self, user_data):
         """ Creates a new user based on the data provided """
@@ -113,7 +147,8 @@ class HBnBFacade:
             return None
         try:
             # essaie de mettre à jour, doit valider les données et lever ValueError
-            amenity.update(amenity_data)
+            # passe par le dépôt pour que l'index sur le nom reste à jour
+            self.amenity_repo.update(amenity_id, amenity_data)
         except ValueError as error:
             # Relance l'exception pour que l'API la gère
             raise error
@@ -176,22 +211,17 @@ class HBnBFacade:
             raise ValueError("Place not found")
 
         # Extraire la liste des identifiants d'amenities si elle est fournie
-        # On la retire du dictionnaire pour éviter de l'envoyer à update()
         amenities_ids = place_data.pop("amenities", None)
 
-        # Mettre à jour les attributs de l'objet place avec les nouvelles données
-        place.update(place_data)
-
         if amenities_ids is not None:
-            # Si une nouvelle liste d'amenities est fournie,
-            # on réinitialise la liste actuelle
-            place.amenities = []
-            for amenity_id in amenities_ids:
-                # Récupérer chaque objet Amenity correspondant à l'identifiant
-                amenity = self.get_amenity(amenity_id)
-                if amenity:
-                    # Ajouter l'amenity à la liste de la place
-                    place.add_amenity(amenity)
+            # Si une nouvelle liste d'amenities est fournie, elle remplace la liste actuelle :
+            # on récupère chaque objet Amenity correspondant à un identifiant connu
+            amenities = [self.get_amenity(amenity_id) for amenity_id in amenities_ids]
+            place_data = {**place_data, "amenities": [amenity for amenity in amenities if amenity]}
+
+        # Mettre à jour les attributs de l'objet place avec les nouvelles données, amenities comprises
+        # (via le dépôt, qui tient l'index sur owner_id et le journal à jour)
+        self.place_repo.update(place_id, place_data)
 
         # Retourner l'objet place mis à jour
         return place
@@ -250,15 +280,8 @@ class HBnBFacade:
 
     def get_reviews_by_place(self, place_id):
         """ obtain a review by the place who choosen"""
-        # Espace réservé pour la logique de récupération de tous les avis pour un lieu spécifique
-        all_reviews = self.review_repo.get_all()
-        filtered_reviews = []
-
-        for review in all_reviews:
-            if review.place and review.place.id == place_id:
-                filtered_reviews.append(review)
-
-        return filtered_reviews
+        # Lecture directe de l'index 'place.id' au lieu de parcourir toutes les reviews
+        return self.review_repo.find_all_by_attribute('place.id', place_id)
 
     def update_review(self, review_id, review_data):
         """ update a review """
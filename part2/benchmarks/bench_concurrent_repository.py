@@ -0,0 +1,104 @@
+"""
+Benchmark: throughput of the repositories shared by several threads, with a
+mix of 90% reads (get, get_by_attribute on an index) and 10% updates.
+
+Compared:
+- locked  : InMemoryRepository behind one lock taken by reads and writes.
+- sharded : ShardedInMemoryRepository (one lock per shard, lock-free reads).
+
+On an interpreter with a GIL, Python code runs on one core at a time, so
+neither variant can scale with the number of threads; the sharded variant
+only removes the waits on the lock. Scaling shows on a free-threaded build
+(python3.13t and later) with several cores.
+
+Usage (from the part2 directory):
+
+    python -m benchmarks.bench_concurrent_repository
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.persistence.repository import InMemoryRepository, ShardedInMemoryRepository
+
+OBJECTS = 10_000
+OPERATIONS = 50_000
+THREADS = (1, 2, 4, 8)
+
+
+class Record(SimpleNamespace):
+    """ Lightweight entity with the update(data) method the repositories expect """
+    def update(self, data):
+        for key, value in data.items():
+            setattr(self, key, value)
+
+
+class LockedRepository:
+    """ InMemoryRepository where every operation takes the same lock """
+
+    def __init__(self, **indexes):
+        self._repo = InMemoryRepository(**indexes)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self._repo, name)
+
+        def locked(*args):
+            with self._lock:
+                return method(*args)
+        return locked
+
+
+def fill(repo):
+    records = [Record(id=str(uuid.uuid4()), email=f'user{i}@example.com', owner_id=f'owner-{i % 100}')
+               for i in range(OBJECTS)]
+    for record in records:
+        repo.add(record)
+    return records
+
+
+def run(repo, records, threads):
+    """ Run OPERATIONS operations spread over 'threads' threads and return operations/s """
+    per_thread = OPERATIONS // threads
+
+    def work(seed):
+        rng = random.Random(seed)
+        for _ in range(per_thread):
+            record = rng.choice(records)
+            draw = rng.random()
+            if draw < 0.45:
+                repo.get(record.id)
+            elif draw < 0.9:
+                repo.get_by_attribute('email', record.email)
+            else:
+                repo.update(record.id, {'owner_id': f'owner-{rng.randrange(100)}'})
+
+    workers = [threading.Thread(target=work, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {os.cpu_count()} CPU(s)")
+    print(f"{'threads':>8} {'locked ops/s':>13} {'sharded ops/s':>14}")
+    indexes = {'indexes': ('owner_id',), 'unique_indexes': ('email',)}
+    for threads in THREADS:
+        locked = LockedRepository(**indexes)
+        sharded = ShardedInMemoryRepository(16, **indexes)
+        locked_rate = run(locked, fill(locked), threads)
+        sharded_rate = run(sharded, fill(sharded), threads)
+        print(f"{threads:>8} {locked_rate:13.0f} {sharded_rate:14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: write throughput and restart time of the durable in-memory
+repositories, restarting either from the operation log alone or from a
+snapshot.
+
+Usage (from the part2 directory):
+
+    python -m benchmarks.bench_durable_restart [count ...]
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+
+from app.models.BaseModel import BaseModel
+from app.persistence.durable import DurableStore, DurableInMemoryRepository
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+class Record(BaseModel):
+    """ Lightweight entity (the User validation is far too slow for a million objects) """
+    def __init__(self, email):
+        super().__init__()
+        self.email = email
+
+
+def open_store(directory):
+    """ Start a store on directory and return (store, repository, seconds to load) """
+    start = time.perf_counter()
+    store = DurableStore(directory, snapshot_every=0)
+    repo = DurableInMemoryRepository(store, 'records', unique_indexes=('email',))
+    store.load()
+    return store, repo, time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'objects':>10} {'writes/s':>10} {'snapshot (s)':>13} "
+          f"{'restart log (s)':>16} {'restart snapshot (s)':>21}")
+    for size in sizes:
+        directory = tempfile.mkdtemp()
+        try:
+            store, repo, _ = open_store(directory)
+            start = time.perf_counter()
+            for i in range(size):
+                repo.add(Record(f'user{i}@example.com'))
+            store.sync()
+            write_rate = size / (time.perf_counter() - start)
+            store.close()
+
+            store, repo, from_log = open_store(directory)
+            assert len(repo.get_all()) == size
+            start = time.perf_counter()
+            store.snapshot()
+            snapshot_time = time.perf_counter() - start
+            store.close()
+
+            store, repo, from_snapshot = open_store(directory)
+            assert repo.get_by_attribute('email', f'user{size - 1}@example.com')
+            store.close()
+        finally:
+            shutil.rmtree(directory)
+        print(f"{size:>10} {write_rate:10.0f} {snapshot_time:13.2f} "
+              f"{from_log:16.2f} {from_snapshot:21.2f}")
+
+
+if __name__ == '__main__':
+    main()
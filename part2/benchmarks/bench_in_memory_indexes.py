@@ -0,0 +1,61 @@
+"""
+Benchmark: get_by_attribute('email', ...) on InMemoryRepository with and
+without a unique index on 'email', for a growing number of users.
+
+With the index the latency stays flat; without it every lookup walks the
+whole repository. Plain objects are stored instead of User instances: the
+email validation of User is far too slow to create a million of them.
+
+Usage (from the part2 directory):
+
+    python -m benchmarks.bench_in_memory_indexes
+"""
+
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.persistence.repository import InMemoryRepository
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+LOOKUPS = 10_000
+# Le parcours complet est lent : on en fait moins
+SCAN_LOOKUPS = 20
+
+
+def fill(repo, size):
+    """ Add 'size' users to repo and return their emails """
+    emails = []
+    for i in range(size):
+        emails.append(f'user{i}@example.com')
+        repo.add(SimpleNamespace(id=str(uuid.uuid4()), email=emails[-1]))
+    return emails
+
+
+def lookup_time(repo, emails, count):
+    """ Return the mean duration in microseconds of a lookup by email """
+    targets = random.choices(emails, k=count)
+    start = time.perf_counter()
+    for email in targets:
+        repo.get_by_attribute('email', email)
+    return (time.perf_counter() - start) * 1_000_000 / count
+
+
+def main():
+    print(f"{'users':>10} {'indexed (us)':>13} {'scan (us)':>12}")
+    for size in SIZES:
+        indexed = InMemoryRepository(unique_indexes=('email',))
+        emails = fill(indexed, size)
+        indexed_us = lookup_time(indexed, emails, LOOKUPS)
+        del indexed
+
+        scanned = InMemoryRepository()
+        fill(scanned, size)
+        scan_us = lookup_time(scanned, emails, SCAN_LOOKUPS)
+        del scanned
+        print(f"{size:>10} {indexed_us:13.2f} {scan_us:12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,9 @@ tests = [
     "tests.test_users",
     "tests.test_amenities",
     "tests.test_places",
-    "tests.test_reviews"
+    "tests.test_reviews",
+    "tests.test_repository",
+    "tests.test_durable"
 ]
 
 for test in tests:
@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from app.models.BaseModel import BaseModel
+from app.persistence.durable import DurableStore, DurableInMemoryRepository, LOG_FILE, SEGMENT_FILE, SNAPSHOT_FILE
+from app.services.facade import HBnBFacade
+
+
+class Owner(BaseModel):
+    """ Objet minimal référencé par un autre dépôt """
+    def __init__(self, email):
+        super().__init__()
+        self.email = email
+
+
+class Item(BaseModel):
+    """ Objet minimal qui référence un Owner """
+    def __init__(self, name, owner):
+        super().__init__()
+        self.name = name
+        self.owner = owner
+
+
+class TestDurableRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        shutil.rmtree(self.directory)
+
+    def open(self, **options):
+        """ Simule un démarrage : nouveau store et nouveaux dépôts rechargés depuis le disque """
+        store = DurableStore(self.directory, **options)
+        self.stores.append(store)
+        owners = DurableInMemoryRepository(store, 'owners', unique_indexes=('email',))
+        items = DurableInMemoryRepository(store, 'items', indexes=('owner.id',))
+        store.load()
+        return store, owners, items
+
+    def fill(self, owners, items):
+        alice = Owner("alice@gmail.com")
+        owners.add(alice)
+        first, second = Item("lamp", alice), Item("desk", alice)
+        items.add(first)
+        items.add(second)
+        items.update(first.id, {'name': "big lamp"})
+        items.delete(second.id)
+        return alice, first
+
+    def assertRestored(self, alice, first):
+        _, owners, items = self.open()
+        owner = owners.get_by_attribute('email', "alice@gmail.com")
+        self.assertEqual(owner.id, alice.id)
+        restored = items.find_all_by_attribute('owner.id', alice.id)
+        self.assertEqual([item.name for item in restored], ["big lamp"])
+        # la référence pointe vers l'instance unique du propriétaire
+        self.assertIs(restored[0].owner, owner)
+        self.assertEqual(len(items.get_all()), 1)
+
+    def test_01_restart_from_log(self):
+        store, owners, items = self.open()
+        alice, first = self.fill(owners, items)
+        store.close()
+        self.assertRestored(alice, first)
+
+    def test_02_restart_from_snapshot_and_log_tail(self):
+        store, owners, items = self.open()
+        alice, first = self.fill(owners, items)
+        store.snapshot()
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, LOG_FILE)), 0)
+        items.update(first.id, {'name': "old lamp"})
+        items.update(first.id, {'name': "big lamp"})
+        store.close()
+        self.assertRestored(alice, first)
+
+    def test_03_automatic_snapshot(self):
+        store, owners, items = self.open(snapshot_every=3)
+        alice, first = self.fill(owners, items)
+        store.close()
+        self.assertRestored(alice, first)
+
+    def test_04_torn_record_is_ignored(self):
+        store, owners, items = self.open()
+        alice, first = self.fill(owners, items)
+        store.close()
+        # arrêt brutal au milieu de l'écriture d'un enregistrement
+        with open(os.path.join(self.directory, LOG_FILE), 'ab') as log:
+            log.write(b'\x40\x00\x00\x00partial')
+        self.assertRestored(alice, first)
+        store, owners, items = self.open()
+        owners.add(Owner("bob@gmail.com"))
+        store.close()
+        _, owners, _ = self.open()
+        self.assertIsNotNone(owners.get_by_attribute('email', "bob@gmail.com"))
+    def test_05_automatic_snapshot_runs_in_the_background(self):
+        store, owners, items = self.open(snapshot_every=3)
+        # la sauvegarde en arrière-plan reste bloquée : les écritures ne doivent pas l'attendre
+        gate, compact = threading.Event(), store._compact
+        store._compact = lambda: (gate.wait(), compact())
+        alice, first = self.fill(owners, items)
+        self.assertTrue(store._compaction.is_alive())
+        self.assertTrue(os.path.exists(os.path.join(self.directory, SEGMENT_FILE)))
+        items.update(first.id, {'name': "big lamp"})
+        # arrêt pendant la sauvegarde : snapshot précédent + segment + journal
+        self.assertRestored(alice, first)
+        gate.set()
+        store.wait_for_snapshot()
+        self.assertFalse(os.path.exists(os.path.join(self.directory, SEGMENT_FILE)))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, SNAPSHOT_FILE)))
+        store.close()
+        self.assertRestored(alice, first)
+
+    def test_06_concurrent_writers(self):
+        store, owners, items = self.open(snapshot_every=50)
+        def write(thread):
+            for i in range(100):
+                owners.add(Owner(f"owner{thread}-{i}@gmail.com"))
+        threads = [threading.Thread(target=write, args=(thread,)) for thread in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.close()
+        _, owners, _ = self.open()
+        self.assertEqual(len(owners.get_all()), 400)
+        self.assertIsNotNone(owners.get_by_attribute('email', "owner3-99@gmail.com"))
+
+    def test_07_durable_and_sharded_cannot_be_combined(self):
+        with self.assertRaises(ValueError):
+            HBnBFacade(data_dir=self.directory, shards=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
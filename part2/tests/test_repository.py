@@ -0,0 +1,149 @@
+import sys
+import threading
+import unittest
+from app.models.BaseModel import BaseModel
+from app.persistence.repository import InMemoryRepository, ShardedInMemoryRepository
+
+
+class Record(BaseModel):
+    """ Objet minimal pour tester le dépôt sans la validation des modèles """
+    def __init__(self, email, owner_id, parent=None):
+        super().__init__()
+        self.email = email
+        self.owner_id = owner_id
+        self.parent = parent
+
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = InMemoryRepository(indexes=('owner_id', 'parent.id'), unique_indexes=('email',))
+        self.alice = Record("alice@gmail.com", "owner-1")
+        self.bob = Record("bob@gmail.com", "owner-1", parent=self.alice)
+        self.clara = Record("clara@gmail.com", "owner-2", parent=self.alice)
+        for record in (self.alice, self.bob, self.clara):
+            self.repo.add(record)
+
+    def test_01_get_by_unique_attribute(self):
+        self.assertIs(self.repo.get_by_attribute('email', "bob@gmail.com"), self.bob)
+        self.assertIsNone(self.repo.get_by_attribute('email', "nobody@gmail.com"))
+
+    def test_02_find_all_by_attribute(self):
+        self.assertEqual(self.repo.find_all_by_attribute('owner_id', "owner-1"), [self.alice, self.bob])
+        self.assertEqual(self.repo.find_all_by_attribute('parent.id', self.alice.id), [self.bob, self.clara])
+        self.assertEqual(self.repo.find_all_by_attribute('owner_id', "owner-3"), [])
+        # attribut non indexé : parcours de tous les objets
+        self.assertEqual(self.repo.find_all_by_attribute('created_at', self.clara.created_at), [self.clara])
+
+    def test_03_duplicate_unique_value(self):
+        with self.assertRaises(ValueError):
+            self.repo.add(Record("alice@gmail.com", "owner-3"))
+        with self.assertRaises(ValueError):
+            self.repo.update(self.bob.id, {'email': "alice@gmail.com"})
+        self.assertIs(self.repo.get_by_attribute('email', "alice@gmail.com"), self.alice)
+
+    def test_04_update_moves_indexes(self):
+        self.repo.update(self.bob.id, {'email': "robert@gmail.com", 'owner_id': "owner-2"})
+        self.assertIsNone(self.repo.get_by_attribute('email', "bob@gmail.com"))
+        self.assertIs(self.repo.get_by_attribute('email', "robert@gmail.com"), self.bob)
+        self.assertEqual(self.repo.find_all_by_attribute('owner_id', "owner-1"), [self.alice])
+        self.assertEqual(self.repo.find_all_by_attribute('owner_id', "owner-2"), [self.clara, self.bob])
+
+    def test_05_delete_removes_from_indexes(self):
+        self.repo.delete(self.bob.id)
+        self.assertIsNone(self.repo.get_by_attribute('email', "bob@gmail.com"))
+        self.assertEqual(self.repo.find_all_by_attribute('parent.id', self.alice.id), [self.clara])
+        # l'email libéré peut être réutilisé
+        self.repo.add(Record("bob@gmail.com", "owner-3"))
+
+class TestShardedInMemoryRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = ShardedInMemoryRepository(shards=4, indexes=('owner_id',), unique_indexes=('email',))
+
+    def run_threads(self, target, count=8):
+        threads = [threading.Thread(target=target, args=(number,)) for number in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_01_same_operations_as_in_memory(self):
+        records = [Record(f"user{i}@gmail.com", f"owner-{i % 2}") for i in range(20)]
+        for record in records:
+            self.repo.add(record)
+        self.assertEqual(len(self.repo.get_all()), 20)
+        self.assertIs(self.repo.get(records[3].id), records[3])
+        self.assertIs(self.repo.get_by_attribute('email', "user7@gmail.com"), records[7])
+        self.assertEqual(len(self.repo.find_all_by_attribute('owner_id', "owner-1")), 10)
+        with self.assertRaises(ValueError):
+            self.repo.add(Record("user7@gmail.com", "owner-3"))
+        self.repo.update(records[7].id, {'email': "seven@gmail.com"})
+        self.assertIsNone(self.repo.get_by_attribute('email', "user7@gmail.com"))
+        self.repo.delete(records[7].id)
+        self.assertIsNone(self.repo.get_by_attribute('email', "seven@gmail.com"))
+
+    def test_02_concurrent_adds_keep_emails_unique(self):
+        created = []
+
+        def register(number):
+            # Tous les threads tentent d'enregistrer les mêmes emails
+            for i in range(200):
+                try:
+                    self.repo.add(Record(f"user{i}@gmail.com", f"owner-{number}"))
+                    created.append(i)
+                except ValueError:
+                    pass
+
+        self.run_threads(register)
+        self.assertEqual(sorted(created), list(range(200)))
+        self.assertEqual(len(self.repo.get_all()), 200)
+
+    def test_03_concurrent_updates_keep_indexes_consistent(self):
+        records = [Record(f"user{i}@gmail.com", "owner-0") for i in range(50)]
+        for record in records:
+            self.repo.add(record)
+
+        def move(number):
+            for round_number in range(20):
+                for record in records:
+                    self.repo.update(record.id, {'owner_id': f"owner-{(number + round_number) % 3}"})
+                    self.repo.get_by_attribute('owner_id', "owner-1")
+
+        self.run_threads(move)
+        for record in records:
+            self.assertIn(record, self.repo.find_all_by_attribute('owner_id', record.owner_id))
+        total = sum(len(self.repo.find_all_by_attribute('owner_id', f"owner-{i}")) for i in range(3))
+        self.assertEqual(total, 50)
+    def test_04_readers_never_miss_an_object_being_updated(self):
+        record = Record("alice@gmail.com", "owner-0")
+        self.repo.add(record)
+        done, missed = threading.Event(), []
+
+        def update():
+            # l'email reste le même : il doit être trouvé pendant toute la mise à jour
+            for i in range(5000):
+                self.repo.update(record.id, {'email': "alice@gmail.com", 'owner_id': f"owner-{i % 2}"})
+            done.set()
+
+        def read(number):
+            while not done.is_set():
+                if self.repo.get_by_attribute('email', "alice@gmail.com") is None:
+                    missed.append(number)
+
+        interval = sys.getswitchinterval()
+        # changements de thread très fréquents pour tomber au milieu des mises à jour
+        sys.setswitchinterval(1e-6)
+        try:
+            writer = threading.Thread(target=update)
+            writer.start()
+            self.run_threads(read, count=2)
+            writer.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(missed, [])
+        self.assertEqual(len(self.repo.find_all_by_attribute('owner_id', "owner-1")), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,18 +10,20 @@ from flask_bcrypt import Bcrypt
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from app.persistence.replica import REPLICA_BIND, ReplicaSynchronizer, RoutingSession
 
 
 jwt = JWTManager()
 bcrypt = Bcrypt()
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def create_app(config_class=config.DevelopmentConfig):
 
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    CORS(app, supports_credentials=True, origins=["http://localhost:8000"], resources={r"/api/*": {"origins": "http://localhost:8000"}})
+    CORS(app, supports_credentials=True, origins=["http://localhost:8000"], resources={r"/api/*": {"origins": "http://localhost:8000"}},
+         expose_headers=["X-Next-Cursor", "Link"])
 
 
     # Désactive la distinction entre URLs avec ou sans slash final
@@ -29,6 +31,40 @@ def create_app(config_class=config.DevelopmentConfig):
     # notamment lors des requêtes CORS préflight OPTIONS
     app.url_map.strict_slashes = False
 
+    # Le backend de persistance choisit la base utilisée et les repositories de la facade
+    from app.persistence.backends import database_uri
+    backend = app.config.get('PERSISTENCE_BACKEND', 'sqlite')
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(
+        backend, app.config.get('SQLALCHEMY_DATABASE_URI'))
+
+    # Réglages du pool de connexions, les options moteur explicites restant prioritaires
+    from app.persistence.pool import PoolMetrics, is_memory_database, pool_engine_options
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **pool_engine_options(app.config['SQLALCHEMY_DATABASE_URI'],
+                              app.config.get('SQLALCHEMY_POOL_OPTIONS')),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
+
+    # Lieux et avis répartis sur plusieurs bases : un bind par shard
+    from app.persistence.backends import SHARDED_BACKENDS
+    from app.persistence.sharding import SHARD_KEYS, attach_global_database, shard_bind, shard_uris
+    if backend in SHARDED_BACKENDS:
+        if is_memory_database(app.config['SQLALCHEMY_DATABASE_URI']):
+            raise ValueError("The sqlite-sharded backend needs a SQLite file, not an in-memory database")
+        uris = shard_uris(app.config['SQLALCHEMY_DATABASE_URI'], app.config.get('SHARD_COUNT', 4))
+        app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}),
+                                          **{shard_bind(index): uri for index, uri in enumerate(uris)}}
+
+    # Réplica en lecture seule, uniquement pour une base SQLite fichier
+    replica_uri = app.config.get('READ_REPLICA_URI')
+    if replica_uri and backend == 'sqlite':
+        app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}),
+                                          REPLICA_BIND: replica_uri}
+
+    # Format des clés, vérifié avant la création des moteurs
+    from app.models.identifiers import binary_ids, use_binary_ids
+    store_binary_ids = binary_ids(app.config.get('ID_FORMAT', 'uuid4'))
+
     jwt.init_app(app)
     bcrypt.init_app(app)
     db.init_app(app)
@@ -64,6 +100,19 @@ def create_app(config_class=config.DevelopmentConfig):
         security='Bearer Auth'  # Appliqué par défaut à toutes les routes (sauf si on override)
     )
 
+    # Compression des réponses selon Accept-Encoding, voir app/api/compression.py
+    from app.api.compression import ResponseCompressor
+    app.extensions['compression'] = ResponseCompressor.from_config(app.config)
+    app.after_request(app.extensions['compression'].after_request)
+
+    # Cache des réponses des GET publics, vidé par les écritures de la facade, voir app/api/response_cache.py
+    from app.api.response_cache import ResponseCache
+    ResponseCache.from_config(app.config).init_app(app)
+
+    # Encodage JSON des réponses (orjson par défaut), voir app/api/representations.py
+    from app.api.representations import json_representation
+    api.representations['application/json'] = json_representation(app.config.get('JSON_ENCODER', 'orjson'))
+
     # Importation et enregistrement des namespaces
     from app.api.v1.users import api as users_ns
     from app.api.v1.places import api as places_ns
@@ -79,8 +128,58 @@ def create_app(config_class=config.DevelopmentConfig):
     api.add_namespace(auth_ns, path='/api/v1/auth')
     api.add_namespace(admin_ns, path='/api/v1/admin')
 
+    from app.services import facade
+    facade.use_backend(backend)
+
+    with app.app_context():
+        # Clés stockées sur 16 octets dans toutes les bases (principale, réplica, shards)
+        if store_binary_ids:
+            for engine in db.engines.values():
+                use_binary_ids(engine)
+
+        # Compteurs du pool, exposés par GET /api/v1/admin/pool
+        app.extensions['pool_metrics'] = PoolMetrics()
+        app.extensions['pool_metrics'].attach(db.engine)
+
+        # Réglages SQLite appliqués à chaque nouvelle connexion (ProductionConfig)
+        pragmas = app.config.get('SQLITE_PRAGMAS')
+        if pragmas and app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+            from app.persistence.sqlite_pragmas import apply_pragmas
+            for engine in db.engines.values():
+                apply_pragmas(engine, pragmas)
+
     #Crée toutes les tables en base si elles n’existent pas déjà.
+    # Base principale seulement : le réplica reçoit le schéma par recopie
+    # Les tables déjà présentes reçoivent ensuite les colonnes et index ajoutés aux modèles
+    from app.persistence.place_repository import AGGREGATE_COLUMNS
+    from app.persistence.schema_upgrade import upgrade_schema
     with app.app_context():
-        db.create_all()
+        if backend in SHARDED_BACKENDS:
+            # Tables réparties dans chaque shard, toutes les autres dans la base globale
+            sharded = [table for table in db.metadata.sorted_tables if table.name in SHARD_KEYS]
+            unsharded = [table for table in db.metadata.sorted_tables if table.name not in SHARD_KEYS]
+            db.metadata.create_all(db.engine, tables=unsharded)
+            added = upgrade_schema(db.engine, unsharded)
+            for index in range(app.config.get('SHARD_COUNT', 4)):
+                engine = db.engines[shard_bind(index)]
+                # Tables globales visibles depuis chaque shard (jointures avec users, place_amenity...)
+                attach_global_database(engine, db.engine.url.database)
+                db.metadata.create_all(engine, tables=sharded)
+                for name, columns in upgrade_schema(engine, sharded).items():
+                    added.setdefault(name, []).extend(columns)
+        else:
+            db.create_all(bind_key=None)
+            added = upgrade_schema(db.engine, db.metadata.sorted_tables)
+        if any(column in AGGREGATE_COLUMNS for column in added.get('places', ())):
+            # Agrégats des notes ajoutés à zéro : recalculés depuis les avis existants
+            facade.repair_rating_aggregates()
+
+    # Copie périodique du primaire vers le réplica (tests et démonstration)
+    if REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {}):
+        app.extensions['replica_sync'] = ReplicaSynchronizer(
+            app, app.config.get('READ_REPLICA_SYNC_INTERVAL', 0))
+        app.extensions['replica_sync'].sync_now()
+        if app.extensions['replica_sync'].interval > 0:
+            app.extensions['replica_sync'].start()
 
     return app
@@ -0,0 +1,175 @@
+"""
+Compression of the HTTP responses (Content-Encoding).
+
+The listings (GET /api/v1/places/, GET /api/v1/users/) are large and very
+repetitive JSON documents: gzip brings them down to a fraction of their
+size. ResponseCompressor runs after every request of the Flask application
+and compresses the body when:
+- the client accepts one of COMPRESSION_ENCODINGS (Accept-Encoding, the
+  first of the list winning at equal quality);
+- the body is at least COMPRESSION_MIN_SIZE bytes: below that, the CPU time
+  and the gzip header cost more than the bytes saved;
+- the response is a JSON or text document, not already encoded, and does
+  not forbid it (Cache-Control: no-transform).
+
+A strong ETag of a compressed response gets the encoding appended
+("<tag>-gzip"), the compressed bytes being another representation (see
+conditional.py).
+
+'zstd' needs the zstandard package; without it only gzip is offered.
+COMPRESSION_LEVELS sets the level of each encoding.
+
+The same body is often sent again (pages read by many clients, responses
+served from a cache): the compressed bytes are kept in an LRU cache keyed by
+the encoding, the level and a digest of the body, so a body already seen is
+hashed instead of compressed again. The cache is bounded by
+COMPRESSION_CACHE_SIZE entries and COMPRESSION_CACHE_MAX_BYTES bytes of
+compressed bodies (least recently used evicted first); a body larger than
+COMPRESSION_CACHE_MAX_BODY is compressed without being hashed or kept, so a
+few large responses cannot push out all the others.
+
+Classes:
+- ResponseCompressor: after_request hook compressing the responses, with counters.
+
+Functions:
+- available_encodings(): return the encodings usable in this environment.
+"""
+
+import gzip
+import hashlib
+import threading
+
+from flask import request
+
+from app.persistence.cache import EntityCache
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle : gzip seulement
+    zstandard = None
+
+# Types de contenu compressés ; les images et polices le sont déjà
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/html', 'text/css',
+                      'text/javascript', 'text/plain')
+DEFAULT_LEVELS = {'zstd': 3, 'gzip': 6}
+# Une entrée dépend seulement du contenu du corps : elle ne devient jamais fausse
+CACHE_TTL = 3600.0
+
+
+def _gzip(body, level):
+    # mtime=0 : même corps, mêmes octets compressés
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _zstd(body, level):
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+ENCODERS = {'zstd': _zstd, 'gzip': _gzip}
+
+
+def available_encodings():
+    """ Return the supported encodings, zstd only when zstandard is installed """
+    return tuple(name for name in ENCODERS if name != 'zstd' or zstandard is not None)
+
+
+class ResponseCompressor:
+    """
+    Compress the responses of a Flask application (register after_request).
+
+    Attributes:
+        encodings: Encodings offered, preferred first.
+        min_size: Smallest body compressed, in bytes.
+        levels: Compression level of each encoding.
+        cache: EntityCache of the compressed bodies, bounded in entries and bytes.
+        cache_max_body: Largest body whose compressed bytes are cached.
+    """
+
+    def __init__(self, encodings=('zstd', 'gzip'), min_size=1024, levels=None, cache_size=256,
+                 cache_max_bytes=8 * 1024 * 1024, cache_max_body=1024 * 1024):
+        unknown = [name for name in encodings if name not in ENCODERS]
+        if unknown:
+            raise ValueError(f"Unknown compression encoding(s): {', '.join(unknown)}")
+        self.encodings = tuple(name for name in encodings if name in available_encodings())
+        self.min_size = min_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.cache = EntityCache(max_size=cache_size, ttl=CACHE_TTL, max_bytes=cache_max_bytes)
+        self.cache_max_body = cache_max_body
+        self._lock = threading.Lock()
+        self._counters = {'compressed': 0, 'too_small': 0, 'not_accepted': 0, 'not_cached': 0,
+                          'bytes_in': 0, 'bytes_out': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        """ Build the compressor from the COMPRESSION_* settings of the configuration """
+        return cls(encodings=config.get('COMPRESSION_ENCODINGS', ('zstd', 'gzip')),
+                   min_size=config.get('COMPRESSION_MIN_SIZE', 1024),
+                   levels=config.get('COMPRESSION_LEVELS'),
+                   cache_size=config.get('COMPRESSION_CACHE_SIZE', 256),
+                   cache_max_bytes=config.get('COMPRESSION_CACHE_MAX_BYTES', 8 * 1024 * 1024),
+                   cache_max_body=config.get('COMPRESSION_CACHE_MAX_BODY', 1024 * 1024))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def compress(self, body, encoding):
+        """
+        Return body compressed with encoding, from the cache when already
+        compressed. Bodies larger than cache_max_body are not cached.
+        """
+        level = self.levels[encoding]
+        if len(body) > self.cache_max_body:
+            # Rarement renvoyé à l'identique : ni empreinte ni place prise dans le cache
+            self._count('not_cached')
+            return ENCODERS[encoding](body, level)
+        key = (encoding, level, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = ENCODERS[encoding](body, level)
+            self.cache.set(key, compressed, size=len(compressed))
+        return compressed
+
+    def after_request(self, response):
+        """ Compress the response if the client accepts it and it is worth it """
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES
+                or 'no-transform' in response.cache_control):
+            return response
+
+        # Le corps dépend de Accept-Encoding, même quand il n'est pas compressé
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            self._count('not_accepted')
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            self._count('too_small')
+            return response
+
+        compressed = self.compress(body, encoding)
+        if len(compressed) >= len(body):
+            return response
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # Octets différents : un ETag fort ne peut pas être celui du corps non compressé
+            response.set_etag(f'{etag}-{encoding}')
+        with self._lock:
+            self._counters['compressed'] += 1
+            self._counters['bytes_in'] += len(body)
+            self._counters['bytes_out'] += len(compressed)
+        return response
+
+    def stats(self):
+        """ Return the counters, the compression ratio and the cache statistics """
+        with self._lock:
+            stats = dict(self._counters)
+        stats['ratio'] = round(stats['bytes_out'] / stats['bytes_in'], 3) if stats['bytes_in'] else None
+        stats['encodings'] = list(self.encodings)
+        stats['cache'] = self.cache.stats()
+        return stats
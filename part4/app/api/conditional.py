@@ -0,0 +1,79 @@
+"""
+Conditional GET: strong ETags and If-None-Match.
+
+The ETag of a response is a digest of:
+- the version of the rows it is built from, read with one query before
+  anything is loaded (see app/persistence/versions.py);
+- the path and the query string (fields, include, limit and cursor change
+  the body);
+- the JSON output (encoder and indentation, see representations.py).
+The same rows always give the same tag and any write on them a new one, so
+a request whose If-None-Match holds the tag gets a 304 before the rows are
+loaded or serialized. The compression appends the encoding to the tag of a
+compressed body ("<tag>-gzip", see compression.py); those tags match too.
+
+Responses carrying an ETag are sent with Cache-Control: no-cache: the
+browser keeps them and revalidates them on each use instead of
+downloading them again.
+
+Functions:
+- entity_tag(version, path, args, encoder, indent): ETag of a response, None without version.
+- matching_tag(etag, if_none_match): the tag of If-None-Match matching etag, or None.
+- validator_headers(etag): headers of a response carrying etag.
+- request_etag(version): entity_tag of the current Flask request.
+- not_modified(etag): the 304 response of the current Flask request, or None.
+"""
+
+import hashlib
+
+from flask import Response, current_app, request
+from werkzeug.http import quote_etag
+
+from app.api.compression import ENCODERS
+from app.api.representations import available_encoder
+
+
+def entity_tag(version, path, args, encoder, indent):
+    """
+    Return the strong ETag (unquoted) of the response of path with the query
+    string args ((name, value) pairs) built from rows of this version, or
+    None when there is no version.
+    """
+    if version is None:
+        return None
+    key = repr((version, path, sorted(args), encoder, bool(indent)))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def matching_tag(etag, if_none_match):
+    """
+    Return the tag of if_none_match (werkzeug ETags) matching etag, itself
+    or one of its compressed variants, or None.
+    """
+    if etag is None or not if_none_match:
+        return None
+    for tag in (etag, *(f'{etag}-{encoding}' for encoding in ENCODERS)):
+        if if_none_match.contains_weak(tag):
+            return tag
+    return None
+
+
+def validator_headers(etag):
+    """ Return the ETag and Cache-Control headers of a response (none without etag) """
+    if etag is None:
+        return {}
+    return {'ETag': quote_etag(etag), 'Cache-Control': 'no-cache'}
+
+
+def request_etag(version):
+    """ Return the ETag of the response of the current request built from rows of this version """
+    return entity_tag(version, request.path, request.args.items(multi=True),
+                      available_encoder(current_app.config.get('JSON_ENCODER', 'orjson')), current_app.debug)
+
+
+def not_modified(etag):
+    """ Return a 304 response if If-None-Match of the current request matches etag, else None """
+    tag = matching_tag(etag, request.if_none_match)
+    if tag is None:
+        return None
+    return Response(status=304, headers={**validator_headers(tag), 'Vary': 'Accept-Encoding'})
@@ -0,0 +1,99 @@
+"""
+JSON output of the flask_restx Api (and of the ASGI application).
+
+flask_restx encodes every response with the json module of the standard
+library. On large listings (GET /places/, GET /reviews/) the encoding
+dominates the CPU time of a request; orjson encodes the same payloads
+several times faster and writes bytes directly (see
+benchmarks/bench_json.py).
+
+JSON_ENCODER selects the encoder of the responses:
+- 'orjson' : orjson, or the standard library when orjson is not installed;
+- 'json'   : the standard library, the output of flask_restx (RESTX_JSON
+             settings, indented in debug mode).
+
+Both encoders write datetime and date values as ISO 8601 strings, UUID as
+their canonical text and Decimal as numbers, and end the body with a
+newline like flask_restx.
+
+Functions:
+- available_encoder(name): return the encoder actually used for a JSON_ENCODER value.
+- dumps(data, encoder='orjson', indent=False, settings=None): encode data to JSON bytes.
+- json_representation(encoder): return the 'application/json' representation of the Api.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur le module json
+    orjson = None
+
+JSON_ENCODERS = ('orjson', 'json')
+
+
+def available_encoder(name):
+    """
+    Return the encoder used for the JSON_ENCODER value 'name': 'orjson'
+    falls back to 'json' when orjson is not installed.
+    Raises ValueError for an unknown encoder.
+    """
+    if name not in JSON_ENCODERS:
+        raise ValueError(f"Unknown JSON encoder '{name}', expected one of: {', '.join(JSON_ENCODERS)}")
+    if name == 'orjson' and orjson is None:
+        return 'json'
+    return name
+
+
+def _default(value):
+    """ Encode the values the encoders do not know (default= of json and orjson) """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data, encoder='orjson', indent=False, settings=None):
+    """
+    Encode data to JSON bytes ending with a newline, with 'encoder' (a value
+    of available_encoder). 'settings' are extra json.dumps arguments of the
+    standard library encoder (RESTX_JSON).
+    """
+    if encoder == 'orjson':
+        # datetime, date et UUID sont encodés nativement, au même format qu'isoformat() et str()
+        option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
+    settings = dict(settings or {})
+    if indent:
+        settings.setdefault('indent', 4)
+    settings.setdefault('default', _default)
+    return (json.dumps(data, **settings) + '\n').encode('utf-8')
+
+
+def json_representation(encoder):
+    """
+    Return the function encoding the responses of the Api as JSON with
+    'encoder' (a JSON_ENCODER value), in place of flask_restx's output_json.
+    """
+    encoder = available_encoder(encoder)
+
+    def output_json(data, code, headers=None):
+        """ Makes a Flask response with a JSON encoded body """
+        body = dumps(data, encoder, indent=current_app.debug,
+                     settings=current_app.config.get('RESTX_JSON'))
+        response = make_response(body, code)
+        response.headers.extend(headers or {})
+        return response
+
+    output_json.encoder = encoder
+    return output_json
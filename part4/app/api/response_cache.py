@@ -0,0 +1,234 @@
+"""
+Server-side cache of the responses of the public GET endpoints.
+
+GET /places/, GET /places/<place_id>, GET /places/<place_id>/reviews and
+GET /amenities/ are read far more often than the rows behind them change.
+The resources decorated with @cached_response keep their whole response
+(body, status and headers, before compression) in a ResponseCache keyed by
+the URL and the query string, and send it again without running the view:
+no query, no serialization, no JSON encoding. The compression still runs on
+the cached body (and reuses its own cache of compressed bodies, see
+compression.py), and a matching If-None-Match gets a 304 (see
+conditional.py).
+
+Only anonymous requests are served from the cache or stored in it (no
+Authorization header): nothing of a response built for a user can reach
+another one. Only the 200 responses are stored.
+
+Invalidation is driven by the writes, through tags:
+- a response is tagged with the ('<table>', id) of every object serialized
+  in its body (record_entities() of app/services/projection.py), plus the
+  tags given to @cached_response ('places',) for the listing of the places,
+  ('places', place_id) for the reviews of a place...);
+- after each commit the facade sends entities_changed with the tags of the
+  rows it wrote (see app/services/facade.py) and every response carrying
+  one of them is dropped.
+A response built while a write was committing could carry the rows of
+before the write: it is not stored if any invalidation happened since the
+request started.
+
+The cache is bounded by RESPONSE_CACHE_SIZE entries and
+RESPONSE_CACHE_MAX_BYTES bytes of bodies and headers (least recently used
+entries evicted first), and RESPONSE_CACHE_TTL seconds per entry. The TTL
+also bounds how long a response can stay stale when the rows are written
+elsewhere: by another process (each process has its own cache), on the
+read replica before its refresh, or directly in the database.
+
+Classes:
+- ResponseCache: LRU + TTL store of the responses, with tag invalidation and counters.
+
+Functions:
+- cached_response(tags): decorator of a Resource method serving it from the cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_restx.utils import unpack
+
+from app.api.conditional import not_modified
+from app.services.facade import entities_changed
+from app.services.projection import record_entities
+
+# En-têtes recalculés à chaque envoi : jamais gardés avec le corps
+SKIPPED_HEADERS = ('Content-Length',)
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU + TTL cache of responses, bounded in entries and bytes,
+    with tag invalidation.
+
+    Attributes:
+        max_entries: Maximum number of responses kept; 0 disables the cache.
+        max_bytes: Maximum total size of the bodies and headers kept.
+        ttl: Number of seconds a response stays valid.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, ttl=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        # clé -> (réponse, taille, tags, expiration)
+        self._entries = OrderedDict()
+        # tag -> clés des réponses qui le portent
+        self._tagged = {}
+        self._bytes = 0
+        # Incrémentée à chaque invalidation : une réponse construite pendant une écriture n'est pas gardée
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'expirations': 0,
+                          'invalidations': 0, 'stale': 0, 'too_large': 0, 'bypassed': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        """ Build the cache from the RESPONSE_CACHE_* settings of the configuration """
+        return cls(max_entries=config.get('RESPONSE_CACHE_SIZE', 1024),
+                   max_bytes=config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+                   ttl=config.get('RESPONSE_CACHE_TTL', 60.0))
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @property
+    def generation(self):
+        """ Number of invalidations so far, read before building a response to store """
+        return self._generation
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _remove(self, key):
+        """ Drop an entry and its tags (lock held) """
+        _, size, tags, _ = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def get(self, key):
+        """ Return the (body, status, headers, etag) stored for key, or None if absent or expired """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            if entry[3] <= self._clock():
+                self._remove(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[0]
+
+    def set(self, key, response, tags, generation):
+        """
+        Store response ((body, status, headers, etag)) for key with its tags,
+        unless an invalidation happened since generation was read. Evicts
+        the least recently used entries beyond the bounds.
+        """
+        body, _, headers, _ = response
+        size = len(body) + sum(len(name) + len(value) for name, value in headers)
+        with self._lock:
+            if generation != self._generation:
+                self._counters['stale'] += 1
+                return
+            if size > self.max_bytes:
+                self._counters['too_large'] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            tags = frozenset(tags)
+            self._entries[key] = (response, size, tags, self._clock() + self.ttl)
+            self._bytes += size
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            self._counters['stores'] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+
+    def invalidate(self, tags):
+        """ Drop the responses carrying one of tags (all of them if tags is None) """
+        with self._lock:
+            self._generation += 1
+            if tags is None:
+                keys = list(self._entries)
+            else:
+                keys = {key for tag in tags for key in self._tagged.get(tag, ())}
+            for key in keys:
+                self._remove(key)
+            self._counters['invalidations'] += len(keys)
+
+    def on_entities_changed(self, sender, tags=None):
+        """ Receiver of the entities_changed signal of the facade """
+        self.invalidate(tags)
+
+    def clear(self):
+        """ Remove every response (counters are kept) """
+        self.invalidate(None)
+
+    def stats(self):
+        """ Return the counters, the size in entries and bytes and the hit ratio """
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(size=len(self._entries), max_entries=self.max_entries, bytes=self._bytes,
+                         max_bytes=self.max_bytes, ttl=self.ttl, tags=len(self._tagged))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else None
+        return stats
+
+    def init_app(self, app):
+        """ Register the cache on app and subscribe it to the writes made in app """
+        app.extensions['response_cache'] = self
+        entities_changed.connect(self.on_entities_changed, sender=app)
+
+
+def cached_response(tags=None):
+    """
+    Decorate the get method of a Resource to serve it from the ResponseCache
+    of the application. tags(**view_args) returns the tags of the response
+    besides those of the serialized objects, e.g. ('places',) for a listing
+    whose rows can be added or removed.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(resource, *args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None or not cache.enabled:
+                return method(resource, *args, **kwargs)
+            if 'Authorization' in request.headers:
+                # Réponse d'un utilisateur connecté : jamais partagée
+                cache.count('bypassed')
+                return method(resource, *args, **kwargs)
+
+            key = (request.base_url, tuple(sorted(request.args.items(multi=True))))
+            entry = cache.get(key)
+            if entry is None:
+                generation = cache.generation
+                with record_entities() as recorded:
+                    response = method(resource, *args, **kwargs)
+                    if not isinstance(response, Response):
+                        # Corps encodé ici, pendant la collecte (sérialisation paresseuse)
+                        response = resource.api.make_response(*unpack(response))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                headers = [(name, value) for name, value in response.headers if name not in SKIPPED_HEADERS]
+                entry = (response.get_data(), response.status_code, headers, response.get_etag()[0])
+                cache.set(key, entry, recorded.union(tags(**kwargs) if tags else ()), generation)
+                return response
+
+            body, status, headers, etag = entry
+            return not_modified(etag) or Response(body, status=status, headers=headers)
+        return wrapper
+    return decorator
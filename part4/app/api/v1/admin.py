@@ -11,6 +11,12 @@ Features include:
 - Admin user creation and modification.
 - Amenity creation and modification.
 - Place modification accessible to admins or place owners.
+- Entity cache counters (hits, misses, evictions) for monitoring.
+- Check of the SQLite PRAGMA settings of the database connections.
+- Connection pool counters (checkouts, wait times, overflow, invalidations).
+- Response compression counters (bytes in and out, compressed bodies cache).
+- Response cache counters (hits, misses, evictions, invalidations, size).
+- Repair of the rating aggregates of the places.
 
 All input data are validated using Flask-RESTx models and
 appropriate HTTP status codes are returned to indicate success or errors.
@@ -21,7 +27,7 @@ business logic and data access.
 
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask import request
+from flask import current_app, request
 from werkzeug.security import generate_password_hash
 from app.services import facade
 
@@ -264,3 +270,110 @@ class AdminPlaceModify(Resource):
             return {'error': message}, 400
         # Si mise à jour ok
         return {"message": "Place updated successfully"}, 200
+
+#-----------------------------------------------------------------------------#
+#---------------------------------Monitoring----------------------------------#
+#-----------------------------------------------------------------------------#
+
+@api.route('/cache')
+class AdminCacheStats(Resource):
+    @jwt_required()
+    @api.response(200, 'Cache statistics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @api.doc(description="Hit/miss/eviction counters of the entity caches (admin only)")
+    def get(self):
+        """
+        Return the statistics of the entity caches.
+        """
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        return facade.get_cache_stats(), 200
+
+
+@api.route('/ratings/repair')
+class AdminRatingRepair(Resource):
+    @jwt_required()
+    @api.response(200, 'Rating aggregates recomputed')
+    @api.response(403, 'Admin privileges required')
+    @api.doc(description="Recompute the rating aggregates of every place from its reviews (admin only)")
+    def post(self):
+        """
+        Recompute the review count, rating sum and histogram of every place.
+        """
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        return {'places_fixed': facade.repair_rating_aggregates()}, 200
+
+
+@api.route('/database')
+class AdminDatabaseSettings(Resource):
+    @jwt_required()
+    @api.response(200, 'Database settings retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @api.doc(description="Compare the configured SQLite PRAGMA settings with those of a connection (admin only)")
+    def get(self):
+        """
+        Return the configured and actual SQLite PRAGMA settings.
+        """
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        # Sans SQLITE_PRAGMAS (développement), rien à vérifier
+        pragmas = current_app.config.get('SQLITE_PRAGMAS') or {}
+        return facade.check_database_pragmas(pragmas), 200
+
+
+@api.route('/pool')
+class AdminPoolStats(Resource):
+    @jwt_required()
+    @api.response(200, 'Pool statistics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @api.doc(description="Checkouts, wait times, overflow and invalidations of the connection pool (admin only)")
+    def get(self):
+        """
+        Return the statistics of the database connection pool.
+        """
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        return current_app.extensions['pool_metrics'].stats(), 200
+
+
+@api.route('/compression')
+class AdminCompressionStats(Resource):
+    @jwt_required()
+    @api.response(200, 'Compression statistics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @api.doc(description="Compressed responses, bytes in and out and cache of the compressed bodies (admin only)")
+    def get(self):
+        """
+        Return the statistics of the response compression.
+        """
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        return current_app.extensions['compression'].stats(), 200
+
+
+@api.route('/response-cache')
+class AdminResponseCacheStats(Resource):
+    @jwt_required()
+    @api.response(200, 'Response cache statistics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @api.doc(description="Hits, misses, evictions, invalidations and size of the response cache (admin only)")
+    def get(self):
+        """
+        Return the statistics of the cache of the public GET responses.
+        """
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        return current_app.extensions['response_cache'].stats(), 200
@@ -6,10 +6,14 @@ providing endpoints to create, retrieve, update, and list amenities.
 
 Available endpoints:
 - POST /amenities/       : Create a new amenity.
-- GET /amenities/        : Retrieve the list of all amenities.
+- GET /amenities/        : Retrieve the list of amenities (cursor-paginated with ?limit=&cursor=).
 - GET /amenities/<id>    : Retrieve a specific amenity by its ID.
 - PUT /amenities/<id>    : Update an existing amenity.
 
+The GET endpoints accept ?fields= and ?include= (see fieldsets.py); without
+them they return the shape AMENITY (id and name). GET /amenities/ is served
+from the response cache to anonymous clients (see app/api/response_cache.py).
+
 Each endpoint uses input validation through Flask-RESTx models
 and returns appropriate HTTP status codes based on operation results.
 
@@ -26,10 +30,16 @@ Handled exceptions and responses:
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.response_cache import cached_response
+from app.api.v1.fieldsets import FIELDSET_PARAMS, Fieldset, get_projection
+from app.api.v1.pagination import PAGINATION_PARAMS, get_pagination_args, paginated_response
 
 # Create a namespace for all amenity-related endpoints
 api = Namespace('amenities', description='Amenity operations')
 
+# Forme des réponses GET sans ?fields= ni ?include=
+AMENITY = Fieldset('amenities', None, ())
+
 # Define the amenity model for input validation and documentation
 amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
@@ -62,25 +72,36 @@ class AmenityList(Resource):
         }, 201
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination, fields or include parameters')
+    @api.doc(params={**PAGINATION_PARAMS, **FIELDSET_PARAMS})
+    @cached_response(lambda: [('amenities',)])
     def get(self):
-        """Retrieve all available amenities"""
-        amenities = facade.get_all_amenities()
-        return amenities, 200
+        """Retrieve a page of available amenities"""
+        try:
+            limit, cursor = get_pagination_args()
+            projection = get_projection(AMENITY)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        amenities, next_cursor = facade.get_all_amenities(limit, cursor, projection)
+        return paginated_response(amenities, next_cursor)
 
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(400, 'Invalid fields or include parameters')
     @api.response(404, 'Amenity not found')
+    @api.doc(params=FIELDSET_PARAMS)
     def get(self, amenity_id):
         """Get amenity details by ID"""
-        amenity = facade.get_amenity(amenity_id)
+        try:
+            projection = get_projection(AMENITY)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        amenity = facade.get_amenity(amenity_id, projection)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return {
-            'id': amenity.id,
-            'name': amenity.name,
-        }, 200
+        return projection.serialize(amenity), 200
 
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
@@ -0,0 +1,46 @@
+"""
+Sparse fieldsets (?fields=) and included relationships (?include=) of the
+GET endpoints.
+
+Every GET endpoint of the users, places, reviews and amenities namespaces
+accepts two query string parameters:
+- fields  : comma-separated fields to return; 'reviews.rating' is a field
+            of an included resource.
+- include : comma-separated relationships to embed; 'places.reviews' goes
+            one level deeper (at most FIELDSET_MAX_DEPTH levels).
+
+Without them an endpoint returns the shape it always returned (its
+Fieldset below). The requested shape decides which columns and
+relationships are read from the database (see app/services/projection.py).
+An unknown field or relationship, or a too deep include, is a 400 error.
+"""
+
+from collections import namedtuple
+
+from flask import current_app, request
+
+from app.services.projection import parse_projection
+
+FIELDSET_PARAMS = {
+    'fields': "Comma-separated fields to return, e.g. 'id,title,reviews.rating'",
+    'include': "Comma-separated relationships to embed, e.g. 'amenities,reviews.user' (empty for none)"
+}
+
+# Forme renvoyée par un endpoint sans ?fields= ni ?include= :
+# ressource, champs du premier niveau (None = ceux de la ressource), relations incluses
+Fieldset = namedtuple('Fieldset', ['resource', 'fields', 'include'])
+
+
+def get_projection(fieldset):
+    """
+    Read 'fields' and 'include' from the query string and return the
+    Projection of the response. Raises ValueError on invalid values.
+    """
+    return parse_projection_args(
+        request.args, fieldset, current_app.config.get('FIELDSET_MAX_DEPTH', 3))
+
+
+def parse_projection_args(args, fieldset, max_depth):
+    """ Same as get_projection, for a mapping of query string arguments """
+    return parse_projection(fieldset.resource, args.get('fields'), args.get('include'),
+                            fieldset.fields, fieldset.include, max_depth)
@@ -0,0 +1,92 @@
+"""
+Cursor-based (keyset) pagination helpers shared by the list endpoints.
+
+Every list resource (users, places, reviews, amenities) accepts two
+query string parameters:
+- limit  : number of items to return (default and maximum set in config).
+- cursor : opaque token returned by the previous page.
+
+Without ?limit= a list returns only its first PAGINATION_DEFAULT_LIMIT (100)
+items, not the whole table: a client wanting everything must follow the
+cursor until the last page (up to PAGINATION_MAX_LIMIT, 1000, per page).
+
+The body of the response stays a plain JSON list, so existing clients keep
+working. When more items are available, the token of the next page is sent
+in the 'X-Next-Cursor' header, together with a 'Link: <...>; rel="next"'
+header pointing to the next page.
+
+The token is the URL-safe base64 encoding of the last primary key of the
+page; clients must treat it as opaque.
+"""
+
+import base64
+from urllib.parse import urlencode
+from flask import current_app, request
+
+PAGINATION_PARAMS = {
+    'limit': 'Maximum number of items to return (default 100, at most 1000); follow the cursor for the rest',
+    'cursor': 'Token of the next page, taken from the X-Next-Cursor header'
+}
+
+
+def encode_cursor(last_id):
+    """ Turn the last primary key of a page into an opaque token """
+    token = base64.urlsafe_b64encode(str(last_id).encode('utf-8'))
+    return token.decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """ Turn an opaque token back into the primary key to resume from """
+    padding = '=' * (-len(token) % 4)
+    try:
+        return base64.urlsafe_b64decode(token + padding).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def get_pagination_args():
+    """
+    Read and validate 'limit' and 'cursor' from the query string.
+
+    Returns a tuple (limit, cursor) where cursor is the decoded primary key
+    or None for the first page. Raises ValueError on invalid values.
+    """
+    return parse_pagination_args(
+        request.args,
+        current_app.config.get('PAGINATION_DEFAULT_LIMIT', 100),
+        current_app.config.get('PAGINATION_MAX_LIMIT', 1000))
+
+
+def parse_pagination_args(args, default_limit, max_limit):
+    """ Same as get_pagination_args, for a mapping of query string arguments """
+    raw_limit = args.get('limit')
+    if raw_limit is None:
+        limit = default_limit
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if not 1 <= limit <= max_limit:
+            raise ValueError(f"limit must be between 1 and {max_limit}")
+
+    token = args.get('cursor')
+    cursor = decode_cursor(token) if token else None
+    return limit, cursor
+
+
+def paginated_response(items, next_cursor, headers=None):
+    """ Build the (body, status, headers) tuple returned by a list endpoint, with extra headers if given """
+    return items, 200, {**next_page_headers(request.base_url, request.args.to_dict(), next_cursor),
+                        **(headers or {})}
+
+
+def next_page_headers(base_url, args, next_cursor):
+    """ Return the X-Next-Cursor and Link headers of a page (none on the last page) """
+    headers = {}
+    if next_cursor is not None:
+        token = encode_cursor(next_cursor)
+        args = dict(args, cursor=token)
+        headers['X-Next-Cursor'] = token
+        headers['Link'] = f'<{base_url}?{urlencode(args)}>; rel="next"'
+    return headers
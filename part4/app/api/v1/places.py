@@ -7,10 +7,21 @@ and accessing reviews associated with each place.
 
 Main functionalities:
 - POST /places/                  : Create a new place (authentication required).
-- GET /places/                   : Retrieve the list of all places.
+- POST /places/batch             : Create several places in one transaction (authentication required).
+- GET /places/                   : Retrieve the list of places (cursor-paginated with ?limit=&cursor=,
+                                   only the first 100 without ?limit=).
+- GET /places/search             : Search places by price range, amenities and bounding box, sorted (cursor-paginated).
 - GET /places/<place_id>         : Retrieve details of a place by its ID.
 - PUT /places/<place_id>         : Update an existing place (only allowed by the owner, authentication required).
-- GET /places/<place_id>/reviews : Retrieve all reviews linked to a place.
+- GET /places/<place_id>/reviews : Retrieve the reviews linked to a place (oldest first, cursor-paginated).
+
+The GET endpoints accept ?fields= and ?include= (see fieldsets.py); without
+them they return the shapes PLACE_LIST, PLACE_DETAIL and PLACE_REVIEWS.
+GET /places/ and GET /places/<place_id> send a strong ETag and answer 304
+to a matching If-None-Match (see app/api/conditional.py). The three GET
+endpoints are served from the response cache to anonymous clients (see
+app/api/response_cache.py). GET /places/search is neither cached nor
+conditional: a write can make any place enter or leave its results.
 
 Data validation and API documentation are managed via Flask-RESTx models.
 
@@ -23,15 +34,21 @@ Security:
 HTTP status codes used:
 - 200 : Operation successful.
 - 201 : Resource successfully created.
+- 304 : Not modified (conditional GET).
 - 400 : Invalid or missing data.
 - 403 : Unauthorized action.
 - 404 : Resource not found.
 - 409 : Conflict (e.g., place title already exists).
 """
 
-from flask import request
+from flask import current_app, request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.conditional import not_modified, request_etag, validator_headers
+from app.api.response_cache import cached_response
+from app.api.v1.fieldsets import FIELDSET_PARAMS, Fieldset, get_projection
+from app.api.v1.pagination import PAGINATION_PARAMS, get_pagination_args, paginated_response
+from app.services.place_search import SORTS, parse_place_search
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 
 # Create a namespace for place-related endpoints
@@ -69,9 +86,57 @@ place_model = api.model('Place', {
     'reviews': fields.List(fields.Nested(review_model), description='List of reviews')
 })
 
+# Entrée de POST et PUT : les amenities sont des identifiants, place_model ne sert qu'aux réponses
+place_input_model = api.model('PlaceInput', {
+    'title': fields.String(required=True, description='Title of the place'),
+    'description': fields.String(description='Description of the place'),
+    'price': fields.Float(required=True, description='Price per night'),
+    'latitude': fields.Float(required=True, description='Latitude of the place'),
+    'longitude': fields.Float(required=True, description='Longitude of the place'),
+    'owner_id': fields.String(required=True, description='ID of the owner'),
+    'amenities': fields.List(fields.String, description='List of amenity IDs')
+})
+
+place_batch_item = api.model('PlaceBatchItem', {
+    'title': fields.String(required=True, description='Title of the place'),
+    'description': fields.String(required=True, description='Description of the place'),
+    'price': fields.Float(required=True, description='Price per night'),
+    'latitude': fields.Float(required=True, description='Latitude of the place'),
+    'longitude': fields.Float(required=True, description='Longitude of the place'),
+    'owner_id': fields.String(description='ID of the owner (defaults to the current user, admins only for others)'),
+    'amenities': fields.List(fields.String, description='List of amenity IDs')
+})
+
+place_batch_model = api.model('PlaceBatch', {
+    'places': fields.List(fields.Nested(place_batch_item), required=True, description='Places to create')
+})
+
+# Formes des réponses sans ?fields= ni ?include= (celles de Place.to_dict() et de User.to_dict())
+PLACE_LIST = Fieldset('places', None, ('amenities', 'reviews'))
+# Détail : le propriétaire complet à la place de owner_id (aussi servi par app/asgi.py)
+PLACE_DETAIL = Fieldset(
+    'places',
+    ('id', 'title', 'description', 'price', 'latitude', 'longitude',
+     'review_count', 'average_rating', 'rating_histogram'),
+    ('owner.reviews', 'owner.places.amenities', 'owner.places.reviews', 'amenities', 'reviews'))
+PLACE_REVIEWS = Fieldset('reviews', ('id', 'text', 'rating', 'user_name'), ())
+
+# Paramètres de GET /places/search, tous facultatifs (voir app/services/place_search.py)
+SEARCH_PARAMS = {
+    'min_price': 'Minimum price per night (included)',
+    'max_price': 'Maximum price per night (included)',
+    'amenities': 'Comma-separated amenity IDs, the place must have all of them',
+    'min_lat': 'Southern edge of the bounding box (-90 to 90)',
+    'max_lat': 'Northern edge of the bounding box (-90 to 90)',
+    'min_lon': 'Western edge of the bounding box (-180 to 180, greater than max_lon across the antimeridian)',
+    'max_lon': 'Eastern edge of the bounding box (-180 to 180)',
+    'sort': f"Sort order: {', '.join(SORTS)} (default id)",
+}
+
+
 @api.route('/')
 class PlaceList(Resource):
-    @api.expect(place_model, validate=True)
+    @api.expect(place_input_model, validate=True)
     @api.response(201, 'Place successfully created')
     @api.response(400, 'Invalid input data')
     @api.response(409, 'The place already exists')
@@ -113,48 +178,109 @@ class PlaceList(Resource):
         }, 201
 
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, 'The page did not change (If-None-Match)')
+    @api.response(400, 'Invalid pagination, fields or include parameters')
+    @api.doc(params={**PAGINATION_PARAMS, **FIELDSET_PARAMS})
+    # Un lieu ajouté peut entrer dans n'importe quelle page
+    @cached_response(lambda: [('places',)])
     def get(self):
-        """Retrieve a list of all places"""
-        place = facade.get_all_places()
-        if place:
-            return place, 200
+        """Retrieve a page of places"""
+        try:
+            limit, cursor = get_pagination_args()
+            projection = get_projection(PLACE_LIST)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        # Version de la page en une requête : 304 sans charger ni sérialiser les lieux
+        etag = request_etag(facade.get_places_version(limit, cursor, projection))
+        unchanged = not_modified(etag)
+        if unchanged:
+            return unchanged
+        places, next_cursor = facade.get_all_places(limit, cursor, projection)
+        return paginated_response(places, next_cursor, validator_headers(etag))
+
+
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @api.expect(place_batch_model, validate=True)
+    @api.response(201, 'Places successfully created')
+    @api.response(400, 'Invalid input data, nothing was created')
+    @jwt_required()
+    @api.doc(security='Bearer Auth')
+    def post(self):
+        """Register several places in one transaction"""
+        current_user = get_jwt_identity()
+        items = api.payload['places']
+        if not items:
+            return {'error': 'No place to create'}, 400
+        max_items = current_app.config.get('BATCH_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return {'error': f'A batch cannot contain more than {max_items} places'}, 400
+
+        # Sans owner_id, le lieu appartient à l'utilisateur connecté
+        for item in items:
+            item.setdefault('owner_id', current_user['id'])
+
+        # Seul un admin peut créer des lieux pour d'autres utilisateurs
+        owner_id = None if current_user.get('is_admin') else current_user['id']
+        places, errors = facade.create_places(items, owner_id=owner_id)
+        if errors:
+            return {'error': 'Invalid batch, no place was created', 'errors': errors}, 400
+
+        return {
+            'count': len(places),
+            'places': [{
+                'id': place.id,
+                'title': place.title,
+                'owner_id': place.owner_id
+            } for place in places]
+        }, 201
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.response(200, 'Page of matching places retrieved successfully')
+    @api.response(400, 'Invalid search, pagination, fields or include parameters')
+    @api.doc(params={**SEARCH_PARAMS, **PAGINATION_PARAMS, **FIELDSET_PARAMS})
+    def get(self):
+        """Search places by price, amenities and location"""
+        try:
+            criteria = parse_place_search(request.args)
+            limit, cursor = get_pagination_args()
+            projection = get_projection(PLACE_LIST)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        # Filtres, tri et page en une requête : la réponse ne contient que les résultats
+        places, next_cursor = facade.search_places(criteria, limit, cursor, projection)
+        return paginated_response(places, next_cursor)
 
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully', model=place_model)
+    @api.response(304, 'The place did not change (If-None-Match)')
+    @api.response(400, 'Invalid fields or include parameters')
     @api.response(404, 'Place not found')
+    @api.doc(params=FIELDSET_PARAMS)
+    @cached_response(lambda place_id: [('places', place_id)])
     def get(self, place_id):
         """Retrieve a specific place by ID"""
-        place = facade.get_place(place_id)
+        try:
+            projection = get_projection(PLACE_DETAIL)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        # Version du lieu et de ses relations en une requête : 304 sans rien charger
+        etag = request_etag(facade.get_place_version(place_id, projection))
+        unchanged = not_modified(etag)
+        if unchanged:
+            return unchanged
+        # Le lieu, son propriétaire et leurs relations en un nombre fixe de requêtes
+        place = facade.get_place_detail(place_id, projection)
         if not place:
             return {'error': 'The place does not exist'}, 404
 
-        # Récupérer le User (owner)
-        owner = facade.get_user_by_id(place.owner_id)
-        if owner:
-            owner_data = owner.to_dict()
-        else:
-            owner_data = None
-
+        return projection.serialize(place), 200, validator_headers(etag)
 
-        # Fetch amenities related to the place
-        amenities_data = [a.to_dict() for a in place.amenities]
-        reviews_data = [a.to_dict() for a in place.reviews]
-
-        return {
-            'id': place.id,
-            'title': place.title,
-            'description': place.description,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'owner': owner_data,
-            'amenities': amenities_data,
-            'reviews': reviews_data
-        }, 200
-
-    @api.expect(place_model, validate=True)
+    @api.expect(place_input_model, validate=True)
     @api.response(200, 'Place updated successfully')
     @api.response(400, 'Invalid input data')
     @api.response(403, 'Unauthorized action')
@@ -195,29 +321,25 @@ class PlaceResource(Resource):
 @api.route('/<place_id>/reviews')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid pagination, fields or include parameters')
     @api.response(404, 'Place not found')
+    @api.doc(params={**PAGINATION_PARAMS, **FIELDSET_PARAMS})
+    # Les avis ajoutés ou supprimés changent ('places', place_id)
+    @cached_response(lambda place_id: [('places', place_id)])
     def get(self, place_id):
-        """Retrieve all reviews for a specific place"""
+        """Retrieve a page of the reviews of a specific place, oldest first"""
+        try:
+            limit, cursor = get_pagination_args()
+            projection = get_projection(PLACE_REVIEWS)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+
         place = facade.get_place(place_id)
         if not place:
             return {"error": "Place not found"}, 404
 
-        reviews = facade.get_reviews_by_place(place_id) or []
-
-        response = []
-        for review in reviews:
-            review_data = {
-                "id": review.id,
-                "text": review.text,
-                "rating": review.rating,
-            }
-
-            if review.user:
-                review_data["user_name"] = f"{review.user.first_name} {review.user.last_name}"
-            else:
-                review_data["user_name"] = "Utilisateur inconnu"
-
-            response.append(review_data)
+        reviews, next_cursor = facade.get_reviews_by_place(place_id, limit, cursor, projection)
 
-        return response, 200
+        response = [projection.serialize(review) for review in reviews]
+        return paginated_response(response, next_cursor)
 
@@ -7,11 +7,15 @@ associated with places and users.
 
 Main features:
 - POST /reviews/              : Create a new review (JWT authentication required).
-- GET /reviews/               : Retrieve the list of all reviews.
+- POST /reviews/batch         : Create several reviews in one transaction (JWT authentication required).
+- GET /reviews/               : Retrieve the list of reviews (cursor-paginated with ?limit=&cursor=).
 - GET /reviews/<review_id>    : Retrieve a review by its ID.
 - PUT /reviews/<review_id>    : Update an existing review (JWT authentication required).
 - DELETE /reviews/<review_id> : Delete a review (JWT authentication required).
 
+The GET endpoints accept ?fields= and ?include= (see fieldsets.py); without
+them they return the shapes REVIEW_LIST and REVIEW_DETAIL.
+
 Each endpoint uses Flask-RESTx models to validate input data
 and automatically generate Swagger documentation.
 
@@ -32,15 +36,23 @@ or posting multiple reviews for the same place.
 
 
 
-from flask import request
+from flask import current_app, request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.fieldsets import FIELDSET_PARAMS, Fieldset, get_projection
+from app.api.v1.pagination import PAGINATION_PARAMS, get_pagination_args, paginated_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_cors import cross_origin
 
 # Create a namespace for review-related endpoints
 api = Namespace('reviews', description='Review operations')
 
+# Formes des réponses GET sans ?fields= ni ?include= : Review.to_dict() pour la liste,
+# l'auteur et le lieu complets (User.to_dict(), Place.to_dict()) pour le détail
+REVIEW_LIST = Fieldset('reviews', None, ())
+REVIEW_DETAIL = Fieldset('reviews', ('id', 'text', 'rating'), (
+    'user.reviews', 'user.places.amenities', 'user.places.reviews', 'place.amenities', 'place.reviews'))
+
 # Define the review model for input validation and documentation
 review_model = api.model('Review', {
     'text': fields.String(required=True, description='Text of the review'),
@@ -78,6 +90,10 @@ review_detailed_response = api.model('ReviewDetailedResponse', {
     'place': fields.Nested(place_brief, description='Place being reviewed')
 })
 
+review_batch_model = api.model('ReviewBatch', {
+    'reviews': fields.List(fields.Nested(review_model), required=True, description='Reviews to create')
+})
+
 
 @api.route('/')
 class ReviewList(Resource):
@@ -116,13 +132,9 @@ class ReviewList(Resource):
         if hasattr(place, 'owner') and str(place.owner.id) == str(user_id):
             return {'error': 'You cannot evaluate your own location.'}, 400
 
-        # Récupère toutes les reviews existantes pour ce lieu
-        existing_reviews = facade.get_reviews_by_place(place_id) or []
-
         # Vérifie si l'utilisateur a déjà posté une review pour ce lieu
-        for rev in existing_reviews:
-            if rev.user and str(rev.user.id) == str(user_id):
-                return {'error': 'You have already reviewed this place'}, 400
+        if facade.has_reviewed_place(user_id, place_id):
+            return {'error': 'You have already reviewed this place'}, 400
         # Si tout est bon, crée une nouvelle review avec les données fournies
         try:
             new_review = facade.create_review(review_data)
@@ -139,42 +151,71 @@ class ReviewList(Resource):
 
 
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination, fields or include parameters')
+    @api.doc(params={**PAGINATION_PARAMS, **FIELDSET_PARAMS})
     def get(self):
-        """Retrieve a list of all reviews"""
-        # Placeholder for logic to return a list of all reviews
-        reviews = facade.get_all_reviews()
-        return reviews, 200
+        """Retrieve a page of reviews"""
+        try:
+            limit, cursor = get_pagination_args()
+            projection = get_projection(REVIEW_LIST)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        reviews, next_cursor = facade.get_all_reviews(limit, cursor, projection)
+        return paginated_response(reviews, next_cursor)
+
+
+@api.route('/batch')
+class ReviewBatch(Resource):
+    @api.expect(review_batch_model, validate=True)
+    @api.response(201, 'Reviews successfully created')
+    @api.response(400, 'Invalid input data, nothing was created')
+    @jwt_required()
+    @api.doc(security='Bearer Auth')
+    def post(self):
+        """Register several reviews of the current user in one transaction"""
+        user_id = get_jwt_identity()["id"]
+        items = api.payload['reviews']
+        if not items:
+            return {'error': 'No review to create'}, 400
+        max_items = current_app.config.get('BATCH_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return {'error': f'A batch cannot contain more than {max_items} reviews'}, 400
+
+        reviews, errors = facade.create_reviews(user_id, items)
+        if errors:
+            return {'error': 'Invalid batch, no review was created', 'errors': errors}, 400
+
+        return {
+            'count': len(reviews),
+            'reviews': [{
+                'id': review.id,
+                'text': review.text,
+                'rating': review.rating,
+                'user_id': review.user_id,
+                'place_id': review.place_id
+            } for review in reviews]
+        }, 201
 
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     @cross_origin(origins="http://localhost:8000", supports_credentials=True)
     @api.response(200, 'Review details retrieved successfully', model=review_detailed_response)
+    @api.response(400, 'Invalid fields or include parameters')
     @api.response(404, 'Review not found')
+    @api.doc(params=FIELDSET_PARAMS)
     def get(self, review_id):
         """Retrieve a review by its ID"""
-        review = facade.get_review(review_id)
+        try:
+            projection = get_projection(REVIEW_DETAIL)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        # L'auteur et le lieu (avec leurs relations) sont chargés avec l'avis
+        review = facade.get_review(review_id, projection)
         if not review:
             return {'error': 'Review not found'}, 404
 
-        # Serialize user and place data if available
-        if review.user is not None:
-            user_data = review.user.to_dict()
-        else:
-            user_data = None
-
-        if review.place is not None:
-            place_data = review.place.to_dict()
-        else:
-            place_data = None
-
-        return {
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user': user_data,
-            'place': place_data
-        }, 200
+        return projection.serialize(review), 200
 
     @api.expect(review_model, validate=True)
     @api.response(200, 'Review updated successfully')
@@ -6,10 +6,13 @@ providing endpoints to create, retrieve, and update users registered in the appl
 
 Main functionalities:
 - POST /users/               : Create a new user.
-- GET /users/                : Retrieve the list of all users.
+- GET /users/                : Retrieve the list of users (cursor-paginated with ?limit=&cursor=).
 - GET /users/<user_id>       : Retrieve a user by their ID.
 - PUT /users/<user_id>       : Update user information (authenticated users can update only their own data).
 
+The GET endpoints accept ?fields= and ?include= (see fieldsets.py); without
+them they return the shape USER (that of User.to_dict()).
+
 Each endpoint uses Flask-RESTx models for input validation
 and automatic API documentation via Swagger.
 
@@ -34,6 +37,8 @@ This module enforces strict input validation
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.fieldsets import FIELDSET_PARAMS, Fieldset, get_projection
+from app.api.v1.pagination import PAGINATION_PARAMS, get_pagination_args, paginated_response
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
 
 # Namespace : permet de créer des groupe logique d'url et de ressources pour API
@@ -45,6 +50,9 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 # Swagger générera une sectoin"user operations"
 api = Namespace('users', description='User operations')
 
+# Forme des réponses GET sans ?fields= ni ?include= : celle de User.to_dict()
+USER = Fieldset('users', None, ('reviews', 'places.amenities', 'places.reviews'))
+
 # Définir le modèle utilisateur pour la validation et la documentation des entrées
 # api.model: défini un schéma JSON pour les entrées utilisateur (Swagger)
 # chaque champ est requis puisque required=True, etdoit avoir une descritpion
@@ -111,12 +119,17 @@ class UserList(Resource):
         # pour récupérer les infos d'un utilisateur à partir de son ID
 
     @api.response(200, 'List of users retrieved')
-    @api.response(404, 'No users found')
-    @api.doc(description="Retrieve the list of all users")
+    @api.response(400, 'Invalid pagination, fields or include parameters')
+    @api.doc(description="Retrieve a page of users", params={**PAGINATION_PARAMS, **FIELDSET_PARAMS})
     def get(self):
-        """ return the lists of users """
-        users = facade.get_all()
-        return users, 200
+        """ return one page of users """
+        try:
+            limit, cursor = get_pagination_args()
+            projection = get_projection(USER)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        users, next_cursor = facade.get_all(limit, cursor, projection)
+        return paginated_response(users, next_cursor)
 
 
 @api.route('/<user_id>', methods=['GET', 'PUT'])
@@ -124,27 +137,23 @@ class UserList(Resource):
 # la classe 'UserRessosurce' est lié à cette route et va gérer les requêtes comme GET, PUT, DELETE
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
-    @api.response(400, 'Invalid input data')
+    @api.response(400, 'Invalid fields or include parameters')
     @api.response(404, 'User not found')
-    @api.doc(description="Get user details by ID")
+    @api.doc(description="Get user details by ID", params=FIELDSET_PARAMS)
     def get(self, user_id):
         """Get user details by ID"""
+        try:
+            projection = get_projection(USER)
+        except ValueError as error:
+            return {'error': str(error)}, 400
         # Appelle la méthode get_user du module facade, en lui passant l'ID demandé
         # cette fonction interroge la base de données ou la couche métier pour trouveerl'utilisateur correspondant
-        user = facade.get_user(user_id)
+        user = facade.get_user(user_id, projection)
         # Si l'utilisateur n'xiste pas (None ou équivalent) l'API retourne message d'erreur et code
         if not user:
             return {'error': 'User not found'}, 404
 
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email,
-            'is_admin': user.is_admin,
-            'reviews': [review.to_dict() for review in user.reviews],
-            'places': [place.to_dict() for place in user.places]
-        }, 200
+        return projection.serialize(user), 200
         # si utilisateur est trouvé, l'API retoiurne ses données dans un dico JSON avec code
     @jwt_required()
     @api.doc(security='Bearer Auth', description="Update user details (user can update only own data, except email and password)")
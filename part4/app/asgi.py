@@ -0,0 +1,180 @@
+"""
+ASGI application serving the hot read endpoints from the async stack.
+
+Most of the traffic is GET /places/<place_id> and GET /places/<place_id>/reviews.
+This module serves those two endpoints with AsyncHBnBFacade: while a request
+waits on SQLite (aiosqlite), the event loop keeps serving the others, so a
+thousand concurrent clients do not need a thousand threads.
+
+The bodies, status codes and pagination headers are the same as those of
+the Flask resources, ?fields= and ?include= included (the default shapes
+are shared with app/api/v1/places.py), and so are the ETag of a place and
+the 304 answered to a matching If-None-Match.
+Every other path answers 404: the rest of the API stays on the WSGI
+application, and a proxy sends only these two routes here.
+
+The async engine opens the same SQLite file as the Flask application; an
+in-memory database cannot be shared between the two engines and is refused,
+and so is the 'sqlite-sharded' backend (the async repositories do not route
+to the shards).
+
+Usage (from the part4 directory, with an ASGI server such as uvicorn):
+
+    uvicorn app.asgi:create_asgi_app --factory
+
+Functions:
+- create_asgi_app(flask_app): build the ASGI application.
+"""
+
+import re
+from urllib.parse import parse_qsl
+
+from werkzeug.http import parse_etags
+
+from app import create_app, db
+from app.api.conditional import entity_tag, matching_tag, validator_headers
+from app.api.representations import available_encoder, dumps
+from app.api.v1.fieldsets import parse_projection_args
+from app.api.v1.pagination import next_page_headers, parse_pagination_args
+from app.api.v1.places import PLACE_DETAIL, PLACE_REVIEWS
+from app.models.identifiers import binary_ids
+from app.persistence.async_repository import create_async_session_factory
+from app.persistence.backends import SHARDED_BACKENDS
+from app.persistence.pool import is_memory_database
+from app.services.async_facade import AsyncHBnBFacade
+
+PLACE_ROUTE = re.compile(r'^/api/v1/places/(?P<place_id>[^/]+)/?$')
+PLACE_REVIEWS_ROUTE = re.compile(r'^/api/v1/places/(?P<place_id>[^/]+)/reviews/?$')
+
+
+def create_asgi_app(flask_app=None):
+    """
+    Return an ASGI application reading the database of flask_app (created
+    with the default configuration if omitted) through AsyncHBnBFacade.
+    """
+    flask_app = flask_app or create_app()
+    config = flask_app.config
+    if config.get('PERSISTENCE_BACKEND', 'sqlite') in SHARDED_BACKENDS:
+        raise ValueError("The async stack does not support the sqlite-sharded backend")
+    with flask_app.app_context():
+        # URL résolue par Flask-SQLAlchemy (chemin relatif -> dossier instance)
+        url = db.engine.url
+    if is_memory_database(str(url)):
+        raise ValueError("The async stack needs a SQLite file shared with the Flask application")
+
+    pool_options = config.get('SQLALCHEMY_POOL_OPTIONS') or {}
+    engine_options = {key: pool_options[key] for key in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle')
+                      if key in pool_options}
+    facade = AsyncHBnBFacade(create_async_session_factory(
+        url, engine_options, config.get('SQLITE_PRAGMAS'), binary_ids(config.get('ID_FORMAT', 'uuid4'))))
+    limits = (config.get('PAGINATION_DEFAULT_LIMIT', 100), config.get('PAGINATION_MAX_LIMIT', 1000))
+    max_depth = config.get('FIELDSET_MAX_DEPTH', 3)
+    # Même encodeur JSON que l'API Flask
+    encoder = available_encoder(config.get('JSON_ENCODER', 'orjson'))
+
+    async def get_place(place_id, scope):
+        try:
+            projection = parse_projection_args(_query_args(scope), PLACE_DETAIL, max_depth)
+        except ValueError as error:
+            return 400, {'error': str(error)}, {}
+        # Même ETag que l'API Flask (sans indentation : le corps n'est jamais indenté ici)
+        etag = entity_tag(await facade.get_place_version(place_id, projection),
+                          scope['path'], _query_pairs(scope), encoder, False)
+        tag = matching_tag(etag, _if_none_match(scope))
+        if tag is not None:
+            return 304, None, {**validator_headers(tag), 'Vary': 'Accept-Encoding'}
+        place = await facade.get_place_detail(place_id, projection)
+        if not place:
+            return 404, {'error': 'The place does not exist'}, {}
+        return 200, projection.serialize(place), validator_headers(etag)
+
+    async def get_place_reviews(place_id, scope):
+        args = _query_args(scope)
+        try:
+            limit, cursor = parse_pagination_args(args, *limits)
+            projection = parse_projection_args(args, PLACE_REVIEWS, max_depth)
+        except ValueError as error:
+            return 400, {'error': str(error)}, {}
+
+        if not await facade.place_exists(place_id):
+            return 404, {"error": "Place not found"}, {}
+        reviews, next_cursor = await facade.get_reviews_by_place(place_id, limit, cursor, projection)
+        return 200, [projection.serialize(review) for review in reviews], next_page_headers(
+            _base_url(scope), args, next_cursor)
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await _lifespan(receive, send, facade)
+            return
+        if scope['type'] != 'http':
+            return
+
+        path = scope['path']
+        for route, handler in ((PLACE_REVIEWS_ROUTE, get_place_reviews), (PLACE_ROUTE, get_place)):
+            match = route.match(path)
+            if match:
+                break
+        else:
+            await _respond(send, encoder, 404, {'message': 'Not found: served by the WSGI application'})
+            return
+        if scope['method'] != 'GET':
+            await _respond(send, encoder, 405, {'message': 'The method is not allowed for the requested URL.'})
+            return
+
+        status, body, headers = await handler(match.group('place_id'), scope)
+        await _respond(send, encoder, status, body, headers)
+
+    application.facade = facade
+    return application
+
+
+def _query_pairs(scope):
+    """ Return the (name, value) pairs of the query string, blank values included like Flask's request.args """
+    return parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True)
+
+
+def _query_args(scope):
+    """ Return the query string arguments of the request as a dictionary """
+    return dict(_query_pairs(scope))
+
+
+def _if_none_match(scope):
+    """ Return the If-None-Match header of the request as werkzeug ETags """
+    headers = dict(scope.get('headers') or [])
+    return parse_etags(headers.get(b'if-none-match', b'').decode('latin-1') or None)
+
+
+def _base_url(scope):
+    """ Rebuild scheme://host/path of the request, like Flask's request.base_url """
+    headers = dict(scope.get('headers') or [])
+    host = headers.get(b'host', b'').decode('latin-1')
+    if not host and scope.get('server'):
+        host = '%s:%s' % tuple(scope['server'])
+    return f"{scope.get('scheme', 'http')}://{host}{scope.get('root_path', '')}{scope['path']}"
+
+
+async def _respond(send, encoder, status, body, headers=None):
+    if status == 304:
+        # Réponse conditionnelle : ni corps ni en-têtes de contenu
+        payload = b''
+        raw_headers = []
+    else:
+        payload = dumps(body, encoder)
+        raw_headers = [(b'content-type', b'application/json'),
+                       (b'content-length', str(len(payload)).encode('ascii'))]
+    raw_headers += [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in (headers or {}).items()]
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+async def _lifespan(receive, send, facade):
+    """ Close the async engine when the server stops """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await facade.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -18,6 +18,14 @@ CREATE TABLE IF NOT EXISTS places (
 	_latitude FLOAT NOT NULL,
 	_longitude FLOAT NOT NULL,
 	owner_id CHAR(36),
+	-- Agrégats des notes, tenus à jour par l'application à chaque écriture d'avis
+	review_count INTEGER NOT NULL DEFAULT 0,
+	rating_sum INTEGER NOT NULL DEFAULT 0,
+	rating_1 INTEGER NOT NULL DEFAULT 0,
+	rating_2 INTEGER NOT NULL DEFAULT 0,
+	rating_3 INTEGER NOT NULL DEFAULT 0,
+	rating_4 INTEGER NOT NULL DEFAULT 0,
+	rating_5 INTEGER NOT NULL DEFAULT 0,
 	Foreign Key (owner_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
@@ -51,6 +59,17 @@ CREATE TABLE IF NOT EXISTS place_amenity (
 	FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE
 );
 
+
+-- Index secondaires pour les recherches fréquentes (mêmes noms que dans les modèles)
+-- users.email, amenities.name et reviews (user_id, place_id) sont déjà indexés par leur contrainte UNIQUE
+CREATE UNIQUE INDEX IF NOT EXISTS unique_place_title_owner ON places (title, owner_id);
+CREATE INDEX IF NOT EXISTS ix_places_owner_id ON places (owner_id);
+CREATE INDEX IF NOT EXISTS ix_places_price_id ON places (_price, id);
+CREATE INDEX IF NOT EXISTS ix_places_latitude_longitude ON places (_latitude, _longitude);
+CREATE INDEX IF NOT EXISTS ix_places_created_at_id ON places (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_reviews_place_id_created_at ON reviews (place_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_place_amenity_amenity_id ON place_amenity (amenity_id);
+
 -- Liaisons amenities-places avec les UUIDs ci-dessus
 -- Minas Tirith
 INSERT INTO place_amenity (place_id, amenity_id) VALUES
@@ -257,6 +276,16 @@ INSERT INTO reviews (id, text, rating, user_id, place_id, created_at) VALUES
 	('e5f6g7h8-5555-6666-7777-888899990000', 'Moria is the place if you love echo, darkness, and surprise appearances by shadowy creatures. The pet Balrog isn’t exactly friendly, and the stairs keep you guessing. Not for the faint-hearted—but great for thrill seekers!', 2, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', 'f9305b02-c7a9-4c85-88ff-d40a7382cba9', datetime('now')),
 	('f6g7h8i9-6666-7777-8888-999900001111', 'The Prancing Pony has charm and ale in abundance, though the walls are as thin as paper. Perfect for loud nights and mysterious guests. Just don’t expect a quiet stay if the hobbits get singing!', 3, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', 'ee41ad7e-d2ce-46f1-8d0b-1fb183f73844', datetime('now'));
 
+-- Agrégats des notes calculés à partir des avis insérés ci-dessus
+UPDATE places SET
+	review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id),
+	rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.place_id = places.id),
+	rating_1 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 1),
+	rating_2 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 2),
+	rating_3 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 3),
+	rating_4 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 4),
+	rating_5 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 5);
+
 -- Select for some tables
 SELECT * FROM users;
 SELECT * FROM places;
@@ -4,8 +4,10 @@ BaseModel definition for all models in the application.
 This abstract base class provides common attributes and methods for all 
 SQLAlchemy models in the application, including:
 
-- A universally unique identifier (UUID) as primary key.
-- Timestamps for object creation (`created_at`) and last update (`updated_at`).
+- A universally unique identifier (UUID) as primary key, random (v4) or
+  time-ordered (v7) and stored as text or 16 bytes (see identifiers.py).
+- Timestamps for object creation (`created_at`) and last update (`updated_at`,
+  refreshed by every UPDATE; it versions the ETags of the GET endpoints).
 - Utility methods for saving, updating, and validating the object.
 
 Classes that inherit from BaseModel automatically gain these fields and behaviors.
@@ -14,19 +16,21 @@ Note: This class is abstract and does not generate a database table.
 """
 
 from app import db
-import uuid
+from app.models.identifiers import IdType, new_id
 from datetime import datetime, UTC # Pour les fuseaux horaires
 
 
 class BaseModel(db.Model):
     __abstract__ = True  # This ensures SQLAlchemy does not create a table for BaseModel
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(IdType, primary_key=True, default=new_id)
     created_at = db.Column(db.DateTime, default=datetime.now(UTC))
-    updated_at = db.Column(db.DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC)) #)
+    # Fonctions appelées à chaque écriture (comme save()) : une valeur calculée à l'import
+    # donnerait la même date à toutes les mises à jour, et les ETags en dépendent
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
     def __init__(self):
-        self.id = str(uuid.uuid4())
+        self.id = new_id()
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
 
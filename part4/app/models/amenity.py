@@ -29,7 +29,8 @@ from sqlalchemy.orm import validates
 class Amenity(BaseModel):
     """ amenity class that contains simple data about a comment on equipment and how it will be validated """
     __tablename__ = 'amenities' # Purée on a oublier ca !!!! Pffff
-    name = db.Column(db.String(50), nullable=False)
+    # Index : recherche d'une amenity par son nom
+    name = db.Column(db.String(50), nullable=False, index=True)
 
     places = db.relationship('Place', secondary=place_amenity, back_populates='amenities')
 
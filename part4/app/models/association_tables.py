@@ -10,18 +10,25 @@ Structure:
 - place_id: Foreign key referencing the `places.id`, also part of the primary key.
 - amenity_id: Foreign key referencing the `amenities.id`, also part of the primary key.
 
+The primary key (place_id, amenity_id) serves lookups by place; a separate
+index on amenity_id serves lookups by amenity (amenity.places).
+
 Used in the Place and Amenity models to enable bidirectional relationships.
 """
 
 from app import db
+from app.models.identifiers import IdType
 
 # Table d'association pour la relation plusieurs-à-plusieurs entre Place et Amenity
 place_amenity = db.Table(
     'place_amenity',  # Nom de la table dans la base de données
 
     # Clé étrangère vers la table 'places', avec contrainte de clé primaire
-    db.Column('place_id', db.String(60), db.ForeignKey('places.id'), primary_key=True),
+    db.Column('place_id', IdType, db.ForeignKey('places.id'), primary_key=True),
 
     # Clé étrangère vers la table 'amenities', avec contrainte de clé primaire
-    db.Column('amenity_id', db.String(60), db.ForeignKey('amenities.id'), primary_key=True)
+    db.Column('amenity_id', IdType, db.ForeignKey('amenities.id'), primary_key=True),
+
+    # Index pour retrouver les lieux d'une amenity sans parcourir toute la table
+    db.Index('ix_place_amenity_amenity_id', 'amenity_id')
 )
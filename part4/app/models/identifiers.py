@@ -0,0 +1,119 @@
+"""
+Primary keys of the models: generation and storage format.
+
+The format is chosen by the ID_FORMAT setting (HBNB_ID_FORMAT):
+- 'uuid4'        : random UUIDs stored as 36-character strings (default,
+                   the format of existing databases and of schema.sql);
+- 'uuid7'        : time-ordered UUIDs (version 7), still stored as strings;
+- 'uuid7-binary' : time-ordered UUIDs stored as 16-byte BLOBs.
+
+Random keys land anywhere in the primary key B-tree and in every index on a
+foreign key (owner_id, user_id, place_id, place_amenity); UUIDv7 keys start
+with a millisecond timestamp, so new rows are appended at the right edge of
+those indexes. The binary storage halves the size of every key.
+
+Above the database nothing changes: ids are always canonical UUID strings
+('0190b6c4-...'), in the models, the API, the pagination cursors and the
+JWT identities. The IdType column type converts them to and from 16 bytes
+when the engine stores binary keys (use_binary_ids). The binary order of
+the keys is the order of their strings, so cursor pagination is unchanged.
+
+Existing databases are converted with app/persistence/migrate_ids.py.
+
+Classes:
+- IdType: column type of the primary and foreign keys.
+
+Functions:
+- uuid7(): return a new UUID version 7.
+- new_id(): return a new id in the format of the current application.
+- use_binary_ids(engine): make an engine store the keys as 16 bytes.
+- binary_ids(id_format): tell whether a format stores binary keys.
+"""
+
+import secrets
+import threading
+import time
+import uuid
+
+from flask import current_app, has_app_context
+from sqlalchemy import LargeBinary, String
+from sqlalchemy.types import TypeDecorator
+
+ID_FORMATS = ('uuid4', 'uuid7', 'uuid7-binary')
+
+_BINARY_FLAG = 'hbnb_binary_ids'
+_uuid7_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """
+    Return a UUID version 7 (RFC 9562): 48 bits of Unix time in
+    milliseconds, a 12-bit counter and 62 random bits. The counter keeps
+    the ids of one process increasing within the same millisecond.
+    """
+    global _last_ms, _counter
+    with _uuid7_lock:
+        now = time.time_ns() // 1_000_000
+        if now > _last_ms:
+            # Compteur de départ aléatoire, avec de la marge avant débordement
+            _last_ms, _counter = now, secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms, _counter = _last_ms + 1, secrets.randbits(11)
+        timestamp, counter = _last_ms, _counter
+    value = (timestamp << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+
+def binary_ids(id_format):
+    """ Tell whether an ID_FORMAT stores the keys as 16 bytes """
+    if id_format not in ID_FORMATS:
+        raise ValueError(f"Unknown id format '{id_format}', expected one of {', '.join(ID_FORMATS)}")
+    return id_format.endswith('-binary')
+
+
+def new_id():
+    """ Return a new primary key, a UUIDv4 or a UUIDv7 string depending on ID_FORMAT """
+    id_format = current_app.config.get('ID_FORMAT', 'uuid4') if has_app_context() else 'uuid4'
+    return str(uuid7() if id_format.startswith('uuid7') else uuid.uuid4())
+
+
+def use_binary_ids(engine):
+    """ Make an engine store the IdType columns as 16-byte BLOBs (before its first connection) """
+    setattr(engine.dialect, _BINARY_FLAG, True)
+
+
+class IdType(TypeDecorator):
+    """
+    UUID key, always a string in Python, stored as a string or as 16 bytes
+    depending on the engine (use_binary_ids).
+    """
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if getattr(dialect, _BINARY_FLAG, False):
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not getattr(dialect, _BINARY_FLAG, False):
+            return value
+        # bytes.fromhex est bien plus rapide que uuid.UUID() sur la forme canonique
+        digits = str(value).replace('-', '')
+        if len(digits) == 32:
+            try:
+                return bytes.fromhex(digits)
+            except ValueError:
+                pass
+        # Pas un UUID : valeur de 17 octets au moins, qui ne correspond à aucune clé stockée
+        return str(value).encode('utf-8').ljust(17, b'\0')
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, bytes) and len(value) == 16:
+            digits = value.hex()
+            return f'{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}'
+        return value
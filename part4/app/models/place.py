@@ -14,6 +14,9 @@ Key features include:
 - Enforcement of uniqueness constraints at the database level (e.g., unique title per owner).
 - Methods for adding related objects while ensuring type safety.
 - Permission checks based on owner ownership.
+- Rating aggregates (number of reviews, sum of the ratings and one counter per
+  star) stored on the row, so the average rating and the star histogram of a
+  place are read without loading its reviews.
 - Serialization of the Place instance to a dictionary, including related objects, for API responses.
 
 This design leverages SQLAlchemy ORM capabilities to ensure data integrity, 
@@ -21,11 +24,16 @@ manage relationships efficiently, and provide a clear mapping between Python obj
 """
 
 from app.models.BaseModel import BaseModel
+from app.models.identifiers import IdType
 from app.models.association_tables import place_amenity
 from app import db
 from sqlalchemy.orm import validates
 from sqlalchemy import UniqueConstraint # pour utiliser des contraintes pour empêcher doublons
 
+# Colonnes de l'histogramme des notes : rating_1 (une étoile) ... rating_5
+RATING_STARS = range(1, 6)
+RATING_COLUMNS = tuple(f'rating_{star}' for star in RATING_STARS)
+
 
 class Place(BaseModel):
     """ Classe Place who contains all of exception and the information about this"""
@@ -36,7 +44,18 @@ class Place(BaseModel):
     _price = db.Column(db.Float, nullable=False)
     _latitude = db.Column(db.Float, nullable=False)
     _longitude = db.Column(db.Float, nullable=False)
-    owner_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=False)
+    # Index : lieux d'un propriétaire (user.places)
+    owner_id = db.Column(IdType, db.ForeignKey('users.id'), nullable=False, index=True)
+
+    # Agrégats des notes, tenus à jour dans la transaction de chaque écriture d'avis
+    # (voir HBnBFacade.create_review) et recalculables par repair_rating_aggregates
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_1 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     owner = db.relationship('User', back_populates='places')
     amenities = db.relationship('Amenity', secondary=place_amenity, back_populates='places')
@@ -46,12 +65,20 @@ class Place(BaseModel):
 ##---------------------------------------------------------------------------##
     __table_args__ = (
         UniqueConstraint('title', 'owner_id', name='unique_place_title_owner'),
+        # Index de la recherche (GET /places/search, voir app/services/place_search.py) :
+        # fourchette de prix et tri par prix, l'id départageant les égalités (pagination)
+        db.Index('ix_places_price_id', '_price', 'id'),
+        # Rectangle de coordonnées : plage sur la latitude, longitude lue dans l'index
+        db.Index('ix_places_latitude_longitude', '_latitude', '_longitude'),
+        # Tri des plus récents
+        db.Index('ix_places_created_at_id', 'created_at', 'id'),
     )
     # __table_args__ doit être soit un tuple ou un dictionnaire.
     # crée une contrainte d’unicité sur une ou plusieurs colonnes dans la base de données.
     # Cela signifie que la base refusera l’insertion d’une ligne si la combinaison
     # des valeurs de title et de l'owner existe déjà.
     # La combinaison de title et owner doit être unique sinon erreur
+    # L'index unique créé par cette contrainte sert aussi la recherche de doublon de create_place
 ##---------------------------------------------------------------------------##
 ##---------------------------------------------------------------------------##
     def __init__(self, title, description, price, latitude, longitude, owner_id):
@@ -63,6 +90,11 @@ class Place(BaseModel):
         self.latitude = latitude
         self.longitude = longitude
         self.owner_id = owner_id
+        # Valeurs des agrégats avant le premier flush (les défauts des colonnes ne s'appliquent qu'à l'INSERT)
+        self.review_count = 0
+        self.rating_sum = 0
+        for column in RATING_COLUMNS:
+            setattr(self, column, 0)
         self.reviews = []  # List to store related reviews
         self.amenities = []  # List to store related amenities
 
@@ -156,6 +188,18 @@ class Place(BaseModel):
             raise ValueError("owner_id must be a valid UUID string")
         return owner_id
 
+    @property
+    def average_rating(self):
+        """ Return the average rating rounded to 2 decimals, or None without reviews """
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    @property
+    def rating_histogram(self):
+        """ Return the number of reviews per rating, as {'1': count, ..., '5': count} """
+        return {str(star): getattr(self, column) or 0 for star, column in zip(RATING_STARS, RATING_COLUMNS)}
+
     def check_owner_permission(self, user):
         """Check if a user has permission to modify this place"""
         from .user import User
@@ -193,6 +237,9 @@ class Place(BaseModel):
             'latitude': self.latitude,
             'longitude': self.longitude,
             'owner_id': self.owner_id,
+            'review_count': self.review_count or 0,
+            'average_rating': self.average_rating,
+            'rating_histogram': self.rating_histogram,
             'amenities': [a.to_dict() for a in self.amenities if hasattr(a, 'to_dict')],
             'reviews': [review.to_dict() for review in self.reviews]
         }
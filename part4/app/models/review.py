@@ -22,8 +22,10 @@ Used libraries:
 """
 
 from app.models.BaseModel import BaseModel
+from app.models.identifiers import IdType
 from app import db
 from sqlalchemy.orm import validates
+from sqlalchemy import UniqueConstraint
 
 class Review(BaseModel):
     """Review class with text, rating, user_id and place_id UUID references."""
@@ -34,15 +36,24 @@ class Review(BaseModel):
     # Colonne contenant la note (entier entre 1 et 5, obligatoire)
     rating = db.Column(db.Integer, nullable=False)
     # Clé étrangère vers l'id de l'utilisateur (UUID sous forme de string, obligatoire)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    # Les recherches par user_id utilisent l'index unique (user_id, place_id) ci-dessous
+    user_id = db.Column(IdType, db.ForeignKey('users.id'), nullable=False)
     # Clé étrangère vers l'id du lieu (UUID sous forme de string, obligatoire)
-    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
+    # Indexé avec created_at et id ci-dessous (place.reviews, liste des avis d'un lieu)
+    place_id = db.Column(IdType, db.ForeignKey('places.id'), nullable=False)
 
     # Relation ORM vers l'objet User, pour accéder aux données utilisateur liées
     user = db.relationship('User', back_populates='reviews')
     # Relation ORM vers l'objet Place, pour accéder aux données lieu liées
     place = db.relationship('Place', back_populates='reviews')
 
+    __table_args__ = (
+        # Un utilisateur ne peut laisser qu'un seul avis par lieu (comme dans schema.sql)
+        UniqueConstraint('user_id', 'place_id', name='unique_review_user_place'),
+        # Avis d'un lieu dans l'ordre chronologique, sans tri ni parcours de la table
+        db.Index('ix_reviews_place_id_created_at', 'place_id', 'created_at', 'id'),
+    )
+
     def __init__(self, text, rating, user_id, place_id):
         """Initialize a Review instance with text, rating, user_id and place_id."""
         super().__init__()
@@ -0,0 +1,171 @@
+"""
+Asynchronous repositories on SQLAlchemy asyncio (AsyncSession + aiosqlite).
+
+They mirror the reads of SQLAlchemyRepository and ReviewRepository for the
+async stack (see app/asgi.py): the same queries and the same indexes, but
+every method is a coroutine and a request waiting on the database no longer
+holds a thread. The async stack only serves reads: the writes go through
+the synchronous facade.
+
+Differences with the synchronous repositories:
+- each call runs in its own AsyncSession, opened from the session factory
+  and closed before returning; the objects returned are detached;
+- relationships cannot be lazy-loaded outside the session, so the read
+  methods take loader options (selectinload(...)) and everything the caller
+  needs must be loaded eagerly; any other relationship raises instead of
+  issuing a hidden query;
+- there is no entity cache and no read replica routing.
+
+Classes:
+- AsyncSQLAlchemyRepository: generic async read repository for one model.
+- AsyncReviewRepository: adds get_by_place and exists_for.
+
+Functions:
+- async_database_url(url): return the aiosqlite URL of a SQLite database URL.
+- create_async_session_factory(url, engine_options, pragmas, binary_keys): build the engine and the session factory.
+"""
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import raiseload
+
+from app.models.identifiers import use_binary_ids
+from app.models.review import Review
+from app.persistence.repository import IN_CHUNK_SIZE
+from app.persistence.sqlite_pragmas import apply_pragmas
+from app.persistence.versions import version_statement
+
+
+def async_database_url(url):
+    """ Return the URL of the same SQLite database with the aiosqlite driver """
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite':
+        raise ValueError(f"The async repositories only support SQLite, not {url.get_backend_name()}")
+    return url.set(drivername='sqlite+aiosqlite')
+
+
+def create_async_session_factory(url, engine_options=None, pragmas=None, binary_keys=False):
+    """
+    Create an async engine on the database of url and return a session
+    factory producing AsyncSession objects that keep their values after
+    commit. The engine is available as factory.kw['bind']. binary_keys
+    must match the ID_FORMAT of the database (see identifiers.py).
+    """
+    engine = create_async_engine(async_database_url(url), **(engine_options or {}))
+    if binary_keys:
+        use_binary_ids(engine.sync_engine)
+    if pragmas:
+        # Les événements de connexion sont émis par le moteur synchrone sous-jacent
+        apply_pragmas(engine.sync_engine, pragmas)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+class AsyncSQLAlchemyRepository:
+    """
+    Async counterpart of the reads of SQLAlchemyRepository.
+
+    Attributes:
+        model: The SQLAlchemy model class this repository manages.
+        session_factory: async_sessionmaker opening one AsyncSession per call.
+
+    Methods (all coroutines):
+        get(obj_id, options), exists(obj_id), get_many(obj_ids, options), get_all(options),
+        get_page(limit, cursor, options), get_by_attribute(attr_name, attr_value, options),
+        get_version(obj_id, paths).
+    """
+    def __init__(self, model, session_factory):
+        self.model = model
+        self.session_factory = session_factory
+
+    def _select(self, options=()):
+        # Toute relation non chargée explicitement lève une erreur au lieu d'une requête cachée
+        return select(self.model).options(*options, raiseload('*'))
+
+    async def get(self, obj_id, options=()):
+        async with self.session_factory() as session:
+            result = await session.execute(self._select(options).where(self.model.id == obj_id))
+            return result.scalar_one_or_none()
+
+    async def exists(self, obj_id):
+        """ Return True if an object with this id exists, without loading it """
+        async with self.session_factory() as session:
+            result = await session.execute(select(exists().where(self.model.id == obj_id)))
+            return result.scalar()
+
+    async def get_many(self, obj_ids, options=()):
+        """ Return a dictionary {id: object} for the given ids that exist """
+        ids = list({obj_id for obj_id in obj_ids if isinstance(obj_id, str)})
+        found = {}
+        async with self.session_factory() as session:
+            for start in range(0, len(ids), IN_CHUNK_SIZE):
+                result = await session.execute(
+                    self._select(options).where(self.model.id.in_(ids[start:start + IN_CHUNK_SIZE])))
+                found.update((obj.id, obj) for obj in result.scalars())
+        return found
+
+    async def get_all(self, options=()):
+        async with self.session_factory() as session:
+            result = await session.execute(self._select(options))
+            return list(result.scalars())
+
+    async def get_page(self, limit, cursor=None, options=()):
+        """
+        Return up to 'limit' objects whose id is greater than 'cursor',
+        ordered by primary key, and the id to resume from (None on the last page).
+        """
+        query = self._select(options).order_by(self.model.id)
+        if cursor is not None:
+            query = query.where(self.model.id > cursor)
+        async with self.session_factory() as session:
+            result = await session.execute(query.limit(limit + 1))
+            items = list(result.scalars())
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
+
+    async def get_version(self, obj_id, paths=()):
+        """ Return the version of an object and of the rows along paths (see versions.py), None if absent """
+        async with self.session_factory() as session:
+            result = await session.execute(version_statement(self.model, obj_id, paths))
+            version = tuple(result.one())
+        return version if version[0] is not None else None
+
+    async def get_by_attribute(self, attr_name, attr_value, options=()):
+        async with self.session_factory() as session:
+            result = await session.execute(
+                self._select(options).where(getattr(self.model, attr_name) == attr_value).limit(1))
+            return result.scalar_one_or_none()
+
+
+class AsyncReviewRepository(AsyncSQLAlchemyRepository):
+    """ Async counterpart of ReviewRepository """
+
+    def __init__(self, session_factory):
+        super().__init__(Review, session_factory)
+
+    async def get_by_place(self, place_id, limit, cursor=None, options=()):
+        """
+        Return up to 'limit' reviews of a place, oldest first, and the id of
+        the last one to resume from (None on the last page).
+        """
+        query = self._select(options).where(self.model.place_id == place_id).order_by(
+            self.model.created_at, self.model.id)
+        if cursor is not None:
+            anchor = select(self.model.created_at).where(self.model.id == cursor).scalar_subquery()
+            query = query.where(or_(
+                self.model.created_at > anchor,
+                and_(self.model.created_at == anchor, self.model.id > cursor)))
+        async with self.session_factory() as session:
+            result = await session.execute(query.limit(limit + 1))
+            items = list(result.scalars())
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
+
+    async def exists_for(self, user_id, place_id):
+        """ Return True if user_id already posted a review for place_id """
+        async with self.session_factory() as session:
+            result = await session.execute(select(exists().where(
+                self.model.user_id == user_id, self.model.place_id == place_id)))
+            return result.scalar()
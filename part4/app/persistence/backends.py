@@ -0,0 +1,80 @@
+"""
+Selection of the persistence backend.
+
+The backend is chosen with the PERSISTENCE_BACKEND setting (environment
+variable HBNB_PERSISTENCE):
+- 'sqlite'        : SQLAlchemy repositories on the database of SQLALCHEMY_DATABASE_URI.
+- 'sqlite-memory' : SQLAlchemy repositories on a private in-memory SQLite database.
+- 'memory'        : InMemoryRepository objects, nothing is written to a database.
+- 'sqlite-sharded': like 'sqlite', but places and reviews are split across
+                    SHARD_COUNT SQLite databases (see sharding.py).
+
+Every backend provides the same repositories (users, places, reviews,
+amenities) implementing the Repository ABC, plus the entity-specific
+methods used by the facade (get_by_place, exists_for, ...).
+
+Functions:
+- database_uri(backend, uri): return the SQLAlchemy URI to use with a backend.
+- create_repositories(backend, cache_factory): build the repositories of a backend.
+"""
+
+from app.models.amenity import Amenity
+from app.persistence.repository import InMemoryRepository, SQLAlchemyRepository
+from app.persistence.user_repository import InMemoryUserRepository, UserRepository
+from app.persistence.place_repository import InMemoryPlaceRepository, PlaceRepository
+from app.persistence.review_repository import InMemoryReviewRepository, ReviewRepository
+from app.persistence.sharded_repository import ShardedPlaceRepository, ShardedReviewRepository
+
+BACKENDS = ('sqlite', 'sqlite-memory', 'memory', 'sqlite-sharded')
+# Backends dont les tables places et reviews sont réparties sur plusieurs bases
+SHARDED_BACKENDS = ('sqlite-sharded',)
+
+# Base SQLite privée au processus, détruite à l'arrêt
+SQLITE_MEMORY_URI = 'sqlite://'
+
+
+def _check(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown persistence backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+
+def database_uri(backend, uri):
+    """
+    Return the database URI to configure for a backend: the configured one
+    for 'sqlite' and 'sqlite-sharded' (global database), an in-memory SQLite
+    database otherwise (the memory backend still needs one for
+    Flask-SQLAlchemy, but never writes to it).
+    """
+    _check(backend)
+    return uri if backend in ('sqlite', 'sqlite-sharded') else SQLITE_MEMORY_URI
+
+
+def create_repositories(backend, cache_factory):
+    """
+    Return a dictionary {'users', 'places', 'reviews', 'amenities'} of the
+    repositories of a backend. cache_factory() builds the entity cache of
+    each SQLAlchemy repository; the in-memory ones have none.
+    """
+    _check(backend)
+    if backend == 'memory':
+        # Registre commun : les relations sont reliées d'un repository à l'autre
+        registry = {}
+        return {
+            'users': InMemoryUserRepository(registry),
+            'places': InMemoryPlaceRepository(registry),
+            'reviews': InMemoryReviewRepository(registry),
+            'amenities': InMemoryRepository(Amenity, registry)
+        }
+    if backend in SHARDED_BACKENDS:
+        return {
+            'users': UserRepository(cache_factory()),
+            'places': ShardedPlaceRepository(cache_factory()),
+            'reviews': ShardedReviewRepository(cache_factory()),
+            'amenities': SQLAlchemyRepository(Amenity, cache_factory())
+        }
+    return {
+        'users': UserRepository(cache_factory()),
+        'places': PlaceRepository(cache_factory()),
+        'reviews': ReviewRepository(cache_factory()),
+        'amenities': SQLAlchemyRepository(Amenity, cache_factory())
+    }
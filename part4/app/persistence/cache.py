@@ -0,0 +1,158 @@
+"""
+Bounded read-through cache for entities loaded by SQLAlchemyRepository.
+
+The cache never keeps ORM instances between requests: an instance is bound
+to the session of the request that loaded it and becomes unusable (or stale)
+once that session is closed. Instead, the cache stores a snapshot of the
+column values of each entity. On a hit, the snapshot is turned back into an
+instance and attached to the current session with merge(load=False), which
+does not emit any SQL. Relationships are not cached and are loaded lazily
+as usual.
+
+Classes:
+- EntityCache: thread-safe LRU + TTL store with hit/miss/eviction counters,
+  optionally bounded in bytes (sizes given by the callers of set()).
+
+Keys used by SQLAlchemyRepository:
+- ('id', obj_id)                 -> snapshot of the entity columns.
+- ('attr', attr_name, attr_value) -> id of the entity found for that value.
+
+Attribute entries are checked against the entity they point to before being
+used, so an entity whose looked-up attribute changed is never returned for
+its old value.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+class EntityCache:
+    """
+    Thread-safe cache bounded by a maximum number of entries (LRU eviction),
+    optionally by a total size in bytes, and a time to live in seconds.
+
+    Attributes:
+        max_size: Maximum number of entries kept; 0 disables the cache.
+        ttl: Number of seconds an entry stays valid.
+        max_bytes: Maximum total size of the entries kept, None for no bound.
+        hits, misses, evictions, expirations, too_large: Usage counters.
+    """
+
+    def __init__(self, max_size=1024, ttl=30.0, clock=time.monotonic, max_bytes=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        # clé -> (valeur, expiration, taille)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.too_large = 0
+
+    def _remove(self, key):
+        """ Drop an entry and its size (lock held) """
+        self._bytes -= self._entries.pop(key)[2]
+
+    def get(self, key):
+        """ Return the value stored for key, or None if absent or expired """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, _ = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            # L'entrée devient la plus récemment utilisée
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, size=0):
+        """
+        Store value for key, size bytes long, evicting the least recently used
+        entries beyond the bounds. A value larger than max_bytes is not stored.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.too_large += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, self._clock() + self.ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_size or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        """ Remove key from the cache if present """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        """ Remove every entry (counters are kept) """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """ Return the counters and the current size as a dictionary """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'too_large': self.too_large
+            }
+
+
+def snapshot(obj):
+    """
+    Return the loaded column values of a persistent instance, or None if it
+    has unsaved changes or some columns are expired or deferred.
+    """
+    state = inspect(obj)
+    if state.modified:
+        # Modifications non validées : elles ne doivent pas être partagées
+        return None
+    values = {}
+    for attr in state.mapper.column_attrs:
+        if attr.key not in state.dict:
+            return None
+        values[attr.key] = state.dict[attr.key]
+    return values
+
+
+def restore(model, values, session):
+    """
+    Rebuild an instance of model from a snapshot and attach it to session
+    without querying the database.
+    """
+    instance = model.__mapper__.class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(instance, key, value)
+    make_transient_to_detached(instance)
+    return session.merge(instance, load=False)
@@ -0,0 +1,134 @@
+"""
+Copy a SQLite database into a new file with another primary key format
+(see app/models/identifiers.py).
+
+The target database is created with the schema of the models, then every
+table present in the source is copied in foreign key order. The keys are
+read as UUID strings whatever their storage in the source (text or 16
+bytes) and written in the storage of the target format, so the same tool
+converts in both directions. The source file is never modified.
+
+The source tables are reflected and only the columns they have are read:
+a database created before columns were added to the models (the rating
+aggregates of places) can be migrated. The missing columns get their
+default in the target, and the aggregates are recomputed from the reviews.
+
+By default the key values are kept: every URL, JWT identity and stored
+reference stays valid, only the storage changes. With rekey=True each row
+also gets a new UUIDv7 key, allotted in created_at order, and every foreign
+key is rewritten accordingly; the old ids are then gone (users log in
+again). Rekeying is refused for the files of 'sqlite-sharded': the keys of
+the other files would not follow, and the keys of a shard must hash to it.
+
+Usage (from the part4 directory):
+
+    python -m app.persistence.migrate_ids instance/hbnb.db instance/hbnb-v7.db --to uuid7-binary
+
+Functions:
+- migrate_ids(source_uri, target_uri, id_format, rekey): copy the database, return {table: rows}.
+"""
+
+import argparse
+
+from sqlalchemy import MetaData, create_engine, inspect, select
+
+from app import db
+from app.models import User, Place, Review, Amenity  # noqa: F401  (tables de db.metadata)
+from app.models.association_tables import place_amenity  # noqa: F401
+from app.models.identifiers import IdType, binary_ids, uuid7, use_binary_ids
+from app.persistence.place_repository import AGGREGATE_COLUMNS, rating_aggregate_repairs
+
+# Nombre de lignes lues puis insérées à la fois
+CHUNK_SIZE = 5000
+
+
+def _sqlite_uri(path_or_uri):
+    return path_or_uri if '://' in path_or_uri else f'sqlite:///{path_or_uri}'
+
+
+def migrate_ids(source_uri, target_uri, id_format='uuid7-binary', rekey=False):
+    """
+    Copy the database of source_uri into the empty database of target_uri,
+    storing the keys in id_format, and return {table name: rows copied}.
+    """
+    source = create_engine(_sqlite_uri(source_uri))
+    target = create_engine(_sqlite_uri(target_uri))
+    if binary_ids(id_format):
+        use_binary_ids(target)
+
+    # Schéma réel de la source : il peut précéder des colonnes ajoutées aux modèles
+    source_metadata = MetaData()
+    source_metadata.reflect(bind=source)
+    present = source_metadata.tables
+    tables = [table for table in db.metadata.sorted_tables if table.name in present]
+    if inspect(target).get_table_names():
+        raise ValueError(f"The target database {target_uri} is not empty")
+    if rekey and len(tables) != len(db.metadata.sorted_tables):
+        # Base globale ou shard de 'sqlite-sharded' : les clés des autres fichiers ne suivraient pas
+        raise ValueError("Rekeying needs a complete database, not one file of sqlite-sharded")
+
+    db.metadata.create_all(target, tables=tables)
+    new_keys = {}
+    copied = {}
+    try:
+        with source.connect() as reader, target.begin() as writer:
+            for table in tables:
+                # Colonnes du modèle présentes dans la source, lues avec les types du modèle
+                columns = [column for column in table.c if column.name in present[table.name].c]
+                if rekey and 'id' in table.c:
+                    # Nouvelles clés attribuées dans l'ordre de création
+                    order = ([table.c.created_at, table.c.id] if 'created_at' in present[table.name].c
+                             else [table.c.id])
+                    new_keys[table.name] = {
+                        old: str(uuid7()) for old in reader.scalars(select(table.c.id).order_by(*order))}
+                copied[table.name] = 0
+                result = reader.execute(select(*columns)).mappings()
+                while True:
+                    rows = [dict(row) for row in result.fetchmany(CHUNK_SIZE)]
+                    if not rows:
+                        break
+                    if rekey:
+                        rows = [_rekeyed(table, row, new_keys) for row in rows]
+                    writer.execute(table.insert(), rows)
+                    copied[table.name] += len(rows)
+            places, reviews = db.metadata.tables['places'], db.metadata.tables['reviews']
+            if (places.name in present and reviews.name in present
+                    and not set(AGGREGATE_COLUMNS) <= set(present[places.name].c.keys())):
+                # Agrégats absents de la source : remis à zéro par défaut, recalculés depuis les avis
+                for statement in rating_aggregate_repairs(places, reviews):
+                    writer.execute(statement)
+    finally:
+        source.dispose()
+        target.dispose()
+    return copied
+
+
+def _rekeyed(table, row, new_keys):
+    """ Return the row with its key and its foreign keys replaced by the new keys """
+    for column in table.c:
+        if not isinstance(column.type, IdType) or row.get(column.name) is None:
+            continue
+        if column.name == 'id':
+            row['id'] = new_keys[table.name][row['id']]
+        for foreign_key in column.foreign_keys:
+            # Référence vers une ligne absente : valeur gardée telle quelle
+            row[column.name] = new_keys.get(foreign_key.column.table.name, {}).get(
+                row[column.name], row[column.name])
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('source', help="SQLite file (or URI) to read")
+    parser.add_argument('target', help="new SQLite file (or URI) to create")
+    parser.add_argument('--to', dest='id_format', default='uuid7-binary',
+                        help="key format of the target: uuid4, uuid7 or uuid7-binary (default)")
+    parser.add_argument('--rekey', action='store_true',
+                        help="give every row a new UUIDv7 key (invalidates the old ids)")
+    args = parser.parse_args(argv)
+    for table, rows in migrate_ids(args.source, args.target, args.id_format, args.rekey).items():
+        print(f"{table:15} {rows:>10} rows")
+
+
+if __name__ == '__main__':
+    main()
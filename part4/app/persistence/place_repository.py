@@ -0,0 +1,225 @@
+from collections import Counter, defaultdict
+
+from sqlalchemy import case, exists, func, or_, select, tuple_, update
+from sqlalchemy.orm.util import identity_key
+
+from app.models.place import Place, RATING_COLUMNS, RATING_STARS
+from app.models.review import Review
+from app import db
+from app.persistence.repository import IN_CHUNK_SIZE, InMemoryRepository, SQLAlchemyRepository
+from app.persistence.unit_of_work import unit_of_work
+
+# Colonnes tenues à jour par adjust_ratings et repair_rating_aggregates
+AGGREGATE_COLUMNS = ('review_count', 'rating_sum') + RATING_COLUMNS
+
+
+def rating_changes(added=(), removed=()):
+    """
+    Group (place_id, rating) pairs of added and removed reviews into
+    {place_id: Counter({rating: +n or -n})}, dropping the changes that cancel out.
+    """
+    changes = defaultdict(Counter)
+    for place_id, rating in added:
+        changes[place_id][rating] += 1
+    for place_id, rating in removed:
+        changes[place_id][rating] -= 1
+    return {place_id: Counter({rating: n for rating, n in counter.items() if n})
+            for place_id, counter in changes.items() if any(counter.values())}
+
+
+def rating_aggregate_repairs(places, reviews):
+    """
+    Return the two UPDATE statements recomputing the aggregates of the places
+    table from the reviews table; their rowcounts add up to the number of
+    places whose stored values were wrong.
+    """
+    totals = select(
+        reviews.c.place_id,
+        func.count().label('review_count'),
+        func.sum(reviews.c.rating).label('rating_sum'),
+        *(func.sum(case((reviews.c.rating == star, 1), else_=0)).label(column)
+          for star, column in zip(RATING_STARS, RATING_COLUMNS))
+    ).group_by(reviews.c.place_id).subquery()
+    return (
+        # Lieux avec des avis : UPDATE ... FROM sur l'agrégat, seulement là où il diffère
+        update(places).where(
+            places.c.id == totals.c.place_id,
+            or_(*(places.c[column] != totals.c[column] for column in AGGREGATE_COLUMNS))
+        ).values({column: totals.c[column] for column in AGGREGATE_COLUMNS}),
+        # Lieux sans avis dont les compteurs ne sont pas à zéro
+        update(places).where(
+            ~exists().where(reviews.c.place_id == places.c.id),
+            or_(*(places.c[column] != 0 for column in AGGREGATE_COLUMNS))
+        ).values({column: 0 for column in AGGREGATE_COLUMNS}),
+    )
+
+
+class PlaceRepository(SQLAlchemyRepository):
+    """
+    Repository class for managing Place entities using SQLAlchemy.
+
+    This class extends the generic SQLAlchemyRepository with the duplicate
+    lookup used before creating places, served by the unique index
+    (title, owner_id).
+
+    It also maintains the rating aggregates of the places (review_count,
+    rating_sum, rating_1 ... rating_5): adjust_ratings applies the changes of
+    the reviews written in the current unit of work with relative UPDATEs
+    (column = column + n), so concurrent reviews of the same place do not
+    overwrite each other, and repair_rating_aggregates recomputes them from
+    the reviews table.
+
+    search returns one page of the places matching a PlaceSearch (see
+    app/services/place_search.py) with a single query, keyset-paginated on
+    (sort value, id) and served by the indexes of the Place model.
+
+    Methods:
+        existing_title_owner_pairs(keys): Returns the (title, owner_id) pairs already stored.
+        search(criteria, limit, cursor, options): Returns one page of the places matching criteria.
+        adjust_ratings(added, removed): Updates the aggregates for added and removed (place_id, rating) pairs.
+        repair_rating_aggregates(): Recomputes every aggregate, returns the number of places fixed.
+    """
+    def __init__(self, cache=None):
+        """ Initializes the PlaceRepository with the Place model and an optional cache."""
+        super().__init__(Place, cache)
+
+    def existing_title_owner_pairs(self, keys):
+        """ Return the (title, owner_id) pairs among keys that are already stored """
+        keys = list({key for key in keys if all(isinstance(value, str) for value in key)})
+        found = set()
+        # Deux paramètres par couple dans la clause IN
+        step = IN_CHUNK_SIZE // 2
+        for start in range(0, len(keys), step):
+            chunk = keys[start:start + step]
+            rows = db.session.query(self.model.title, self.model.owner_id).filter(
+                tuple_(self.model.title, self.model.owner_id).in_(chunk))
+            found.update((title, owner) for title, owner in rows)
+        return found
+
+    def search(self, criteria, limit, cursor=None, options=()):
+        """
+        Return up to 'limit' places matching criteria (a PlaceSearch), in its
+        sort order, after the place 'cursor', together with the id to resume
+        from (None when this is the last page), like get_page.
+        """
+        query = self.model.query.options(*options).filter(*criteria.conditions()).order_by(*criteria.order_by())
+        if cursor is not None:
+            # Valeur de tri du curseur lue dans la même requête (sous-requête sur la clé primaire)
+            query = query.filter(criteria.after(criteria.anchor(cursor), cursor))
+        items = query.limit(limit + 1).all()
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
+
+    def adjust_ratings(self, added=(), removed=()):
+        """ Add the ratings of the added reviews to their places and remove those of the removed ones """
+        with unit_of_work() as session:
+            for place_id, counter in rating_changes(added, removed).items():
+                values = {
+                    'review_count': self.model.review_count + sum(counter.values()),
+                    'rating_sum': self.model.rating_sum + sum(rating * n for rating, n in counter.items()),
+                }
+                for rating, n in counter.items():
+                    column = f'rating_{rating}'
+                    values[column] = getattr(self.model, column) + n
+                # Mise à jour relative faite par la base : pas de lecture-modification-écriture
+                session.execute(update(self.model).where(self.model.id == place_id).values(values),
+                                execution_options={'synchronize_session': False})
+                self._expire(session, [place_id])
+                self.invalidate(place_id)
+
+    def repair_rating_aggregates(self):
+        """
+        Recompute the aggregates of every place from the reviews table with
+        two set-based UPDATEs, and return the number of places whose stored
+        values were wrong.
+        """
+        with unit_of_work() as session:
+            fixed = sum(session.execute(statement).rowcount
+                        for statement in rating_aggregate_repairs(self.model.__table__, Review.__table__))
+            self._expire(session)
+            if self.cache is not None:
+                self.cache.clear()
+        return fixed
+
+    def _expire(self, session, place_ids=None):
+        """ Reload the aggregates of the places of the session (all of them if place_ids is None) on next access """
+        if place_ids is None:
+            objs = [obj for obj in session.identity_map.values() if isinstance(obj, self.model)]
+        else:
+            objs = [session.identity_map.get(identity_key(self.model, place_id)) for place_id in place_ids]
+        for obj in objs:
+            if obj is not None:
+                session.expire(obj, list(AGGREGATE_COLUMNS))
+
+
+class InMemoryPlaceRepository(InMemoryRepository):
+    """
+    Repository class keeping Place entities in memory.
+
+    Same methods as PlaceRepository; the duplicate lookup uses the unique
+    index mirrored from the (title, owner_id) constraint, the rating
+    aggregates are updated on the objects under the write lock, and search
+    filters and sorts every place in Python.
+    """
+    def __init__(self, registry=None):
+        """ Initializes the InMemoryPlaceRepository with the Place model."""
+        super().__init__(Place, registry)
+
+    def existing_title_owner_pairs(self, keys):
+        """ Return the (title, owner_id) pairs among keys that are already stored """
+        return {key for key in keys
+                if all(isinstance(value, str) for value in key)
+                and self.get_unique(('title', 'owner_id'), key) is not None}
+
+    def search(self, criteria, limit, cursor=None, options=()):
+        """ Return one page of the places matching criteria, like PlaceRepository.search (scan of the places) """
+        places = sorted((place for place in self._storage.values() if criteria.matches(place)),
+                        key=criteria.sort_key, reverse=criteria.descending)
+        if cursor is not None:
+            anchor = self.get(cursor)
+            if anchor is None:
+                # Comme en SQL : curseur inconnu, aucun lieu après lui
+                return [], None
+            position = criteria.sort_key(anchor)
+            places = [place for place in places
+                      if (criteria.sort_key(place) < position if criteria.descending
+                          else criteria.sort_key(place) > position)]
+        if len(places) > limit:
+            return places[:limit], places[limit - 1].id
+        return places, None
+
+    def adjust_ratings(self, added=(), removed=()):
+        """ Add the ratings of the added reviews to their places and remove those of the removed ones """
+        with self._lock:
+            for place_id, counter in rating_changes(added, removed).items():
+                place = self.get(place_id)
+                if place is None:
+                    continue
+                place.review_count += sum(counter.values())
+                place.rating_sum += sum(rating * n for rating, n in counter.items())
+                for rating, n in counter.items():
+                    column = f'rating_{rating}'
+                    setattr(place, column, getattr(place, column) + n)
+
+    def repair_rating_aggregates(self):
+        """
+        Recompute the aggregates of every place from the in-memory reviews
+        and return the number of places whose values were wrong.
+        """
+        reviews = self.registry.get(Review)
+        totals = defaultdict(Counter)
+        for review in (reviews.get_all() if reviews is not None else []):
+            totals[review.place_id][review.rating] += 1
+        fixed = 0
+        with self._lock:
+            for place in self.get_all():
+                counter = totals.get(place.id, Counter())
+                values = {'review_count': sum(counter.values()),
+                          'rating_sum': sum(rating * n for rating, n in counter.items())}
+                values.update((column, counter[star]) for star, column in zip(RATING_STARS, RATING_COLUMNS))
+                if any(getattr(place, column) != value for column, value in values.items()):
+                    fixed += 1
+                    for column, value in values.items():
+                        setattr(place, column, value)
+        return fixed
@@ -0,0 +1,167 @@
+"""
+Connection pool settings and instrumentation.
+
+The pool settings of the configuration (SQLALCHEMY_POOL_OPTIONS: pool_size,
+max_overflow, pool_timeout, pool_recycle, pool_pre_ping) are turned into
+engine options for Flask-SQLAlchemy. An in-memory SQLite database only
+exists inside its single connection, so it keeps the pool chosen by
+Flask-SQLAlchemy and ignores these settings.
+
+PoolMetrics listens to the pool events of an engine and counts connections
+opened, checkouts, checkins and invalidations. With InstrumentedQueuePool it
+also measures how long each checkout waited for a free connection, the
+checkouts that timed out, and the highest overflow reached.
+
+Classes:
+- InstrumentedQueuePool: QueuePool timing the wait of every checkout.
+- PoolMetrics: counters of the pool of one engine.
+
+Functions:
+- is_memory_database(uri): tell whether a URI is an in-memory SQLite database.
+- pool_engine_options(uri, pool_options): return the engine options for a URI.
+"""
+
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Nombre d'attentes récentes gardées pour calculer les percentiles
+RECENT_WAITS = 1024
+
+
+class InstrumentedQueuePool(QueuePool):
+    """ QueuePool reporting the time spent waiting for each connection to its PoolMetrics """
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - start, self.overflow())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() remplace le pool : le nouveau garde les mêmes compteurs
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    """
+    Counters of the connection pool of an engine, safe to update from
+    several threads.
+
+    Attributes:
+        engine: The engine whose pool is observed (set by attach).
+    """
+
+    def __init__(self):
+        self.engine = None
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('connects', 'checkouts', 'checkins', 'invalidations',
+             'soft_invalidations', 'timeouts'), 0)
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._waits = deque(maxlen=RECENT_WAITS)
+        self._overflow_max = 0
+
+    def attach(self, engine):
+        """ Start counting the pool events of engine """
+        self.engine = engine
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics = self
+        for name, counter in (('connect', 'connects'), ('checkout', 'checkouts'),
+                              ('checkin', 'checkins'), ('invalidate', 'invalidations'),
+                              ('soft_invalidate', 'soft_invalidations')):
+            event.listen(engine, name, self._counter(counter))
+
+    def _counter(self, counter):
+        def listener(*args):
+            with self._lock:
+                self._counters[counter] += 1
+        return listener
+
+    def record_wait(self, seconds, overflow):
+        """ Record one checkout that waited 'seconds' for a connection """
+        with self._lock:
+            self._wait_count += 1
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+            self._waits.append(seconds)
+            self._overflow_max = max(self._overflow_max, overflow)
+
+    def record_timeout(self, seconds):
+        """ Record one checkout that gave up after pool_timeout """
+        with self._lock:
+            self._counters['timeouts'] += 1
+            self._wait_max = max(self._wait_max, seconds)
+
+    def reset(self):
+        """ Set every counter back to zero """
+        with self._lock:
+            for counter in self._counters:
+                self._counters[counter] = 0
+            self._wait_count = 0
+            self._wait_total = self._wait_max = 0.0
+            self._waits.clear()
+            self._overflow_max = 0
+
+    def stats(self):
+        """
+        Return the counters, the checkout wait times in milliseconds (mean
+        and max since the start, p50 and p99 over the last RECENT_WAITS
+        checkouts) and the current state of the pool.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            waits = sorted(self._waits)
+            stats['wait_ms'] = {
+                'mean': round(self._wait_total * 1000 / self._wait_count, 3) if self._wait_count else 0.0,
+                'max': round(self._wait_max * 1000, 3),
+                'p50': round(waits[len(waits) // 2] * 1000, 3) if waits else 0.0,
+                'p99': round(waits[min(len(waits) - 1, len(waits) * 99 // 100)] * 1000, 3) if waits else 0.0,
+            }
+            stats['overflow_max'] = self._overflow_max
+
+        pool = self.engine.pool if self.engine is not None else None
+        stats['pool'] = {'class': type(pool).__name__ if pool is not None else None}
+        if isinstance(pool, QueuePool):
+            stats['pool'].update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+            })
+        return stats
+
+
+def is_memory_database(uri):
+    """ Return True for an in-memory SQLite URI ('sqlite://', ':memory:', mode=memory) """
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and (
+        url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory')
+
+
+def pool_engine_options(uri, pool_options):
+    """
+    Return the engine options applying pool_options to the database of uri
+    with an InstrumentedQueuePool, or {} for an in-memory SQLite database.
+    """
+    if not pool_options or is_memory_database(uri):
+        return {}
+    return {'poolclass': InstrumentedQueuePool, **pool_options}
@@ -0,0 +1,73 @@
+"""
+Query plan verification for the SQLite database.
+
+Used by the tests to check that every query issued by the facade is served
+by an index: the SELECT statements sent to the engine are recorded, then
+replayed with 'EXPLAIN QUERY PLAN'. A step of the form 'SCAN <table>'
+without 'USING ... INDEX' is a full table scan and is reported.
+
+Classes:
+- QueryRecorder: context manager recording the SELECT statements executed on an engine.
+
+Functions:
+- explain(connection, statement, parameters): return the steps of the query plan.
+- full_scans(plan): return the tables read with a full table scan.
+- find_full_scans(engine, queries): return the recorded queries that scan a whole table.
+"""
+
+import re
+
+from sqlalchemy import event
+
+# 'SCAN places' (ou 'SCAN TABLE places' avant SQLite 3.36), sans index
+_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(?P<index> USING .*INDEX.*| USING INTEGER PRIMARY KEY.*)?$')
+
+
+class QueryRecorder:
+    """ Record (statement, parameters) of every SELECT executed on an engine """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.queries = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.queries.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+def explain(connection, statement, parameters=()):
+    """ Return the 'detail' column of EXPLAIN QUERY PLAN for a statement """
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters or ())
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan):
+    """ Return the names of the tables read without any index in a plan """
+    tables = []
+    for detail in plan:
+        match = _SCAN.match(detail)
+        if match and not match.group('index'):
+            tables.append(match.group(1))
+    return tables
+
+
+def find_full_scans(engine, queries):
+    """
+    Replay the recorded queries with EXPLAIN QUERY PLAN and return a list of
+    (statement, plan) for those reading a whole table.
+    """
+    problems = []
+    with engine.connect() as connection:
+        for statement, parameters in queries:
+            plan = explain(connection, statement, parameters)
+            if full_scans(plan):
+                problems.append((statement, plan))
+    return problems
@@ -0,0 +1,174 @@
+"""
+Read/write splitting between the primary database and a read replica.
+
+When READ_REPLICA_URI is configured, the replica is registered as the
+Flask-SQLAlchemy bind 'replica' and RoutingSession chooses the engine of
+every statement:
+- SELECT statements issued inside read_from_replica() go to the replica;
+- everything else (flushes, INSERT/UPDATE/DELETE, reads inside a unit of
+  work) goes to the primary.
+
+Read-your-writes: once the session of a request has written anything, every
+later read of that request goes to the primary, so a client never reads a
+replica older than its own write. The session is discarded at the end of the
+request, and the next request reads from the replica again.
+
+Objects read from the replica are not put in the entity cache: the replica
+may lag behind the primary, and a stale row must not outlive the replication
+delay for the cache TTL.
+
+Keeping the replica fresh is the job of the deployment (any SQLite
+replication tool). For tests and benchmarks, ReplicaSynchronizer copies the
+primary file into the replica with the SQLite online backup API.
+
+RoutingSession also sends the rows of the sharded tables to their shard
+when the 'sqlite-sharded' backend is used (see sharding.py).
+
+Classes:
+- RoutingSession: Flask-SQLAlchemy session routing reads to the replica and sharded rows to their shard.
+- ReplicaSynchronizer: thread copying the primary into the replica periodically.
+
+Functions:
+- read_from_replica(): context manager sending the reads inside it to the replica.
+- replica_read(method): decorator running a method inside read_from_replica().
+- reading_from_replica(session): tell whether a read would now go to the replica.
+- sync_replica(primary, replica): copy the primary database into the replica.
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select, event
+
+from app.persistence.sharding import (assign_shard_ids, current_shard, route_orm_execute,
+                                      shard_engines, shard_of, targets_shards)
+
+REPLICA_BIND = 'replica'
+_READ_KEY = 'read_from_replica'
+_WROTE_KEY = 'wrote_to_primary'
+
+
+class RoutingSession(Session):
+    """
+    Session sending the SELECT statements of read_from_replica() blocks to
+    the replica bind, and the statements on sharded tables to their shard.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, shard_id=None, instance=None, **kwargs):
+        if bind is None:
+            if self._flushing or (clause is not None and not isinstance(clause, Select)):
+                # Écriture : les lectures suivantes de la requête iront au primaire
+                self.info[_WROTE_KEY] = True
+            elif reading_from_replica(self):
+                return self._db.engines[REPLICA_BIND]
+
+            engines = shard_engines(self)
+            if engines and (shard_id is not None or targets_shards(mapper, clause)):
+                if shard_id is None:
+                    shard_id = shard_of(instance, len(engines)) if instance is not None else current_shard(self)
+                # Sans shard (lignes de place_amenity, requêtes Core) : base globale
+                if shard_id is not None:
+                    return engines[shard_id]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    @property
+    def connection_callable(self):
+        """ With shards, the flush asks for the connection of each row (None otherwise) """
+        return self._connection_for_row if shard_engines(self) else None
+
+    def _connection_for_row(self, mapper=None, instance=None, **kwargs):
+        return self.connection(bind_arguments={'mapper': mapper, 'instance': instance})
+
+
+# Routage des requêtes ORM et identifiants des nouvelles lignes, sans effet sans shards
+event.listen(RoutingSession, 'do_orm_execute', route_orm_execute, retval=True)
+event.listen(RoutingSession, 'before_flush', lambda session, flush_context, instances: assign_shard_ids(session))
+
+
+def reading_from_replica(session):
+    """
+    Return True if a read of session would go to the replica: inside
+    read_from_replica(), with a replica configured, outside any unit of work
+    and before any write of the session.
+    """
+    from app.persistence.unit_of_work import in_unit_of_work
+    return (session.info.get(_READ_KEY, False)
+            and not session.info.get(_WROTE_KEY, False)
+            and REPLICA_BIND in session._db.engines
+            and not in_unit_of_work(session))
+
+
+@contextmanager
+def read_from_replica():
+    """ Send the reads of the current session to the replica inside the with block """
+    from app import db
+    session = db.session()
+    previous = session.info.get(_READ_KEY, False)
+    session.info[_READ_KEY] = True
+    try:
+        yield session
+    finally:
+        session.info[_READ_KEY] = previous
+
+
+def replica_read(method):
+    """ Decorator: run a read-only method inside read_from_replica() """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with read_from_replica():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def sync_replica(primary, replica):
+    """
+    Copy the whole primary database into the replica with the SQLite
+    online backup API. Both arguments are engines on SQLite files.
+    """
+    source = primary.raw_connection()
+    target = replica.raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        target.close()
+        source.close()
+
+
+class ReplicaSynchronizer:
+    """
+    Daemon thread calling sync_replica every 'interval' seconds.
+
+    Attributes:
+        app: The Flask application whose primary and replica engines are used.
+        interval: Number of seconds between two copies.
+        syncs: Number of copies made so far.
+    """
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self.syncs = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='replica-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def sync_now(self):
+        """ Copy the primary into the replica right away """
+        from app import db
+        with self.app.app_context():
+            sync_replica(db.engine, db.engines[REPLICA_BIND])
+        self.syncs += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sync_now()
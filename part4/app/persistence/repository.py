@@ -4,25 +4,52 @@ for a generic repository pattern in the HBnB application.
 
 Classes:
 - Repository (ABC): Abstract base class specifying the interface for a repository managing CRUD operations.
+- SQLAlchemyRepository: Concrete implementation of Repository backed by the SQLAlchemy session.
 - InMemoryRepository: Concrete implementation of Repository that stores objects in memory using a dictionary.
 
 Responsibilities:
 - add(obj): Add a new object to the repository.
-- get(obj_id): Retrieve an object by its unique identifier.
-- get_all(): Return a list of all stored objects.
+- add_many(objs): Add several objects in a single transaction.
+- get(obj_id, options): Retrieve an object by its unique identifier, with the relationships of the loader options.
+- get_many(obj_ids): Retrieve several objects by identifier with set-based queries.
+- get_all(options): Return a list of all stored objects.
+- get_page(limit, cursor, options): Return one keyset-paginated page of objects and the key to resume from.
 - update(obj_id, data): Update an existing object identified by obj_id with provided data.
 - delete(obj_id): Remove an object by its identifier.
 - get_by_attribute(attr_name, attr_value): Retrieve an object matching a specific attribute value.
+- invalidate(obj_id): Drop any cached copy of an object after it was modified outside the repository.
+- get_version(obj_id, paths), get_page_version(limit, cursor, paths): Read in one query the version
+  of an object or of a page and of the rows along relationship paths (see versions.py), for the
+  ETags; None when the repository cannot read versions cheaply.
 
 Implementation Notes:
 - SQLAlchemyRepository expects that each model has a primary key named 'id'.
 - The update method uses setattr and assumes model instances can be updated dynamically.
 - get_by_attribute enables flexible filtering without knowing the object's ID.
+- Writes run inside a unit of work (see unit_of_work.py): called on their own
+  they commit once, called inside a larger unit of work they only modify the
+  session and the outermost unit of work commits.
+- When an EntityCache is given, get and get_by_attribute are served from it
+  (read-through) and update/delete invalidate it. Rows read from the read
+  replica are not cached.
+- InMemoryRepository mirrors the UNIQUE constraints and the indexes of the
+  table of its model, and links many-to-one relationships between the
+  in-memory repositories; it has no transactions (see its docstring).
 
 This design abstracts persistence mechanisms and enables easy swapping or extension with other storage backends.
 """
 
+import threading
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from sqlalchemy import Column, UniqueConstraint, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import MANYTOONE
+from sqlalchemy.orm.util import identity_key
+from app.persistence.cache import restore, snapshot
+from app.persistence.replica import reading_from_replica
+from app.persistence.unit_of_work import after_commit, unit_of_work
+from app.persistence.versions import page_version_statement, version_statement
 from app.models import User, Place, Review, Amenity  # Import your models
 from app.models.user import User
 from app import db
@@ -32,17 +59,32 @@ from app import db
 
 # from app import db  # Assuming you have set up SQLAlchemy in your Flask app
 
+# Nombre maximum d'identifiants par clause IN (limite de variables de SQLite)
+IN_CHUNK_SIZE = 500
+
 class Repository(ABC):
     @abstractmethod
     def add(self, obj):
         pass
 
     @abstractmethod
-    def get(self, obj_id):
+    def add_many(self, objs):
+        pass
+
+    @abstractmethod
+    def get(self, obj_id, options=()):
+        pass
+
+    @abstractmethod
+    def get_many(self, obj_ids):
+        pass
+
+    @abstractmethod
+    def get_all(self, options=()):
         pass
 
     @abstractmethod
-    def get_all(self):
+    def get_page(self, limit, cursor=None, options=()):
         pass
 
     @abstractmethod
@@ -57,6 +99,17 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def invalidate(self, obj_id):
+        pass
+
+    @abstractmethod
+    def get_version(self, obj_id, paths=()):
+        pass
+
+    @abstractmethod
+    def get_page_version(self, limit, cursor=None, paths=()):
+        pass
 
 
 class SQLAlchemyRepository(Repository):
@@ -69,43 +122,397 @@ class SQLAlchemyRepository(Repository):
 
     Attributes:
         model: The SQLAlchemy model class this repository manages.
+        cache: Optional EntityCache serving get and get_by_attribute.
 
     Methods:
         add(obj): Adds a new record to the database.
-        get(obj_id): Retrieves a record by its primary key.
-        get_all(): Retrieves all records for the model.
+        add_many(objs): Adds several records in one transaction.
+        get(obj_id, options): Retrieves a record by its primary key.
+        get_many(obj_ids): Retrieves several records by primary key with IN queries.
+        get_all(options): Retrieves all records for the model.
+        get_page(limit, cursor, options): Retrieves one page of records ordered by primary key.
         update(obj_id, data): Updates a record with new data.
         delete(obj_id): Deletes a record by its ID.
         get_by_attribute(attr_name, attr_value): Finds a record by a specific attribute's value.
+        invalidate(obj_id): Removes a record from the cache.
     """
-    def __init__(self, model):
+    def __init__(self, model, cache=None):
         self.model = model
+        self.cache = cache
 
     def add(self, obj):
+        with unit_of_work() as session:
+            session.add(obj)
+
+    def add_many(self, objs):
+        """
+        Add every object in one transaction: the INSERTs are grouped by the
+        session into multi-row statements and either all rows or none are stored.
+
+        The objects are not expired by this commit: their values are the ones
+        just written, and reloading them would cost one SELECT per row.
+        """
+        with unit_of_work(expire_on_commit=False) as session:
+            session.add_all(objs)
+
+    def get(self, obj_id, options=()):
+        if options:
+            # Les relations demandées sont chargées avec la ligne ; le cache ne garde que les colonnes
+            return self.model.query.options(*options).filter(self.model.id == obj_id).first()
+        if self.cache is None:
+            return self.model.query.get(obj_id)
+
         from app import db
-        db.session.add(obj)
-        db.session.commit()
+        # Objet déjà chargé dans la session de la requête : aucune requête SQL
+        obj = db.session.identity_map.get(identity_key(self.model, obj_id))
+        if obj is not None:
+            return obj
+
+        values = self.cache.get(('id', obj_id))
+        if values is not None:
+            return restore(self.model, values, db.session)
+
+        obj = self.model.query.get(obj_id)
+        self._remember(obj)
+        return obj
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+    def get_many(self, obj_ids):
+        """
+        Return a dictionary {id: object} for the given ids that exist,
+        using one IN query per IN_CHUNK_SIZE ids.
+        """
+        ids = list({obj_id for obj_id in obj_ids if isinstance(obj_id, str)})
+        found = {}
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            for obj in self.model.query.filter(self.model.id.in_(chunk)):
+                found[obj.id] = obj
+        return found
 
-    def get_all(self):
-        return self.model.query.all()
+    def get_all(self, options=()):
+        return self.model.query.options(*options).all()
+
+    def get_page(self, limit, cursor=None, options=()):
+        """
+        Return up to 'limit' records whose id is greater than 'cursor',
+        ordered by primary key, together with the id to resume from
+        (None when this is the last page).
+
+        The filter and the ORDER BY both use the primary key index, so the
+        cost of a page does not depend on the size of the table. The loader
+        options (selectinload(...), ...) load the relationships of the whole
+        page in a fixed number of statements.
+        """
+        query = self.model.query.options(*options).order_by(self.model.id)
+        if cursor is not None:
+            query = query.filter(self.model.id > cursor)
+        # Un élément de plus que demandé permet de savoir s'il reste une page
+        items = query.limit(limit + 1).all()
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
+
+    def update(self, obj_id, data):
+        with unit_of_work():
+            obj = self.get(obj_id)
+            if obj:
+                for key, value in data.items():
+                    setattr(obj, key, value)
+                self.invalidate(obj_id)
+
+    def delete(self, obj_id):
+        with unit_of_work() as session:
+            obj = self.get(obj_id)
+            if obj:
+                session.delete(obj)
+                self.invalidate(obj_id)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if self.cache is None:
+            return self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
+        if attr_name == 'id':
+            return self.get(attr_value)
+
+        key = ('attr', attr_name, attr_value)
+        obj_id = self.cache.get(key)
+        if obj_id is not None:
+            obj = self.get(obj_id)
+            # L'attribut a pu changer depuis la mise en cache
+            if obj is not None and getattr(obj, attr_name) == attr_value:
+                return obj
+            self.cache.delete(key)
+
+        obj = self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
+        if obj is not None and self._remember(obj):
+            self.cache.set(key, obj.id)
+        return obj
+
+    def invalidate(self, obj_id):
+        """
+        Remove the cached copy of an object, if any, now and once the current
+        unit of work has committed (a concurrent request may cache the old
+        row again before the commit).
+        """
+        cache = self.cache
+        if cache is not None:
+            key = ('id', obj_id)
+            cache.delete(key)
+            after_commit(lambda: cache.delete(key))
+
+    def get_version(self, obj_id, paths=()):
+        """
+        Return the version of an object and of the rows along the
+        relationship paths (tuples of names), read with one query, or None
+        if the object does not exist.
+        """
+        version = tuple(db.session.execute(version_statement(self.model, obj_id, paths)).one())
+        return version if version[0] is not None else None
+
+    def get_page_version(self, limit, cursor=None, paths=()):
+        """ Return the version of the page get_page(limit, cursor) and of the rows along paths, read with one query """
+        return tuple(db.session.execute(page_version_statement(self.model, limit, cursor, paths)).one())
+
+    def _remember(self, obj):
+        """ Store a snapshot of a freshly loaded object; return True if cached """
+        if obj is None:
+            return False
+        # Le réplica peut être en retard : ses lignes ne doivent pas rester en cache
+        if reading_from_replica(db.session()):
+            return False
+        values = snapshot(obj)
+        if values is None:
+            return False
+        self.cache.set(('id', obj.id), values)
+        return True
+
+
+class InMemoryRepository(Repository):
+    """
+    A repository keeping the objects of a model in Python dictionaries.
+
+    The table of the model is mirrored in memory:
+    - every UNIQUE column or constraint is enforced, with the IntegrityError
+      the database would raise;
+    - the leading column of every index and unique constraint gets a hash
+      index, so get_by_attribute on it does not scan the objects.
+    Many-to-one relationships (review.user, place.owner, ...) are linked to
+    the objects of the other in-memory repositories of the same registry,
+    which also fills the collections on the other side (user.reviews, ...)
+    through back_populates, so the loader options taken by the read methods
+    are ignored: every relationship is already in memory.
+
+    There are no transactions: every write is applied immediately, and a
+    unit of work failing halfway does not undo the writes already done.
+    Writes are serialized by a lock; reads take none.
+
+    Attributes:
+        model: The SQLAlchemy model class this repository manages.
+        registry: Dictionary {model: InMemoryRepository} shared by the repositories of one backend.
+        cache: Always None (the objects already live in memory).
+    """
+    def __init__(self, model, registry=None):
+        self.model = model
+        self.cache = None
+        self.registry = registry if registry is not None else {}
+        self.registry[model] = self
+        self._storage = {}
+        # Identifiants triés, pour la pagination par curseur
+        self._ids = []
+        self._lock = threading.RLock()
+
+        mapper = inspect(model)
+        table = model.__table__
+
+        def key(column):
+            return mapper.get_property_by_column(column).key
+
+        unique = [(column,) for column in table.columns if column.unique]
+        unique += [tuple(constraint.columns) for constraint in table.constraints
+                   if isinstance(constraint, UniqueConstraint)]
+        unique += [tuple(index.columns) for index in table.indexes if index.unique]
+        indexed = [index.columns for index in table.indexes] + unique
+        # Contraintes uniques : tuple d'attributs -> {tuple de valeurs: objet}
+        self._unique = {tuple(key(column) for column in columns): {} for columns in unique}
+        # Index : attribut de tête -> {valeur: {id: objet}}
+        self._indexes = {key(list(columns)[0]): {} for columns in indexed
+                         if isinstance(list(columns)[0], Column)}
+        # Relations plusieurs-à-un : (relation, attribut clé étrangère, modèle cible)
+        self._links = [(relation.key, key(list(relation.local_columns)[0]), relation.mapper.class_)
+                       for relation in mapper.relationships if relation.direction is MANYTOONE]
+        # id -> valeurs indexées de l'objet, pour le retirer des index sans les parcourir
+        self._keys = {}
+
+    def add(self, obj):
+        self.add_many([obj])
+
+    def add_many(self, objs):
+        """ Add every object, or none of them if one breaks a unique constraint """
+        entries = [(obj, self._values_of(obj)) for obj in objs]
+        with self._lock:
+            batch = {}
+            for obj, values in entries:
+                self._check_unique(obj.id, values, batch)
+            for obj, values in entries:
+                self._store(obj, values)
+        for obj, _ in entries:
+            self._link(obj)
+
+    def get(self, obj_id, options=()):
+        return self._storage.get(obj_id)
+
+    def get_many(self, obj_ids):
+        """ Return a dictionary {id: object} for the given ids that exist """
+        found = {}
+        for obj_id in obj_ids:
+            obj = self._storage.get(obj_id) if isinstance(obj_id, str) else None
+            if obj is not None:
+                found[obj_id] = obj
+        return found
+
+    def get_all(self, options=()):
+        return list(self._storage.values())
+
+    def get_page(self, limit, cursor=None, options=()):
+        """
+        Return up to 'limit' objects whose id is greater than 'cursor',
+        ordered by id, together with the id to resume from (None on the
+        last page), like SQLAlchemyRepository.get_page.
+        """
+        start = bisect_right(self._ids, cursor) if cursor is not None else 0
+        ids = self._ids[start:start + limit + 1]
+        items = [self._storage[obj_id] for obj_id in ids if obj_id in self._storage]
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
 
     def update(self, obj_id, data):
-        from app import db
         obj = self.get(obj_id)
-        if obj:
+        if not obj:
+            return
+        previous = {key: getattr(obj, key) for key in data}
+        try:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            self.invalidate(obj_id)
+        except BaseException:
+            # Pas de rollback en mémoire : on remet les anciennes valeurs
+            for key, value in previous.items():
+                setattr(obj, key, value)
+            raise
 
     def delete(self, obj_id):
-        from app import db
-        obj = self.get(obj_id)
-        if obj:
-            db.session.delete(obj)
-            db.session.commit()
+        with self._lock:
+            obj = self._storage.pop(obj_id, None)
+            if obj is None:
+                return
+            del self._ids[bisect_left(self._ids, obj_id)]
+            self._unindex(obj_id)
+        for relation, _, _ in self._links:
+            # Retire aussi l'objet des collections de l'autre côté (user.reviews, ...)
+            setattr(obj, relation, None)
 
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
+        if attr_name == 'id':
+            return self.get(attr_value)
+        if (attr_name,) in self._unique:
+            return self._unique[(attr_name,)].get((attr_value,))
+        found = self.find_all_by_attribute(attr_name, attr_value)
+        return found[0] if found else None
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        """ Return every object whose attribute equals attr_value """
+        if attr_name in self._indexes:
+            return list(self._indexes[attr_name].get(attr_value, {}).values())
+        # list() copie les valeurs en une fois : une écriture concurrente ne peut pas interrompre le parcours
+        return [obj for obj in list(self._storage.values()) if getattr(obj, attr_name) == attr_value]
+
+    def get_unique(self, attr_names, attr_values):
+        """ Return the object holding the values of a unique constraint, or None """
+        return self._unique[tuple(attr_names)].get(tuple(attr_values))
+
+    def invalidate(self, obj_id):
+        """
+        Refresh the indexes and the relationships of an object modified
+        outside the repository. Raises IntegrityError if its new values
+        break a unique constraint.
+        """
+        obj = self.get(obj_id)
+        if obj is None:
+            return
+        values = self._values_of(obj)
+        with self._lock:
+            self._check_unique(obj_id, values)
+            self._unindex(obj_id)
+            self._index(obj, values)
+        self._link(obj)
+
+    def get_version(self, obj_id, paths=()):
+        """ No version without the database: the responses get no ETag """
+        return None
+
+    def get_page_version(self, limit, cursor=None, paths=()):
+        return None
+
+    def _values_of(self, obj):
+        """ Return the current values of every unique constraint and index of obj """
+        values = {attrs: tuple(getattr(obj, attr) for attr in attrs) for attrs in self._unique}
+        values.update({attr: getattr(obj, attr) for attr in self._indexes})
+        return values
+
+    def _check_unique(self, obj_id, values, batch=None):
+        """ Raise IntegrityError if another object holds one of the unique values """
+        for attrs in self._unique:
+            value = values[attrs]
+            if None in value:
+                # Comme en SQL, NULL ne viole jamais une contrainte UNIQUE
+                continue
+            other = self._unique[attrs].get(value)
+            if batch is not None:
+                other = batch.setdefault((attrs, value), obj_id) if other is None else other
+                other_id = other if isinstance(other, str) else other.id
+            else:
+                other_id = other.id if other is not None else obj_id
+            if other_id != obj_id:
+                columns = ', '.join(f"{self.model.__tablename__}.{attr}" for attr in attrs)
+                raise IntegrityError(f"INSERT INTO {self.model.__tablename__}", None,
+                                     ValueError(f"UNIQUE constraint failed: {columns}"))
+
+    def _store(self, obj, values):
+        if obj.id in self._storage:
+            self._unindex(obj.id)
+        else:
+            insort(self._ids, obj.id)
+        self._storage[obj.id] = obj
+        self._index(obj, values)
+
+    def _index(self, obj, values):
+        for attrs in self._unique:
+            if None not in values[attrs]:
+                self._unique[attrs][values[attrs]] = obj
+        for attr in self._indexes:
+            self._indexes[attr].setdefault(values[attr], {})[obj.id] = obj
+        self._keys[obj.id] = values
+
+    def _unindex(self, obj_id):
+        values = self._keys.pop(obj_id, None)
+        if values is None:
+            return
+        for attrs in self._unique:
+            if self._unique[attrs].get(values[attrs]) is not None and self._unique[attrs][values[attrs]].id == obj_id:
+                del self._unique[attrs][values[attrs]]
+        for attr in self._indexes:
+            bucket = self._indexes[attr].get(values[attr])
+            if bucket is not None:
+                bucket.pop(obj_id, None)
+                if not bucket:
+                    del self._indexes[attr][values[attr]]
+
+    def _link(self, obj):
+        """ Point the many-to-one relationships of obj to the objects of the other repositories """
+        for relation, foreign_key, target_model in self._links:
+            repository = self.registry.get(target_model)
+            if repository is None:
+                continue
+            target = repository.get(getattr(obj, foreign_key))
+            if target is not None and getattr(obj, relation) is not target:
+                setattr(obj, relation, target)
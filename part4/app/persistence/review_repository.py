@@ -0,0 +1,99 @@
+from sqlalchemy import and_, exists, or_, select
+
+from app.models.review import Review
+from app import db
+from app.persistence.repository import IN_CHUNK_SIZE, InMemoryRepository, SQLAlchemyRepository
+
+class ReviewRepository(SQLAlchemyRepository):
+    """
+    Repository class for managing Review entities using SQLAlchemy.
+
+    This class extends the generic SQLAlchemyRepository with the queries
+    filtered by place, which are served by the index
+    (place_id, created_at, id) instead of reading the whole table.
+
+    Methods:
+        get_by_place(place_id, limit, cursor, options): Returns one page of the reviews of a place.
+        exists_for(user_id, place_id): Tells whether a user already reviewed a place.
+        places_reviewed_by(user_id, place_ids): Returns the places among place_ids a user already reviewed.
+    """
+    def __init__(self, cache=None):
+        """ Initializes the ReviewRepository with the Review model and an optional cache."""
+        super().__init__(Review, cache)
+
+    def get_by_place(self, place_id, limit, cursor=None, options=()):
+        """
+        Return up to 'limit' reviews of a place, oldest first, together with
+        the id of the last one to resume from (None on the last page).
+
+        The cursor is the id of the last review of the previous page: the
+        page starts right after its (created_at, id) position.
+        """
+        query = self.model.query.options(*options).filter(self.model.place_id == place_id).order_by(
+            self.model.created_at, self.model.id)
+        if cursor is not None:
+            # Date de création de la dernière review de la page précédente
+            anchor = select(self.model.created_at).where(
+                self.model.id == cursor).scalar_subquery()
+            query = query.filter(or_(
+                self.model.created_at > anchor,
+                and_(self.model.created_at == anchor, self.model.id > cursor)))
+        items = query.limit(limit + 1).all()
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
+
+    def exists_for(self, user_id, place_id):
+        """ Return True if user_id already posted a review for place_id """
+        # Recherche dans l'index unique (user_id, place_id)
+        return db.session.query(exists().where(
+            self.model.user_id == user_id, self.model.place_id == place_id)).scalar()
+
+    def places_reviewed_by(self, user_id, place_ids):
+        """ Return the set of ids among place_ids that user_id already reviewed """
+        place_ids = list(place_ids)
+        found = set()
+        for start in range(0, len(place_ids), IN_CHUNK_SIZE):
+            rows = db.session.query(self.model.place_id).filter(
+                self.model.user_id == user_id,
+                self.model.place_id.in_(place_ids[start:start + IN_CHUNK_SIZE]))
+            found.update(place_id for (place_id,) in rows)
+        return found
+
+
+class InMemoryReviewRepository(InMemoryRepository):
+    """
+    Repository class keeping Review entities in memory.
+
+    Same methods as ReviewRepository; the reviews of a place come from the
+    index mirrored from (place_id, created_at, id) and are sorted in Python.
+    """
+    def __init__(self, registry=None):
+        """ Initializes the InMemoryReviewRepository with the Review model."""
+        super().__init__(Review, registry)
+
+    def get_by_place(self, place_id, limit, cursor=None, options=()):
+        """
+        Return up to 'limit' reviews of a place, oldest first, together with
+        the id of the last one to resume from (None on the last page).
+        """
+        reviews = sorted(self.find_all_by_attribute('place_id', place_id),
+                         key=lambda review: (review.created_at, review.id))
+        if cursor is not None:
+            anchor = self.get(cursor)
+            if anchor is None:
+                # Comme en SQL : curseur inconnu, aucune review après lui
+                return [], None
+            position = (anchor.created_at, anchor.id)
+            reviews = [review for review in reviews if (review.created_at, review.id) > position]
+        if len(reviews) > limit:
+            return reviews[:limit], reviews[limit - 1].id
+        return reviews, None
+
+    def exists_for(self, user_id, place_id):
+        """ Return True if user_id already posted a review for place_id """
+        return self.get_unique(('user_id', 'place_id'), (user_id, place_id)) is not None
+
+    def places_reviewed_by(self, user_id, place_ids):
+        """ Return the set of ids among place_ids that user_id already reviewed """
+        return {place_id for place_id in place_ids if self.exists_for(user_id, place_id)}
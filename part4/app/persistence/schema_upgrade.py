@@ -0,0 +1,58 @@
+"""
+Upgrade of the tables of an existing database to the schema of the models.
+
+create_all() creates the missing tables but never changes a table that
+already exists: a database created before a column or an index was added to
+a model keeps its old schema, and the queries on the new columns fail while
+the new indexes are missing. upgrade_schema() runs at startup, after
+create_all(), and brings the existing tables up to date:
+- every column of a model missing from its table is added with
+  ALTER TABLE ... ADD COLUMN, its server default filling the existing rows
+  (the rating aggregates of places start at 0, then the caller repairs
+  them from the reviews);
+- every index declared by the models (db.Index, index=True) is created with
+  CREATE INDEX IF NOT EXISTS, the same statements as app/database/schema.sql.
+
+Constraints (UNIQUE, FOREIGN KEY) cannot be added to an existing SQLite
+table and are left as they are.
+
+Functions:
+- upgrade_schema(engine, tables): add the missing columns and indexes, return the columns added.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+
+def _add_column_statement(engine, table, column):
+    """ Return the ALTER TABLE adding column to table, or raise ValueError if the rows cannot be filled """
+    if not column.nullable and column.server_default is None:
+        raise ValueError(f"Cannot add the column {table.name}.{column.name} to an existing table: "
+                         "it is NOT NULL without a server default")
+    preparer = engine.dialect.identifier_preparer
+    definition = CreateColumn(column).compile(dialect=engine.dialect)
+    return f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {definition}"
+
+
+def upgrade_schema(engine, tables):
+    """
+    Add to the existing tables of engine the columns and indexes of tables
+    (Table objects of the models) they miss. Tables absent from the database
+    are skipped (create_all creates them). Returns {table name: [columns added]}.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = {}
+    with engine.begin() as connection:
+        for table in tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    connection.execute(text(_add_column_statement(engine, table, column)))
+                    added.setdefault(table.name, []).append(column.name)
+            # Sans effet sur une base déjà indexée
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                connection.execute(CreateIndex(index, if_not_exists=True))
+    return added
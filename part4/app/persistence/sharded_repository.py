@@ -0,0 +1,164 @@
+"""
+Repositories of the sharded tables (places and reviews) for the
+'sqlite-sharded' backend (see sharding.py).
+
+Each method goes to the shards it needs and only to them:
+- get, update, delete: the shard of the id;
+- get_many, places_reviewed_by, existing_title_owner_pairs, adjust_ratings:
+  one query per shard holding some of the keys;
+- get_by_place, exists_for: the shard of the place;
+- get_all, get_page: every shard, queried in parallel, the results merged
+  in id order (scatter-gather);
+- search: every shard, queried in parallel, the pages merged in the sort
+  order of the search; the sort value of the cursor is read first on the
+  shard of the cursor;
+- repair_rating_aggregates: every shard, a place and its reviews being on
+  the same shard;
+- get_version, get_page_version: not supported (None, no ETag), the
+  relationship paths of a response crossing the shards.
+
+Classes:
+- ShardedRepositoryMixin: routed get / get_many / get_all / get_page.
+- ShardedPlaceRepository: PlaceRepository on the shards.
+- ShardedReviewRepository: ReviewRepository on the shards.
+"""
+
+import heapq
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from app import db
+from app.persistence.place_repository import PlaceRepository
+from app.persistence.review_repository import ReviewRepository
+from app.persistence.sharding import on_shard, scatter_load, shard_engines, shard_index
+
+
+class ShardedRepositoryMixin:
+    """ Routing of the generic repository methods for a sharded model """
+
+    def shard_count(self):
+        return len(shard_engines(db.session()))
+
+    def shard_of_key(self, key):
+        """ Return the shard of a row id or of a shard key (owner_id, place_id) """
+        return shard_index(key, self.shard_count())
+
+    def group_by_shard(self, keys, key=lambda item: item):
+        """ Return {shard: [items]} for the given items """
+        groups = defaultdict(list)
+        for item in keys:
+            groups[self.shard_of_key(key(item))].append(item)
+        return groups
+
+    def get(self, obj_id, options=()):
+        if not isinstance(obj_id, str):
+            return None
+        with on_shard(self.shard_of_key(obj_id)):
+            return super().get(obj_id, options)
+
+    def get_version(self, obj_id, paths=()):
+        """ The relationship paths cross the shards: no version, the responses get no ETag """
+        return None
+
+    def get_page_version(self, limit, cursor=None, paths=()):
+        return None
+
+    def get_many(self, obj_ids):
+        """ Return {id: object}, with one IN query per shard holding some of the ids """
+        ids = {obj_id for obj_id in obj_ids if isinstance(obj_id, str)}
+        found = {}
+        for index, shard_ids in self.group_by_shard(ids).items():
+            with on_shard(index):
+                found.update(super().get_many(shard_ids))
+        return found
+
+    def get_all(self, options=()):
+        """ Return every object, the shards being read in parallel """
+        parts = scatter_load(select(self.model).options(*options).order_by(self.model.id))
+        return list(heapq.merge(*parts, key=lambda obj: obj.id))
+
+    def get_page(self, limit, cursor=None, options=()):
+        """
+        Return one page in id order, like SQLAlchemyRepository.get_page:
+        every shard returns its first limit + 1 ids after the cursor (in
+        parallel), with the relationships of the loader options, and the
+        pages are merged.
+        """
+        query = select(self.model).options(*options).order_by(self.model.id)
+        if cursor is not None:
+            query = query.where(self.model.id > cursor)
+        parts = scatter_load(query.limit(limit + 1))
+        items = list(heapq.merge(*parts, key=lambda obj: obj.id))[:limit + 1]
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
+
+
+class ShardedPlaceRepository(ShardedRepositoryMixin, PlaceRepository):
+    """ PlaceRepository on the shards: a place lives on the shard of its owner_id """
+
+    def existing_title_owner_pairs(self, keys):
+        """ Return the (title, owner_id) pairs among keys that are already stored """
+        keys = [key for key in keys if all(isinstance(value, str) for value in key)]
+        found = set()
+        for index, shard_keys in self.group_by_shard(keys, key=lambda pair: pair[1]).items():
+            with on_shard(index):
+                found.update(super().existing_title_owner_pairs(shard_keys))
+        return found
+
+    def search(self, criteria, limit, cursor=None, options=()):
+        """
+        Return one page of the places matching criteria, like
+        PlaceRepository.search: every shard returns its first limit + 1
+        matches after the cursor (in parallel) and the pages are merged in
+        the sort order.
+        """
+        query = select(self.model).options(*options).where(*criteria.conditions()).order_by(*criteria.order_by())
+        if cursor is not None:
+            # La valeur de tri du curseur est sur le shard du curseur : lue avant la diffusion
+            anchor = self.get(cursor)
+            if anchor is None:
+                return [], None
+            query = query.where(criteria.after(criteria.sort_key(anchor)[0], cursor))
+        parts = scatter_load(query.limit(limit + 1))
+        items = list(heapq.merge(*parts, key=criteria.sort_key, reverse=criteria.descending))[:limit + 1]
+        if len(items) > limit:
+            return items[:limit], items[limit - 1].id
+        return items, None
+
+    def adjust_ratings(self, added=(), removed=()):
+        """ Apply the rating changes on the shard of each place """
+        added = self.group_by_shard(added, key=lambda pair: pair[0])
+        removed = self.group_by_shard(removed, key=lambda pair: pair[0])
+        for index in set(added) | set(removed):
+            with on_shard(index):
+                super().adjust_ratings(added.get(index, ()), removed.get(index, ()))
+
+    def repair_rating_aggregates(self):
+        """ Recompute the aggregates on every shard and return the number of places fixed """
+        fixed = 0
+        for index in range(self.shard_count()):
+            with on_shard(index):
+                fixed += super().repair_rating_aggregates()
+        return fixed
+
+
+class ShardedReviewRepository(ShardedRepositoryMixin, ReviewRepository):
+    """ ReviewRepository on the shards: a review lives on the shard of its place """
+
+    def get_by_place(self, place_id, limit, cursor=None, options=()):
+        with on_shard(self.shard_of_key(place_id)):
+            return super().get_by_place(place_id, limit, cursor, options)
+
+    def exists_for(self, user_id, place_id):
+        with on_shard(self.shard_of_key(place_id)):
+            return super().exists_for(user_id, place_id)
+
+    def places_reviewed_by(self, user_id, place_ids):
+        """ Return the set of ids among place_ids that user_id already reviewed """
+        found = set()
+        for index, shard_place_ids in self.group_by_shard(place_ids).items():
+            with on_shard(index):
+                found.update(super().places_reviewed_by(user_id, shard_place_ids))
+        return found
@@ -0,0 +1,250 @@
+"""
+Horizontal sharding of places and reviews across several SQLite databases.
+
+One SQLite file accepts one writer at a time. With the 'sqlite-sharded'
+backend the places and reviews tables are split across SHARD_COUNT
+databases (Flask-SQLAlchemy binds 'shard_0', 'shard_1', ...). Users,
+amenities and the place_amenity association stay in the global database of
+SQLALCHEMY_DATABASE_URI.
+
+Placement:
+- a place is stored on the shard of its owner_id, a review on the shard of
+  its place_id (so a place and its reviews share one shard, and the UNIQUE
+  constraints (title, owner_id) and (user_id, place_id) still hold);
+- the id of every new place or review is drawn so that it hashes to that
+  same shard (assign_shard_ids, before each flush): any row can then be
+  found from its id alone, and place.reviews or user.places read a single
+  shard.
+
+Routing is done by RoutingSession (see replica.py) and route_orm_execute:
+- rows written by a flush go to the shard of their id;
+- statements run inside on_shard(index), or with
+  bind_arguments={'shard_id': index}, go to that shard;
+- lazy loads follow the object they start from (place.reviews,
+  review.place, user.places);
+- any other ORM statement on a sharded table is run on every shard and the
+  results are concatenated (scatter-gather);
+- the flush of the place_amenity rows, and Core statements without a
+  shard, go to the global database.
+
+The global database is attached to every shard connection (ATTACH
+DATABASE ... AS global_db): the tables missing from a shard are looked up
+there, so a statement on a shard can still join users, amenities or
+place_amenity (amenity.places, joinedload(Place.owner), ...). Sharding
+therefore needs SQLite files; an in-memory database cannot be attached.
+A unit of work writing to several shards commits each database in turn,
+not atomically.
+
+Functions:
+- shard_bind(index): name of the bind of a shard.
+- shard_uris(uri, count): database URIs of the shards of a global database.
+- shard_index(key, count): shard of a shard key.
+- shard_engines(session): engines of the shards of a session (empty list without sharding).
+- attach_global_database(engine, path): attach the global database to every connection of a shard engine.
+- on_shard(index): context manager sending the statements on sharded tables to one shard.
+- scatter_load(statement): run a SELECT on every shard in parallel and merge the objects in the session.
+- assign_shard_ids(session): give the new places and reviews an id on their shard.
+- route_orm_execute(orm_context): do_orm_execute listener routing the ORM statements.
+"""
+
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+
+SHARD_BIND_PREFIX = 'shard_'
+# Tables réparties -> attribut dont le hachage donne le shard d'une nouvelle ligne
+SHARD_KEYS = {'places': 'owner_id', 'reviews': 'place_id'}
+# Chargements paresseux routés vers le shard de l'objet de départ : (table de départ, table lue)
+SAME_SHARD_LOADS = {('places', 'reviews'), ('reviews', 'places'), ('users', 'places')}
+
+_SHARD_KEY = 'shard_id'
+_ENGINES_KEY = 'shard_engines'
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shard_bind(index):
+    """ Return the Flask-SQLAlchemy bind key of a shard """
+    return f'{SHARD_BIND_PREFIX}{index}'
+
+
+def shard_uris(uri, count):
+    """
+    Return the URIs of 'count' shards next to the global database file:
+    hbnb.db gives hbnb-shard0.db, hbnb-shard1.db, ...
+    """
+    url = make_url(uri)
+    stem, dot, suffix = url.database.rpartition('.')
+    if not dot:
+        stem, suffix = suffix, ''
+    return [url.set(database=f"{stem}-shard{index}{dot}{suffix}").render_as_string(hide_password=False)
+            for index in range(count)]
+
+
+def shard_index(key, count):
+    """ Return the shard of a key (stable across processes, unlike hash()) """
+    return zlib.crc32(str(key).encode('utf-8')) % count
+
+
+def shard_engines(session):
+    """ Return the engines of the shards, in order, or an empty list without sharding """
+    engines = session.info.get(_ENGINES_KEY)
+    if engines is None:
+        # Calculé une fois par session (une session par contexte d'application)
+        binds = session._db.engines
+        count = sum(1 for key in binds if isinstance(key, str) and key.startswith(SHARD_BIND_PREFIX))
+        engines = session.info[_ENGINES_KEY] = [binds[shard_bind(index)] for index in range(count)]
+    return engines
+
+
+def attach_global_database(engine, path):
+    """ Attach the global database file to every new connection of a shard engine """
+    @event.listens_for(engine, 'connect')
+    def attach(dbapi_connection, connection_record):
+        dbapi_connection.execute('ATTACH DATABASE ? AS global_db', (path,))
+
+
+def targets_shards(mapper=None, clause=None):
+    """ Return True if a mapper or a statement reads or writes a sharded table """
+    if mapper is not None and getattr(mapper, 'local_table', None) is not None:
+        if mapper.local_table.name in SHARD_KEYS:
+            return True
+    if clause is not None:
+        return any(getattr(table, 'name', None) in SHARD_KEYS for table in find_tables(clause, include_crud=True))
+    return False
+
+
+def current_shard(session):
+    """ Return the shard selected by on_shard() in this session, or None """
+    return session.info.get(_SHARD_KEY)
+
+
+def shard_of(obj, count):
+    """ Return the shard of a stored row, from its id """
+    return shard_index(obj.id, count)
+
+
+@contextmanager
+def on_shard(index):
+    """ Send the statements on sharded tables of the current session to one shard """
+    from app import db
+    session = db.session()
+    previous = session.info.get(_SHARD_KEY)
+    session.info[_SHARD_KEY] = index
+    try:
+        yield session
+    finally:
+        session.info[_SHARD_KEY] = previous
+
+
+def _new_id_on_shard(index, count):
+    """ Draw ids (in the format of ID_FORMAT) until one hashes to the shard (count draws on average) """
+    from app.models.identifiers import new_id
+    while True:
+        obj_id = new_id()
+        if shard_index(obj_id, count) == index:
+            return obj_id
+
+
+def assign_shard_ids(session):
+    """
+    Before a flush: give each new place or review an id hashing to the shard
+    of its shard key (owner_id, place_id), unless it already has one.
+    """
+    count = len(shard_engines(session))
+    if not count:
+        return
+    for obj in session.new:
+        table = getattr(obj, '__tablename__', None)
+        if table in SHARD_KEYS:
+            index = shard_index(getattr(obj, SHARD_KEYS[table]), count)
+            if shard_index(obj.id, count) != index:
+                obj.id = _new_id_on_shard(index, count)
+
+
+def _parent_shard(orm_context, count):
+    """ Shard of the object a lazy load or a refresh starts from, if it decides the shard """
+    if orm_context.is_select:
+        state = orm_context.lazy_loaded_from
+        if state is not None and state.key is not None:
+            target = orm_context.bind_mapper
+            pair = (state.mapper.local_table.name, target.local_table.name if target is not None else None)
+            if pair in SAME_SHARD_LOADS:
+                return shard_index(state.key[1][0], count)
+            return None
+        # Rechargement d'attributs expirés d'un objet déjà stocké
+        state = orm_context.load_options._refresh_state
+        if state is not None and state.key is not None and state.mapper.local_table.name in SHARD_KEYS:
+            return shard_index(state.key[1][0], count)
+    return None
+
+
+def route_orm_execute(orm_context):
+    """
+    do_orm_execute listener: choose the shard of an ORM statement on a
+    sharded table, or run it on every shard and merge the results.
+    Returns None (default execution) for every other statement.
+    """
+    session = orm_context.session
+    engines = shard_engines(session)
+    if not engines or 'shard_id' in orm_context.bind_arguments:
+        return None
+    if not targets_shards(orm_context.bind_mapper, orm_context.statement):
+        return None
+
+    index = current_shard(session)
+    if index is None:
+        index = _parent_shard(orm_context, len(engines))
+    if index is not None:
+        return orm_context.invoke_statement(
+            bind_arguments={**orm_context.bind_arguments, 'shard_id': index})
+
+    # Requête sans clé de shard : exécutée sur chaque shard, résultats mis bout à bout
+    results = [orm_context.invoke_statement(bind_arguments={**orm_context.bind_arguments, 'shard_id': index})
+               for index in range(len(engines))]
+    return results[0].merge(*results[1:])
+
+
+def _pool():
+    """ Return the thread pool running the scatter-gather queries """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='shard-scatter')
+    return _executor
+
+
+def scatter_load(statement):
+    """
+    Run a SELECT of ORM objects on every shard and return one list of
+    objects per shard, merged into the current session.
+
+    The shards are queried in parallel, each by a thread with its own
+    connection, unless the session has uncommitted writes (the threads
+    would not see them): the statement is then run shard after shard in the
+    session itself.
+    """
+    from app import db
+    from app.persistence.unit_of_work import in_unit_of_work
+    session = db.session()
+    engines = shard_engines(session)
+
+    if in_unit_of_work(session) or session.new or session.dirty or session.deleted:
+        parts = []
+        for index in range(len(engines)):
+            parts.append(list(session.scalars(statement, bind_arguments={'shard_id': index})))
+        return parts
+
+    def load(engine):
+        with Session(engine, expire_on_commit=False) as shard_session:
+            return list(shard_session.scalars(statement))
+
+    parts = list(_pool().map(load, engines))
+    # Les objets chargés par les threads rejoignent la session de la requête, sans requête
+    return [[session.merge(obj, load=False) for obj in part] for part in parts]
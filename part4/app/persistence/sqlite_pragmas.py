@@ -0,0 +1,78 @@
+"""
+Connection-time PRAGMA settings for SQLite.
+
+SQLite settings such as synchronous, cache_size or busy_timeout only last
+for the connection that set them, so they are applied by a 'connect' event
+listener to every connection the engine opens. journal_mode=WAL is stored in
+the database file, but setting it again on each connection is harmless.
+
+The PRAGMA statements answer with numbers for some settings (synchronous,
+temp_store) and in lower case for journal_mode; verify_pragmas compares the
+configured values with what the connection reports after normalizing both.
+
+Functions:
+- apply_pragmas(engine, pragmas): run the PRAGMA statements on every new connection.
+- read_pragmas(connection, names): return the current value of each PRAGMA.
+- verify_pragmas(engine, pragmas): compare the configured and the actual values.
+"""
+
+from sqlalchemy import event
+
+# Valeurs symboliques renvoyées sous forme numérique par SQLite
+_SYMBOLS = {
+    'synchronous': {'OFF': 0, 'NORMAL': 1, 'FULL': 2, 'EXTRA': 3},
+    'temp_store': {'DEFAULT': 0, 'FILE': 1, 'MEMORY': 2},
+}
+
+
+def apply_pragmas(engine, pragmas):
+    """
+    Register a listener running 'PRAGMA name = value' for each item of
+    pragmas on every connection opened by engine, in the given order.
+    """
+    statements = [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return set_pragmas
+
+
+def read_pragmas(connection, names):
+    """ Return {name: value} as reported by 'PRAGMA name' on a connection """
+    return {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
+
+
+def _normalize(name, value):
+    if isinstance(value, str):
+        value = value.strip()
+        if value.upper() in _SYMBOLS.get(name, {}):
+            return _SYMBOLS[name][value.upper()]
+        try:
+            return int(value)
+        except ValueError:
+            return value.lower()
+    return value
+
+
+def verify_pragmas(engine, pragmas):
+    """
+    Open a connection from engine and return {name: {'expected', 'actual',
+    'ok'}} for every configured PRAGMA.
+    """
+    with engine.connect() as connection:
+        actual = read_pragmas(connection, pragmas)
+    return {
+        name: {
+            'expected': expected,
+            'actual': actual[name],
+            'ok': _normalize(name, expected) == _normalize(name, actual[name])
+        }
+        for name, expected in pragmas.items()
+    }
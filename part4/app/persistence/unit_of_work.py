@@ -0,0 +1,84 @@
+"""
+Unit of work for the SQLAlchemy session.
+
+A unit of work groups every write of one logical operation in a single
+transaction: the repositories and the facade only add, modify or delete
+objects in the session, and the outermost unit of work commits once at the
+end (or rolls back everything if an exception escapes).
+
+Units of work can be nested: an inner one joins the transaction of the outer
+one and does not commit. This lets a facade method open its own unit of work
+while an API resource groups several facade calls in a larger one:
+
+    with facade.transaction():
+        facade.create_amenity({'name': 'WiFi'})
+        facade.create_amenity({'name': 'Parking'})   # one COMMIT for both
+
+Functions:
+- unit_of_work(expire_on_commit=True): context manager opening (or joining) a transaction.
+- after_commit(callback): run callback once the current unit of work has committed.
+- in_unit_of_work(session): tell whether a unit of work is open in a session.
+"""
+
+from contextlib import contextmanager
+
+from app import db
+
+_DEPTH_KEY = 'unit_of_work_depth'
+_CALLBACKS_KEY = 'unit_of_work_after_commit'
+
+
+@contextmanager
+def unit_of_work(expire_on_commit=True):
+    """
+    Open a unit of work, or join the one already open in this session.
+
+    Only the outermost unit of work commits. With expire_on_commit=False the
+    objects of the session keep their values after that commit instead of
+    being reloaded on next access (useful right after inserting many rows).
+    """
+    session = db.session()
+    depth = session.info.get(_DEPTH_KEY, 0)
+    session.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            _commit(session, expire_on_commit)
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+            session.info.pop(_CALLBACKS_KEY, None)
+        raise
+    finally:
+        session.info[_DEPTH_KEY] = depth
+
+    if depth == 0:
+        for callback in session.info.pop(_CALLBACKS_KEY, []):
+            callback()
+
+
+def after_commit(callback):
+    """
+    Run callback after the commit of the current unit of work, or right away
+    if no unit of work is open.
+    """
+    session = db.session()
+    if session.info.get(_DEPTH_KEY, 0) == 0:
+        callback()
+    else:
+        session.info.setdefault(_CALLBACKS_KEY, []).append(callback)
+
+
+def in_unit_of_work(session):
+    """ Return True if a unit of work is open in session """
+    return session.info.get(_DEPTH_KEY, 0) > 0
+
+
+def _commit(session, expire_on_commit):
+    """ Commit the session, optionally without expiring its objects """
+    previous = session.expire_on_commit
+    session.expire_on_commit = expire_on_commit
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = previous
@@ -1,6 +1,6 @@
 from app.models.user import User
 from app import db
-from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.repository import InMemoryRepository, SQLAlchemyRepository
 
 class UserRepository(SQLAlchemyRepository):
     """
@@ -13,10 +13,26 @@ class UserRepository(SQLAlchemyRepository):
     Methods:
         get_user_by_email(email): Returns the first user found with the given email.
     """
-    def __init__(self):
-        """ Initializes the UserRepository with the User model."""
-        super().__init__(User)
+    def __init__(self, cache=None):
+        """ Initializes the UserRepository with the User model and an optional cache."""
+        super().__init__(User, cache)
 
     def get_user_by_email(self, email):
         """ Retrieve a user instance by their email address."""
         return self.model.query.filter_by(email=email).first()
+
+
+class InMemoryUserRepository(InMemoryRepository):
+    """
+    Repository class keeping User entities in memory.
+
+    Same methods as UserRepository; the email lookup uses the unique index
+    mirrored from the 'email' column.
+    """
+    def __init__(self, registry=None):
+        """ Initializes the InMemoryUserRepository with the User model."""
+        super().__init__(User, registry)
+
+    def get_user_by_email(self, email):
+        """ Retrieve a user instance by their email address."""
+        return self.get_by_attribute('email', email)
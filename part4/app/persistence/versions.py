@@ -0,0 +1,69 @@
+"""
+Versions of the rows behind a response, for the ETags of the GET endpoints.
+
+Every write refreshes updated_at on the rows it changes (BaseModel, and the
+rating aggregates of a place updated with its reviews). The version of a
+response is read with one SELECT made of scalar subqueries:
+- for one object, its updated_at (NULL when it does not exist);
+- for a page (the limit + 1 rows after the cursor, the last one telling
+  whether a next page exists), the number of rows, the last id and the
+  latest updated_at: a row added to or removed from the page changes one
+  of them;
+- for each relationship path of the response ('amenities',
+  'owner.places.reviews', ...), the number of related rows and their latest
+  updated_at: a row added or removed changes the count, a row modified its
+  updated_at.
+The subqueries follow the primary and foreign key indexes from the object,
+so reading a version costs one indexed query and no relationship is loaded.
+
+Functions:
+- version_statement(model, obj_id, paths): SELECT of the version of one object.
+- page_version_statement(model, limit, cursor, paths): SELECT of the version of a page.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+
+def _path_versions(model, roots, path):
+    """
+    Return the scalar subqueries (number of rows, latest updated_at) of the
+    rows reached along 'path' from the 'model' rows selected by roots(alias).
+    """
+    root = aliased(model)
+    entity = root
+    joins = []
+    for name in path:
+        attribute = getattr(entity, name)
+        # Un alias par étape : le même modèle peut revenir sur le chemin (places -> owner -> places)
+        entity = aliased(attribute.property.mapper.class_)
+        joins.append(attribute.of_type(entity))
+
+    def subquery(column):
+        query = select(column).select_from(root)
+        for join in joins:
+            query = query.join(join)
+        return query.where(roots(root)).correlate(None).scalar_subquery()
+
+    return subquery(func.count(entity.id)), subquery(func.max(entity.updated_at))
+
+
+def version_statement(model, obj_id, paths=()):
+    """ Return the SELECT of the version of the 'model' object obj_id and of the rows along paths """
+    columns = [select(model.updated_at).where(model.id == obj_id).scalar_subquery()]
+    for path in paths:
+        columns.extend(_path_versions(model, lambda root: root.id == obj_id, path))
+    return select(*columns)
+
+
+def page_version_statement(model, limit, cursor=None, paths=()):
+    """ Return the SELECT of the version of the page of get_page(limit, cursor) and of the rows along paths """
+    page = select(model.id, model.updated_at).order_by(model.id)
+    if cursor is not None:
+        page = page.where(model.id > cursor)
+    page = page.limit(limit + 1).subquery()
+    columns = [select(column).select_from(page).correlate(None).scalar_subquery()
+               for column in (func.count(), func.max(page.c.id), func.max(page.c.updated_at))]
+    for path in paths:
+        columns.extend(_path_versions(model, lambda root: root.id.in_(select(page.c.id)), path))
+    return select(*columns)
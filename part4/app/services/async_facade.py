@@ -0,0 +1,99 @@
+"""
+Asynchronous counterpart of the read operations of HBnBFacade.
+
+AsyncHBnBFacade serves the read-only operations of the API from coroutines,
+on the async repositories of app/persistence/async_repository.py, so that an
+ASGI server can keep many requests waiting on the database without one
+thread per request (see app/asgi.py).
+
+The objects returned are detached from any session: every relationship
+their to_dict() (or the caller) needs is loaded eagerly by the loader
+options of app/services/loading.py, and nothing else can be reached from
+them.
+
+Writes (user registration with bcrypt, place and review creation with their
+validations) stay on the synchronous HBnBFacade.
+"""
+
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.persistence.async_repository import AsyncReviewRepository, AsyncSQLAlchemyRepository
+from app.services.loading import PLACE_DETAIL_OPTIONS, PLACE_OPTIONS, REVIEW_AUTHOR_OPTIONS, USER_OPTIONS
+
+
+class AsyncHBnBFacade:
+    """ Front end for the read operations of the HBnB application, as coroutines """
+
+    def __init__(self, session_factory):
+        """ Initialises the async repositories on an async_sessionmaker """
+        self.session_factory = session_factory
+        self.user_repo = AsyncSQLAlchemyRepository(User, session_factory)
+        self.place_repo = AsyncSQLAlchemyRepository(Place, session_factory)
+        self.review_repo = AsyncReviewRepository(session_factory)
+        self.amenity_repo = AsyncSQLAlchemyRepository(Amenity, session_factory)
+
+    async def close(self):
+        """ Close every connection of the async engine """
+        await self.session_factory.kw['bind'].dispose()
+
+    async def get_user(self, user_id):
+        """ Retrieves a user by their unique ID """
+        return await self.user_repo.get(user_id, USER_OPTIONS)
+
+    async def get_all(self, limit, cursor=None):
+        """ Returns one page of users in the form of dictionaries, and the cursor of the next page."""
+        users, next_cursor = await self.user_repo.get_page(limit, cursor, USER_OPTIONS)
+        return [user.to_dict() for user in users], next_cursor
+
+    async def get_amenity(self, amenity_id):
+        """ return a specific amenities with ID """
+        return await self.amenity_repo.get(amenity_id)
+
+    async def get_all_amenities(self, limit, cursor=None):
+        """ return one page of amenities and the cursor of the next page """
+        amenities, next_cursor = await self.amenity_repo.get_page(limit, cursor)
+        return [amenity.to_dict() for amenity in amenities], next_cursor
+
+    async def get_place(self, place_id):
+        """ Return a place with its amenities and reviews """
+        return await self.place_repo.get(place_id, PLACE_OPTIONS)
+
+    async def place_exists(self, place_id):
+        """ Tell whether a place exists (one indexed lookup, nothing loaded) """
+        return await self.place_repo.exists(place_id)
+
+    async def get_place_detail(self, place_id, projection=None):
+        """
+        Return a place with its amenities, reviews and owner (with the owner's
+        own relations), or with the columns and relationships of projection.
+        """
+        return await self.place_repo.get(place_id, projection.loader_options() if projection else PLACE_DETAIL_OPTIONS)
+
+    async def get_place_version(self, place_id, projection):
+        """ Return the version of the place detail shaped by projection (one query), None if absent """
+        return await self.place_repo.get_version(place_id, projection.version_paths())
+
+    async def get_all_places(self, limit, cursor=None):
+        """ Return one page of places as dictionaries and the cursor of the next page """
+        places, next_cursor = await self.place_repo.get_page(limit, cursor, PLACE_OPTIONS)
+        return [place.to_dict() for place in places], next_cursor
+
+    async def get_review(self, review_id):
+        """ Return a specific review """
+        return await self.review_repo.get(review_id)
+
+    async def get_all_reviews(self, limit, cursor=None):
+        """ Return one page of reviews and the cursor of the next page """
+        reviews, next_cursor = await self.review_repo.get_page(limit, cursor)
+        return [review.to_dict() for review in reviews], next_cursor
+
+    async def get_reviews_by_place(self, place_id, limit, cursor=None, projection=None):
+        """ Return one page of the reviews of a place, oldest first, with their authors (or what projection reads) """
+        options = projection.loader_options() if projection else REVIEW_AUTHOR_OPTIONS
+        return await self.review_repo.get_by_place(place_id, limit, cursor, options)
+
+    async def has_reviewed_place(self, user_id, place_id):
+        """ Tell whether the user already posted a review for the place """
+        return await self.review_repo.exists_for(user_id, place_id)
@@ -12,9 +12,16 @@ Main features:
 - Manage User entities: creation, retrieval (by ID or email), update.
 - Manage Amenity entities: creation, retrieval, update.
 - Manage Place entities: creation (with owner and amenities association), retrieval,
-  update (including amenities update).
+  update (including amenities update). The amenities are fetched with one IN
+  query and an update only writes the place_amenity rows that changed.
 - Manage Review entities: creation (linked to user and place), retrieval, update,
   deletion.
+- Bulk creation of places and reviews: the whole batch is validated first,
+  referenced entities are resolved with set-based queries, and the rows are
+  inserted in a single transaction (all or nothing).
+- Rating aggregates of the places (count, sum and histogram of the ratings)
+  updated in the same transaction as every review written, and recomputed
+  set-wise by repair_rating_aggregates.
 - Validation of entity existence and integrity before operations.
 - Handles relationships between entities (e.g., associating amenities with places,
   linking reviews to users and places).
@@ -24,7 +31,36 @@ Exceptions:
 - Handles cases where referenced entities (e.g., users, places) do not exist.
 
 Note:
-- Uses in-memory repositories to store entity instances.
+- The repositories come from the persistence backend chosen in the
+  configuration (SQLite file, SQLite in memory, or plain in-memory
+  repositories, see app/persistence/backends.py).
+- Every write method runs in a unit of work and commits exactly once; callers
+  can group several facade calls in one transaction with facade.transaction().
+- Each repository has a bounded LRU + TTL cache in front of get and
+  get_by_attribute; the update_* methods invalidate it, and a rollback
+  clears it so that no uncommitted row is served from it.
+- The listing and detail reads load the relationships their callers go
+  through with the loader options of app/services/loading.py (selectinload
+  for collections, joinedload for owners and authors), so the number of SQL
+  statements they issue does not grow with the number of rows.
+- The GET endpoints pass a Projection (see app/services/projection.py) built
+  from ?fields= and ?include=: only its columns and relationships are
+  loaded, and the listings are serialized to its shape.
+- Every write announces the entities it changed with the entities_changed
+  signal, once its transaction has committed: the tags ('<table>', id) of
+  the rows written and of the rows whose relationships changed, and
+  ('<table>',) when rows were added to or removed from a table. The
+  response cache drops the responses built from them (see
+  app/api/response_cache.py).
+- search_places returns one page of the places matching a PlaceSearch
+  (filters and sort order of GET /places/search, see
+  app/services/place_search.py), selected by one indexed query.
+- get_place_version and get_places_version read in one query the version
+  (updated_at of the rows, counts of the related rows) of the responses of
+  GET /places/<place_id> and GET /places/, for their ETags.
+- The read-only methods decorated with @replica_read run on the read replica
+  when one is configured; writes, and every read made after a write in the
+  same request, go to the primary database.
 - The facade abstracts persistence details from higher-level API layers.
 """
 
@@ -32,39 +68,153 @@ from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
-from app.persistence.repository import SQLAlchemyRepository
-from app.persistence.user_repository import UserRepository
+from app.persistence.backends import create_repositories
+from app.persistence.cache import EntityCache
+from app.persistence.replica import replica_read
+from app.persistence.sqlite_pragmas import verify_pragmas
+from app.persistence.unit_of_work import after_commit, unit_of_work
+from app.services.loading import PLACE_DETAIL_OPTIONS, PLACE_OPTIONS, REVIEW_AUTHOR_OPTIONS, USER_OPTIONS
+from blinker import Namespace
+from flask import current_app
+from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError # pour interdire doublon place
 from app import db
 
+# Envoyé (sender = l'application) après chaque commit d'une écriture, avec tags=set de tags
+# ('<table>', id) ou ('<table>',), ou tags=None quand n'importe quelle ligne a pu changer
+entities_changed = Namespace().signal('entities-changed')
+
+# Taille maximale et durée de vie (en secondes) du cache de chaque repository
+ENTITY_CACHE_SIZE = 1024
+ENTITY_CACHE_TTL = 30
+
+
+def unknown_amenities_message(amenity_ids):
+    """ Error message listing amenity ids that do not exist """
+    return f"Unknown amenity ids: {', '.join(map(str, amenity_ids))}"
+
+
+def check_place_item(data):
+    """
+    Raise ValueError unless the values of a create_places item used as
+    lookup keys (owner_id, title, amenity ids) are strings or absent.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Each place must be an object")
+    for name in ('owner_id', 'title'):
+        if data.get(name) is not None and not isinstance(data[name], str):
+            raise ValueError(f"{name} must be a string")
+    amenity_ids = data.get('amenities')
+    if amenity_ids is not None and (not isinstance(amenity_ids, list)
+                                    or not all(isinstance(amenity_id, str) for amenity_id in amenity_ids)):
+        raise ValueError("amenities must be a list of amenity ids")
+
+
 class HBnBFacade:
 
     """ Front end for managing business operations related to the HBnB application."""
 
-    def __init__(self):
-        """ Initialises the HBnBFacade object with in-memory repositories for each entity. """
-        self.user_repo = UserRepository()  # Switched to SQLAlchemyRepository
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
-        self.amenity_repo = SQLAlchemyRepository(Amenity)
+    def __init__(self, backend='sqlite'):
+        """ Initialises the HBnBFacade object with the repositories of a persistence backend. """
+        self.use_backend(backend)
+
+        # Une transaction annulée a pu laisser en cache des lignes jamais validées
+        event.listen(db.session, 'after_soft_rollback', self._on_rollback)
+
+    def use_backend(self, backend):
+        """
+        Replace every repository with those of a persistence backend
+        ('sqlite', 'sqlite-memory' or 'memory'). Raises ValueError for an
+        unknown backend.
+        """
+        repositories = create_repositories(backend, self._new_cache)
+        self.backend = backend
+        self.user_repo = repositories['users']
+        self.place_repo = repositories['places']
+        self.review_repo = repositories['reviews']
+        self.amenity_repo = repositories['amenities']
+
+    @staticmethod
+    def _new_cache():
+        """ Build the entity cache used by one repository """
+        return EntityCache(max_size=ENTITY_CACHE_SIZE, ttl=ENTITY_CACHE_TTL)
+
+    def _repositories(self):
+        """ Return the repositories by entity name """
+        return {
+            'users': self.user_repo,
+            'places': self.place_repo,
+            'reviews': self.review_repo,
+            'amenities': self.amenity_repo
+        }
+
+    def _on_rollback(self, session, previous_transaction):
+        """ Empty every entity cache after a rollback """
+        self.clear_caches()
+
+    def clear_caches(self):
+        """ Empty the entity cache of every repository """
+        for repo in self._repositories().values():
+            if repo.cache is not None:
+                repo.cache.clear()
+
+    def transaction(self, expire_on_commit=True):
+        """
+        Open a unit of work: every facade call made inside the with block is
+        part of the same transaction, committed once at the end.
+        """
+        return unit_of_work(expire_on_commit)
+
+    def _changed(self, *tags, everything=False):
+        """ Send entities_changed with tags once the current unit of work has committed """
+        app = current_app._get_current_object()
+        tags = None if everything else set(tags)
+        after_commit(lambda: entities_changed.send(app, tags=tags))
+
+    def get_cache_stats(self):
+        """ Return the hit/miss/eviction counters of every entity cache """
+        return {
+            name: repo.cache.stats()
+            for name, repo in self._repositories().items()
+            if repo.cache is not None
+        }
+
+    def check_database_pragmas(self, pragmas):
+        """
+        Compare the configured SQLite PRAGMA settings with those of a new
+        connection. Returns {'backend', 'ok', 'pragmas': {name: {'expected',
+        'actual', 'ok'}}}.
+        """
+        results = verify_pragmas(db.engine, pragmas)
+        return {
+            'backend': self.backend,
+            'ok': all(result['ok'] for result in results.values()),
+            'pragmas': results
+        }
 
     def create_user(self, user_data):
         """ Creates a new user based on the data provided """
-        user = User(**user_data)
-        user.hash_password(user_data['password'])
-        self.user_repo.add(user)
-        db.session.commit()
+        with self.transaction():
+            user = User(**user_data)
+            user.hash_password(user_data['password'])
+            self.user_repo.add(user)
+            self._changed(('users',))
         return user
 
-    def get_user(self, user_id):
-        """ Retrieves a user by their unique ID """
-        return self.user_repo.get(user_id)
+    def get_user(self, user_id, projection=None):
+        """ Retrieves a user by their unique ID (with the columns and relationships of projection, if given) """
+        return self.user_repo.get(user_id, projection.loader_options() if projection else ())
         # on retourne un utilisateur par son ID
 
-    def get_all(self):
-        """ Returns a list of all users in the form of dictionaries."""
-        users = self.user_repo.get_all()
-        return [user.to_dict() for user in users]
+    @replica_read
+    def get_all(self, limit, cursor=None, projection=None):
+        """ Returns one page of users in the form of dictionaries (shaped by projection, if given), and the cursor of the next page."""
+        if projection is None:
+            # Avis et lieux de toute la page chargés par relation, pas par utilisateur
+            users, next_cursor = self.user_repo.get_page(limit, cursor, USER_OPTIONS)
+            return [user.to_dict() for user in users], next_cursor
+        users, next_cursor = self.user_repo.get_page(limit, cursor, projection.loader_options())
+        return [projection.serialize(user) for user in users], next_cursor
         # on retourne une liste
 
     def get_user_by_email(self, email):
@@ -74,14 +224,15 @@ class HBnBFacade:
 
     def update_user(self, user_id, data):
         """ Updates the data of an existing user """
-        # Appelle la méthode 'update' du repository pour modifier l'utilisateur existant
-        # Cette méthode modifie directement l'objet en mémoire, mais ne retourne rien
-        self.user_repo.update(user_id, data)
-
-        # Une fois les données mises à jour, on récupère l'objet utilisateur actualisé
-        # Cela permet de s'assurer qu'on renvoie bien les nouvelles données à l'API
-        user = self.user_repo.get(user_id)
-        db.session.commit()
+        with self.transaction():
+            # Appelle la méthode 'update' du repository pour modifier l'utilisateur existant
+            # Cette méthode modifie directement l'objet en mémoire, mais ne retourne rien
+            self.user_repo.update(user_id, data)
+            self._changed(('users', user_id))
+
+            # Une fois les données mises à jour, on récupère l'objet utilisateur actualisé
+            # Cela permet de s'assurer qu'on renvoie bien les nouvelles données à l'API
+            user = self.user_repo.get(user_id)
         # Retourne l'utilisateur mis à jour à l'appelant (typiquement, l'API)
         return user
 
@@ -95,35 +246,42 @@ class HBnBFacade:
 
     def create_amenity(self, amenity_data):
         """ Creates a new amenity based on the data provided """
-        amenity = Amenity(**amenity_data)
-        self.amenity_repo.add(amenity)
-        db.session.commit()
+        with self.transaction():
+            amenity = Amenity(**amenity_data)
+            self.amenity_repo.add(amenity)
+            self._changed(('amenities',))
         return amenity
 
-    def get_amenity(self, amenity_id):
-        """ return a specific amenities with ID """
-        return self.amenity_repo.get(amenity_id)
+    @replica_read
+    def get_amenity(self, amenity_id, projection=None):
+        """ return a specific amenities with ID (with the columns and relationships of projection, if given) """
+        return self.amenity_repo.get(amenity_id, projection.loader_options() if projection else ())
 
-    def get_all_amenities(self):
-        """ return all of amenities """
-        amenities = self.amenity_repo.get_all()
-        return [amenity.to_dict() for amenity in amenities]
+    @replica_read
+    def get_all_amenities(self, limit, cursor=None, projection=None):
+        """ return one page of amenities (shaped by projection, if given) and the cursor of the next page """
+        amenities, next_cursor = self.amenity_repo.get_page(
+            limit, cursor, projection.loader_options() if projection else ())
+        serialize = projection.serialize if projection else Amenity.to_dict
+        return [serialize(amenity) for amenity in amenities], next_cursor
 
     def update_amenity(self, amenity_id, amenity_data):
         """ update a amenity """
-        # Récupère l'amenity en mémoire à partir de son ID
-        amenity = self.amenity_repo.get(amenity_id)
-        if not amenity:
-            # Pas trouvé donc on retourne None = ID inconnu
-            return None
-        try:
-            # essaie de mettre à jour, doit valider les données et lever ValueError
-            amenity.update(amenity_data)
-        except ValueError as error:
-            # Relance l'exception pour que l'API la gère
-            raise error
+        with self.transaction():
+            # Récupère l'amenity en mémoire à partir de son ID
+            amenity = self.amenity_repo.get(amenity_id)
+            if not amenity:
+                # Pas trouvé donc on retourne None = ID inconnu
+                return None
+            try:
+                # essaie de mettre à jour, doit valider les données et lever ValueError
+                amenity.update(amenity_data)
+            except ValueError as error:
+                # Relance l'exception pour que l'API la gère (la transaction est annulée)
+                raise error
+            self.amenity_repo.invalidate(amenity_id)
+            self._changed(('amenities', amenity_id))
         # si ok, retourne amenity modifié
-        db.session.commit()
         return amenity
 
 #---------------------------------------------------------------------------#
@@ -144,39 +302,37 @@ class HBnBFacade:
             raise ValueError("Aucun utilisateur trouvé avec cet ID")
 
         # Vérification avant création pour éviter doublon
-        existing_place = Place.query.filter_by(title=place_data['title'], owner_id=owner_id).first()
-        if existing_place:
+        if self.place_repo.existing_title_owner_pairs([(place_data['title'], owner_id)]):
             raise ValueError("This Place already exist for this owner.")
 
         # Extraire la liste des identifiants des commodités (amenities) depuis les données
         # On les retire du dictionnaire pour éviter de les passer au constructeur de Place
-        amenity_ids = place_data.pop("amenities", [])
+        # Toutes les amenities sont lues en une requête IN, un id inconnu refuse la création
+        amenities = self.resolve_amenities(place_data.pop("amenities", None) or [])
 
         # Créer une nouvelle instance de Place avec les données restantes
         place = Place(**place_data)
 
         # Associer les objets Amenity à l'objet Place
-        for amenity_id in amenity_ids:
-            # Récupère l'objet Amenity correspondant à l'identifiant
-            amenity = self.get_amenity(amenity_id)
-            if amenity:
-                # Ajoute l'amenity à la liste des commodités de la place
-                place.add_amenity(amenity)
-
-        # Enregistre la nouvelle place dans le dépôt (base de données ou autre persistance)
-        self.place_repo.add(place)
+        for amenity in amenities:
+            place.add_amenity(amenity)
+
 ##---------------------------------------------------------------------------##
 ##---------------------------------------------------------------------------##
         try:
-            db.session.commit()
+            with self.transaction():
+                # Enregistre la nouvelle place dans le dépôt (base de données ou autre persistance)
+                self.place_repo.add(place)
+                # Nouveau lieu : liste des lieux, lieux du propriétaire et de chaque amenity
+                self._changed(('places',), ('users', owner_id),
+                              *(('amenities', amenity.id) for amenity in amenities))
         except IntegrityError:
-            db.session.rollback()
             raise ValueError("Place already exist with this title for this owner")
 
-# Tente de valider les modifications dans la base de données avec commit().
+# La transaction est validée une seule fois, à la sortie du bloc with.
 # Si une contrainte d'intégrité est violée (par exemple un doublon unique),
 # une exception IntegrityError est levée.
-# On effectue alors un rollback() pour annuler la transaction en cours,
+# Le unit of work effectue alors un rollback() pour annuler la transaction en cours,
 # ce qui permet de garder la session SQLAlchemy propre et prête à d'autres opérations.
 # Enfin, on lève une ValueError avec un message clair pour informer l'utilisateur
 # que la donnée existe déjà et éviter un message d'erreur technique brut.
@@ -184,50 +340,188 @@ class HBnBFacade:
 ##---------------------------------------------------------------------------##
 ##---------------------------------------------------------------------------##
 
-        db.session.commit()
         # Retourne l'objet place nouvellement créé
         return place
 
+    def create_places(self, places_data, owner_id=None):
+        """
+        Create several places in one transaction.
+
+        Every item is validated before anything is written. Owners and
+        amenities referenced by the batch, and the existing (title, owner)
+        pairs, are fetched with set-based queries instead of one query per item.
+        If owner_id is given, every place must belong to that user.
+
+        Returns a tuple (places, errors) where errors is a list of
+        {'index': position in the batch, 'error': message}. When errors is not
+        empty nothing has been inserted.
+        """
+        errors = []
+        items = []
+        for index, data in enumerate(places_data):
+            # Types vérifiés avant de servir de clés aux requêtes ensemblistes
+            try:
+                check_place_item(data)
+            except ValueError as error:
+                errors.append({'index': index, 'error': str(error)})
+            else:
+                items.append((index, data))
+
+        owners = self.user_repo.get_many(data.get('owner_id') for _, data in items)
+        amenities = self.amenity_repo.get_many(
+            amenity_id for _, data in items for amenity_id in (data.get('amenities') or []))
+        existing = self.place_repo.existing_title_owner_pairs(
+            (data.get('title'), data.get('owner_id')) for _, data in items)
+
+        places = []
+        seen = set()
+        for index, data in items:
+            try:
+                place_owner_id = data.get('owner_id')
+                if place_owner_id not in owners:
+                    raise ValueError("Aucun utilisateur trouvé avec cet ID")
+                if owner_id is not None and place_owner_id != owner_id:
+                    raise ValueError("Unauthorized action")
+                if data.get('description') is None:
+                    raise ValueError("Description is required")
+                # Le constructeur valide le type et le format de chaque champ
+                place = Place(
+                    title=data.get('title'),
+                    description=data.get('description'),
+                    price=data.get('price'),
+                    latitude=data.get('latitude'),
+                    longitude=data.get('longitude'),
+                    owner_id=place_owner_id
+                )
+                key = (place.title, place_owner_id)
+                if key in existing or key in seen:
+                    raise ValueError("This Place already exist for this owner.")
+                unknown = [a for a in (data.get('amenities') or []) if a not in amenities]
+                if unknown:
+                    raise ValueError(unknown_amenities_message(unknown))
+            except ValueError as error:
+                errors.append({'index': index, 'error': str(error)})
+                continue
+            seen.add(key)
+            places.append(place)
+
+        if errors:
+            return [], sorted(errors, key=lambda error: error['index'])
+
+        try:
+            # Les objets gardent leurs valeurs après le commit : pas de rechargement ligne par ligne
+            with self.transaction(expire_on_commit=False):
+                # Les amenities ne sont associées qu'une fois tout le lot validé
+                for place, data in zip(places, places_data):
+                    for amenity_id in dict.fromkeys(data.get('amenities') or []):
+                        place.add_amenity(amenities[amenity_id])
+                self.place_repo.add_many(places)
+                self._changed(('places',), *(('users', place.owner_id) for place in places),
+                              *(('amenities', amenity.id) for place in places for amenity in place.amenities))
+        except IntegrityError:
+            return [], [{'index': None, 'error': "Place already exist with this title for this owner"}]
+        return places, []
+
+    @replica_read
     def get_place(self, place_id):
         """ function that displays a specific location"""
         return self.place_repo.get(place_id)
 
-    def get_all_places(self):
-        """ function that displays multiple locations """
-        places = self.place_repo.get_all()
-        return [place.to_dict() for place in places]
+    @replica_read
+    def get_place_detail(self, place_id, projection=None):
+        """
+        Return a place with its amenities, reviews and owner (with the owner's
+        own relations), or with the columns and relationships of projection.
+        """
+        return self.place_repo.get(place_id, projection.loader_options() if projection else PLACE_DETAIL_OPTIONS)
+
+    @replica_read
+    def get_place_version(self, place_id, projection):
+        """ Return the version of the place detail shaped by projection (one query), None without one """
+        return self.place_repo.get_version(place_id, projection.version_paths())
+
+    @replica_read
+    def get_places_version(self, limit, cursor, projection):
+        """ Return the version of one page of places shaped by projection (one query), None without one """
+        return self.place_repo.get_page_version(limit, cursor, projection.version_paths())
+
+    @replica_read
+    def get_all_places(self, limit, cursor=None, projection=None):
+        """ function that displays one page of locations (shaped by projection, if given) and the cursor of the next page """
+        if projection is None:
+            # Amenities et avis de toute la page : une requête IN par relation
+            places, next_cursor = self.place_repo.get_page(limit, cursor, PLACE_OPTIONS)
+            return [place.to_dict() for place in places], next_cursor
+        places, next_cursor = self.place_repo.get_page(limit, cursor, projection.loader_options())
+        return [projection.serialize(place) for place in places], next_cursor
+
+    @replica_read
+    def search_places(self, criteria, limit, cursor=None, projection=None):
+        """ Return one page of the places matching criteria (a PlaceSearch), shaped by projection, and the cursor of the next page """
+        options = projection.loader_options() if projection is not None else PLACE_OPTIONS
+        places, next_cursor = self.place_repo.search(criteria, limit, cursor, options)
+        serialize = projection.serialize if projection is not None else Place.to_dict
+        return [serialize(place) for place in places], next_cursor
 
     def update_place(self, place_id, place_data):
         """ Update a place """
-        # Récupérer le lieu à mettre à jour à partir de son identifiant
-        place = self.get_place(place_id)
-        if not place:
-            # Si le lieu n'existe pas, lever une exception
-            raise ValueError("Place not found")
-
-        # Extraire la liste des identifiants d'amenities si elle est fournie
-        # On la retire du dictionnaire pour éviter de l'envoyer à update()
-        amenities_ids = place_data.pop("amenities", None)
-
-        # Mettre à jour les attributs de l'objet place avec les nouvelles données
-        place.update(place_data)
-
-        if amenities_ids is not None:
-            # Si une nouvelle liste d'amenities est fournie,
-            # on réinitialise la liste actuelle
-            place.amenities = []
-            for amenity_id in amenities_ids:
-                # Récupérer chaque objet Amenity correspondant à l'identifiant
-                amenity = self.get_amenity(amenity_id)
-                if amenity:
-                    # Ajouter l'amenity à la liste de la place
-                    place.add_amenity(amenity)
-
-        db.session.commit()
+        # Toutes les modifications sont annulées si une donnée est invalide
+        with self.transaction():
+            # Récupérer le lieu à mettre à jour à partir de son identifiant
+            place = self.get_place(place_id)
+            if not place:
+                # Si le lieu n'existe pas, lever une exception
+                raise ValueError("Place not found")
+
+            # Extraire la liste des identifiants d'amenities si elle est fournie
+            # On la retire du dictionnaire pour éviter de l'envoyer à update()
+            amenities_ids = place_data.pop("amenities", None)
+
+            # Propriétaire d'avant : le lieu quitte sa liste s'il change
+            changed = [('places', place_id), ('users', place.owner_id)]
+
+            # Mettre à jour les attributs de l'objet place avec les nouvelles données
+            place.update(place_data)
+            changed.append(('users', place.owner_id))
+
+            if amenities_ids is not None:
+                # Seules les différences sont écrites : une ligne place_amenity
+                # supprimée par amenity retirée, une insérée par amenity ajoutée
+                current = {amenity.id: amenity for amenity in place.amenities}
+                wanted = self.resolve_amenities(amenities_ids, known=current)
+                wanted_ids = {amenity.id for amenity in wanted}
+                for amenity_id, amenity in current.items():
+                    if amenity_id not in wanted_ids:
+                        place.amenities.remove(amenity)
+                        changed.append(('amenities', amenity_id))
+                for amenity in wanted:
+                    if amenity.id not in current:
+                        place.add_amenity(amenity)
+                        changed.append(('amenities', amenity.id))
+
+            self.place_repo.invalidate(place_id)
+            self._changed(*changed)
 
         # Retourner l'objet place mis à jour
         return place
 
+    def resolve_amenities(self, amenity_ids, known=None):
+        """
+        Return the amenities of amenity_ids, in order and without duplicates.
+        Those missing from known ({id: amenity}) are fetched with one IN
+        query. Raises ValueError listing the unknown ids.
+        """
+        if not isinstance(amenity_ids, list) or not all(isinstance(amenity_id, str) for amenity_id in amenity_ids):
+            raise ValueError("amenities must be a list of amenity ids")
+        amenity_ids = list(dict.fromkeys(amenity_ids))
+        found = dict(known or {})
+        found.update(self.amenity_repo.get_many(
+            amenity_id for amenity_id in amenity_ids if amenity_id not in found))
+        unknown = [amenity_id for amenity_id in amenity_ids if amenity_id not in found]
+        if unknown:
+            raise ValueError(unknown_amenities_message(unknown))
+        return [found[amenity_id] for amenity_id in amenity_ids]
+
     def get_place_by_id(self, place_id):
         """ Retrieves a user by their unique ID """
         return self.place_repo.get_by_attribute('id', place_id)
@@ -270,54 +564,138 @@ class HBnBFacade:
         # l'identifiant utilisateur (UUID) et l'identifiant lieu (UUID) récupérés depuis les objets user et place
         review = Review(text=text, rating=rating, user_id=user.id, place_id=place.id)
 
+        # Recherche indexée : un seul avis par utilisateur et par lieu
+        if self.review_repo.exists_for(user.id, place.id):
+            raise ValueError("You have already reviewed this place")
+
         # Ajouter la review dans le dépôt (base de données ou autre persistance)
-        self.review_repo.add(review)
-        db.session.commit()
+        try:
+            with self.transaction():
+                self.review_repo.add(review)
+                # Agrégats du lieu mis à jour dans la même transaction que l'avis
+                self.place_repo.adjust_ratings(added=[(place.id, review.rating)])
+                self._changed(('reviews',), ('places', place.id), ('users', user.id))
+        except IntegrityError:
+            # Avis concurrent enregistré entre la vérification et le commit
+            raise ValueError("You have already reviewed this place")
         # Retourner l’objet Review créé
         return review
 
-    def get_review(self, review_id):
-        """ list a specific review"""
-        # Espace réservé pour la logique de récupération d’un avis par son ID
-        return self.review_repo.get(review_id)
-
-    def get_all_reviews(self):
-        """ resume the lists of all reviews """
-        reviews = self.review_repo.get_all()
-        return [review.to_dict() for review in reviews]
-
-    def get_reviews_by_place(self, place_id):
-        """ obtain a review by the place who choosen"""
-        # Espace réservé pour la logique de récupération de tous les avis pour un lieu spécifique
-        all_reviews = self.review_repo.get_all()
-        filtered_reviews = []
-
-        for review in all_reviews:
-            if review.place and review.place.id == place_id:
-                filtered_reviews.append(review)
+    def create_reviews(self, user_id, reviews_data):
+        """
+        Create several reviews written by the same user in one transaction.
 
-        return filtered_reviews
+        The places of the batch and the places already reviewed by the user
+        are fetched with set-based queries. Returns a tuple (reviews, errors)
+        like create_places; nothing is inserted when errors is not empty.
+        """
+        user = self.get_user_by_id(user_id)
+        if not user:
+            return [], [{'index': None, 'error': f"Aucun utilisateur trouvé avec l'ID {user_id}"}]
+
+        places = self.place_repo.get_many(data.get('place_id') for data in reviews_data)
+        already_reviewed = self.review_repo.places_reviewed_by(user.id, places)
+
+        errors = []
+        reviews = []
+        for index, data in enumerate(reviews_data):
+            try:
+                place = places.get(data.get('place_id'))
+                if not place:
+                    raise ValueError(f"Aucun lieu trouvé avec l'ID {data.get('place_id')}")
+                if place.owner_id == user.id:
+                    raise ValueError("You cannot evaluate your own location.")
+                if place.id in already_reviewed:
+                    raise ValueError("You have already reviewed this place")
+                review = Review(text=data.get('text'), rating=data.get('rating'),
+                                user_id=user.id, place_id=place.id)
+            except ValueError as error:
+                errors.append({'index': index, 'error': str(error)})
+                continue
+            already_reviewed.add(place.id)
+            reviews.append(review)
+
+        if errors:
+            return [], errors
+
+        with self.transaction(expire_on_commit=False):
+            self.review_repo.add_many(reviews)
+            # Une seule mise à jour par lieu, même s'il reçoit plusieurs avis du lot
+            self.place_repo.adjust_ratings(added=[(review.place_id, review.rating) for review in reviews])
+            self._changed(('reviews',), ('users', user.id), *(('places', review.place_id) for review in reviews))
+        return reviews, []
+
+    @replica_read
+    def get_review(self, review_id, projection=None):
+        """ list a specific review (with the columns and relationships of projection, if given) """
+        # Espace réservé pour la logique de récupération d’un avis par son ID
+        return self.review_repo.get(review_id, projection.loader_options() if projection else ())
+
+    @replica_read
+    def get_all_reviews(self, limit, cursor=None, projection=None):
+        """ resume one page of reviews (shaped by projection, if given) and the cursor of the next page """
+        reviews, next_cursor = self.review_repo.get_page(
+            limit, cursor, projection.loader_options() if projection else ())
+        serialize = projection.serialize if projection else Review.to_dict
+        return [serialize(review) for review in reviews], next_cursor
+
+    @replica_read
+    def get_reviews_by_place(self, place_id, limit, cursor=None, projection=None):
+        """
+        obtain one page of the reviews of a place, oldest first, with their
+        authors (or the columns and relationships of projection), and the
+        cursor of the next page
+        """
+        # Filtre et tri faits par la base, via l'index (place_id, created_at, id) ;
+        # l'auteur de chaque avis vient de la même requête (jointure sur users)
+        options = projection.loader_options() if projection else REVIEW_AUTHOR_OPTIONS
+        return self.review_repo.get_by_place(place_id, limit, cursor, options)
+
+    def has_reviewed_place(self, user_id, place_id):
+        """ tell whether the user already posted a review for the place """
+        return self.review_repo.exists_for(user_id, place_id)
 
     def update_review(self, review_id, review_data):
         """ update a review """
         # Espace réservé pour la logique de mise à jour d’un avis
-        self.review_repo.update(review_id, review_data)
-        review = self.review_repo.get(review_id)
-        db.session.commit()
+        with self.transaction():
+            review = self.review_repo.get(review_id)
+            if not review:
+                return None
+            before = (review.place_id, review.rating)
+            self.review_repo.update(review_id, review_data)
+            review = self.review_repo.get(review_id)
+            after = (review.place_id, review.rating)
+            if after != before:
+                self.place_repo.adjust_ratings(added=[after], removed=[before])
+            self._changed(('reviews', review_id), ('places', before[0]), ('places', after[0]))
         return review
 
     def delete_review(self, review_id):
         """ delete a review """
         # Espace réservé pour la logique de suppression d’un avis
-        # Vérifie d'abord si la review existe
-        review = self.review_repo.get(review_id)
-        if not review:
-            return False  # Ne rien supprimer si l'ID est inconnu
-
-        # Supprime la review
-        self.review_repo.delete(review_id)
-        db.session.commit()
+        with self.transaction():
+            # Vérifie d'abord si la review existe
+            review = self.review_repo.get(review_id)
+            if not review:
+                return False  # Ne rien supprimer si l'ID est inconnu
+
+            removed = (review.place_id, review.rating)
+            # Supprime la review
+            self.review_repo.delete(review_id)
+            self.place_repo.adjust_ratings(removed=[removed])
+            self._changed(('reviews',), ('reviews', review_id), ('places', review.place_id), ('users', review.user_id))
         # Confirme qu'elle n'existe plus
         return True
 
-
+    def repair_rating_aggregates(self):
+        """
+        Recompute the rating aggregates of every place from its reviews (after
+        an import, a bulk delete or any write made outside the facade).
+        Returns the number of places whose aggregates were wrong.
+        """
+        fixed = self.place_repo.repair_rating_aggregates()
+        if fixed:
+            # Lieux corrigés inconnus ici : toutes les réponses peuvent avoir changé
+            self._changed(everything=True)
+        return fixed
@@ -0,0 +1,40 @@
+"""
+Loader options of the facade read operations, shared by HBnBFacade and
+AsyncHBnBFacade.
+
+Each read loads, with the rows it returns, every relationship its caller
+goes through, so the number of SQL statements does not depend on the number
+of places, reviews or amenities:
+- collections (place.amenities, place.reviews, user.places, ...) are loaded
+  with selectinload: one 'WHERE ... IN (...)' statement per relationship for
+  the whole page, whatever its size;
+- many-to-one relationships (place.owner, review.user) are loaded with
+  joinedload: their columns come with the row in the same statement.
+
+Constants:
+- PLACE_OPTIONS: what Place.to_dict() reads (place listings).
+- USER_OPTIONS: what User.to_dict() reads (user listings and details).
+- PLACE_DETAIL_OPTIONS: GET /places/<place_id>, the place and the dictionary of its owner.
+- REVIEW_AUTHOR_OPTIONS: GET /places/<place_id>/reviews, the reviews and the name of their authors.
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+
+# Relations lues par Place.to_dict()
+PLACE_OPTIONS = (selectinload(Place.amenities), selectinload(Place.reviews))
+# Relations lues par User.to_dict() : ses avis et ses lieux (avec leurs propres relations)
+USER_OPTIONS = (
+    selectinload(User.reviews),
+    selectinload(User.places).selectinload(Place.amenities),
+    selectinload(User.places).selectinload(Place.reviews),
+)
+# Relations lues par GET /places/<place_id> : le lieu, son propriétaire (dans la même requête)
+# et le dictionnaire du propriétaire
+PLACE_DETAIL_OPTIONS = PLACE_OPTIONS + tuple(
+    joinedload(Place.owner).options(option) for option in USER_OPTIONS)
+# Auteur de chaque avis, lu dans la même requête que la page d'avis
+REVIEW_AUTHOR_OPTIONS = (joinedload(Review.user),)
@@ -0,0 +1,177 @@
+"""
+Criteria of the place search (GET /api/v1/places/search).
+
+A PlaceSearch holds the filters and the sort order of a search and turns
+them into both sides of a read, like a Projection:
+- the SQL: conditions(), order_by() and after() build the WHERE and ORDER BY
+  of one query on places, served by the indexes of the Place model (price,
+  latitude/longitude, created_at) and, for each required amenity, by the
+  primary key of place_amenity (EXISTS);
+- the Python: matches() and sort_key() filter and sort objects in memory
+  (in-memory repository, merge of the pages of the shards).
+
+Filters, all optional and combined with AND:
+- min_price, max_price: price per night, bounds included;
+- amenities: comma-separated amenity ids, the place must have all of them;
+- min_lat, max_lat, min_lon, max_lon: bounding box, bounds included. When
+  min_lon > max_lon the box crosses the antimeridian (e.g. 170 to -170).
+
+Sort orders (ties broken by id, in the same direction):
+- id (default): the order of GET /places/;
+- price / -price: cheapest / most expensive first;
+- newest: most recently created first.
+
+The pages are keyset-paginated like the other listings: the cursor is the id
+of the last place of the previous page, and the next page starts right
+after its (sort value, id) position.
+
+Classes:
+- PlaceSearch: the filters and sort order of a search.
+
+Functions:
+- parse_place_search(args): build a PlaceSearch from query string arguments.
+"""
+
+import math
+
+from sqlalchemy import and_, exists, or_, select
+
+from app.models.place import Place
+from app.models.association_tables import place_amenity
+
+# Ordre : (attribut trié, décroissant) ; l'id départage les égalités dans le même sens
+SORTS = {
+    'id': ('id', False),
+    'price': ('_price', False),
+    '-price': ('_price', True),
+    'newest': ('created_at', True),
+}
+# Un EXISTS par amenity demandée : nombre borné
+MAX_AMENITIES = 20
+
+
+class PlaceSearch:
+    """
+    Filters and sort order of a place search. Raises ValueError for an
+    unknown sort order, an empty price range, a latitude range upside down
+    or too many amenities.
+    """
+    def __init__(self, min_price=None, max_price=None, amenity_ids=(), min_lat=None, max_lat=None,
+                 min_lon=None, max_lon=None, sort='id'):
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(SORTS)}")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price must not exceed max_price")
+        if min_lat is not None and max_lat is not None and min_lat > max_lat:
+            raise ValueError("min_lat must not exceed max_lat")
+        amenity_ids = tuple(dict.fromkeys(amenity_ids))
+        if len(amenity_ids) > MAX_AMENITIES:
+            raise ValueError(f"At most {MAX_AMENITIES} amenities can be required")
+        self.min_price = min_price
+        self.max_price = max_price
+        self.amenity_ids = amenity_ids
+        self.min_lat, self.max_lat = min_lat, max_lat
+        self.min_lon, self.max_lon = min_lon, max_lon
+        self.sort = sort
+        self.column, self.descending = SORTS[sort]
+
+    def _crosses_antimeridian(self):
+        return self.min_lon is not None and self.max_lon is not None and self.min_lon > self.max_lon
+
+    def conditions(self):
+        """ Return the SQL conditions of the filters on Place """
+        conditions = []
+        for column, low, high in ((Place._price, self.min_price, self.max_price),
+                                  (Place._latitude, self.min_lat, self.max_lat)):
+            if low is not None:
+                conditions.append(column >= low)
+            if high is not None:
+                conditions.append(column <= high)
+        if self._crosses_antimeridian():
+            conditions.append(or_(Place._longitude >= self.min_lon, Place._longitude <= self.max_lon))
+        else:
+            if self.min_lon is not None:
+                conditions.append(Place._longitude >= self.min_lon)
+            if self.max_lon is not None:
+                conditions.append(Place._longitude <= self.max_lon)
+        for amenity_id in self.amenity_ids:
+            # Recherche dans la clé primaire (place_id, amenity_id) pour chaque lieu candidat
+            conditions.append(exists().where(place_amenity.c.place_id == Place.id,
+                                             place_amenity.c.amenity_id == amenity_id))
+        return conditions
+
+    def order_by(self):
+        """ Return the ORDER BY clauses of the sort order """
+        columns = [getattr(Place, self.column)] if self.column != 'id' else []
+        columns.append(Place.id)
+        return [column.desc() for column in columns] if self.descending else columns
+
+    def anchor(self, cursor):
+        """ Return the SQL sort value of the place cursor (scalar subquery) """
+        return select(getattr(Place, self.column)).where(Place.id == cursor).scalar_subquery()
+
+    def after(self, anchor, cursor):
+        """
+        Return the SQL condition of the places coming after the place cursor,
+        whose sort value is anchor (a value or the expression of anchor()).
+        """
+        if self.column == 'id':
+            return Place.id < cursor if self.descending else Place.id > cursor
+        column = getattr(Place, self.column)
+        # La borne seule sur la colonne de tri permet de démarrer dans l'index au niveau du curseur
+        if self.descending:
+            return and_(column <= anchor, or_(column < anchor, Place.id < cursor))
+        return and_(column >= anchor, or_(column > anchor, Place.id > cursor))
+
+    def matches(self, place):
+        """ Return True if the place object passes the filters """
+        for value, low, high in ((place.price, self.min_price, self.max_price),
+                                 (place.latitude, self.min_lat, self.max_lat)):
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        if self._crosses_antimeridian():
+            if self.max_lon < place.longitude < self.min_lon:
+                return False
+        elif ((self.min_lon is not None and place.longitude < self.min_lon)
+              or (self.max_lon is not None and place.longitude > self.max_lon)):
+            return False
+        if self.amenity_ids:
+            owned = {amenity.id for amenity in place.amenities}
+            return all(amenity_id in owned for amenity_id in self.amenity_ids)
+        return True
+
+    def sort_key(self, place):
+        """ Return the (sort value, id) of a place object, in the order of order_by() """
+        return (getattr(place, self.column), place.id)
+
+
+def _number(args, name):
+    """ Return the finite float of args[name], or None when absent """
+    raw = args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a number")
+    return value
+
+
+def parse_place_search(args):
+    """
+    Build the PlaceSearch of a mapping of query string arguments (min_price,
+    max_price, amenities, min_lat, max_lat, min_lon, max_lon, sort). Raises
+    ValueError for an invalid value.
+    """
+    values = {name: _number(args, name) for name in ('min_price', 'max_price', 'min_lat', 'max_lat',
+                                                     'min_lon', 'max_lon')}
+    for name, limit in (('min_lat', 90.0), ('max_lat', 90.0), ('min_lon', 180.0), ('max_lon', 180.0)):
+        if values[name] is not None and not -limit <= values[name] <= limit:
+            raise ValueError(f"{name} must be between {-limit} and {limit}")
+    for name in ('min_price', 'max_price'):
+        if values[name] is not None and values[name] < 0:
+            raise ValueError(f"{name} must not be negative")
+    amenity_ids = [entry.strip() for entry in (args.get('amenities') or '').split(',') if entry.strip()]
+    return PlaceSearch(amenity_ids=amenity_ids, sort=args.get('sort') or 'id', **values)
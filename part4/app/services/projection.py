@@ -0,0 +1,314 @@
+"""
+Sparse fieldsets and include depth of the GET endpoints.
+
+A Projection is the shape of a response: the fields of a resource and, for
+each included relationship, the Projection of the related resource. It is
+built from the ?fields= and ?include= query parameters (see
+app/api/v1/fieldsets.py) and drives both sides of a read:
+- the SQL: loader_options() loads only the columns behind the requested
+  fields (load_only) and only the included relationships (selectinload for
+  collections, joinedload for many-to-one, each with its own load_only), so
+  a narrow request reads fewer columns and fewer tables;
+- the serialization: serialize(obj) builds the dictionary with those fields
+  only, in the order of the resource declaration below;
+- the ETag: version_paths() lists the relationships whose rows are
+  versioned with the object (see app/persistence/versions.py);
+- the response cache: inside record_entities(), serialize() also collects
+  the cache_tag of every object it reads, so that a cached response is
+  dropped when one of them is written (see app/api/response_cache.py).
+
+Syntax:
+- include=amenities,reviews.user : relationships to embed, the dots going
+  one level deeper (at most max_depth levels);
+- fields=id,title,reviews.rating : fields to return, the dots naming a
+  field of an included resource. Naming a relationship or a field of a
+  relationship includes it.
+A level without any requested field returns the default fields of its
+resource. A level with requested fields returns only those, and only the
+relationships named in fields or include: the default includes of the
+endpoint are dropped there.
+
+Classes:
+- Field: a serialized attribute and the columns it reads.
+- Relation: a serialized relationship.
+- ResourceShape: the fields and relationships of a resource, in output order.
+- Projection: the shape of one response.
+
+Functions:
+- parse_projection(resource, fields, include, default_fields, default_include, max_depth): build a Projection.
+- cache_tag(obj): the ('<table>', id) tag of an entity.
+- record_entities(): context manager collecting the tags of the serialized objects.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import MANYTOONE, ONETOMANY, joinedload, load_only, selectinload
+
+from app.models.user import User
+from app.models.place import Place, RATING_COLUMNS
+from app.models.review import Review
+from app.models.amenity import Amenity
+
+
+# Tags des objets sérialisés dans le bloc record_entities() en cours (None : pas de collecte)
+_recorded = contextvars.ContextVar('recorded_entities', default=None)
+
+
+def cache_tag(obj):
+    """ Return the tag of an entity in the response cache: (table name, id) """
+    return (type(obj).__tablename__, obj.id)
+
+
+@contextmanager
+def record_entities():
+    """ Collect in the yielded set the cache_tag of every object serialized inside the with block """
+    tags = set()
+    token = _recorded.set(tags)
+    try:
+        yield tags
+    finally:
+        _recorded.reset(token)
+
+
+class Field:
+    """
+    A serialized attribute: 'columns' are the mapped attributes it reads
+    (its own name by default), 'via' = (relationship, columns) when it reads
+    a related object, and 'default' tells whether it is returned when no
+    field is requested.
+    """
+    def __init__(self, name, columns=None, getter=None, via=None, default=True):
+        self.name = name
+        self.columns = tuple(columns) if columns is not None else (name,)
+        self.getter = getter or (lambda obj: getattr(obj, name))
+        self.via = via
+        self.default = default
+
+
+class Relation:
+    """ A serialized relationship, to the resource named 'resource' """
+    def __init__(self, name, resource):
+        self.name = name
+        self.resource = resource
+
+
+class ResourceShape:
+    """ The fields and relationships of a resource, in output order """
+    def __init__(self, model, members):
+        self.model = model
+        self.members = members
+        self.fields = {member.name: member for member in members if isinstance(member, Field)}
+        self.relations = {member.name: member for member in members if isinstance(member, Relation)}
+        self.default_fields = tuple(name for name, field in self.fields.items() if field.default)
+        # Colonnes lues par la forme par défaut : au-delà, load_only n'économise rien
+        self.default_columns = {column for name in self.default_fields for column in self.fields[name].columns}
+
+    def relationship(self, name):
+        """ Return the SQLAlchemy RelationshipProperty of a relationship """
+        return inspect(self.model).relationships[name]
+
+    def column_keys(self, columns):
+        """ Return the attribute keys of Column objects of this model """
+        mapper = inspect(self.model)
+        return {mapper.get_property_by_column(column).key for column in columns}
+
+
+def review_user_name(review):
+    """ Display name of the author of a review """
+    if review.user:
+        return f"{review.user.first_name} {review.user.last_name}"
+    return "Utilisateur inconnu"
+
+
+RESOURCES = {
+    'users': ResourceShape(User, [
+        Field('id'), Field('first_name'), Field('last_name'), Field('email'), Field('is_admin'),
+        Relation('reviews', 'reviews'), Relation('places', 'places'),
+    ]),
+    'places': ResourceShape(Place, [
+        Field('id'), Field('title'), Field('description'),
+        # Colonnes privées derrière les propriétés validées
+        Field('price', ('_price',)), Field('latitude', ('_latitude',)), Field('longitude', ('_longitude',)),
+        Field('owner_id'), Relation('owner', 'users'),
+        Field('review_count', getter=lambda place: place.review_count or 0),
+        Field('average_rating', ('review_count', 'rating_sum')),
+        Field('rating_histogram', RATING_COLUMNS),
+        Relation('amenities', 'amenities'), Relation('reviews', 'reviews'),
+    ]),
+    'reviews': ResourceShape(Review, [
+        Field('id'), Field('text'), Field('rating'), Field('user_id'), Field('place_id'),
+        Field('user_name', (), review_user_name, via=('user', ('first_name', 'last_name')), default=False),
+        Relation('user', 'users'), Relation('place', 'places'),
+    ]),
+    'amenities': ResourceShape(Amenity, [
+        Field('id'), Field('name'), Relation('places', 'places'),
+    ]),
+}
+
+
+class Projection:
+    """
+    The shape of one response: 'fields' of the resource 'shape' and the
+    Projection of each included relationship ({name: Projection}).
+    """
+    def __init__(self, shape, fields, relations):
+        self.shape = shape
+        self.fields = tuple(fields)
+        self.relations = relations
+
+    def loader_options(self, extra_columns=()):
+        """
+        Return the loader options reading the requested columns and
+        relationships (plus extra_columns, needed by the parent loader).
+        Returns () when the columns of the default fields are all requested
+        and nothing is included, so that the plain read (and the entity
+        cache) is used.
+        """
+        model = self.shape.model
+        columns = set(extra_columns)
+        # Colonnes des objets liés lus par les champs calculés (user_name -> user.first_name, ...)
+        via = {}
+        for name in self.fields:
+            field = self.shape.fields[name]
+            columns.update(field.columns)
+            if field.via is not None:
+                via.setdefault(field.via[0], set()).update(field.via[1])
+
+        options = []
+        for name in sorted(set(self.relations) | set(via)):
+            prop = self.shape.relationship(name)
+            target = RESOURCES[self.shape.relations[name].resource]
+            child_columns = set(via.get(name, ()))
+            if prop.direction is MANYTOONE:
+                # La clé étrangère de l'objet de départ désigne l'objet lié
+                columns.update(self.shape.column_keys(prop.local_columns))
+                loader = joinedload(getattr(model, name))
+            else:
+                if prop.direction is ONETOMANY:
+                    # Clé étrangère des objets liés, pour les rattacher à leur parent
+                    child_columns.update(target.column_keys(prop.remote_side))
+                loader = selectinload(getattr(model, name))
+            child = self.relations.get(name)
+            if child is not None:
+                child_options = child.loader_options(child_columns)
+            else:
+                child_options = Projection(target, (), {}).loader_options(child_columns)
+            options.append(loader.options(*child_options) if child_options else loader)
+
+        if columns >= self.shape.default_columns:
+            return tuple(options)
+        # La clé primaire est toujours chargée
+        columns.add('id')
+        return (load_only(*(getattr(model, key) for key in sorted(columns))),) + tuple(options)
+
+    def version_paths(self, prefix=()):
+        """
+        Return the relationship paths read by this projection (included
+        relationships and the objects read by computed fields), as tuples
+        of names: the rows whose versions make the ETag of the response.
+        """
+        paths = set()
+        for name in self.fields:
+            via = self.shape.fields[name].via
+            if via is not None:
+                paths.add(prefix + (via[0],))
+        for name, child in self.relations.items():
+            paths.add(prefix + (name,))
+            paths.update(child.version_paths(prefix + (name,)))
+        return sorted(paths)
+
+    def serialize(self, obj):
+        """ Return the dictionary of obj with the requested fields and relationships """
+        data = {}
+        tags = _recorded.get()
+        if tags is not None:
+            tags.add(cache_tag(obj))
+        for member in self.shape.members:
+            if member.name in self.fields:
+                data[member.name] = member.getter(obj)
+                if tags is not None and member.via is not None:
+                    # Objet lié lu par un champ calculé (user_name -> review.user)
+                    related = getattr(obj, member.via[0])
+                    if related is not None:
+                        tags.add(cache_tag(related))
+            elif member.name in self.relations:
+                child = self.relations[member.name]
+                value = getattr(obj, member.name)
+                if self.shape.relationship(member.name).uselist:
+                    data[member.name] = [child.serialize(item) for item in value]
+                else:
+                    data[member.name] = child.serialize(value) if value is not None else None
+        return data
+
+
+def _split(value):
+    """ Return the non-empty, stripped entries of a comma-separated list """
+    return [entry.strip() for entry in value.split(',') if entry.strip()]
+
+
+def _paths(entries):
+    return [tuple(entry.split('.')) for entry in entries]
+
+
+def parse_projection(resource, fields=None, include=None, default_fields=None, default_include=(), max_depth=3):
+    """
+    Build the Projection of a response on 'resource' (a key of RESOURCES)
+    from the raw ?fields= and ?include= values (None when absent).
+
+    default_fields are the fields of the top level when none is requested
+    (the defaults of the resource if None); default_include the
+    relationship paths embedded when include is absent. Raises ValueError
+    for an unknown field or relationship, or an include deeper than max_depth.
+    """
+    root = RESOURCES[resource]
+    requested = _paths(_split(include)) if include is not None else []
+    defaults = _paths(default_include) if include is None else []
+    # Champs demandés par niveau : chemin de relations -> noms
+    explicit = {}
+    for *path, name in _paths(_split(fields)) if fields is not None else []:
+        explicit.setdefault(tuple(path), []).append(name)
+
+    def check(path, shape_name=resource):
+        """ Validate a path of relationships and return the shape it leads to """
+        if len(path) > max_depth:
+            raise ValueError(f"include depth must not exceed {max_depth}: {'.'.join(path)}")
+        shape = RESOURCES[shape_name]
+        for depth, name in enumerate(path):
+            if not name or name not in shape.relations:
+                raise ValueError(f"Unknown relationship '{name}' in '{'.'.join(path[:depth + 1])}'")
+            shape = RESOURCES[shape.relations[name].resource]
+        return shape
+
+    for path in requested:
+        check(path)
+    for path, names in explicit.items():
+        shape = check(path)
+        for name in names:
+            if name in shape.relations:
+                check(path + (name,))
+            elif name not in shape.fields:
+                raise ValueError(f"Unknown field '{'.'.join(path + (name,))}'")
+
+    def below(paths, path):
+        return any(candidate[:len(path)] == path for candidate in paths)
+
+    def build(shape, path):
+        names = explicit.get(path)
+        if names is None:
+            field_names = default_fields if path == () and default_fields is not None else shape.default_fields
+        else:
+            field_names = [name for name in dict.fromkeys(names) if name in shape.fields]
+        relations = {}
+        for name, relation in shape.relations.items():
+            sub = path + (name,)
+            wanted = (below(requested, sub) or below(explicit, sub)
+                      or (names is not None and name in names)
+                      # Inclusions par défaut : seulement aux niveaux sans champs demandés
+                      or (names is None and below(defaults, sub)))
+            if wanted:
+                relations[name] = build(RESOURCES[relation.resource], sub)
+        return Projection(shape, field_names, relations)
+
+    return build(root, ())
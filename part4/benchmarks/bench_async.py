@@ -0,0 +1,110 @@
+"""
+Benchmark: 1000 concurrent clients on GET /places/<id> and
+GET /places/<id>/reviews, served by the synchronous Flask stack and by the
+async stack (app/asgi.py).
+
+Every client sends both requests once, all clients starting together.
+- sync: the clients are queued on a pool of threads using the Flask test
+  client, like a threaded WSGI server with one thread per connection of the
+  SQLAlchemy pool (pool_size + max_overflow: more threads would only wait
+  on the pool and time out);
+- async: one asyncio task per client calls the ASGI application directly,
+  on a single event loop.
+
+The latency of a client counts the time spent waiting for a worker (or for
+a connection of the pool) from the moment all the clients start. The
+entity caches are disabled so that every request reaches the database.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_async
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import BenchmarkConfig, make_app, seed
+from app import db
+from app.asgi import create_asgi_app
+from app.services import facade
+
+CLIENTS = 1000
+
+
+def report(label, elapsed, latencies):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000
+    print(f"{label:8} {CLIENTS / elapsed:10.0f} {p50:10.1f} {p99:10.1f}")
+
+
+def run_sync(app, paths, workers):
+    def client(start, place_path):
+        test_client = app.test_client()
+        test_client.get(place_path)
+        test_client.get(place_path + '/reviews')
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(client, start, path) for path in paths]
+        latencies = [future.result() for future in futures]
+    report('sync', time.perf_counter() - start, latencies)
+
+
+def run_async(application, paths):
+    async def request(path):
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            pass
+
+        await application({'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+                           'scheme': 'http', 'root_path': '', 'headers': [(b'host', b'localhost')]},
+                          receive, send)
+
+    async def client(start, place_path):
+        await request(place_path)
+        await request(place_path + '/reviews')
+        return time.perf_counter() - start
+
+    async def main():
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(client(start, path) for path in paths))
+        report('async', time.perf_counter() - start, latencies)
+        await application.facade.close()
+
+    asyncio.run(main())
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        app = make_app(type('AsyncBenchmarkConfig', (BenchmarkConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directory, 'async.db')}))
+        with app.app_context():
+            ids = seed(users=500, places=2000, reviews_per_place=5)
+        for repo in facade._repositories().values():
+            repo.cache = None
+        paths = [f'/api/v1/places/{random.choice(ids["places"])}' for _ in range(CLIENTS)]
+
+        pool_options = app.config['SQLALCHEMY_POOL_OPTIONS']
+        workers = pool_options['pool_size'] + pool_options['max_overflow']
+        print(f"{CLIENTS} concurrent clients, 2 GET each (sync: {workers} threads, async: 1 event loop)")
+        print(f"{'stack':8} {'clients/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+        run_sync(app, paths, workers)
+        run_async(create_asgi_app(app), paths)
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
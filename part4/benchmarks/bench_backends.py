@@ -0,0 +1,76 @@
+"""
+Benchmark: the same repository operations on every persistence backend.
+
+Times, for each backend of app/persistence/backends.py, the methods of the
+Repository ABC used by the facade on AMENITIES objects: bulk insert, get by
+id, lookup on an indexed attribute, walk of every page, and update.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_backends
+"""
+
+import os
+import shutil
+import tempfile
+
+from benchmarks.common import BenchmarkConfig, make_app, timed
+from app import db
+from app.models import Amenity
+from app.persistence.backends import BACKENDS
+from app.services import facade
+
+AMENITIES = 10_000
+LOOKUPS = 2_000
+PAGE_SIZE = 100
+
+
+def measure(backend, uri):
+    """ Return {operation: milliseconds} for one backend """
+    config_class = type('BackendBenchmarkConfig', (BenchmarkConfig,), {
+        'PERSISTENCE_BACKEND': backend, 'SQLALCHEMY_DATABASE_URI': uri})
+    app = make_app(config_class)
+    results = {}
+    with app.app_context():
+        repo = facade.amenity_repo
+        amenities = [Amenity(f'Amenity {i}') for i in range(AMENITIES)]
+        results['add_many'] = timed(lambda: repo.add_many(amenities))
+        ids = [amenity.id for amenity in amenities[:LOOKUPS]]
+        names = [amenity.name for amenity in amenities[:LOOKUPS]]
+        facade.clear_caches()
+        results['get'] = timed(lambda: [repo.get(obj_id) for obj_id in ids])
+        facade.clear_caches()
+        results['get_by_attribute'] = timed(
+            lambda: [repo.get_by_attribute('name', name) for name in names])
+
+        def walk():
+            cursor = None
+            while True:
+                _, cursor = repo.get_page(PAGE_SIZE, cursor)
+                if cursor is None:
+                    break
+        results['get_page (all)'] = timed(walk)
+        results['update'] = timed(
+            lambda: [repo.update(obj_id, {'name': f'Renamed {obj_id}'}) for obj_id in ids[:200]])
+        db.session.remove()
+        db.drop_all(bind_key=None)
+    return {operation: seconds * 1000 for operation, seconds in results.items()}
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        uris = {'sqlite': 'sqlite:///' + os.path.join(directory, 'bench.db')}
+        results = {backend: measure(backend, uris.get(backend, 'sqlite://')) for backend in BACKENDS}
+    finally:
+        shutil.rmtree(directory)
+
+    operations = list(results[BACKENDS[0]])
+    print(f"{AMENITIES} amenities, {LOOKUPS} lookups, pages of {PAGE_SIZE}, 200 updates (ms)")
+    print(f"{'operation':20}" + ''.join(f"{backend:>15}" for backend in BACKENDS))
+    for operation in operations:
+        print(f"{operation:20}" + ''.join(f"{results[backend][operation]:15.1f}" for backend in BACKENDS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: importing N places one POST /places/ at a time versus a single
+POST /places/batch, counting SQL statements (database round trips) and time.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_bulk_create [N]
+"""
+
+import sys
+
+from flask_jwt_extended import create_access_token
+
+from benchmarks.common import QueryCounter, make_app, seed, timed
+
+
+def place_payload(prefix, index, owner_id, amenity_ids):
+    """ Return the JSON body of one place """
+    return {
+        'title': f'{prefix} {index}',
+        'description': 'Imported from a partner catalogue',
+        'price': 50.0 + index % 100,
+        'latitude': 45.0,
+        'longitude': 5.0,
+        'owner_id': owner_id,
+        'amenities': amenity_ids
+    }
+
+
+def main(count=500):
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        ids = seed(users=2, places=0, amenities=5)
+        token = create_access_token(identity={'id': ids['users'][0], 'is_admin': False})
+    headers = {'Authorization': f'Bearer {token}'}
+    owner_id = ids['users'][0]
+    amenity_ids = ids['amenities'][:3]
+
+    def one_by_one():
+        for i in range(count):
+            # POST /places/ expects nested amenity objects, the ids are left out
+            response = client.post('/api/v1/places/', headers=headers,
+                                   json=place_payload('Single', i, owner_id, []))
+            assert response.status_code == 201, response.get_json()
+
+    def batch():
+        places = [place_payload('Batch', i, owner_id, amenity_ids) for i in range(count)]
+        response = client.post('/api/v1/places/batch', headers=headers, json={'places': places})
+        assert response.status_code == 201, response.get_json()
+
+    with app.app_context():
+        with QueryCounter() as single_queries:
+            single_time = timed(one_by_one)
+        with QueryCounter() as batch_queries:
+            batch_time = timed(batch)
+
+    print(f"{count} places")
+    print(f"{'mode':12} {'statements':>11} {'seconds':>9} {'places/s':>10}")
+    print(f"{'one by one':12} {single_queries.count:11d} {single_time:9.3f} {count / single_time:10.0f}")
+    print(f"{'batch':12} {batch_queries.count:11d} {batch_time:9.3f} {count / batch_time:10.0f}")
+    print(f"round trips divided by {single_queries.count / max(batch_queries.count, 1):.0f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
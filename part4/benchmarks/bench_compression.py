@@ -0,0 +1,81 @@
+"""
+Benchmark: bytes on the wire and CPU time per request of GET /api/v1/places/
+and GET /api/v1/users/ pages, uncompressed and with each encoding and level
+of the response compression (see app/api/compression.py).
+
+'cold' compresses every response (cache of the compressed bodies disabled),
+'cached' sends the same page again and reuses its compressed bytes. The CPU
+time is the process time of the whole request (query, serialization and
+compression) as seen by the test client; 'compress ms' is the time of the
+compression alone (cold, then cached), on the same body.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_compression
+"""
+
+import time
+
+from app.api.compression import ResponseCompressor, available_encodings
+from benchmarks.common import BenchmarkConfig, make_app, seed
+
+URLS = ('/api/v1/places/?limit=100', '/api/v1/users/?limit=100')
+REQUESTS = 50
+VARIANTS = [('identity', None)] + [('gzip', level) for level in (1, 6, 9)]
+if 'zstd' in available_encodings():
+    VARIANTS += [('zstd', level) for level in (1, 3, 10)]
+
+
+def measure(encoding, level, cache_size):
+    """ Return {url: (bytes per response, CPU ms per request, uncompressed body)} """
+    settings = {'COMPRESSION_CACHE_SIZE': cache_size}
+    if level is not None:
+        settings.update({'COMPRESSION_ENCODINGS': (encoding,), 'COMPRESSION_LEVELS': {encoding: level}})
+    app = make_app(type('CompressionBenchmarkConfig', (BenchmarkConfig,), settings))
+    with app.app_context():
+        seed(users=100, places=500, reviews_per_place=5, amenities=10)
+    client = app.test_client()
+    headers = {'Accept-Encoding': encoding}
+    results = {}
+    for url in URLS:
+        size = len(client.get(url, headers=headers).data)
+        body = client.get(url).data
+        start = time.process_time()
+        for _ in range(REQUESTS):
+            client.get(url, headers=headers)
+        results[url] = (size, (time.process_time() - start) * 1000 / REQUESTS, body)
+    return results
+
+
+def compression_ms(body, encoding, level, cache_size):
+    """ CPU ms of compressing body once more with a compressor that already compressed it """
+    compressor = ResponseCompressor((encoding,), levels={encoding: level}, cache_size=cache_size)
+    compressor.compress(body, encoding)
+    start = time.process_time()
+    for _ in range(REQUESTS):
+        compressor.compress(body, encoding)
+    return (time.process_time() - start) * 1000 / REQUESTS
+
+
+def main():
+    print(f"{REQUESTS} requests per page, bytes and CPU ms per request")
+    print(f"{'url':28} {'encoding':10} {'bytes':>9} {'cold ms':>9} {'cached ms':>10} {'compress ms':>16}")
+    rows = {}
+    for encoding, level in VARIANTS:
+        cold = measure(encoding, level, cache_size=0)
+        cached = measure(encoding, level, cache_size=256)
+        for url in URLS:
+            compress = '-'
+            if level is not None:
+                body = cold[url][2]
+                compress = (f"{compression_ms(body, encoding, level, 0):7.2f} "
+                            f"{compression_ms(body, encoding, level, 256):7.3f}")
+            rows.setdefault(url, []).append((encoding if level is None else f'{encoding}-{level}',
+                                             cold[url][0], cold[url][1], cached[url][1], compress))
+    for url, variants in rows.items():
+        for name, size, cold_ms, cached_ms, compress in variants:
+            print(f"{url:28} {name:10} {size:9} {cold_ms:9.2f} {cached_ms:10.2f} {compress:>16}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: SQL statements per request on the hot GET paths, with and
+without the entity cache of the repositories.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_entity_cache
+"""
+
+from benchmarks.common import QueryCounter, make_app, seed, timed
+from app.services import facade
+
+REQUESTS = 200
+
+
+def run(client, paths, app):
+    """ Send every path REQUESTS times and return (queries/request, seconds) """
+    with app.app_context():
+        with QueryCounter() as counter:
+            elapsed = timed(lambda: [client.get(path) for path in paths], REQUESTS)
+    return counter.count / (REQUESTS * len(paths)), elapsed
+
+
+def main():
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        ids = seed(users=20, places=50, reviews_per_place=5)
+
+    scenarios = {
+        'GET /places/<id>': [f'/api/v1/places/{ids["places"][0]}'],
+        'GET /places/<id>/reviews': [f'/api/v1/places/{ids["places"][1]}/reviews'],
+        'GET /amenities/<id>': [f'/api/v1/amenities/{ids["amenities"][0]}'],
+    }
+
+    caches = {name: repo.cache for name, repo in facade._repositories().items()}
+    print(f"{'path':28} {'queries/req (off)':>18} {'queries/req (on)':>17} {'ms/req off':>11} {'ms/req on':>10}")
+    for label, paths in scenarios.items():
+        for repo in facade._repositories().values():
+            repo.cache = None
+        off_queries, off_time = run(client, paths, app)
+
+        for name, repo in facade._repositories().items():
+            repo.cache = caches[name]
+            repo.cache.clear()
+        on_queries, on_time = run(client, paths, app)
+
+        per_request = REQUESTS * len(paths)
+        print(f"{label:28} {off_queries:18.2f} {on_queries:17.2f} "
+              f"{off_time * 1000 / per_request:11.3f} {on_time * 1000 / per_request:10.3f}")
+
+    print()
+    for name, stats in facade.get_cache_stats().items():
+        print(f"{name:10} {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: insert rate and index size with random UUIDv4 keys stored as
+text (the historical format) and with time-ordered UUIDv7 keys, stored as
+text and as 16 bytes (ID_FORMAT, see app/models/identifiers.py).
+
+For each format a fresh database file receives places and reviews in
+batches of one transaction each, like a steady stream of writes. Random
+keys land anywhere in the primary key and foreign key indexes, so every
+batch touches pages all over them; UUIDv7 keys are appended at the end.
+The sizes come from the dbstat virtual table (tables and their indexes).
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_ids
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.common import BenchmarkConfig, make_app, new_id, seed
+from app import db
+from app.models import Place, Review
+
+FORMATS = ('uuid4', 'uuid7', 'uuid7-binary')
+BATCHES = 40
+PLACES_PER_BATCH = 500
+REVIEWS_PER_PLACE = 4
+
+
+def sizes(connection):
+    """ Return (size of the tables, size of the indexes) in bytes """
+    rows = connection.exec_driver_sql(
+        "SELECT m.type, sum(s.pgsize) FROM dbstat s JOIN sqlite_master m ON m.name = s.name "
+        "GROUP BY m.type").all()
+    totals = dict(rows)
+    return totals.get('table', 0), totals.get('index', 0)
+
+
+def write_batch(owners):
+    """ Insert PLACES_PER_BATCH places and their reviews in one transaction, return the row count """
+    now = datetime.now()
+    places, reviews = [], []
+    for i in range(PLACES_PER_BATCH):
+        place_id = new_id()
+        places.append({'id': place_id, 'created_at': now, 'updated_at': now, 'title': f'Place {place_id}',
+                       'description': 'A place to stay', '_price': 10.0, '_latitude': 1.0, '_longitude': 1.0,
+                       'owner_id': owners[i % len(owners)]})
+        reviews.extend({'id': new_id(), 'created_at': now, 'updated_at': now, 'text': 'Nice stay',
+                        'rating': 1 + j, 'user_id': owners[(i + j + 1) % len(owners)], 'place_id': place_id}
+                       for j in range(REVIEWS_PER_PLACE))
+    db.session.execute(Place.__table__.insert(), places)
+    db.session.execute(Review.__table__.insert(), reviews)
+    db.session.commit()
+    return len(places) + len(reviews)
+
+
+def run(id_format):
+    directory = tempfile.mkdtemp()
+    try:
+        app = make_app(type('IdsBenchmarkConfig', (BenchmarkConfig,), {
+            'ID_FORMAT': id_format,
+            # Cache réduit : la base dépasse le cache, comme une base de production
+            'SQLITE_PRAGMAS': {'cache_size': -2000},
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directory, 'ids.db')}))
+        with app.app_context():
+            owners = seed(users=1000, places=0, reviews_per_place=0, amenities=0)['users']
+            rows = 0
+            start = time.perf_counter()
+            for _ in range(BATCHES):
+                rows += write_batch(owners)
+            elapsed = time.perf_counter() - start
+            with db.engine.connect() as connection:
+                table_bytes, index_bytes = sizes(connection)
+            db.engine.dispose()
+        return rows / elapsed, table_bytes, index_bytes
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    reviews = BATCHES * PLACES_PER_BATCH * REVIEWS_PER_PLACE
+    print(f"{BATCHES} transactions, {BATCHES * PLACES_PER_BATCH} places, {reviews} reviews")
+    print(f"{'format':14} {'rows/s':>10} {'tables MB':>10} {'indexes MB':>11}")
+    for id_format in FORMATS:
+        rate, table_bytes, index_bytes = run(id_format)
+        print(f"{id_format:14} {rate:10.0f} {table_bytes / 2**20:10.1f} {index_bytes / 2**20:11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: encoding of GET /places/ payloads with the standard library json
+module (flask_restx's output) and with orjson (JSON_ENCODER, see
+app/api/representations.py).
+
+The payloads are lists of Place.to_dict() (amenities and reviews included)
+of 10, 1k and 100k items. The seeded places are loaded once; the larger
+payloads repeat their dictionaries, the encoders do not cache anything.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_json
+"""
+
+from app import db
+from app.api.representations import available_encoder, dumps
+from app.models import Place
+from app.services.loading import PLACE_OPTIONS
+from benchmarks.common import make_app, seed, timed
+
+SIZES = (10, 1000, 100000)
+# Nombre d'encodages par taille, pour des durées mesurables
+REPEATS = {10: 2000, 1000: 20, 100000: 1}
+SEEDED_PLACES = 1000
+
+
+def payloads():
+    """ Return {size: list of Place.to_dict()} """
+    app = make_app()
+    with app.app_context():
+        seed(users=50, places=SEEDED_PLACES, reviews_per_place=5, amenities=10)
+        places = [place.to_dict() for place in Place.query.options(*PLACE_OPTIONS).all()]
+        db.session.remove()
+    return {size: [places[i % len(places)] for i in range(size)] for size in SIZES}
+
+
+def main():
+    encoders = ['json']
+    if available_encoder('orjson') == 'orjson':
+        encoders.append('orjson')
+    else:
+        print("orjson is not installed: only the standard library is measured")
+
+    print(f"{'items':>7} {'encoder':8} {'ms/encode':>10} {'MB/s':>8} {'speedup':>8}")
+    for size, payload in payloads().items():
+        repeat = REPEATS[size]
+        baseline = None
+        for encoder in encoders:
+            body = dumps(payload, encoder)
+            elapsed = timed(lambda: dumps(payload, encoder), repeat) / repeat
+            baseline = baseline or elapsed
+            print(f"{size:7} {encoder:8} {elapsed * 1000:10.3f} {len(body) / elapsed / 2**20:8.1f} "
+                  f"{baseline / elapsed:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: bytes and time per request of GET /api/v1/places/search against
+downloading every place with GET /api/v1/places/ and filtering in the
+client (what the price filter of the front end used to do).
+
+'listing' walks every page of the listing (limit=1000) and reports the
+total; each search reports the size of its first page, the number of places
+on it, and the time of one request. The response cache is disabled, so
+every request runs its queries.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_place_search
+"""
+
+import time
+
+from benchmarks.common import BenchmarkConfig, make_app, seed
+
+PLACES = 20000
+REQUESTS = 20
+
+
+def listing(client):
+    """ Return (bytes, places, seconds) of downloading every page of GET /places/ """
+    size = count = 0
+    start = time.perf_counter()
+    url = '/api/v1/places/?limit=1000'
+    while url:
+        response = client.get(url)
+        size += len(response.data)
+        count += len(response.get_json())
+        link = response.headers.get('Link')
+        url = link[1:link.index('>')] if link else None
+    return size, count, time.perf_counter() - start
+
+
+def search(client, query):
+    """ Return (bytes, places, seconds per request) of GET /places/search?query """
+    response = client.get(f'/api/v1/places/search?{query}')
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get(f'/api/v1/places/search?{query}')
+    return len(response.data), len(response.get_json()), (time.perf_counter() - start) / REQUESTS
+
+
+def main():
+    app = make_app(type('PlaceSearchBenchmarkConfig', (BenchmarkConfig,), {'RESPONSE_CACHE_SIZE': 0}))
+    with app.app_context():
+        ids = seed(users=200, places=PLACES, reviews_per_place=2)
+    client = app.test_client()
+    queries = [
+        'max_price=20',
+        'max_price=20&fields=id,title,price,review_count,average_rating',
+        'min_lat=40&max_lat=45&min_lon=0&max_lon=20',
+        'min_lon=170&max_lon=-165',
+        'amenities=<2 ids>&sort=-price&limit=20',
+        'sort=newest&limit=20',
+    ]
+    amenities = f"{ids['amenities'][0]},{ids['amenities'][1]}"
+    print(f"{PLACES} places, {REQUESTS} requests per search")
+    print(f"{'request':72} {'bytes':>10} {'places':>7} {'ms':>9}")
+    size, count, seconds = listing(client)
+    print(f"{'GET /places/ (every page)':72} {size:10} {count:7} {seconds * 1000:9.1f}")
+    for query in queries:
+        size, count, seconds = search(client, query.replace('<2 ids>', amenities))
+        print(f"{'GET /places/search?' + query:72} {size:10} {count:7} {seconds * 1000:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
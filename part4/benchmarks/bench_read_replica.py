@@ -0,0 +1,110 @@
+"""
+Benchmark: GET throughput while writers are active, with every query on the
+primary database and with the reads sent to a read replica.
+
+Reader threads send GET /api/v1/places/?limit=20 and
+GET /api/v1/places/<id>/reviews through the test client while writer
+threads create amenities through the facade, for DURATION seconds. With a replica, the primary is copied into it
+every SYNC_INTERVAL seconds (SQLite backup API). The entity caches are
+disabled so that every read reaches a database.
+
+Each setup is run with the default SQLite settings (rollback journal) and
+with the PRAGMA settings of ProductionConfig (WAL).
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_read_replica
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.common import BenchmarkConfig, make_app, seed
+import config
+from app import db
+from app.services import facade
+
+READERS = 4
+WRITERS = 2
+DURATION = 3.0
+SYNC_INTERVAL = 0.5
+
+
+def reader(app, stop, latencies, place_ids):
+    client = app.test_client()
+    while not stop.is_set():
+        place_id = random.choice(place_ids)
+        start = time.perf_counter()
+        client.get('/api/v1/places/?limit=20')
+        client.get(f'/api/v1/places/{place_id}/reviews')
+        latencies.append(time.perf_counter() - start)
+
+
+def writer(app, stop, counter):
+    while not stop.is_set():
+        with app.app_context():
+            facade.create_amenity({'name': 'Bench'})
+            db.session.remove()
+        counter.append(1)
+
+
+def run(label, base_config, directory, replica):
+    primary = os.path.join(directory, f'{label}-primary.db')
+    options = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + primary,
+               'PERSISTENCE_BACKEND': 'sqlite', 'DEBUG': False, 'TESTING': False,
+               'READ_REPLICA_URI': None, 'READ_REPLICA_SYNC_INTERVAL': 0}
+    if replica:
+        options['READ_REPLICA_URI'] = 'sqlite:///' + os.path.join(directory, f'{label}-replica.db')
+        options['READ_REPLICA_SYNC_INTERVAL'] = SYNC_INTERVAL
+    app = make_app(type('ReplicaBenchmarkConfig', (base_config,), options))
+    with app.app_context():
+        ids = seed(users=20, places=2000, reviews_per_place=5)
+    if replica:
+        app.extensions['replica_sync'].sync_now()
+    for repo in facade._repositories().values():
+        repo.cache = None
+
+    stop = threading.Event()
+    reads = [[] for _ in range(READERS)]
+    writes = [[] for _ in range(WRITERS)]
+    threads = [threading.Thread(target=reader, args=(app, stop, latencies, ids['places'])) for latencies in reads]
+    threads += [threading.Thread(target=writer, args=(app, stop, counter)) for counter in writes]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    syncs = 0
+    if replica:
+        app.extensions['replica_sync'].stop()
+        syncs = app.extensions['replica_sync'].syncs
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    reads = sorted(value for latencies in reads for value in latencies)
+    p99 = reads[min(len(reads) - 1, len(reads) * 99 // 100)] * 1000 if reads else 0.0
+    print(f"{label:22} {len(reads) / DURATION:9.0f} {p99:12.1f} "
+          f"{sum(len(counter) for counter in writes) / DURATION:9.0f} {syncs:6}")
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"{READERS} readers (2 GET each), {WRITERS} writers, {DURATION:.0f} s, replica copied every {SYNC_INTERVAL} s")
+        print(f"{'setup':22} {'GET pairs/s':>9} {'read p99 ms':>12} {'writes/s':>9} {'syncs':>6}")
+        for profile, base_config in (('default', BenchmarkConfig), ('production', config.ProductionConfig)):
+            run(f'{profile} primary only', base_config, directory, replica=False)
+            run(f'{profile} replica', base_config, directory, replica=True)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
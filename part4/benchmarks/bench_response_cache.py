@@ -0,0 +1,122 @@
+"""
+Benchmark: latency of the public GET endpoints with and without the
+response cache (see app/api/response_cache.py), under a read-mostly load.
+
+Reader threads send anonymous GET /places/<id>, GET /places/<id>/reviews,
+GET /places/?limit=20 and GET /amenities/ for DURATION seconds, the places
+being picked with a skewed distribution (a few popular places, a long tail),
+while a writer updates one review every WRITE_INTERVAL seconds through the
+facade, which drops the cached responses built from it. The first WARMUP
+seconds are not measured (steady state of the cache). Reported per setup:
+reads per second, p50, p90 and p99 latency, and for the cache its hit
+ratio, invalidations and size over the measured period. A percentile falls
+on a hit only while the share of misses stays below its tail: with more
+than 1% of misses, the p99 of the cached setup is still the time of a miss.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_response_cache
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.common import BenchmarkConfig, make_app, seed
+from app import db
+from app.services import facade
+
+READERS = 4
+WARMUP = 2.0
+DURATION = 10.0
+WRITE_INTERVAL = 0.2
+# Lieux lus (les autres ne sont jamais demandés)
+POPULAR = 100
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def urls(ids):
+    """ Return the URLs read and their weights (1/rank for the places) """
+    places = ids['places'][:POPULAR]
+    paths, weights = ['/api/v1/places/?limit=20', '/api/v1/amenities/'], [20.0, 10.0]
+    for rank, place_id in enumerate(places, 1):
+        paths += [f'/api/v1/places/{place_id}', f'/api/v1/places/{place_id}/reviews']
+        weights += [10.0 / rank] * 2
+    return paths, weights
+
+
+def reader(app, paths, weights, stop, latencies):
+    client = app.test_client()
+    while not stop.is_set():
+        path = random.choices(paths, weights)[0]
+        start = time.perf_counter()
+        client.get(path)
+        latencies.append(time.perf_counter() - start)
+
+
+def writer(app, review_ids, stop):
+    with app.app_context():
+        while not stop.wait(WRITE_INTERVAL):
+            facade.update_review(random.choice(review_ids), {'text': f'Updated {time.time()}'})
+            db.session.remove()
+
+
+def run(label, cache_size, path):
+    app = make_app(type('ResponseCacheBenchmarkConfig', (BenchmarkConfig,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path, 'RESPONSE_CACHE_SIZE': cache_size}))
+    with app.app_context():
+        ids = seed(users=200, places=2000, reviews_per_place=5)
+    paths, weights = urls(ids)
+    # Avis des lieux lus, pour que les écritures invalident des réponses en cache
+    review_ids = ids['reviews'][:POPULAR * 5]
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(READERS)]
+    threads = [threading.Thread(target=reader, args=(app, paths, weights, stop, latencies[i]))
+               for i in range(READERS)]
+    threads.append(threading.Thread(target=writer, args=(app, review_ids, stop)))
+    for thread in threads:
+        thread.start()
+    time.sleep(WARMUP)
+    # Début de la mesure : latences et compteurs du cache d'après la mise en route
+    skipped = [len(thread_latencies) for thread_latencies in latencies]
+    before = app.extensions['response_cache'].stats()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    reads = [latency for thread_latencies, start in zip(latencies, skipped) for latency in thread_latencies[start:]]
+    stats = app.extensions['response_cache'].stats()
+    hits, misses = (stats[name] - before[name] for name in ('hits', 'misses'))
+    stats['hit_ratio'] = hits / (hits + misses) if hits + misses else 0
+    stats['invalidations'] -= before['invalidations']
+    cache = (f"{stats['hit_ratio']:9.2f} {stats['invalidations']:13} {stats['size']:6}"
+             if cache_size else f"{'-':>9} {'-':>13} {'-':>6}")
+    print(f"{label:10} {len(reads) / DURATION:8.0f} {percentile(reads, 0.5) * 1000:8.2f} "
+          f"{percentile(reads, 0.9) * 1000:8.2f} {percentile(reads, 0.99) * 1000:8.2f} {cache}")
+    with app.app_context():
+        db.engine.dispose()
+
+
+def main():
+    print(f"{READERS} reader threads for {DURATION:.0f} s (after {WARMUP:.0f} s of warm-up), "
+          f"1 review updated every {WRITE_INTERVAL * 1000:.0f} ms")
+    print(f"{'setup':10} {'reads/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'hit ratio':>9} {'invalidations':>13} {'size':>6}")
+    for label, cache_size in (('uncached', 0), ('cached', 4096)):
+        directory = tempfile.mkdtemp()
+        try:
+            run(label, cache_size, os.path.join(directory, 'response_cache.db'))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: write throughput of the sqlite-sharded backend with 1, 2, 4 and
+8 shards.
+
+WRITERS threads create places through the facade at the same time, each
+place in its own transaction (one commit, so one fsync, per place). The
+owners are spread over every shard. With one shard every commit waits for
+the lock of the same database file; with N shards the writers of different
+owners commit to different files in parallel.
+
+The databases are files in a temporary directory, with the default SQLite
+settings (rollback journal, synchronous=FULL): the cost measured is the one
+of the commits, which is what sharding spreads.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_sharding
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import BenchmarkConfig, make_app, seed
+from app import db
+from app.services import facade
+
+WRITERS = 16
+PLACES_PER_WRITER = 25
+SHARD_COUNTS = (1, 2, 4, 8)
+
+
+def run(shards):
+    directory = tempfile.mkdtemp()
+    try:
+        app = make_app(type('ShardingBenchmarkConfig', (BenchmarkConfig,), {
+            'PERSISTENCE_BACKEND': 'sqlite-sharded',
+            'SHARD_COUNT': shards,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directory, 'global.db')}))
+        with app.app_context():
+            owners = seed(users=WRITERS * 4, places=0, reviews_per_place=0, amenities=0)['users']
+
+        def writer(index):
+            with app.app_context():
+                for i in range(PLACES_PER_WRITER):
+                    facade.create_place({
+                        'title': f'Place {index}-{i}', 'description': 'Sharded write', 'price': 10.0,
+                        'latitude': 1.0, 'longitude': 1.0,
+                        'owner_id': owners[(index + i * WRITERS) % len(owners)]})
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=WRITERS) as pool:
+            list(pool.map(writer, range(WRITERS)))
+        elapsed = time.perf_counter() - start
+
+        with app.app_context():
+            stored = len(facade.place_repo.get_all())
+            for engine in db.engines.values():
+                engine.dispose()
+        assert stored == WRITERS * PLACES_PER_WRITER
+        return stored / elapsed
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    print(f"{WRITERS} writer threads, {WRITERS * PLACES_PER_WRITER} places, one commit per place")
+    print(f"{'shards':>6} {'places/s':>10} {'speedup':>8}")
+    baseline = None
+    for shards in SHARD_COUNTS:
+        throughput = run(shards)
+        baseline = baseline or throughput
+        print(f"{shards:>6} {throughput:10.0f} {throughput / baseline:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
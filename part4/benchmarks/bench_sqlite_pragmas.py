@@ -0,0 +1,103 @@
+"""
+Benchmark: mixed read/write load on a SQLite file, with the default
+settings (rollback journal, synchronous=FULL) and with the PRAGMA settings
+of ProductionConfig (WAL, synchronous=NORMAL, mmap, cache, busy timeout).
+
+Reader threads look up places and their reviews by id while writer threads
+insert amenities, one transaction per row, for DURATION seconds. Reported:
+operations per second and the 99th percentile latency of each kind.
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_sqlite_pragmas
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.common import BenchmarkConfig, make_app, new_id, seed
+import config
+from app import db
+from app.models import Amenity
+
+READERS = 4
+WRITERS = 2
+DURATION = 3.0
+
+READ = 'SELECT id, title, _price FROM places WHERE id = ?'
+READ_REVIEWS = 'SELECT id, rating FROM reviews WHERE place_id = ? ORDER BY created_at, id LIMIT 10'
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def worker(engine, stop, latencies, write, place_ids):
+    """ Run reads or writes until stop is set, recording each latency """
+    insert = Amenity.__table__.insert()
+    with engine.connect() as connection:
+        while not stop.is_set():
+            start = time.perf_counter()
+            if write:
+                now = datetime.now()
+                with connection.begin():
+                    connection.execute(insert, {'id': new_id(), 'name': 'Bench',
+                                                'created_at': now, 'updated_at': now})
+            else:
+                place_id = random.choice(place_ids)
+                connection.exec_driver_sql(READ, (place_id,)).fetchall()
+                connection.exec_driver_sql(READ_REVIEWS, (place_id,)).fetchall()
+                connection.rollback()
+            latencies.append(time.perf_counter() - start)
+
+
+def run(label, base_config, path):
+    profile = type('PragmaBenchmarkConfig', (base_config,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'PERSISTENCE_BACKEND': 'sqlite', 'DEBUG': False})
+    app = make_app(profile)
+    with app.app_context():
+        ids = seed(users=20, places=2000, reviews_per_place=5)
+        engine = db.engine
+        stop = threading.Event()
+        reads = [[] for _ in range(READERS)]
+        writes = [[] for _ in range(WRITERS)]
+        threads = [threading.Thread(target=worker, args=(engine, stop, latencies, False, ids['places']))
+                   for latencies in reads]
+        threads += [threading.Thread(target=worker, args=(engine, stop, latencies, True, ids['places']))
+                    for latencies in writes]
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        journal = engine.connect().exec_driver_sql('PRAGMA journal_mode').scalar()
+        engine.dispose()
+
+    reads = [value for latencies in reads for value in latencies]
+    writes = [value for latencies in writes for value in latencies]
+    print(f"{label:12} {journal:>8} {len(reads) / DURATION:10.0f} {percentile(reads, 0.99) * 1000:12.2f} "
+          f"{len(writes) / DURATION:11.0f} {percentile(writes, 0.99) * 1000:13.2f}")
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"{READERS} readers, {WRITERS} writers, {DURATION:.0f} s")
+        print(f"{'profile':12} {'journal':>8} {'reads/s':>10} {'read p99 ms':>12} {'writes/s':>11} {'write p99 ms':>13}")
+        # Base de référence : aucun PRAGMA, comme DevelopmentConfig
+        run('default', BenchmarkConfig, os.path.join(directory, 'default.db'))
+        run('production', config.ProductionConfig, os.path.join(directory, 'production.db'))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: write throughput and COMMITs per logical operation on a SQLite
+file, before and after the unit of work.
+
+Scenarios:
+- update, legacy pattern : repository update committing, re-read of the
+  expired row, second commit (what update_user/update_review used to do).
+- update, unit of work   : facade.update_review (one commit).
+- create, one unit of work per write : facade.create_amenity in a loop.
+- create, grouped        : the same writes, 100 per facade.transaction().
+
+Usage (from the part4 directory):
+
+    python -m benchmarks.bench_unit_of_work [N]
+"""
+
+import os
+import sys
+import tempfile
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Review
+from app.services import facade
+from benchmarks.common import BenchmarkConfig, make_app, seed, timed
+
+
+def main(count=1000):
+    directory = tempfile.mkdtemp()
+
+    class FileConfig(BenchmarkConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(directory, 'bench.db')
+
+    app = make_app(FileConfig)
+    with app.app_context():
+        ids = seed(users=10, places=count // 5 + 1, reviews_per_place=5)
+        review_ids = ids['reviews'][:count]
+        commits = []
+        event.listen(db.engine, 'commit', lambda conn: commits.append(1))
+
+        def legacy_update():
+            for i, review_id in enumerate(review_ids):
+                review = db.session.get(Review, review_id)
+                review.text = f'Legacy {i}'
+                db.session.commit()
+                db.session.get(Review, review_id).text
+                db.session.commit()
+                db.session.remove()
+
+        def uow_update():
+            for i, review_id in enumerate(review_ids):
+                facade.update_review(review_id, {'text': f'Unit of work {i}'})
+                db.session.remove()
+
+        def create_each():
+            for i in range(count):
+                facade.create_amenity({'name': f'Single {i}'})
+            db.session.remove()
+
+        def create_grouped():
+            for start in range(0, count, 100):
+                with facade.transaction():
+                    for i in range(start, min(start + 100, count)):
+                        facade.create_amenity({'name': f'Grouped {i}'})
+            db.session.remove()
+
+        print(f"{count} writes on {FileConfig.SQLALCHEMY_DATABASE_URI}")
+        print(f"{'scenario':34} {'writes/s':>9} {'commits/write':>14}")
+        for label, scenario in (('update, legacy pattern', legacy_update),
+                                ('update, unit of work', uow_update),
+                                ('create, one unit of work per write', create_each),
+                                ('create, 100 writes per unit of work', create_grouped)):
+            commits.clear()
+            elapsed = timed(scenario)
+            print(f"{label:34} {count / elapsed:9.0f} {len(commits) / count:14.2f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,132 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Provides:
+- BenchmarkConfig: configuration using an in-memory SQLite database.
+- make_app(): create the Flask application with BenchmarkConfig.
+- seed(): insert users, amenities, places and reviews with bulk INSERTs
+  (the ORM constructors hash passwords with bcrypt, far too slow to seed
+  thousands of rows).
+- QueryCounter: context manager counting the SQL statements executed.
+- timed(): run a function several times and return the elapsed seconds.
+
+The scripts are run from the part4 directory, for example:
+
+    python -m benchmarks.bench_entity_cache
+"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+import config
+from app import create_app, db
+from app.models.identifiers import new_id as model_id
+
+
+class BenchmarkConfig(config.TestingConfig):
+    """ Test settings (throw-away in-memory database) without debug mode """
+    DEBUG = False
+    TESTING = False
+    # seed() écrit directement dans les tables : backend SQL quel que soit HBNB_PERSISTENCE
+    PERSISTENCE_BACKEND = 'sqlite'
+
+
+def make_app(config_class=BenchmarkConfig):
+    """ Create the application for a benchmark """
+    return create_app(config_class)
+
+
+def new_id():
+    """ Return a new primary key, in the ID_FORMAT of the current application """
+    return model_id()
+
+
+def seed(users=10, places=100, reviews_per_place=5, amenities=10):
+    """
+    Insert rows directly in the tables and return their ids as a dictionary
+    with the keys 'users', 'places', 'reviews' and 'amenities'.
+    Must be called inside an application context.
+    """
+    from app.models import User, Place, Review, Amenity
+    from app.models.association_tables import place_amenity
+
+    now = datetime.now()
+    ids = {'users': [], 'places': [], 'reviews': [], 'amenities': []}
+
+    user_rows = []
+    for i in range(users):
+        ids['users'].append(new_id())
+        user_rows.append({
+            'id': ids['users'][-1], 'created_at': now, 'updated_at': now,
+            'first_name': 'Bench', 'last_name': 'User',
+            'email': f'bench{i}@example.com', 'password': 'x', 'is_admin': False
+        })
+
+    amenity_rows = []
+    for i in range(amenities):
+        ids['amenities'].append(new_id())
+        amenity_rows.append({'id': ids['amenities'][-1], 'created_at': now,
+                             'updated_at': now, 'name': f'Amenity {i}'})
+
+    place_rows, link_rows = [], []
+    for i in range(places):
+        ids['places'].append(new_id())
+        place_rows.append({
+            'id': ids['places'][-1], 'created_at': now, 'updated_at': now,
+            'title': f'Place {i}', 'description': 'A place to stay ' * 20,
+            '_price': float(10 + i % 300), '_latitude': -60 + (i % 120),
+            '_longitude': -170 + (i % 340), 'owner_id': ids['users'][i % users]
+        })
+        for amenity_id in ids['amenities'][:3]:
+            link_rows.append({'place_id': ids['places'][-1], 'amenity_id': amenity_id})
+
+    review_rows = []
+    for place_index, place_id in enumerate(ids['places']):
+        for j in range(reviews_per_place):
+            ids['reviews'].append(new_id())
+            review_rows.append({
+                'id': ids['reviews'][-1], 'created_at': now, 'updated_at': now,
+                'text': 'Nice stay', 'rating': 1 + j % 5,
+                'user_id': ids['users'][(place_index + j + 1) % users],
+                'place_id': place_id
+            })
+
+    for table, rows in ((User.__table__, user_rows), (Amenity.__table__, amenity_rows),
+                        (Place.__table__, place_rows), (place_amenity, link_rows),
+                        (Review.__table__, review_rows)):
+        if rows:
+            db.session.execute(table.insert(), rows)
+    db.session.commit()
+    return ids
+
+
+class QueryCounter:
+    """ Count the SQL statements sent to the engine inside a with block """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.engine = self.engine or db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+def timed(func, repeat=1):
+    """ Call func 'repeat' times and return the elapsed time in seconds """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return time.perf_counter() - start
@@ -4,6 +4,24 @@ Configuration module for the Flask application.
 Defines base configuration class 'Config' with common settings, including:
 - SECRET_KEY fetched from environment variable or defaulted.
 - DEBUG flag set to False for production.
+- Default and maximum page sizes for the cursor-paginated list endpoints.
+- Maximum number of items accepted by the batch creation endpoints.
+- Encoder of the JSON responses (JSON_ENCODER: 'orjson' or 'json'), read
+  from HBNB_JSON_ENCODER.
+- Compression of the responses (COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE,
+  COMPRESSION_LEVELS, COMPRESSION_CACHE_SIZE, COMPRESSION_CACHE_MAX_BYTES,
+  COMPRESSION_CACHE_MAX_BODY), see app/api/compression.py.
+- Cache of the responses of the public GET endpoints (RESPONSE_CACHE_SIZE,
+  RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL), see app/api/response_cache.py.
+- Connection pool settings (size, overflow, timeout, recycle, pre-ping),
+  read from DB_POOL_* environment variables.
+- Optional read replica (READ_REPLICA_URI) receiving the read-only facade
+  calls, and the interval of its in-process refresh.
+- Persistence backend of the repositories ('sqlite', 'sqlite-memory',
+  'memory' or 'sqlite-sharded'), read from the HBNB_PERSISTENCE environment
+  variable, and the number of shards of 'sqlite-sharded' (HBNB_SHARDS).
+- Format of the primary keys (ID_FORMAT: 'uuid4', 'uuid7' or 'uuid7-binary'),
+  read from HBNB_ID_FORMAT.
 
 Defines 'DevelopmentConfig' class that inherits from 'Config' and overrides/adds:
 - DEBUG mode enabled for detailed error output during development.
@@ -11,6 +29,14 @@ Defines 'DevelopmentConfig' class that inherits from 'Config' and overrides/adds
 - SQLAlchemy tracking disabled to save resources.
 - JWT access token expiration set to 1 day.
 
+Defines 'ProductionConfig' class that inherits from 'Config' and uses a SQLite
+file tuned with connection-time PRAGMA settings (WAL journal, synchronous=NORMAL,
+memory-mapped reads, larger page cache, busy timeout, temporary tables in memory).
+
+Defines 'TestingConfig' class that inherits from 'DevelopmentConfig' and uses
+a throw-away in-memory SQLite database for the unit tests, without the
+response cache.
+
 Also provides a 'config' dictionary to select the configuration class based on the environment.
 """
 import os
@@ -31,6 +57,59 @@ class Config:
 # Il affiche juste un message générique : "Une erreur est survenue" (ou une page 500).
 # Cela protège tes données sensibles, ton code source et empêche les pirates de comprendre la structure de ton app.
 # alors que le debug True est plus utilisé dans un cadre de développement sans de grosse sécurité
+    PAGINATION_DEFAULT_LIMIT = 100
+    PAGINATION_MAX_LIMIT = 1000
+# Nombre d'éléments renvoyés par défaut (et au maximum) par les endpoints de liste,
+# pour que le coût d'une page reste constant quelle que soit la taille des tables
+    BATCH_MAX_ITEMS = 1000
+# Nombre maximum d'éléments acceptés par les endpoints de création en lot (/batch)
+    FIELDSET_MAX_DEPTH = 3
+# Profondeur maximale de ?include= (places.reviews.user = 3 niveaux), voir app/api/v1/fieldsets.py
+    JSON_ENCODER = os.getenv('HBNB_JSON_ENCODER', 'orjson')
+# Encodeur JSON des réponses : 'orjson' (rapide, repli sur json s'il n'est pas installé)
+# ou 'json' (bibliothèque standard), voir app/api/representations.py
+    COMPRESSION_ENCODINGS = tuple(
+        name for name in os.getenv('HBNB_COMPRESSION', 'zstd,gzip').split(',') if name)
+    COMPRESSION_MIN_SIZE = int(os.getenv('HBNB_COMPRESSION_MIN_SIZE', '1024'))
+    COMPRESSION_LEVELS = {'zstd': 3, 'gzip': 6}
+    COMPRESSION_CACHE_SIZE = 256
+    COMPRESSION_CACHE_MAX_BYTES = int(os.getenv('HBNB_COMPRESSION_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+    COMPRESSION_CACHE_MAX_BODY = int(os.getenv('HBNB_COMPRESSION_CACHE_MAX_BODY', str(1024 * 1024)))
+# Compression des réponses : encodages proposés par ordre de préférence (zstd seulement
+# si zstandard est installé, vide = désactivée), taille minimale d'un corps compressé,
+# niveau de chaque encodage, nombre et octets de corps compressés gardés en cache, et
+# taille au-delà de laquelle un corps est compressé sans être gardé
+    RESPONSE_CACHE_SIZE = int(os.getenv('HBNB_RESPONSE_CACHE_SIZE', '1024'))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('HBNB_RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL = float(os.getenv('HBNB_RESPONSE_CACHE_TTL', '60'))
+# Cache des réponses des GET publics (lieux, avis d'un lieu, amenities) : nombre de réponses
+# et octets gardés au plus (0 = désactivé), et durée de vie d'une réponse en secondes.
+# Chaque processus a son cache : la durée de vie borne le retard sur les écritures des autres
+    PERSISTENCE_BACKEND = os.getenv('HBNB_PERSISTENCE', 'sqlite')
+# Stockage des repositories : 'sqlite' (base de SQLALCHEMY_DATABASE_URI),
+# 'sqlite-memory' (base SQLite en mémoire), 'memory' (dictionnaires Python, sans base)
+# ou 'sqlite-sharded' (lieux et avis répartis sur plusieurs bases SQLite)
+    SHARD_COUNT = int(os.getenv('HBNB_SHARDS', '4'))
+# Nombre de bases de 'sqlite-sharded' ; leurs fichiers sont nommés d'après la base
+# principale (hbnb.db -> hbnb-shard0.db, hbnb-shard1.db, ...)
+    ID_FORMAT = os.getenv('HBNB_ID_FORMAT', 'uuid4')
+# Clés primaires : 'uuid4' (aléatoires, texte), 'uuid7' (ordonnées dans le temps, texte)
+# ou 'uuid7-binary' (ordonnées, 16 octets) ; voir app/models/identifiers.py
+    SQLALCHEMY_POOL_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '3600')),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    }
+# Pool de connexions : connexions gardées ouvertes, connexions supplémentaires permises,
+# attente maximale d'une connexion libre (s), durée de vie d'une connexion (s) et
+# vérification de la connexion avant usage. Ignoré pour une base SQLite en mémoire.
+    READ_REPLICA_URI = os.getenv('HBNB_READ_REPLICA_URI')
+    READ_REPLICA_SYNC_INTERVAL = float(os.getenv('HBNB_READ_REPLICA_SYNC_INTERVAL', '0'))
+# Réplica SQLite (fichier) pour les lectures des GET ; None = tout sur la base principale.
+# Si l'intervalle est > 0, l'application recopie elle-même la base principale dans le
+# réplica (API backup de SQLite) ; sinon la réplication est assurée à l'extérieur.
 
 
 class DevelopmentConfig(Config):
@@ -53,8 +132,52 @@ class DevelopmentConfig(Config):
     # Expiration du token JWT fixée à 1 jour
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
 
+
+class ProductionConfig(Config):
+    """
+    Configuration class used in production.
+
+    - DEBUG stays disabled.
+    - The SQLite file comes from DATABASE_URL (production.db by default).
+    - SQLITE_PRAGMAS are run on every new connection (see
+      app/persistence/sqlite_pragmas.py) and can be checked with
+      GET /api/v1/admin/database.
+    """
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    SQLITE_PRAGMAS = {
+        # Attend jusqu'à 5 s qu'un verrou se libère au lieu d'échouer avec "database is locked"
+        'busy_timeout': 5000,
+        # Journal WAL : les lectures ne sont plus bloquées par une écriture en cours
+        'journal_mode': 'WAL',
+        # En WAL, NORMAL ne fait plus de fsync à chaque commit mais reste cohérent après un crash
+        'synchronous': 'NORMAL',
+        # Lectures par mmap (256 Mo) plutôt que par appels read()
+        'mmap_size': 268435456,
+        # Cache de pages de 64 Mo par connexion (valeur négative = en Kio)
+        'cache_size': -64000,
+        # Tables et index temporaires (tris, GROUP BY) en mémoire
+        'temp_store': 'MEMORY',
+    }
+
+
+class TestingConfig(DevelopmentConfig):
+    """
+    Configuration class used by the unit tests.
+
+    Same settings as development, but with an in-memory SQLite database
+    created empty for each application instance.
+    """
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # Les tests comptent les requêtes SQL de chaque GET : pas de réponse servie du cache
+    RESPONSE_CACHE_SIZE = 0
+
     # Dictionnaire permettant de choisir la configuration selon l'environnement
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
     'default': DevelopmentConfig
 }
@@ -6,6 +6,24 @@ Loads and executes all unit tests from the specified test modules:
 - tests.test_amenities
 - tests.test_places
 - tests.test_reviews
+- tests.test_query_plans
+- tests.test_repository_conformance
+- tests.test_sqlite_pragmas
+- tests.test_pool
+- tests.test_read_replica
+- tests.test_async_stack
+- tests.test_rating_aggregates
+- tests.test_sharding
+- tests.test_identifiers
+- tests.test_place_amenities
+- tests.test_eager_loading
+- tests.test_fieldsets
+- tests.test_json_output
+- tests.test_compression
+- tests.test_conditional_get
+- tests.test_response_cache
+- tests.test_place_search
+- tests.test_schema_upgrade
 
 Uses unittest framework with verbosity level 2.
 """
@@ -18,7 +36,25 @@ tests = [
     "tests.test_users",
     "tests.test_amenities",
     "tests.test_places",
-    "tests.test_reviews"
+    "tests.test_reviews",
+    "tests.test_query_plans",
+    "tests.test_repository_conformance",
+    "tests.test_sqlite_pragmas",
+    "tests.test_pool",
+    "tests.test_read_replica",
+    "tests.test_async_stack",
+    "tests.test_rating_aggregates",
+    "tests.test_sharding",
+    "tests.test_identifiers",
+    "tests.test_place_amenities",
+    "tests.test_eager_loading",
+    "tests.test_fieldsets",
+    "tests.test_json_output",
+    "tests.test_compression",
+    "tests.test_conditional_get",
+    "tests.test_response_cache",
+    "tests.test_place_search",
+    "tests.test_schema_upgrade"
 ]
 
 for test in tests:
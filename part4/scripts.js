@@ -150,29 +150,57 @@ document.addEventListener('DOMContentLoaded', () => {
 /*---------------------------------------------------------------------------*/
 /*------------------------------List Place-----------------------------------*/
 /*---------------------------------------------------------------------------*/
+/**
+* Retrieves every page of a cursor-paginated list endpoint of the API.
+* Each page sends the URL of the next one in its Link header (rel="next"),
+* absent on the last page: the pages are requested until it disappears.
+*
+* @param {string} url - URL of the first page
+* @param {Object} [options] - Options of fetch (headers...)
+* @returns {Promise<Array|undefined>} A promise that resolves to the items of all the pages, otherwise undefined
+*/
+async function fetchAllPages(url, options) {
+    const items = [];
+    while (url) {
+        const response = await fetch(url, options);
+        if (!response.ok) {
+            console.error("Error retrieving", url, response.status);   // En cas d'erreur sur une page
+            return undefined;
+        }
+        items.push(...await response.json());                         // Ajoute les éléments de la page
+        const link = response.headers.get('Link');                     // Page suivante, absente sur la dernière
+        const next = link && link.match(/<([^>]+)>;\s*rel="next"/);
+        url = next ? next[1] : null;
+    }
+    return items;
+}
+
 /**
 * Retrieves the list of locations from the API using an authentication token.
+* With a maximum price, the locations are filtered by the server
+* (GET /places/search): only the matching ones are sent.
+* The API returns the places by pages (100 by default): every page is fetched.
 *
 * @param {string} token - The JWT token for authentication
+* @param {number} [maxPrice] - Maximum price per night, all the locations when omitted
 * @returns {Promise<Array|undefined>} A promise that resolves to an array of locations if the request succeeds, otherwise undefined
 */
-async function fetchPlaces(token) {
+async function fetchPlaces(token, maxPrice) {
     console.log("Je vais chercher les places...");
-    const response = await fetch("http://localhost:5000/api/v1/places", {   // Requête GET vers l'API des lieux
+    const url = maxPrice === undefined
+        ? "http://localhost:5000/api/v1/places/?limit=1000"                                     // tous les lieux, pages de 1000
+        : `http://localhost:5000/api/v1/places/search?max_price=${maxPrice}&limit=1000`;       // filtrés par l'API
+    const data = await fetchAllPages(url, {             // Requêtes GET vers l'API des lieux, page après page
         method: 'GET',
         headers: {
             'Content-Type': 'application/json',
             'Authorization': `Bearer ${token}`          // Envoi du token dans l'en-tête Authorization
         },
     });
-
-    if (response.ok) {
-        const data = await response.json();             // Si tout va bien, on récupère les données JSON
+    if (data) {
         console.log("Lieux récupérés :", data);         // Log des lieux
-        return data;                                    // On retourne les données
-    } else {
-        console.error("Error retrieving locations:", response.status);      // En cas d'erreur
     }
+    return data;                                        // On retourne les données
 }
 
 
@@ -218,6 +246,11 @@ function displayPlaces(places) {
         const price = document.createElement('p');              //créer un paragraphe pour le prix
         price.textContent = `Price by night: ${place.price} €`; // affiche le prix
 
+        const ratingLine = document.createElement('p');         // note moyenne, lue dans les agrégats du lieu (sans charger les avis)
+        ratingLine.innerHTML = place.review_count
+            ? `${displayStars(Math.round(place.average_rating))} (${place.review_count})`
+            : 'No reviews yet';
+
         const viewButton = document.createElement('button');    // créer un bouton
         viewButton.textContent = 'View détail';                 // texte du bouton
         viewButton.classList.add('details-button-index');       // Applique mon style css
@@ -231,6 +264,7 @@ function displayPlaces(places) {
         placeDiv.appendChild(image);        // ajoute les éléments au div
         placeDiv.appendChild(title);
         placeDiv.appendChild(price);
+        placeDiv.appendChild(ratingLine);
         placeDiv.appendChild(viewButton);
 
         placesList.appendChild(placeDiv);                 // Ajoute le div au conteneur principal
@@ -247,9 +281,9 @@ function displayPlaces(places) {
 * How it works:
 * - Waits for the DOM to fully load.
 * - Dynamically inserts options into the price filter.
-* - Filters the displayed locations based on the selected value.
+* - Asks the API for the locations matching the selected value
+*   (GET /places/search?max_price=) and displays them.
 *
-* Locations must have the `data-price` attribute specified in their HTML tag.
 * Encoding: UTF-8
 */
 document.addEventListener('DOMContentLoaded', () => {               //une fois le DOM chargé, on exécute
@@ -273,15 +307,11 @@ document.addEventListener('DOMContentLoaded', () => {               //une fois l
 
     priceFilter.addEventListener('change', () => {                              // écoute si changement de valeur du filtre par l'utilisateur
         const selected = priceFilter.value;                                     // récupère la valeur
-        const maxPrice = selected === 'all' ? Infinity : parseInt(selected);    // convertir la veleur en nombre, et all = infini
-
-        document.querySelectorAll('.place-list-index').forEach(placeCard => {   // parcourt tous les lieux
-            const price = parseInt(placeCard.getAttribute('data-price'));       // récup le prix de la place grâce à l'attribut data
-            if (price <= maxPrice) {
-                placeCard.style.display = 'block';                              // affiche le lieu si correspond au filtre
-            } else {
-                placeCard.style.display = 'none';                               // ne l'affiche pas dans le cas contraire
-            }
+        const maxPrice = selected === 'all' ? undefined : parseInt(selected);   // convertir la valeur en nombre, all = pas de filtre
+
+        fetchPlaces(getCookie('token'), maxPrice).then(places => {             // le serveur ne renvoie que les lieux du filtre
+            if (places) displayPlaces(places);
+            else console.error("no location found or received");
         });
     });
 });
@@ -656,9 +686,9 @@ function gestionResponse(response) {                    // Fonction pour gérer
 * displays an error message in the console.
 */
 function loadReviews(placeId) {                                         // Fonction qui charge et affiche les avis pour un lieu donné
-    fetch(`http://localhost:5000/api/v1/places/${placeId}/reviews`)     // Envoie une requête GET à l'API pour récupérer les avis du lieu
-        .then(response => response.json())                              // Convertit la réponse HTTP en objet JSON
-        .then(data => {                                                 // Quand les données JSON sont reçues
+    fetchAllPages(`http://localhost:5000/api/v1/places/${placeId}/reviews?limit=1000`)  // Récupère tous les avis du lieu, page après page
+        .then(data => {                                                 // Quand toutes les pages sont reçues
+            if (!data) return;                                          // Erreur déjà affichée dans la console
             const reviewContainer = document.getElementById('reviews'); // Récupère l'élément HTML où afficher les avis
             reviewContainer.innerHTML = '';                             // Vide ce conteneur pour réinitialiser l'affichage
 
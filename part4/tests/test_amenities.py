@@ -61,5 +61,32 @@ class TestAmenityEndpoints(unittest.TestCase):
         response = self.client.put(f'/api/v1/amenities/{amenity_id}', json={"name": ""})
         self.assertEqual(response.status_code, 400)
 
+    def test_09_get_amenities_paginated(self):
+        first = self.client.get('/api/v1/amenities/?limit=2')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.get_json()), 2)
+        cursor = first.headers.get('X-Next-Cursor')
+        self.assertIsNotNone(cursor)
+
+        second = self.client.get(f'/api/v1/amenities/?limit=2&cursor={cursor}')
+        self.assertEqual(second.status_code, 200)
+        first_ids = {a['id'] for a in first.get_json()}
+        second_ids = {a['id'] for a in second.get_json()}
+        self.assertTrue(second_ids)
+        self.assertFalse(first_ids & second_ids)
+
+    def test_10_get_amenities_invalid_limit(self):
+        response = self.client.get('/api/v1/amenities/?limit=0')
+        self.assertEqual(response.status_code, 400)
+
+    def test_11_get_amenity_after_update(self):
+        amenity_id = self.amenity_ids[2]
+        # Le premier GET place l'amenity dans le cache
+        self.assertEqual(self.client.get(f'/api/v1/amenities/{amenity_id}').get_json()['name'], 'Parking')
+        response = self.client.put(f'/api/v1/amenities/{amenity_id}', json={"name": "Garage"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/v1/amenities/{amenity_id}')
+        self.assertEqual(response.get_json()['name'], 'Garage')
+
 if __name__ == '__main__':
     unittest.main()
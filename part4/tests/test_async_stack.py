@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+import config
+from app import create_app, db
+from app.asgi import create_asgi_app
+from app.models import User, Place, Review, Amenity
+from app.models.association_tables import place_amenity
+
+
+def call(application, path, query_string=b'', extra_headers=(), method='GET'):
+    """ Send one HTTP request to an ASGI application and return (status, headers, body) """
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query_string,
+             'scheme': 'http', 'root_path': '', 'headers': [(b'host', b'localhost'), *extra_headers]}
+    asyncio.run(application(scope, receive, send))
+    start, body = messages
+    headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], headers, json.loads(body['body']) if body['body'] else None
+
+
+class TestAsyncStack(unittest.TestCase):
+    """ The async endpoints answer exactly like the Flask resources """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        file_config = type('AsyncConfig', (config.TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(cls.directory, 'async.db'),
+            'PERSISTENCE_BACKEND': 'sqlite'})
+        cls.app = create_app(file_config)
+        cls.client = cls.app.test_client()
+
+        now = datetime.now()
+        cls.owner_id, cls.place_id, cls.amenity_id = (str(uuid.uuid4()) for _ in range(3))
+        guests = [str(uuid.uuid4()) for _ in range(3)]
+        with cls.app.app_context():
+            db.session.execute(User.__table__.insert(), [
+                {'id': user_id, 'first_name': 'User', 'last_name': str(i), 'email': f'user{i}@async.io',
+                 'password': 'x', 'is_admin': False, 'created_at': now, 'updated_at': now}
+                for i, user_id in enumerate([cls.owner_id] + guests)])
+            db.session.execute(Amenity.__table__.insert(), [
+                {'id': cls.amenity_id, 'name': 'WiFi', 'created_at': now, 'updated_at': now}])
+            db.session.execute(Place.__table__.insert(), [
+                {'id': cls.place_id, 'title': 'Async', 'description': 'Loop', '_price': 10.0,
+                 '_latitude': 1.0, '_longitude': 2.0, 'owner_id': cls.owner_id,
+                 'created_at': now, 'updated_at': now}])
+            db.session.execute(place_amenity.insert(), [
+                {'place_id': cls.place_id, 'amenity_id': cls.amenity_id}])
+            db.session.execute(Review.__table__.insert(), [
+                {'id': str(uuid.uuid4()), 'text': f'Review {i}', 'rating': 1 + i, 'user_id': user_id,
+                 'place_id': cls.place_id, 'created_at': now + timedelta(seconds=i), 'updated_at': now}
+                for i, user_id in enumerate(guests)])
+            db.session.commit()
+        # staticmethod : l'application ASGI ne doit pas devenir une méthode liée
+        cls.asgi = staticmethod(create_asgi_app(cls.app))
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run(cls.asgi.facade.close())
+        with cls.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        shutil.rmtree(cls.directory)
+
+    def assertSameResponse(self, path, query_string=''):
+        status, headers, body = call(self.asgi, path, query_string.encode())
+        expected = self.client.get(path + ('?' + query_string if query_string else ''))
+        self.assertEqual(status, expected.status_code)
+        self.assertEqual(body, expected.get_json())
+        for header in ('X-Next-Cursor', 'Link'):
+            self.assertEqual(headers.get(header.lower()), expected.headers.get(header))
+        return status, headers, body
+
+    def test_place_detail(self):
+        status, _, body = self.assertSameResponse(f'/api/v1/places/{self.place_id}')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['owner']['id'], self.owner_id)
+        self.assertEqual(len(body['reviews']), 3)
+        self.assertSameResponse(f'/api/v1/places/{uuid.uuid4()}')
+
+    def test_place_reviews_pages(self):
+        path = f'/api/v1/places/{self.place_id}/reviews'
+        _, headers, first = self.assertSameResponse(path, 'limit=2')
+        self.assertEqual([review['text'] for review in first], ['Review 0', 'Review 1'])
+        _, headers, rest = self.assertSameResponse(path, f"limit=2&cursor={headers['x-next-cursor']}")
+        self.assertEqual([review['text'] for review in rest], ['Review 2'])
+        self.assertNotIn('x-next-cursor', headers)
+        self.assertSameResponse(path, 'limit=0')
+        self.assertSameResponse(f'/api/v1/places/{uuid.uuid4()}/reviews')
+
+    def test_fields_and_include(self):
+        path = f'/api/v1/places/{self.place_id}'
+        _, _, body = self.assertSameResponse(path, 'fields=title,reviews.rating')
+        self.assertEqual(set(body), {'title', 'reviews'})
+        self.assertSameResponse(path, 'include=owner.secrets')
+        _, _, items = self.assertSameResponse(f'{path}/reviews', 'fields=text')
+        self.assertEqual(items[0], {'text': 'Review 0'})
+
+    def test_etag(self):
+        path = f'/api/v1/places/{self.place_id}'
+        status, headers, _ = call(self.asgi, path)
+        self.assertEqual(status, 200)
+        etag = headers['etag']
+        self.assertEqual(headers['cache-control'], 'no-cache')
+        status, headers, body = call(self.asgi, path, extra_headers=[(b'if-none-match', etag.encode())])
+        self.assertEqual((status, headers['etag'], body), (304, etag, None))
+        status, headers, _ = call(self.asgi, path, b'fields=title', [(b'if-none-match', etag.encode())])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers['etag'], etag)
+
+    def test_other_routes_are_not_served(self):
+        self.assertEqual(call(self.asgi, '/api/v1/users/')[0], 404)
+        self.assertEqual(call(self.asgi, f'/api/v1/places/{self.place_id}', method='DELETE')[0], 405)
+
+    def test_memory_database_is_refused(self):
+        with self.assertRaises(ValueError):
+            create_asgi_app(create_app(type('MemoryConfig', (config.TestingConfig,), {
+                'PERSISTENCE_BACKEND': 'sqlite'})))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import gzip
+import unittest
+
+from flask_jwt_extended import create_access_token
+
+import config
+from app import create_app
+from app.api import compression
+from app.api.compression import ResponseCompressor, available_encodings
+from app.services import facade
+
+
+class CompressionConfig(config.TestingConfig):
+    COMPRESSION_ENCODINGS = ('gzip',)
+    COMPRESSION_MIN_SIZE = 512
+
+
+class TestCompression(unittest.TestCase):
+    """ Responses are compressed according to Accept-Encoding and their size """
+
+    def setUp(self):
+        self.app = create_app(CompressionConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+        self.client = self.app.test_client()
+        self.compressor = self.app.extensions['compression']
+        for i in range(30):
+            facade.create_amenity({'name': f'Amenity {i}'})
+
+    def get(self, url, encoding=None):
+        headers = {'Accept-Encoding': encoding} if encoding is not None else {}
+        return self.client.get(url, headers=headers)
+
+    def test_large_response_is_compressed(self):
+        plain = self.get('/api/v1/amenities/')
+        response = self.get('/api/v1/amenities/', 'gzip, deflate')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(int(response.headers['Content-Length']), len(response.data))
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+    def test_not_compressed(self):
+        # Pas d'Accept-Encoding, gzip refusé, ou corps trop petit
+        for url, encoding in (('/api/v1/amenities/', None), ('/api/v1/amenities/', 'gzip;q=0, br'),
+                              ('/api/v1/amenities/?limit=1', 'gzip')):
+            response = self.get(url, encoding)
+            self.assertNotIn('Content-Encoding', response.headers, (url, encoding))
+            self.assertIn('Accept-Encoding', response.headers['Vary'], (url, encoding))
+        stats = self.compressor.stats()
+        self.assertEqual((stats['compressed'], stats['not_accepted'], stats['too_small']), (0, 2, 1))
+
+    def test_compressed_bodies_are_reused(self):
+        first = self.get('/api/v1/amenities/', 'gzip')
+        second = self.get('/api/v1/amenities/', 'gzip')
+        self.assertEqual(first.data, second.data)
+        stats = self.compressor.stats()
+        self.assertEqual((stats['cache']['misses'], stats['cache']['hits']), (1, 1))
+        self.assertEqual(stats['compressed'], 2)
+        self.assertLess(stats['ratio'], 1)
+
+    def test_admin_endpoint(self):
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+        user = create_access_token(identity={'id': 'user', 'is_admin': False})
+        response = self.client.get('/api/v1/admin/compression', headers={'Authorization': f'Bearer {user}'})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get('/api/v1/admin/compression', headers={'Authorization': f'Bearer {admin}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['encodings'], ['gzip'])
+
+
+class TestResponseCompressor(unittest.TestCase):
+
+    def test_levels(self):
+        body = b''.join(b'{"id": %d, "name": "Amenity"}, ' % i for i in range(2000))
+        fast = ResponseCompressor(('gzip',), levels={'gzip': 1}).compress(body, 'gzip')
+        best = ResponseCompressor(('gzip',), levels={'gzip': 9}).compress(body, 'gzip')
+        self.assertEqual(gzip.decompress(fast), body)
+        self.assertLess(len(best), len(fast))
+
+    def test_cache_is_bounded_in_bytes(self):
+        bodies = [b''.join(b'{"id": %d, "page": %d}, ' % (i, page) for i in range(2000)) for page in range(6)]
+        size = len(ResponseCompressor(('gzip',)).compress(bodies[0], 'gzip'))
+        compressor = ResponseCompressor(('gzip',), cache_max_bytes=3 * size + size // 2)
+        for body in bodies:
+            compressor.compress(body, 'gzip')
+        stats = compressor.stats()['cache']
+        self.assertLessEqual(stats['bytes'], 3 * size + size // 2)
+        self.assertEqual((stats['size'], stats['evictions']), (3, 3))
+        # Les plus récents restent, le plus ancien a été évincé
+        compressor.compress(bodies[-1], 'gzip')
+        compressor.compress(bodies[0], 'gzip')
+        self.assertEqual((compressor.cache.hits, compressor.cache.misses), (1, 7))
+
+    def test_large_bodies_are_not_cached(self):
+        body = b''.join(b'{"id": %d, "name": "Amenity"}, ' % i for i in range(2000))
+        compressor = ResponseCompressor(('gzip',), cache_max_body=len(body) - 1)
+        self.assertEqual(gzip.decompress(compressor.compress(body, 'gzip')), body)
+        compressor.compress(body, 'gzip')
+        stats = compressor.stats()
+        self.assertEqual((stats['not_cached'], stats['cache']['size'], stats['cache']['misses']), (2, 0, 0))
+        # Plus grand que tout le cache : compressé mais pas gardé
+        compressor = ResponseCompressor(('gzip',), cache_max_bytes=10)
+        compressor.compress(body, 'gzip')
+        self.assertEqual((compressor.cache.too_large, compressor.stats()['cache']['size']), (1, 0))
+
+    def test_encodings(self):
+        with self.assertRaises(ValueError):
+            ResponseCompressor(('gzip', 'lzma'))
+        # Sans zstandard, zstd n'est pas proposé
+        original = compression.zstandard
+        compression.zstandard = None
+        try:
+            self.assertEqual(ResponseCompressor(('zstd', 'gzip')).encodings, ('gzip',))
+        finally:
+            compression.zstandard = original
+
+    @unittest.skipUnless('zstd' in available_encodings(), 'zstandard is not installed')
+    def test_zstd_is_preferred(self):
+        app = create_app(type('ZstdConfig', (CompressionConfig,), {'COMPRESSION_ENCODINGS': ('zstd', 'gzip')}))
+        with app.app_context():
+            for i in range(30):
+                facade.create_amenity({'name': f'Amenity {i}'})
+            response = app.test_client().get('/api/v1/amenities/', headers={'Accept-Encoding': 'gzip, zstd'})
+        self.assertEqual(response.headers['Content-Encoding'], 'zstd')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+
+import config
+from app import create_app, db
+from app.persistence.query_plan import QueryRecorder
+from app.services import facade
+
+
+class ConditionalConfig(config.TestingConfig):
+    """ The versions are read from the SQL backend, whatever HBNB_PERSISTENCE says """
+    PERSISTENCE_BACKEND = 'sqlite'
+    COMPRESSION_ENCODINGS = ('gzip',)
+    COMPRESSION_MIN_SIZE = 64
+
+
+class TestConditionalGet(unittest.TestCase):
+    """ GET /places/ and GET /places/<place_id> send ETags and answer 304 """
+
+    def setUp(self):
+        self.app = create_app(ConditionalConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.client = self.app.test_client()
+        self.owner_id = self.new_user('Owner', 'owner@etag.io').id
+        self.guest_id = self.new_user('Guest', 'guest@etag.io').id
+        self.amenity_id = facade.create_amenity({'name': 'WiFi'}).id
+        self.place_id = self.new_place('Loft').id
+        self.review_id = facade.create_review({'text': 'Great', 'rating': 5, 'user_id': self.guest_id,
+                                               'place_id': self.place_id}).id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def new_user(self, name, email):
+        return facade.create_user({'first_name': name, 'last_name': 'Etag', 'email': email, 'password': 'secret'})
+
+    def new_place(self, title):
+        return facade.create_place({'title': title, 'description': 'Nice', 'price': 80.0, 'latitude': 1.0,
+                                    'longitude': 2.0, 'owner_id': self.owner_id, 'amenities': [self.amenity_id]})
+
+    def get(self, url, etag=None, **headers):
+        """ GET url on a fresh session; return the response and the number of SELECTs """
+        facade.clear_caches()
+        db.session.remove()
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        with QueryRecorder(db.engine) as recorder:
+            response = self.client.get(url, headers=headers)
+        return response, len(recorder.queries)
+
+    def assertNotModified(self, url, etag, expected=None):
+        response, statements = self.get(url, etag)
+        self.assertEqual(response.status_code, 304, url)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], expected or etag)
+        # La version seulement : rien n'est chargé ni sérialisé
+        self.assertEqual(statements, 1)
+
+    def test_place_detail(self):
+        url = f'/api/v1/places/{self.place_id}'
+        response, _ = self.get(url)
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertNotModified(url, etag)
+        self.assertEqual(self.get(url, '"other"')[0].status_code, 200)
+        self.assertNotModified(url, '*', etag)
+        # Une autre forme de la réponse a un autre ETag
+        self.assertNotEqual(self.get(url + '?fields=title')[0].headers['ETag'], etag)
+
+    def test_writes_change_the_place_etag(self):
+        url = f'/api/v1/places/{self.place_id}'
+        writes = [
+            # Avis modifié sans changer la note : seul son updated_at change
+            lambda: facade.update_review(self.review_id, {'text': 'Really great'}),
+            lambda: facade.update_amenity(self.amenity_id, {'name': 'Fast WiFi'}),
+            lambda: facade.update_place(self.place_id, {'amenities': []}),
+            # Un autre lieu du propriétaire fait partie du détail (owner.places)
+            lambda: self.new_place('Barn'),
+            lambda: facade.delete_review(self.review_id),
+        ]
+        etags = {self.get(url)[0].headers['ETag']}
+        for write in writes:
+            write()
+            response, _ = self.get(url, ', '.join(etags))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(response.headers['ETag'], etags)
+            etags.add(response.headers['ETag'])
+
+    def test_rating_aggregates_change_a_narrow_etag(self):
+        url = f'/api/v1/places/{self.place_id}?fields=average_rating'
+        etag = self.get(url)[0].headers['ETag']
+        facade.update_review(self.review_id, {'rating': 1})
+        response, _ = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'average_rating': 1.0})
+
+    def test_unknown_place(self):
+        response, _ = self.get('/api/v1/places/unknown', '*')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_place_listing(self):
+        url = '/api/v1/places/?limit=5'
+        response, _ = self.get(url)
+        etag = response.headers['ETag']
+        self.assertNotModified(url, etag)
+        self.new_place('Barn')
+        response, _ = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 2)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_compressed_etag(self):
+        url = f'/api/v1/places/{self.place_id}'
+        etag = self.get(url)[0].headers['ETag']
+        response, _ = self.get(url, **{'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        gzip_etag = response.headers['ETag']
+        self.assertEqual(gzip_etag, etag[:-1] + '-gzip"')
+        response, _ = self.get(url, gzip_etag, **{'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], gzip_etag)
+
+
+class TestConditionalGetInMemory(unittest.TestCase):
+
+    def test_no_etag_without_versions(self):
+        app = create_app(type('MemoryConfig', (config.TestingConfig,), {'PERSISTENCE_BACKEND': 'memory'}))
+        with app.app_context():
+            response = app.test_client().get('/api/v1/places/', headers={'If-None-Match': '*'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
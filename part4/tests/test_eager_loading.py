@@ -0,0 +1,117 @@
+import unittest
+import uuid
+from datetime import datetime
+
+import config
+from app import create_app, db
+from app.models import User
+from app.persistence.query_plan import QueryRecorder
+from app.services import facade
+
+
+class EagerLoadingConfig(config.TestingConfig):
+    """ The statements are counted on the SQL backend, whatever HBNB_PERSISTENCE says """
+    PERSISTENCE_BACKEND = 'sqlite'
+
+
+class TestEagerLoading(unittest.TestCase):
+    """ Listings and details issue the same number of SELECTs whatever the number of rows """
+
+    def setUp(self):
+        self.app = create_app(EagerLoadingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.client = self.app.test_client()
+        self.owner_id = self.new_user('Owner', 'owner@eager.io')
+        self.amenity_ids = [facade.create_amenity({'name': f'Amenity {i}'}).id for i in range(3)]
+        self.places = []
+        self.guests = 0
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def new_user(self, name, email):
+        # Insertion directe : le constructeur hache le mot de passe avec bcrypt (lent)
+        user_id = str(uuid.uuid4())
+        now = datetime.now()
+        db.session.execute(User.__table__.insert(), [
+            {'id': user_id, 'first_name': name, 'last_name': 'Eager', 'email': email,
+             'password': 'x', 'is_admin': False, 'created_at': now, 'updated_at': now}])
+        db.session.commit()
+        return user_id
+
+    def add_places(self, count, reviews=2):
+        """ Add places, each with every amenity and 'reviews' reviews by new guests """
+        for _ in range(count):
+            place = facade.create_place({'title': f'Place {len(self.places)}', 'description': 'Eager',
+                                         'price': 10.0, 'latitude': 1.0, 'longitude': 1.0,
+                                         'owner_id': self.owner_id, 'amenities': list(self.amenity_ids)})
+            self.places.append(place.id)
+            self.add_reviews(place.id, reviews)
+
+    def add_reviews(self, place_id, count):
+        for _ in range(count):
+            self.guests += 1
+            guest_id = self.new_user('Guest', f'guest{self.guests}@eager.io')
+            facade.create_review({'text': 'Fine', 'rating': 4, 'user_id': guest_id, 'place_id': place_id})
+
+    def count_selects(self, operation):
+        # Ni le cache ni la session ne doivent masquer les requêtes
+        facade.clear_caches()
+        db.session.remove()
+        with QueryRecorder(db.engine) as recorder:
+            result = operation()
+        return len(recorder.queries), result
+
+    def test_place_listing(self):
+        self.add_places(2)
+        few, response = self.count_selects(lambda: self.client.get('/api/v1/places/?limit=50'))
+        self.assertEqual(len(response.get_json()), 2)
+        self.add_places(8)
+        many, response = self.count_selects(lambda: self.client.get('/api/v1/places/?limit=50'))
+        items = response.get_json()
+        self.assertEqual(len(items), 10)
+        self.assertTrue(all(len(item['amenities']) == 3 and len(item['reviews']) == 2 for item in items))
+        self.assertEqual(few, many)
+
+    def test_user_listing(self):
+        self.add_places(1)
+        few, _ = self.count_selects(lambda: facade.get_all(50))
+        self.add_places(5)
+        many, (users, _) = self.count_selects(lambda: facade.get_all(50))
+        owner = next(user for user in users if user['id'] == self.owner_id)
+        self.assertEqual(len(owner['places']), 6)
+        self.assertEqual(few, many)
+
+    def test_place_detail(self):
+        self.add_places(1, reviews=1)
+        place_id = self.places[0]
+        few, response = self.count_selects(lambda: self.client.get(f'/api/v1/places/{place_id}'))
+        self.assertEqual(response.status_code, 200)
+        # Plus d'avis pour ce lieu, et plus de lieux (donc d'avis) pour son propriétaire
+        self.add_reviews(place_id, 5)
+        self.add_places(4)
+        many, response = self.count_selects(lambda: self.client.get(f'/api/v1/places/{place_id}'))
+        body = response.get_json()
+        self.assertEqual(len(body['reviews']), 6)
+        self.assertEqual(body['owner']['id'], self.owner_id)
+        self.assertEqual(len(body['owner']['places']), 5)
+        self.assertEqual(few, many)
+
+    def test_place_reviews_with_authors(self):
+        self.add_places(1, reviews=1)
+        place_id = self.places[0]
+        url = f'/api/v1/places/{place_id}/reviews?limit=50'
+        few, _ = self.count_selects(lambda: self.client.get(url))
+        self.add_reviews(place_id, 9)
+        many, response = self.count_selects(lambda: self.client.get(url))
+        items = response.get_json()
+        self.assertEqual(len(items), 10)
+        self.assertTrue(all(item['user_name'].startswith('Guest') for item in items))
+        self.assertEqual(few, many)
+
+
+if __name__ == '__main__':
+    unittest.main()
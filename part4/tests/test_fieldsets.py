@@ -0,0 +1,130 @@
+import unittest
+
+import config
+from app import create_app, db
+from app.persistence.query_plan import QueryRecorder
+from app.services import facade
+from app.services.projection import parse_projection
+
+
+class FieldsetConfig(config.TestingConfig):
+    """ The SELECT statements are checked on the SQL backend, whatever HBNB_PERSISTENCE says """
+    PERSISTENCE_BACKEND = 'sqlite'
+
+
+class TestFieldsets(unittest.TestCase):
+    """ ?fields= and ?include= shape the responses and the columns read """
+
+    def setUp(self):
+        self.app = create_app(FieldsetConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.client = self.app.test_client()
+        owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Fields',
+                                    'email': 'owner@fields.io', 'password': 'secret'})
+        guest = facade.create_user({'first_name': 'Guest', 'last_name': 'Fields',
+                                    'email': 'guest@fields.io', 'password': 'secret'})
+        wifi = facade.create_amenity({'name': 'WiFi'})
+        place = facade.create_place({'title': 'Loft', 'description': 'A long description' * 100,
+                                     'price': 80.0, 'latitude': 1.0, 'longitude': 2.0,
+                                     'owner_id': owner.id, 'amenities': [wifi.id]})
+        review = facade.create_review({'text': 'Great', 'rating': 5, 'user_id': guest.id, 'place_id': place.id})
+        self.owner_id, self.guest_id, self.place_id, self.review_id = owner.id, guest.id, place.id, review.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def get(self, url):
+        """ GET url on a fresh session; return the response and the SELECT statements """
+        facade.clear_caches()
+        db.session.remove()
+        with QueryRecorder(db.engine) as recorder:
+            response = self.client.get(url)
+        return response, [statement for statement, _ in recorder.queries]
+
+    def test_default_shapes_are_unchanged(self):
+        response, _ = self.get('/api/v1/places/')
+        self.assertEqual(response.get_json(), facade.get_all_places(100)[0])
+        response, _ = self.get(f'/api/v1/users/{self.owner_id}')
+        self.assertEqual(response.get_json(), facade.get_user(self.owner_id).to_dict())
+
+        response, _ = self.get(f'/api/v1/reviews/{self.review_id}')
+        review = facade.get_review(self.review_id)
+        self.assertEqual(response.get_json(), {
+            'id': review.id, 'text': review.text, 'rating': review.rating,
+            'user': review.user.to_dict(), 'place': review.place.to_dict()})
+
+        response, _ = self.get(f'/api/v1/places/{self.place_id}')
+        body = response.get_json()
+        self.assertNotIn('owner_id', body)
+        self.assertEqual(body['owner'], facade.get_user(self.owner_id).to_dict())
+        response, _ = self.get(f'/api/v1/places/{self.place_id}/reviews')
+        self.assertEqual(response.get_json(), [{'id': self.review_id, 'text': 'Great', 'rating': 5,
+                                                'user_name': 'Guest Fields'}])
+
+    def test_narrow_listing_reads_only_its_columns(self):
+        response, statements = self.get('/api/v1/places/?fields=id,title,price')
+        self.assertEqual(response.get_json(), [{'id': self.place_id, 'title': 'Loft', 'price': 80.0}])
+        # La version de la page (ETag) puis les lieux, sans la description ni les relations par défaut
+        self.assertEqual(len(statements), 2)
+        self.assertFalse([statement for statement in statements if 'description' in statement])
+
+    def test_nested_fields_and_include(self):
+        response, statements = self.get('/api/v1/users/?fields=id,places.title&include=')
+        users = {user['id']: user for user in response.get_json()}
+        self.assertEqual(users[self.owner_id], {'id': self.owner_id, 'places': [{'title': 'Loft'}]})
+        self.assertEqual(users[self.guest_id], {'id': self.guest_id, 'places': []})
+        self.assertFalse([statement for statement in statements
+                          if 'email' in statement or 'description' in statement or 'reviews' in statement])
+
+        response, _ = self.get(f'/api/v1/places/{self.place_id}?fields=title&include=reviews.user')
+        body = response.get_json()
+        self.assertEqual(set(body), {'title', 'reviews'})
+        self.assertEqual(body['reviews'][0]['user']['first_name'], 'Guest')
+        self.assertNotIn('places', body['reviews'][0]['user'])
+
+    def test_computed_field_reads_the_related_columns(self):
+        response, statements = self.get(f'/api/v1/places/{self.place_id}/reviews?fields=rating,user_name')
+        self.assertEqual(response.get_json(), [{'rating': 5, 'user_name': 'Guest Fields'}])
+        author = [statement for statement in statements if 'first_name' in statement]
+        self.assertTrue(author)
+        self.assertNotIn('email', author[0])
+
+    def test_invalid_parameters(self):
+        for query in ('fields=id,secret', 'include=owner.secrets', 'include=reviews.',
+                      'include=reviews.user.places.reviews', 'fields=reviews.user.places.reviews.id'):
+            response, _ = self.get(f'/api/v1/places/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+        response, _ = self.get('/api/v1/amenities/?include=places.owner.reviews')
+        self.assertEqual(response.status_code, 200)
+
+    def test_projection_loader_options(self):
+        # Toutes les colonnes et aucune relation : lecture ordinaire, servie par le cache
+        self.assertEqual(parse_projection('amenities').loader_options(), ())
+        self.assertEqual(len(parse_projection('places', 'id,owner.first_name').loader_options()), 2)
+
+
+class TestFieldsetsInMemory(unittest.TestCase):
+    """ The in-memory backend ignores the loader options but shapes the responses the same way """
+
+    def setUp(self):
+        test_config = type('MemoryConfig', (config.TestingConfig,), {'PERSISTENCE_BACKEND': 'memory'})
+        self.app = create_app(test_config)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+        wifi = facade.create_amenity({'name': 'WiFi'})
+        self.amenity_id = wifi.id
+
+    def test_fields(self):
+        response = self.app.test_client().get('/api/v1/amenities/?fields=name&include=places')
+        self.assertEqual(response.get_json(), [{'name': 'WiFi', 'places': []}])
+        response = self.app.test_client().get(f'/api/v1/amenities/{self.amenity_id}?fields=id')
+        self.assertEqual(response.get_json(), {'id': self.amenity_id})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import uuid
+
+import config
+from app import create_app, db
+from app.models.identifiers import uuid7
+from app.persistence.migrate_ids import migrate_ids
+from app.services import facade
+from tests.test_schema_upgrade import PLACE_ID, create_baseline_database
+
+
+class TestUUID7(unittest.TestCase):
+
+    def test_uuid7_is_time_ordered(self):
+        ids = [uuid7() for _ in range(2000)]
+        self.assertTrue(all(value.version == 7 and value.variant == uuid.RFC_4122 for value in ids))
+        # Croissants dans le même processus, même au sein d'une milliseconde
+        self.assertEqual([str(value) for value in ids], sorted(str(value) for value in ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+
+class TestBinaryIds(unittest.TestCase):
+    """ With ID_FORMAT='uuid7-binary' the keys are 16-byte BLOBs in SQLite and strings everywhere else """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'hbnb.db')
+        test_config = type('BinaryIdsConfig', (config.TestingConfig,), {
+            'PERSISTENCE_BACKEND': 'sqlite', 'ID_FORMAT': 'uuid7-binary',
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + self.path})
+        self.app = create_app(test_config)
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+
+    def column_types(self, table, column):
+        with sqlite3.connect(self.path) as connection:
+            return {row[0] for row in connection.execute(f"SELECT typeof({column}) FROM {table}")}
+
+    def test_keys_are_stored_as_16_bytes_and_served_as_strings(self):
+        owner = facade.create_user({'first_name': 'Binary', 'last_name': 'Keys',
+                                    'email': 'binary@keys.io', 'password': 'secret'})
+        wifi = facade.create_amenity({'name': 'WiFi'})
+        place = facade.create_place({'title': 'Compact', 'description': 'Keys', 'price': 10.0, 'latitude': 1.0,
+                                     'longitude': 1.0, 'owner_id': owner.id, 'amenities': [wifi.id]})
+        self.assertEqual(uuid.UUID(place.id).version, 7)
+        place_id, owner_id, wifi_id = place.id, owner.id, wifi.id
+        for table, column in (('users', 'id'), ('places', 'id'), ('places', 'owner_id'),
+                              ('place_amenity', 'place_id'), ('place_amenity', 'amenity_id')):
+            self.assertEqual(self.column_types(table, column), {'blob'})
+        with sqlite3.connect(self.path) as connection:
+            self.assertEqual(connection.execute("SELECT length(id) FROM places").fetchone(), (16,))
+
+        db.session.expunge_all()
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['owner']['id'], owner_id)
+        self.assertEqual(response.get_json()['amenities'][0]['id'], wifi_id)
+        # Un id qui n'est pas un UUID ne correspond à rien, sans erreur
+        self.assertEqual(self.client.get('/api/v1/places/not-a-uuid').status_code, 404)
+
+    def test_pagination_follows_creation_order(self):
+        names = [f'Amenity {i}' for i in range(5)]
+        for name in names:
+            facade.create_amenity({'name': name})
+        seen, cursor = [], None
+        while True:
+            page, cursor = facade.amenity_repo.get_page(2, cursor)
+            seen.extend(amenity.name for amenity in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, names)
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            create_app(type('BadIdsConfig', (config.TestingConfig,), {'ID_FORMAT': 'uuid1'}))
+
+
+class TestMigrateIds(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.source = os.path.join(self.directory, 'source.db')
+        app = create_app(type('SourceConfig', (config.TestingConfig,), {
+            'PERSISTENCE_BACKEND': 'sqlite', 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + self.source}))
+        with app.app_context():
+            owner = facade.create_user({'first_name': 'Old', 'last_name': 'Keys',
+                                        'email': 'old@keys.io', 'password': 'secret'})
+            guest = facade.create_user({'first_name': 'Guest', 'last_name': 'Keys',
+                                        'email': 'guest@keys.io', 'password': 'secret'})
+            wifi = facade.create_amenity({'name': 'WiFi'})
+            place = facade.create_place({'title': 'Old place', 'description': 'Text keys', 'price': 10.0,
+                                         'latitude': 1.0, 'longitude': 1.0, 'owner_id': owner.id,
+                                         'amenities': [wifi.id]})
+            facade.create_review({'text': 'Fine', 'rating': 4, 'user_id': guest.id, 'place_id': place.id})
+            self.place_id = place.id
+            db.session.remove()
+            db.engine.dispose()
+
+    def open_app(self, path, id_format):
+        return create_app(type('TargetConfig', (config.TestingConfig,), {
+            'PERSISTENCE_BACKEND': 'sqlite', 'ID_FORMAT': id_format, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path}))
+
+    def test_conversion_keeps_the_ids(self):
+        target = os.path.join(self.directory, 'binary.db')
+        copied = migrate_ids(self.source, target, 'uuid7-binary')
+        self.assertEqual(copied, {'users': 2, 'amenities': 1, 'places': 1, 'place_amenity': 1, 'reviews': 1})
+        with self.open_app(target, 'uuid7-binary').app_context():
+            place = facade.get_place(self.place_id)
+            self.assertEqual(place.owner.first_name, 'Old')
+            self.assertEqual([amenity.name for amenity in place.amenities], ['WiFi'])
+            self.assertEqual([review.rating for review in place.reviews], [4])
+            db.engine.dispose()
+        with self.assertRaises(ValueError):
+            migrate_ids(self.source, target, 'uuid7-binary')
+
+    def test_rekey_rewrites_every_foreign_key(self):
+        target = os.path.join(self.directory, 'rekeyed.db')
+        migrate_ids(self.source, target, 'uuid7', rekey=True)
+        with self.open_app(target, 'uuid7').app_context():
+            self.assertIsNone(facade.get_place(self.place_id))
+            place, = facade.place_repo.get_all()
+            self.assertEqual(uuid.UUID(place.id).version, 7)
+            self.assertEqual(place.owner.first_name, 'Old')
+            self.assertEqual([amenity.name for amenity in place.amenities], ['WiFi'])
+            self.assertEqual([review.user.first_name for review in place.reviews], ['Guest'])
+            # Ordre des clés = ordre de création
+            users = sorted(facade.user_repo.get_all(), key=lambda user: user.id)
+            self.assertEqual([user.first_name for user in users], ['Old', 'Guest'])
+            db.engine.dispose()
+
+    def test_database_older_than_the_aggregates(self):
+        source = os.path.join(self.directory, 'baseline.db')
+        create_baseline_database(source)
+        for rekey in (False, True):
+            target = os.path.join(self.directory, f'baseline-{rekey}.db')
+            copied = migrate_ids(source, target, 'uuid7-binary', rekey=rekey)
+            self.assertEqual(copied, {'users': 3, 'amenities': 1, 'places': 1, 'place_amenity': 1, 'reviews': 2})
+            with self.open_app(target, 'uuid7-binary').app_context():
+                place, = facade.place_repo.get_all()
+                self.assertEqual(place.id != PLACE_ID, rekey)
+                # Agrégats absents de la source, recalculés depuis les avis copiés
+                self.assertEqual((place.review_count, place.rating_4, place.rating_5), (2, 1, 1))
+                self.assertEqual([amenity.name for amenity in place.amenities], ['WiFi'])
+                db.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import unittest
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import config
+from app import create_app
+from app.api import representations
+from app.api.representations import available_encoder, dumps
+from app.services import facade
+
+
+class TestDumps(unittest.TestCase):
+    """ Both encoders write the same JSON """
+
+    def test_encoders_agree(self):
+        key = uuid.uuid4()
+        data = {'id': key, 'created_at': datetime(2024, 5, 1, 12, 30, 15, 250),
+                'day': date(2024, 5, 1), 'price': Decimal('12.5'), 'ratings': {1: 2},
+                'items': [None, True, 'é', 1.5]}
+        expected = {'id': str(key), 'created_at': '2024-05-01T12:30:15.000250', 'day': '2024-05-01',
+                    'price': 12.5, 'ratings': {'1': 2}, 'items': [None, True, 'é', 1.5]}
+        for encoder in ('json', 'orjson'):
+            body = dumps(data, encoder)
+            self.assertTrue(body.endswith(b'\n'), encoder)
+            self.assertEqual(json.loads(body), expected, encoder)
+            self.assertEqual(json.loads(dumps(data, encoder, indent=True)), expected, encoder)
+
+    def test_unknown_values(self):
+        for encoder in ('json', 'orjson'):
+            with self.assertRaises(TypeError):
+                dumps({'value': object()}, encoder)
+
+    def test_available_encoder(self):
+        self.assertEqual(available_encoder('json'), 'json')
+        self.assertEqual(available_encoder('orjson'), 'orjson')
+        # Sans orjson installé, repli sur la bibliothèque standard
+        with patch.object(representations, 'orjson', None):
+            self.assertEqual(available_encoder('orjson'), 'json')
+        with self.assertRaises(ValueError):
+            available_encoder('simplejson')
+
+
+class TestJsonResponses(unittest.TestCase):
+    """ The Api encodes its responses with JSON_ENCODER """
+
+    def test_responses(self):
+        for encoder in ('json', 'orjson'):
+            app = create_app(type('JsonConfig', (config.TestingConfig,), {'JSON_ENCODER': encoder}))
+            with app.app_context():
+                amenity = facade.create_amenity({'name': 'WiFi'}).to_dict()
+                client = app.test_client()
+                response = client.get('/api/v1/amenities/')
+                self.assertEqual(response.content_type, 'application/json', encoder)
+                self.assertEqual(response.get_json(), [amenity], encoder)
+                # Mode debug : corps indenté, comme avec flask_restx
+                self.assertIn(b'\n  ', response.data, encoder)
+                response = client.get('/api/v1/amenities/unknown')
+                self.assertEqual(response.status_code, 404, encoder)
+                self.assertEqual(response.content_type, 'application/json', encoder)
+                self.assertIn('error', response.get_json())
+
+    def test_unknown_encoder(self):
+        with self.assertRaises(ValueError):
+            create_app(type('JsonConfig', (config.TestingConfig,), {'JSON_ENCODER': 'fast'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
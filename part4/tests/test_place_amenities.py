@@ -0,0 +1,116 @@
+import unittest
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+import config
+from app import create_app, db
+from app.services import facade
+
+
+class PlaceAmenitiesConfig(config.TestingConfig):
+    """ The statements are counted on the SQL backend, whatever HBNB_PERSISTENCE says """
+    PERSISTENCE_BACKEND = 'sqlite'
+
+
+class TestPlaceAmenities(unittest.TestCase):
+    """ create_place and update_place resolve the amenities set-wise and write only the changes """
+
+    def setUp(self):
+        self.app = create_app(PlaceAmenitiesConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Amenities',
+                                         'email': 'owner@amenities.io', 'password': 'secret'})
+        self.amenities = [facade.create_amenity({'name': f'Amenity {i}'}) for i in range(40)]
+        self.ids = [amenity.id for amenity in self.amenities]
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.record)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.record)
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement.split()[0].upper(), statement, executemany))
+
+    def place(self, amenity_ids):
+        return facade.create_place({'title': 'Equipped', 'description': 'Many amenities', 'price': 10.0,
+                                    'latitude': 1.0, 'longitude': 1.0, 'owner_id': self.owner.id,
+                                    'amenities': amenity_ids})
+
+    def amenity_selects(self):
+        return [statement for kind, statement, _ in self.statements
+                if kind == 'SELECT' and 'FROM amenities' in statement and 'place_amenity' not in statement]
+
+    def association_writes(self):
+        return [(kind, executemany) for kind, statement, executemany in self.statements
+                if kind in ('INSERT', 'DELETE') and 'place_amenity' in statement]
+
+    def test_create_place_fetches_the_amenities_in_one_query(self):
+        place = self.place(self.ids + self.ids[:3])
+        self.assertEqual(len(self.amenity_selects()), 1)
+        self.assertEqual(sorted(amenity.id for amenity in place.amenities), sorted(self.ids))
+
+    def test_update_place_writes_only_the_changed_rows(self):
+        place = self.place(self.ids[:30])
+        self.statements.clear()
+        # 2 retirées, 3 ajoutées, 28 inchangées
+        facade.update_place(place.id, {'amenities': self.ids[2:33]})
+        self.assertEqual(len(self.amenity_selects()), 1)
+        writes = self.association_writes()
+        self.assertEqual(sorted(kind for kind, _ in writes), ['DELETE', 'INSERT'])
+        self.assertTrue(all(executemany for _, executemany in writes))
+        db.session.expire_all()
+        self.assertEqual(sorted(a.id for a in facade.get_place(place.id).amenities), sorted(self.ids[2:33]))
+
+        self.statements.clear()
+        facade.update_place(place.id, {'amenities': list(reversed(self.ids[2:33]))})
+        self.assertEqual(self.association_writes(), [])
+
+    def test_unknown_amenity_ids_are_listed(self):
+        with self.assertRaises(ValueError) as error:
+            self.place([self.ids[0], 'missing-1', 'missing-2'])
+        self.assertIn('missing-1, missing-2', str(error.exception))
+        self.assertEqual(facade.place_repo.get_all(), [])
+
+        place = self.place(self.ids[:2])
+        with self.assertRaises(ValueError) as error:
+            facade.update_place(place.id, {'amenities': [self.ids[0], 'missing-3']})
+        self.assertIn('missing-3', str(error.exception))
+        db.session.expire_all()
+        self.assertEqual(len(facade.get_place(place.id).amenities), 2)
+
+    def test_post_and_put_accept_amenity_ids(self):
+        client = self.app.test_client()
+        headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity={'id': self.owner.id, 'is_admin': False})}
+        response = client.post('/api/v1/places/', headers=headers, json={
+            'title': 'Posted', 'description': 'Nice', 'price': 10.0, 'latitude': 1.0, 'longitude': 1.0,
+            'owner_id': self.owner.id, 'amenities': self.ids[:30]})
+        self.assertEqual(response.status_code, 201, response.get_json())
+        place_id = response.get_json()['id']
+
+        self.statements.clear()
+        # 2 retirées, 3 ajoutées, 28 inchangées
+        response = client.put(f'/api/v1/places/{place_id}', headers=headers, json={
+            'title': 'Posted', 'description': 'Nicer', 'price': 12.0, 'latitude': 1.0, 'longitude': 1.0,
+            'owner_id': self.owner.id, 'amenities': self.ids[2:33]})
+        self.assertEqual(response.status_code, 200, response.get_json())
+        writes = self.association_writes()
+        self.assertEqual(sorted(kind for kind, _ in writes), ['DELETE', 'INSERT'])
+        self.assertTrue(all(executemany for _, executemany in writes))
+        db.session.expire_all()
+        self.assertEqual(sorted(a.id for a in facade.get_place(place_id).amenities), sorted(self.ids[2:33]))
+
+        # Des objets au lieu d'identifiants sont refusés par le modèle d'entrée
+        response = client.put(f'/api/v1/places/{place_id}', headers=headers, json={
+            'title': 'Posted', 'price': 12.0, 'latitude': 1.0, 'longitude': 1.0,
+            'owner_id': self.owner.id, 'amenities': [{'id': self.ids[0]}]})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
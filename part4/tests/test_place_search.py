@@ -0,0 +1,108 @@
+import unittest
+
+import config
+from app import create_app, db
+from app.persistence.query_plan import QueryRecorder
+from app.services import facade
+from app.services.place_search import MAX_AMENITIES, parse_place_search
+
+
+class PlaceSearchConfig(config.TestingConfig):
+    """ The SELECT statements are counted on the SQL backend, whatever HBNB_PERSISTENCE says """
+    PERSISTENCE_BACKEND = 'sqlite'
+
+
+class TestPlaceSearch(unittest.TestCase):
+    """ GET /places/search filters, sorts and pages the places in the database """
+
+    def setUp(self):
+        self.app = create_app(PlaceSearchConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.client = self.app.test_client()
+        owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Search',
+                                    'email': 'owner@search.io', 'password': 'secret'})
+        self.wifi = facade.create_amenity({'name': 'WiFi'}).id
+        self.pool = facade.create_amenity({'name': 'Pool'}).id
+        self.places = {}
+        for title, price, latitude, longitude, amenities in (
+                ('Loft', 80.0, 48.8, 2.3, [self.wifi]),
+                ('Villa', 250.0, 43.7, 7.2, [self.wifi, self.pool]),
+                ('Hut', 15.0, -17.5, 179.5, [self.pool]),
+                ('Tent', 15.0, -16.5, -179.5, [])):
+            self.places[title] = facade.create_place({
+                'title': title, 'description': 'Nice', 'price': price, 'latitude': latitude,
+                'longitude': longitude, 'owner_id': owner.id, 'amenities': amenities}).id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def search(self, query):
+        """ GET /places/search?query on a fresh session; return the response and the SELECT statements """
+        facade.clear_caches()
+        db.session.remove()
+        with QueryRecorder(db.engine) as recorder:
+            response = self.client.get(f'/api/v1/places/search?{query}')
+        return response, [statement for statement, _ in recorder.queries]
+
+    def titles(self, query):
+        response, _ = self.search(query)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return [place['title'] for place in response.get_json()]
+
+    def test_filters(self):
+        self.assertEqual(sorted(self.titles('')), ['Hut', 'Loft', 'Tent', 'Villa'])
+        self.assertEqual(sorted(self.titles('min_price=15&max_price=80')), ['Hut', 'Loft', 'Tent'])
+        self.assertEqual(self.titles(f'amenities={self.wifi},{self.pool}'), ['Villa'])
+        self.assertEqual(sorted(self.titles(f'amenities={self.pool}')), ['Hut', 'Villa'])
+        self.assertEqual(sorted(self.titles('min_lat=40&max_lat=50&min_lon=0&max_lon=5')), ['Loft'])
+        # Rectangle à cheval sur l'antiméridien
+        self.assertEqual(sorted(self.titles('min_lon=179&max_lon=-179')), ['Hut', 'Tent'])
+        self.assertEqual(self.titles(f'min_lon=179&max_lon=-179&amenities={self.pool}'), ['Hut'])
+
+    def test_sorts(self):
+        self.assertEqual(self.titles('sort=-price')[:2], ['Villa', 'Loft'])
+        self.assertEqual(self.titles('sort=price')[2:], ['Loft', 'Villa'])
+        self.assertEqual(self.titles('sort=newest')[0], 'Tent')
+
+    def test_pages_keep_the_filters(self):
+        seen, url = [], '/api/v1/places/search?sort=price&max_price=100&limit=1'
+        while url:
+            response = self.client.get(url)
+            seen.extend(place['title'] for place in response.get_json())
+            link = response.headers.get('Link')
+            url = link[1:link.index('>')] if link else None
+        self.assertEqual(seen, self.titles('sort=price&max_price=100'))
+        self.assertEqual(len(seen), 3)
+
+    def test_one_statement_with_narrow_fields(self):
+        response, statements = self.search('max_price=100&sort=price&fields=id,title,price')
+        self.assertEqual(len(response.get_json()), 3)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(set(response.get_json()[0]), {'id', 'title', 'price'})
+        # Forme par défaut : celle de GET /places/, relations chargées page entière
+        response, statements = self.search('max_price=100')
+        self.assertEqual(response.get_json(), [
+            place for place in self.client.get('/api/v1/places/').get_json()
+            if place['id'] in {self.places['Loft'], self.places['Hut'], self.places['Tent']}])
+        self.assertLessEqual(len(statements), 3)
+
+    def test_invalid_parameters(self):
+        for query in ('min_price=abc', 'max_price=nan', 'min_price=-1', 'min_price=20&max_price=10',
+                      'min_lat=91', 'min_lat=10&max_lat=0', 'max_lon=-181', 'sort=rating', 'limit=0',
+                      'fields=secret', 'amenities=' + ','.join(str(i) for i in range(MAX_AMENITIES + 1))):
+            response, _ = self.search(query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+
+    def test_parse(self):
+        criteria = parse_place_search({'min_price': '10', 'amenities': f' {self.wifi},,{self.wifi} ',
+                                       'min_lon': '170', 'max_lon': '-170'})
+        self.assertEqual((criteria.min_price, criteria.max_price, criteria.sort), (10.0, None, 'id'))
+        self.assertEqual(criteria.amenity_ids, (self.wifi,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
 import unittest
-from app import create_app
+from flask_jwt_extended import create_access_token
+
+import config
+from app import create_app, db
+from app.services import facade
 
 class TestPlaceEndpoints(unittest.TestCase):
 
@@ -118,5 +122,69 @@ class TestPlaceEndpoints(unittest.TestCase):
         })
         self.assertEqual(response.status_code, 400)
 
+class TestPlaceBatchEndpoint(unittest.TestCase):
+    """ POST /places/batch and create_places validate the whole batch before writing it """
+
+    def setUp(self):
+        # Base en mémoire propre à chaque test : rien n'est écrit dans instance/development.db
+        self.app = create_app(config.TestingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+        self.addCleanup(db.session.remove)
+        self.client = self.app.test_client()
+        self.owner_id = facade.create_user({'first_name': 'Batch', 'last_name': 'Owner',
+                                            'email': 'batch@owner.io', 'password': 'secret'}).id
+        token = create_access_token(identity={'id': self.owner_id, 'is_admin': False})
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.amenity_id = facade.create_amenity({'name': 'Jacuzzi'}).id
+
+    def place(self, title, **extra):
+        data = {"title": title, "description": "Lot", "price": 40.0, "latitude": 10.0, "longitude": 10.0}
+        data.update(extra)
+        return data
+
+    def test_01_create_batch(self):
+        response = self.client.post('/api/v1/places/batch', headers=self.headers, json={"places": [
+            self.place("Batch A", amenities=[self.amenity_id]),
+            self.place("Batch B")
+        ]})
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual(data['count'], 2)
+        place = self.client.get(f"/api/v1/places/{data['places'][0]['id']}").get_json()
+        self.assertEqual([a['id'] for a in place['amenities']], [self.amenity_id])
+
+    def test_02_create_batch_invalid_is_atomic(self):
+        # "Batch A" existe déjà pour ce propriétaire
+        self.client.post('/api/v1/places/batch', headers=self.headers, json={"places": [self.place("Batch A")]})
+        response = self.client.post('/api/v1/places/batch', headers=self.headers, json={"places": [
+            self.place("Batch C"),
+            self.place("Batch A"),
+            self.place("Batch D", price=-1),
+            self.place("Batch E", amenities=["00000000-0000-0000-0000-000000000000"])
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['index'] for e in response.get_json()['errors']], [1, 2, 3])
+
+        # Aucun lieu du lot n'a été créé
+        retry = self.client.post('/api/v1/places/batch', headers=self.headers,
+                                 json={"places": [self.place("Batch C")]})
+        self.assertEqual(retry.status_code, 201)
+
+    def test_03_create_places_reports_wrong_types_as_item_errors(self):
+        # Appel direct de la façade, sans la validation du modèle de l'API
+        places, errors = facade.create_places([
+            self.place("Batch F", owner_id=self.owner_id),
+            self.place("Batch G", owner_id=[self.owner_id]),
+            self.place("Batch H", owner_id=self.owner_id, amenities=[{"id": self.amenity_id}]),
+            self.place(["Batch I"], owner_id=self.owner_id),
+            self.place("Batch J", owner_id=self.owner_id, amenities=self.amenity_id),
+            "Batch K"
+        ])
+        self.assertEqual(places, [])
+        self.assertEqual([e['index'] for e in errors], [1, 2, 3, 4, 5])
+        self.assertEqual(errors[0]['error'], "owner_id must be a string")
+
 if __name__ == '__main__':
     unittest.main()
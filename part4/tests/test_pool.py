@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import config
+from app import create_app, db
+from app.persistence.pool import InstrumentedQueuePool, is_memory_database, pool_engine_options
+
+
+class TestPoolSettings(unittest.TestCase):
+
+    def test_memory_database_keeps_default_pool(self):
+        for uri in ('sqlite://', 'sqlite:///:memory:', 'sqlite:///file:db?mode=memory&uri=true'):
+            self.assertTrue(is_memory_database(uri), uri)
+            self.assertEqual(pool_engine_options(uri, {'pool_size': 3}), {})
+        self.assertFalse(is_memory_database('sqlite:///hbnb.db'))
+        self.assertEqual(pool_engine_options('sqlite:///hbnb.db', {'pool_size': 3}),
+                         {'poolclass': InstrumentedQueuePool, 'pool_size': 3})
+
+
+class TestPoolMetrics(unittest.TestCase):
+    """ Pool settings from the configuration and counters of the admin endpoint """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        pool_config = type('PoolConfig', (config.TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(self.directory, 'pool.db'),
+            'PERSISTENCE_BACKEND': 'sqlite',
+            'SQLALCHEMY_POOL_OPTIONS': {'pool_size': 1, 'max_overflow': 1, 'pool_timeout': 1,
+                                        'pool_recycle': 60, 'pool_pre_ping': True}})
+        self.app = create_app(pool_config)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.metrics = self.app.extensions['pool_metrics']
+        self.metrics.reset()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+
+    def test_settings_are_applied(self):
+        pool = db.engine.pool
+        self.assertIsInstance(pool, InstrumentedQueuePool)
+        self.assertEqual((pool.size(), pool._max_overflow, pool.timeout()), (1, 1, 1))
+        self.assertEqual(pool._recycle, 60)
+        self.assertTrue(pool._pre_ping)
+
+    def test_checkouts_overflow_and_timeouts_are_counted(self):
+        first = db.engine.connect()
+        second = db.engine.connect()  # au-delà de pool_size : connexion en overflow
+        with self.assertRaises(PoolTimeoutError):
+            db.engine.connect()
+        second.close()
+        first.close()
+
+        stats = self.metrics.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['checkins'], 2)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['overflow_max'], 1)
+        self.assertGreaterEqual(stats['wait_ms']['max'], 1000)
+        self.assertEqual(stats['pool']['checked_out'], 0)
+
+    def test_invalidations_are_counted_and_survive_dispose(self):
+        with db.engine.connect() as connection:
+            connection.invalidate()
+        db.engine.dispose()
+        with db.engine.connect():
+            pass
+        stats = self.metrics.stats()
+        self.assertEqual(stats['invalidations'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertIs(db.engine.pool.metrics, self.metrics)
+
+    def test_admin_endpoint(self):
+        client = self.app.test_client()
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+        user = create_access_token(identity={'id': 'user', 'is_admin': False})
+
+        response = client.get('/api/v1/admin/pool', headers={'Authorization': f'Bearer {user}'})
+        self.assertEqual(response.status_code, 403)
+
+        response = client.get('/api/v1/admin/pool', headers={'Authorization': f'Bearer {admin}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['pool']['class'], 'InstrumentedQueuePool')
+        self.assertEqual(response.json['pool']['size'], 1)
+        self.assertIn('p99', response.json['wait_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import uuid
+from datetime import datetime
+
+import config
+from app import create_app, db
+from app.models import User, Place, Review, Amenity
+from app.models.association_tables import place_amenity
+from app.persistence.query_plan import QueryRecorder, explain, find_full_scans
+from app.services import facade
+from app.services.place_search import PlaceSearch
+
+
+class QueryPlanConfig(config.TestingConfig):
+    """ The query plans only exist with a SQL backend, whatever HBNB_PERSISTENCE says """
+    PERSISTENCE_BACKEND = 'sqlite'
+
+
+class TestFacadeQueryPlans(unittest.TestCase):
+    """ Every query issued by the facade must be served by an index """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app(QueryPlanConfig)
+        cls.context = cls.app.app_context()
+        cls.context.push()
+
+        # Insertion directe : les constructeurs hachent le mot de passe et valident l'email en ligne
+        now = datetime.now()
+        cls.owner_id, cls.guest_id = str(uuid.uuid4()), str(uuid.uuid4())
+        cls.place_id, cls.amenity_id = str(uuid.uuid4()), str(uuid.uuid4())
+        cls.review_ids = sorted(str(uuid.uuid4()) for _ in range(2))
+        cls.review_id = cls.review_ids[0]
+        db.session.execute(User.__table__.insert(), [
+            {'id': cls.owner_id, 'first_name': 'Owner', 'last_name': 'Plan', 'email': 'owner@plan.io',
+             'password': 'x', 'is_admin': False, 'created_at': now, 'updated_at': now},
+            {'id': cls.guest_id, 'first_name': 'Guest', 'last_name': 'Plan', 'email': 'guest@plan.io',
+             'password': 'x', 'is_admin': False, 'created_at': now, 'updated_at': now},
+        ])
+        db.session.execute(Amenity.__table__.insert(), [
+            {'id': cls.amenity_id, 'name': 'WiFi', 'created_at': now, 'updated_at': now}])
+        db.session.execute(Place.__table__.insert(), [
+            {'id': cls.place_id, 'title': 'Plan', 'description': 'Indexed', '_price': 10.0,
+             '_latitude': 1.0, '_longitude': 1.0, 'owner_id': cls.owner_id,
+             'created_at': now, 'updated_at': now}])
+        db.session.execute(place_amenity.insert(), [
+            {'place_id': cls.place_id, 'amenity_id': cls.amenity_id}])
+        # Même date de création : l'ordre des avis d'un lieu est départagé par l'id
+        db.session.execute(Review.__table__.insert(), [
+            {'id': review_id, 'text': 'Good', 'rating': 4, 'user_id': user_id,
+             'place_id': cls.place_id, 'created_at': now, 'updated_at': now}
+            for review_id, user_id in zip(cls.review_ids, (cls.guest_id, cls.owner_id))])
+        db.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        db.session.remove()
+        cls.context.pop()
+
+    def assertIndexed(self, operation):
+        # Ni le cache ni la session ne doivent masquer les requêtes
+        facade.clear_caches()
+        db.session.remove()
+        with QueryRecorder(db.engine) as recorder:
+            operation()
+        self.assertTrue(recorder.queries)
+        problems = find_full_scans(db.engine, recorder.queries)
+        self.assertEqual(problems, [], "full table scan in:\n" + "\n".join(
+            f"{statement}\n  -> {plan}" for statement, plan in problems))
+
+    def test_get_by_id(self):
+        self.assertIndexed(lambda: facade.get_user(self.owner_id))
+        self.assertIndexed(lambda: facade.get_user_by_id(self.owner_id))
+        self.assertIndexed(lambda: facade.get_place(self.place_id))
+        self.assertIndexed(lambda: facade.get_review(self.review_id))
+        self.assertIndexed(lambda: facade.get_amenity(self.amenity_id))
+
+    def test_get_user_by_email(self):
+        self.assertIndexed(lambda: facade.get_user_by_email('owner@plan.io'))
+
+    def test_get_amenity_by_name(self):
+        self.assertIndexed(lambda: facade.amenity_repo.get_by_attribute('name', 'WiFi'))
+
+    def test_list_pages(self):
+        self.assertIndexed(lambda: facade.get_all(10, self.owner_id))
+        self.assertIndexed(lambda: facade.get_all_amenities(10, self.amenity_id))
+        self.assertIndexed(lambda: facade.get_all_reviews(10, self.review_id))
+        self.assertIndexed(lambda: facade.get_all_places(10, self.place_id))
+
+    def test_relationships(self):
+        self.assertIndexed(lambda: facade.get_place(self.place_id).to_dict())
+        self.assertIndexed(lambda: facade.get_place_detail(self.place_id).owner.to_dict())
+        self.assertIndexed(lambda: facade.get_user(self.owner_id).to_dict())
+        self.assertIndexed(lambda: facade.get_amenity(self.amenity_id).places)
+
+    def test_create_place_duplicate_check(self):
+        def create_duplicate():
+            with self.assertRaises(ValueError):
+                facade.create_place({'title': 'Plan', 'description': 'Again', 'price': 10.0,
+                                     'latitude': 1.0, 'longitude': 1.0, 'owner_id': self.owner_id})
+        self.assertIndexed(create_duplicate)
+
+    def test_create_reviews_lookups(self):
+        def create_duplicate():
+            reviews, errors = facade.create_reviews(
+                self.guest_id, [{'text': 'Again', 'rating': 3, 'place_id': self.place_id}])
+            self.assertTrue(errors)
+        self.assertIndexed(create_duplicate)
+
+    def test_get_reviews_by_place(self):
+        self.assertIndexed(lambda: facade.get_reviews_by_place(self.place_id, 10))
+        self.assertIndexed(lambda: facade.get_reviews_by_place(self.place_id, 10, self.review_id))
+
+    def test_get_reviews_by_place_without_sort(self):
+        # L'index fournit déjà l'ordre (created_at, id) : pas de tri temporaire
+        with QueryRecorder(db.engine) as recorder:
+            facade.get_reviews_by_place(self.place_id, 10)
+        with db.engine.connect() as connection:
+            for statement, parameters in recorder.queries:
+                plan = explain(connection, statement, parameters)
+                self.assertFalse([step for step in plan if 'TEMP B-TREE' in step], plan)
+
+    def test_get_reviews_by_place_pages(self):
+        first, cursor = facade.get_reviews_by_place(self.place_id, 1)
+        self.assertEqual([review.id for review in first], self.review_ids[:1])
+        second, last = facade.get_reviews_by_place(self.place_id, 1, cursor)
+        self.assertEqual([review.id for review in second], self.review_ids[1:])
+        self.assertIsNone(last)
+
+    def test_search_places(self):
+        for criteria in (PlaceSearch(min_price=5, max_price=20), PlaceSearch(sort='-price'),
+                         PlaceSearch(min_lat=0, max_lat=2, min_lon=170, max_lon=-170),
+                         PlaceSearch(sort='newest', amenity_ids=[self.amenity_id])):
+            self.assertIndexed(lambda: facade.search_places(criteria, 10))
+            self.assertIndexed(lambda: facade.search_places(criteria, 10, self.place_id))
+
+    def test_has_reviewed_place(self):
+        self.assertIndexed(lambda: self.assertTrue(
+            facade.has_reviewed_place(self.guest_id, self.place_id)))
+        self.assertFalse(facade.has_reviewed_place(str(uuid.uuid4()), self.place_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
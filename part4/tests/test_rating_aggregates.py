@@ -0,0 +1,98 @@
+import unittest
+
+from flask_jwt_extended import create_access_token
+
+import config
+from app import create_app, db
+from app.models import Review
+from app.services import facade
+
+
+class TestRatingAggregates(unittest.TestCase):
+    """ The rating aggregates of a place follow every review written through the facade """
+
+    def setUp(self):
+        self.app = create_app(config.TestingConfig)
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        self.owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Place',
+                                         'email': 'owner@ratings.io', 'password': 'secret'})
+        self.guests = [facade.create_user({'first_name': 'Guest', 'last_name': 'ABC'[i],
+                                           'email': f'guest{i}@ratings.io', 'password': 'secret'})
+                       for i in range(3)]
+        self.place = facade.create_place({'title': 'Rated', 'description': 'Stars', 'price': 50.0,
+                                          'latitude': 1.0, 'longitude': 2.0, 'owner_id': self.owner.id})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def aggregates(self):
+        place = facade.get_place(self.place.id)
+        return place.review_count, place.rating_sum, place.rating_histogram
+
+    def review(self, guest, rating):
+        return facade.create_review({'text': 'Review', 'rating': rating,
+                                     'user_id': guest.id, 'place_id': self.place.id})
+
+    def test_create_update_and_delete_review(self):
+        first = self.review(self.guests[0], 5)
+        self.review(self.guests[1], 2)
+        self.assertEqual(self.aggregates(), (2, 7, {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1}))
+
+        facade.update_review(first.id, {'rating': 3})
+        self.assertEqual(self.aggregates(), (2, 5, {'1': 0, '2': 1, '3': 1, '4': 0, '5': 0}))
+        # Le texte seul ne change pas les agrégats
+        facade.update_review(first.id, {'text': 'Changed my mind'})
+        self.assertEqual(self.aggregates()[:2], (2, 5))
+
+        facade.delete_review(first.id)
+        self.assertEqual(self.aggregates(), (1, 2, {'1': 0, '2': 1, '3': 0, '4': 0, '5': 0}))
+        self.assertEqual(facade.get_place(self.place.id).average_rating, 2.0)
+
+    def test_rejected_review_leaves_aggregates_unchanged(self):
+        self.review(self.guests[0], 4)
+        with self.assertRaises(ValueError):
+            self.review(self.guests[0], 1)
+        self.assertEqual(self.aggregates()[:2], (1, 4))
+
+    def test_batch_of_reviews(self):
+        other = facade.create_place({'title': 'Other', 'description': 'Stars', 'price': 50.0,
+                                     'latitude': 1.0, 'longitude': 2.0, 'owner_id': self.owner.id})
+        reviews, errors = facade.create_reviews(self.guests[2].id, [
+            {'place_id': self.place.id, 'text': 'Nice', 'rating': 4},
+            {'place_id': other.id, 'text': 'Meh', 'rating': 1}])
+        self.assertEqual((len(reviews), errors), (2, []))
+        self.assertEqual(self.aggregates()[:2], (1, 4))
+        self.assertEqual(facade.get_place(other.id).rating_1, 1)
+
+    def test_listing_and_repair_endpoint(self):
+        self.review(self.guests[0], 5)
+        self.review(self.guests[1], 4)
+        listed = self.client.get('/api/v1/places/').get_json()
+        self.assertEqual([(p['review_count'], p['average_rating']) for p in listed], [(2, 4.5)])
+        self.assertEqual(listed[0]['rating_histogram']['5'], 1)
+        detail = self.client.get(f'/api/v1/places/{self.place.id}').get_json()
+        self.assertEqual(detail['average_rating'], 4.5)
+
+        # Avis ajouté directement dans le dépôt, sans mise à jour des agrégats
+        facade.review_repo.add(Review(text='Imported', rating=3, user_id=self.guests[2].id,
+                                      place_id=self.place.id))
+        self.assertEqual(self.aggregates()[:2], (2, 9))
+
+        user_token = create_access_token(identity={'id': self.guests[0].id, 'is_admin': False})
+        response = self.client.post('/api/v1/admin/ratings/repair',
+                                    headers={'Authorization': f'Bearer {user_token}'})
+        self.assertEqual(response.status_code, 403)
+
+        admin_token = create_access_token(identity={'id': self.owner.id, 'is_admin': True})
+        response = self.client.post('/api/v1/admin/ratings/repair',
+                                    headers={'Authorization': f'Bearer {admin_token}'})
+        self.assertEqual(response.get_json(), {'places_fixed': 1})
+        self.assertEqual(self.aggregates()[:2], (3, 12))
+
+
+if __name__ == '__main__':
+    unittest.main()
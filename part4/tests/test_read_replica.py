@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime
+
+import config
+from app import create_app, db
+from app.models import Amenity
+from app.persistence.query_plan import QueryRecorder
+from app.persistence.replica import REPLICA_BIND
+from app.services import facade
+
+
+class TestReadReplica(unittest.TestCase):
+    """ Read-only facade calls go to the replica, writes and reads after a write to the primary """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        replica_config = type('ReplicaConfig', (config.TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(self.directory, 'primary.db'),
+            'READ_REPLICA_URI': 'sqlite:///' + os.path.join(self.directory, 'replica.db'),
+            'READ_REPLICA_SYNC_INTERVAL': 0,
+            'PERSISTENCE_BACKEND': 'sqlite'})
+        self.app = create_app(replica_config)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.replica = db.engines[REPLICA_BIND]
+        self.sync = self.app.extensions['replica_sync']
+
+    def tearDown(self):
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+        self.context.pop()
+
+    def insert_amenity(self, name):
+        """ Write a row on the primary only, as another process would """
+        amenity_id, now = str(uuid.uuid4()), datetime.now()
+        with db.engine.begin() as connection:
+            connection.execute(Amenity.__table__.insert(), {
+                'id': amenity_id, 'name': name, 'created_at': now, 'updated_at': now})
+        return amenity_id
+
+    def new_request(self):
+        """ Start from a fresh session and empty caches, like a new request """
+        db.session.remove()
+        facade.clear_caches()
+
+    def test_reads_use_the_replica(self):
+        amenity_id = self.insert_amenity('WiFi')
+        self.new_request()
+        with QueryRecorder(self.replica) as recorder:
+            self.assertIsNone(facade.get_amenity(amenity_id))
+        self.assertTrue(recorder.queries)
+
+        self.sync.sync_now()
+        self.new_request()
+        self.assertEqual(facade.get_amenity(amenity_id).name, 'WiFi')
+        amenities, _ = facade.get_all_amenities(10)
+        self.assertEqual([a['id'] for a in amenities], [amenity_id])
+
+    def test_read_your_writes_within_a_request(self):
+        self.new_request()
+        amenity = facade.create_amenity({'name': 'Pool'})
+        with QueryRecorder(self.replica) as recorder:
+            # Le réplica n'a pas été recopié : seule la base principale connaît l'amenity
+            self.assertEqual(facade.get_amenity(amenity.id).name, 'Pool')
+            self.assertEqual(len(facade.get_all_amenities(10)[0]), 1)
+        self.assertEqual(recorder.queries, [])
+
+        # Requête suivante : retour sur le réplica, pas encore à jour
+        self.new_request()
+        self.assertIsNone(facade.get_amenity(amenity.id))
+
+    def test_reads_inside_a_unit_of_work_use_the_primary(self):
+        amenity_id = self.insert_amenity('Parking')
+        self.new_request()
+        with facade.transaction():
+            self.assertIsNotNone(facade.get_amenity(amenity_id))
+
+    def test_replica_rows_are_not_cached(self):
+        amenity_id = self.insert_amenity('Sauna')
+        self.sync.sync_now()
+        self.new_request()
+        self.assertIsNotNone(facade.get_amenity(amenity_id))
+        self.assertIsNone(facade.amenity_repo.cache.get(('id', amenity_id)))
+
+    def test_without_replica_everything_uses_the_primary(self):
+        app = create_app(type('NoReplicaConfig', (config.TestingConfig,), {'PERSISTENCE_BACKEND': 'sqlite'}))
+        with app.app_context():
+            self.assertNotIn(REPLICA_BIND, db.engines)
+            self.assertNotIn('replica_sync', app.extensions)
+            amenity_id = facade.create_amenity({'name': 'Gym'}).id
+            db.session.remove()
+            self.assertEqual(facade.get_amenity(amenity_id).name, 'Gym')
+
+
+if __name__ == '__main__':
+    unittest.main()
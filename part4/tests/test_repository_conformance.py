@@ -0,0 +1,228 @@
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+
+import config
+from app import create_app, db
+from app.models import Place, Review, Amenity
+from app.persistence.repository import Repository
+from app.services import facade
+from app.services.place_search import PlaceSearch
+
+
+class RepositoryConformance:
+    """
+    Behaviour every persistence backend must share. Each subclass below runs
+    these tests against one backend of app/persistence/backends.py.
+    """
+    backend = None
+    id_format = 'uuid4'
+
+    def database_uri(self):
+        return 'sqlite://'
+
+    def setUp(self):
+        test_config = type('BackendConfig', (config.TestingConfig,), {
+            'PERSISTENCE_BACKEND': self.backend,
+            'ID_FORMAT': self.id_format,
+            'SQLALCHEMY_DATABASE_URI': self.database_uri()})
+        self.app = create_app(test_config)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.amenities = facade.amenity_repo
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def new_place(self, title='Loft', owner_id=None):
+        return Place(title=title, description='Nice', price=10.0, latitude=1.0,
+                     longitude=1.0, owner_id=owner_id or str(uuid.uuid4()))
+
+    def test_repositories_implement_the_abc(self):
+        self.assertEqual(facade.backend, self.backend)
+        for repo in (facade.user_repo, facade.place_repo, facade.review_repo, facade.amenity_repo):
+            self.assertIsInstance(repo, Repository)
+
+    def test_add_get_and_get_many(self):
+        wifi, pool = Amenity('WiFi'), Amenity('Pool')
+        self.amenities.add(wifi)
+        self.amenities.add_many([pool])
+        self.assertEqual(self.amenities.get(wifi.id).name, 'WiFi')
+        self.assertIsNone(self.amenities.get(str(uuid.uuid4())))
+        found = self.amenities.get_many([wifi.id, pool.id, str(uuid.uuid4()), None])
+        self.assertEqual(set(found), {wifi.id, pool.id})
+        self.assertEqual({a.name for a in self.amenities.get_all()}, {'WiFi', 'Pool'})
+
+    def test_get_page_walks_every_object_once_in_id_order(self):
+        amenities = [Amenity(f'Amenity {i}') for i in range(5)]
+        self.amenities.add_many(amenities)
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.amenities.get_page(2, cursor)
+            seen.extend(a.id for a in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(a.id for a in amenities))
+
+    def test_update_delete_and_get_by_attribute(self):
+        amenity = Amenity('WiFi')
+        self.amenities.add(amenity)
+        self.amenities.update(amenity.id, {'name': 'Fibre'})
+        self.assertEqual(self.amenities.get_by_attribute('name', 'Fibre').id, amenity.id)
+        self.assertIsNone(self.amenities.get_by_attribute('name', 'WiFi'))
+        self.amenities.delete(amenity.id)
+        self.assertIsNone(self.amenities.get(amenity.id))
+        self.assertIsNone(self.amenities.get_by_attribute('name', 'Fibre'))
+        # Supprimer un id inconnu ne lève pas d'erreur
+        self.amenities.delete(amenity.id)
+
+    def test_unique_constraint_raises_integrity_error(self):
+        place = self.new_place()
+        facade.place_repo.add(place)
+        with self.assertRaises(IntegrityError):
+            facade.place_repo.add(self.new_place(owner_id=place.owner_id))
+        # Un lot en conflit n'enregistre aucun de ses objets
+        other = self.new_place(title='Other')
+        with self.assertRaises(IntegrityError):
+            facade.place_repo.add_many([other, self.new_place(owner_id=place.owner_id)])
+        self.assertIsNone(facade.place_repo.get(other.id))
+
+    def test_existing_title_owner_pairs(self):
+        place = self.new_place()
+        facade.place_repo.add(place)
+        keys = [('Loft', place.owner_id), ('Loft', str(uuid.uuid4())), (None, place.owner_id)]
+        self.assertEqual(facade.place_repo.existing_title_owner_pairs(keys), {('Loft', place.owner_id)})
+
+    def test_reviews_of_a_place(self):
+        place = self.new_place()
+        facade.place_repo.add(place)
+        user_ids = [str(uuid.uuid4()) for _ in range(3)]
+        reviews = [Review(text='Good', rating=4, user_id=user_id, place_id=place.id)
+                   for user_id in user_ids]
+        facade.review_repo.add_many(reviews)
+        facade.review_repo.add(Review(text='Other', rating=2, user_id=user_ids[0],
+                                      place_id=str(uuid.uuid4())))
+        expected = sorted(reviews, key=lambda review: (review.created_at, review.id))
+
+        first, cursor = facade.review_repo.get_by_place(place.id, 2)
+        rest, last = facade.review_repo.get_by_place(place.id, 2, cursor)
+        self.assertEqual([r.id for r in first + rest], [r.id for r in expected])
+        self.assertIsNone(last)
+
+        self.assertTrue(facade.review_repo.exists_for(user_ids[1], place.id))
+        self.assertFalse(facade.review_repo.exists_for(user_ids[1], str(uuid.uuid4())))
+        self.assertEqual(facade.review_repo.places_reviewed_by(
+            user_ids[2], [place.id, str(uuid.uuid4())]), {place.id})
+
+    def test_place_search(self):
+        wifi, pool = Amenity('WiFi'), Amenity('Pool')
+        self.amenities.add_many([wifi, pool])
+        places = []
+        # Prix en double : l'id départage les lieux de même prix
+        for i, (price, longitude) in enumerate([(30.0, 10.0), (10.0, 175.0), (30.0, -175.0), (20.0, 0.0), (50.0, 10.0)]):
+            place = Place(title=f'Place {i}', description='Nice', price=price, latitude=float(i),
+                          longitude=longitude, owner_id=str(uuid.uuid4()))
+            place.amenities = [wifi, pool] if i % 2 == 0 else [wifi]
+            places.append(place)
+        facade.place_repo.add_many(places)
+
+        def walk(criteria):
+            seen, cursor = [], None
+            while True:
+                page, cursor = facade.place_repo.search(criteria, 2, cursor)
+                seen.extend(place.id for place in page)
+                if cursor is None:
+                    return seen
+
+        def ids(selected, key, reverse=False):
+            return [place.id for place in sorted(selected, key=lambda place: (key(place), place.id), reverse=reverse)]
+
+        self.assertEqual(walk(PlaceSearch()), sorted(place.id for place in places))
+        self.assertEqual(walk(PlaceSearch(sort='price')), ids(places, lambda place: place.price))
+        self.assertEqual(walk(PlaceSearch(sort='-price', max_price=30)),
+                         ids(places[:4], lambda place: place.price, reverse=True))
+        self.assertEqual(walk(PlaceSearch(sort='newest')), ids(places, lambda place: place.created_at, reverse=True))
+        self.assertEqual(walk(PlaceSearch(amenity_ids=[pool.id, wifi.id], min_price=20)),
+                         sorted(places[i].id for i in (0, 2, 4)))
+        # Rectangle à cheval sur l'antiméridien
+        self.assertEqual(walk(PlaceSearch(min_lon=170, max_lon=-170, min_lat=0, max_lat=1.5)), [places[1].id])
+        self.assertEqual(facade.place_repo.search(PlaceSearch(sort='price'), 2, str(uuid.uuid4())), ([], None))
+
+    def test_rating_aggregates(self):
+        place = self.new_place()
+        facade.place_repo.add(place)
+        facade.place_repo.adjust_ratings(added=[(place.id, 5), (place.id, 3)])
+        facade.place_repo.adjust_ratings(added=[(place.id, 4)], removed=[(place.id, 3)])
+        place = facade.place_repo.get(place.id)
+        self.assertEqual((place.review_count, place.rating_sum, place.average_rating), (2, 9, 4.5))
+        self.assertEqual(place.rating_histogram, {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1})
+
+        # Avis écrits sans passer par adjust_ratings : la réparation recalcule tout
+        facade.review_repo.add(Review(text='Bad', rating=1, user_id=str(uuid.uuid4()), place_id=place.id))
+        other = self.new_place(title='Other')
+        facade.place_repo.add(other)
+        facade.place_repo.adjust_ratings(added=[(other.id, 2)])
+        self.assertEqual(facade.place_repo.repair_rating_aggregates(), 2)
+        place, other = facade.place_repo.get(place.id), facade.place_repo.get(other.id)
+        self.assertEqual((place.review_count, place.rating_sum, place.rating_1, place.rating_5), (1, 1, 1, 0))
+        self.assertEqual((other.review_count, other.average_rating), (0, None))
+        self.assertEqual(facade.place_repo.repair_rating_aggregates(), 0)
+
+    def test_relationships_follow_writes(self):
+        place = self.new_place()
+        facade.place_repo.add(place)
+        review = Review(text='Good', rating=5, user_id=str(uuid.uuid4()), place_id=place.id)
+        facade.review_repo.add(review)
+        self.assertIs(facade.review_repo.get(review.id).place, facade.place_repo.get(place.id))
+        self.assertEqual([r.id for r in facade.place_repo.get(place.id).reviews], [review.id])
+        facade.review_repo.delete(review.id)
+        self.assertEqual(facade.place_repo.get(place.id).reviews, [])
+
+
+class TestSQLiteFileBackend(RepositoryConformance, unittest.TestCase):
+    backend = 'sqlite'
+
+    def database_uri(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        return 'sqlite:///' + os.path.join(self.directory, 'conformance.db')
+
+
+class TestSQLiteMemoryBackend(RepositoryConformance, unittest.TestCase):
+    backend = 'sqlite-memory'
+
+
+class TestSQLiteBinaryIdsBackend(RepositoryConformance, unittest.TestCase):
+    backend = 'sqlite-memory'
+    id_format = 'uuid7-binary'
+
+
+class TestInMemoryBackend(RepositoryConformance, unittest.TestCase):
+    backend = 'memory'
+
+
+class TestSQLiteShardedBackend(RepositoryConformance, unittest.TestCase):
+    backend = 'sqlite-sharded'
+
+    def database_uri(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        return 'sqlite:///' + os.path.join(self.directory, 'global.db')
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def test_unknown_backend_is_rejected(self):
+        test_config = type('BackendConfig', (config.TestingConfig,), {'PERSISTENCE_BACKEND': 'mongo'})
+        with self.assertRaises(ValueError):
+            create_app(test_config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+import gzip
+import unittest
+
+from flask_jwt_extended import create_access_token
+
+import config
+from app import create_app, db
+from app.api.response_cache import ResponseCache
+from app.persistence.query_plan import QueryRecorder
+from app.services import facade
+
+
+class ResponseCacheConfig(config.TestingConfig):
+    """ The SELECT statements are counted on the SQL backend, whatever HBNB_PERSISTENCE says """
+    PERSISTENCE_BACKEND = 'sqlite'
+    RESPONSE_CACHE_SIZE = 100
+    COMPRESSION_ENCODINGS = ('gzip',)
+    COMPRESSION_MIN_SIZE = 64
+
+
+class TestResponseCache(unittest.TestCase):
+    """ The public GET endpoints are served from the cache until a write changes them """
+
+    def setUp(self):
+        self.app = create_app(ResponseCacheConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.client = self.app.test_client()
+        self.cache = self.app.extensions['response_cache']
+        self.owner_id = self.new_user('Owner', 'owner@cache.io').id
+        self.guest_id = self.new_user('Guest', 'guest@cache.io').id
+        self.amenity_id = facade.create_amenity({'name': 'WiFi'}).id
+        self.place_id = self.new_place('Loft').id
+        self.other_place_id = self.new_place('Barn').id
+        self.review_id = facade.create_review({'text': 'Great', 'rating': 5, 'user_id': self.guest_id,
+                                               'place_id': self.place_id}).id
+        self.urls = ['/api/v1/places/', f'/api/v1/places/{self.place_id}',
+                     f'/api/v1/places/{self.place_id}/reviews', '/api/v1/amenities/?include=places']
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.context.pop()
+
+    def new_user(self, name, email):
+        return facade.create_user({'first_name': name, 'last_name': 'Cache', 'email': email, 'password': 'secret'})
+
+    def new_place(self, title):
+        return facade.create_place({'title': title, 'description': 'Nice', 'price': 80.0, 'latitude': 1.0,
+                                    'longitude': 2.0, 'owner_id': self.owner_id, 'amenities': [self.amenity_id]})
+
+    def get(self, url, **headers):
+        """ GET url on a fresh session; return the response and the number of SELECTs """
+        facade.clear_caches()
+        db.session.remove()
+        with QueryRecorder(db.engine) as recorder:
+            response = self.client.get(url, headers=headers)
+        return response, len(recorder.queries)
+
+    def fresh(self, url):
+        """ Body of url built without the cache """
+        self.cache.max_entries = 0
+        try:
+            return self.get(url)[0].get_json()
+        finally:
+            self.cache.max_entries = 100
+
+    def test_hits_run_no_query(self):
+        for url in self.urls:
+            first, statements = self.get(url)
+            self.assertGreater(statements, 0, url)
+            second, statements = self.get(url)
+            self.assertEqual(statements, 0, url)
+            self.assertEqual(second.data, first.data, url)
+            self.assertEqual(second.headers.get('ETag'), first.headers.get('ETag'), url)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (4, 4, 4))
+
+    def test_hits_are_compressed_and_conditional(self):
+        url = f'/api/v1/places/{self.place_id}'
+        plain = self.get(url)[0]
+        etag = plain.headers['ETag']
+        response, statements = self.get(url, **{'Accept-Encoding': 'gzip'})
+        self.assertEqual((response.headers['Content-Encoding'], statements), ('gzip', 0))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        response, statements = self.get(url, **{'If-None-Match': etag})
+        self.assertEqual((response.status_code, response.data, statements), (304, b'', 0))
+
+    def test_writes_drop_the_responses_built_from_them(self):
+        writes = [
+            lambda: facade.update_review(self.review_id, {'text': 'Really great'}),
+            lambda: facade.update_amenity(self.amenity_id, {'name': 'Fast WiFi'}),
+            lambda: facade.update_user(self.guest_id, {'first_name': 'Gus'}),
+            lambda: facade.update_place(self.place_id, {'amenities': []}),
+            lambda: self.new_place('Cabin'),
+            lambda: facade.create_review({'text': 'Fine', 'rating': 3, 'user_id': self.owner_id,
+                                          'place_id': self.other_place_id}),
+            lambda: facade.delete_review(self.review_id),
+            lambda: facade.create_amenity({'name': 'Pool'}),
+        ]
+        for write in writes:
+            for url in self.urls:
+                self.get(url)
+            write()
+            for url in self.urls:
+                self.assertEqual(self.get(url)[0].get_json(), self.fresh(url), url)
+        self.assertGreater(self.cache.stats()['invalidations'], 0)
+
+    def test_unrelated_writes_keep_the_response(self):
+        url = f'/api/v1/places/{self.place_id}/reviews'
+        self.get(url)
+        facade.update_place(self.other_place_id, {'title': 'Big barn'})
+        facade.update_amenity(self.amenity_id, {'name': 'Fast WiFi'})
+        self.assertEqual(self.get(url)[1], 0)
+
+    def test_failed_write_keeps_the_response(self):
+        url = f'/api/v1/places/{self.place_id}'
+        self.get(url)
+        with self.assertRaises(ValueError):
+            facade.update_place(self.place_id, {'price': -1})
+        self.assertEqual(self.get(url)[1], 0)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        token = create_access_token(identity={'id': self.guest_id, 'is_admin': False})
+        url = f'/api/v1/places/{self.place_id}'
+        self.get(url)
+        response, statements = self.get(url, Authorization=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(statements, 0)
+        self.assertEqual(self.cache.stats()['bypassed'], 1)
+
+    def test_errors_are_not_stored(self):
+        for url in ('/api/v1/places/unknown', '/api/v1/places/?fields=secret'):
+            self.assertNotEqual(self.get(url)[0].status_code, 200)
+            self.assertNotEqual(self.get(url)[0].status_code, 200)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (0, 4, 0))
+
+    def test_admin_endpoint(self):
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+        user = create_access_token(identity={'id': 'user', 'is_admin': False})
+        response = self.client.get('/api/v1/admin/response-cache', headers={'Authorization': f'Bearer {user}'})
+        self.assertEqual(response.status_code, 403)
+        self.get('/api/v1/amenities/')
+        response = self.client.get('/api/v1/admin/response-cache', headers={'Authorization': f'Bearer {admin}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['size'], 1)
+
+
+class TestResponseCacheStore(unittest.TestCase):
+    """ Bounds, expiration and invalidation of ResponseCache """
+
+    def entry(self, size):
+        return (b'x' * size, 200, [('Content-Type', 'application/json')], None)
+
+    def test_entry_bound(self):
+        cache = ResponseCache(max_entries=2)
+        for key in 'abc':
+            cache.set(key, self.entry(10), (), cache.generation)
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_byte_bound(self):
+        # Corps de 100 octets + 28 octets d'en-têtes par réponse
+        cache = ResponseCache(max_bytes=300)
+        for key in 'abc':
+            cache.set(key, self.entry(100), (), cache.generation)
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['bytes'], stats['evictions']), (2, 256, 1))
+        cache.set('d', self.entry(400), (), cache.generation)
+        self.assertEqual(cache.stats()['too_large'], 1)
+
+    def test_ttl(self):
+        now = [0.0]
+        cache = ResponseCache(ttl=10, clock=lambda: now[0])
+        cache.set('a', self.entry(1), [('places', '1')], cache.generation)
+        now[0] = 11
+        self.assertIsNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['expirations'], stats['size'], stats['tags']), (1, 0, 0))
+
+    def test_invalidation(self):
+        cache = ResponseCache()
+        cache.set('a', self.entry(1), [('places', '1'), ('places',)], cache.generation)
+        cache.set('b', self.entry(1), [('places', '2')], cache.generation)
+        cache.invalidate({('places', '1')})
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+        cache.invalidate(None)
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_response_built_during_a_write_is_not_stored(self):
+        cache = ResponseCache()
+        generation = cache.generation
+        cache.invalidate({('places', '1')})
+        cache.set('a', self.entry(1), (), generation)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['stale'], 1)
+
+    def test_disabled(self):
+        app = create_app(config.TestingConfig)
+        with app.app_context():
+            client = app.test_client()
+            client.get('/api/v1/amenities/')
+            client.get('/api/v1/amenities/')
+        self.assertEqual(app.extensions['response_cache'].stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import config
+from app import create_app, db
+from app.persistence.schema_upgrade import upgrade_schema
+
+# Schéma créé par create_all avant les agrégats des notes et les index secondaires
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    first_name VARCHAR(50) NOT NULL, last_name VARCHAR(50) NOT NULL, email VARCHAR(120) NOT NULL,
+    password VARCHAR(128) NOT NULL, is_admin BOOLEAN, id VARCHAR(36) NOT NULL,
+    created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id), UNIQUE (email));
+CREATE TABLE amenities (
+    name VARCHAR(50) NOT NULL, id VARCHAR(36) NOT NULL, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id));
+CREATE TABLE places (
+    title VARCHAR(100) NOT NULL, description VARCHAR(4000) NOT NULL, _price FLOAT NOT NULL,
+    _latitude FLOAT NOT NULL, _longitude FLOAT NOT NULL, owner_id VARCHAR(50) NOT NULL,
+    id VARCHAR(36) NOT NULL, created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id),
+    CONSTRAINT unique_place_title_owner UNIQUE (title, owner_id),
+    FOREIGN KEY(owner_id) REFERENCES users (id));
+CREATE TABLE place_amenity (
+    place_id VARCHAR(60) NOT NULL, amenity_id VARCHAR(60) NOT NULL, PRIMARY KEY (place_id, amenity_id),
+    FOREIGN KEY(place_id) REFERENCES places (id), FOREIGN KEY(amenity_id) REFERENCES amenities (id));
+CREATE TABLE reviews (
+    text VARCHAR(400) NOT NULL, rating INTEGER NOT NULL, user_id VARCHAR(36) NOT NULL,
+    place_id VARCHAR(36) NOT NULL, id VARCHAR(36) NOT NULL, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id), FOREIGN KEY(place_id) REFERENCES places (id));
+"""
+
+OWNER_ID = '00000000-0000-4000-8000-000000000001'
+GUEST_IDS = ('00000000-0000-4000-8000-000000000002', '00000000-0000-4000-8000-000000000003')
+PLACE_ID = '00000000-0000-4000-8000-000000000010'
+AMENITY_ID = '00000000-0000-4000-8000-000000000020'
+
+
+def create_baseline_database(path):
+    """ Create at path a SQLite database with the baseline schema: one place, its amenity and two reviews """
+    now = '2024-01-01 00:00:00.000000'
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executescript(BASELINE_SCHEMA)
+        connection.executemany(
+            "INSERT INTO users VALUES (?, 'Old', ?, 'x', 0, ?, ?, ?)",
+            [(name, f'{name.lower()}@old.io', user_id, now, now)
+             for name, user_id in zip(('Owner', 'Guest1', 'Guest2'), (OWNER_ID,) + GUEST_IDS)])
+        connection.execute("INSERT INTO amenities VALUES ('WiFi', ?, ?, ?)", (AMENITY_ID, now, now))
+        connection.execute("INSERT INTO places VALUES ('Old place', 'Before', 10.0, 1.0, 1.0, ?, ?, ?, ?)",
+                           (OWNER_ID, PLACE_ID, now, now))
+        connection.execute("INSERT INTO place_amenity VALUES (?, ?)", (PLACE_ID, AMENITY_ID))
+        connection.executemany("INSERT INTO reviews VALUES ('Fine', ?, ?, ?, ?, ?, ?)",
+                               [(rating, user_id, PLACE_ID, f'{PLACE_ID[:-2]}3{index}', now, now)
+                                for index, (rating, user_id) in enumerate(zip((4, 5), GUEST_IDS))])
+    connection.close()
+
+
+class TestSchemaUpgrade(unittest.TestCase):
+    """ The application upgrades the tables of a database created before the new columns and indexes """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'old.db')
+        create_baseline_database(self.path)
+        self.config = type('UpgradeConfig', (config.TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + self.path, 'PERSISTENCE_BACKEND': 'sqlite'})
+
+    def start(self):
+        """ Create the application on the database, as a startup would """
+        app = create_app(self.config)
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        return app
+
+    def schema(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(places)")}
+            indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            connection.close()
+        return columns, indexes
+
+    def test_startup_adds_the_aggregates_and_the_indexes(self):
+        app = self.start()
+        columns, indexes = self.schema()
+        self.assertTrue({'review_count', 'rating_sum', 'rating_1', 'rating_5'} <= columns)
+        self.assertTrue({'ix_places_owner_id', 'ix_places_price_id', 'ix_places_latitude_longitude',
+                         'ix_places_created_at_id', 'ix_reviews_place_id_created_at',
+                         'ix_place_amenity_amenity_id', 'ix_amenities_name'} <= indexes)
+
+        # Agrégats recalculés depuis les avis existants
+        with app.app_context():
+            client = app.test_client()
+            self.assertEqual(client.get('/api/v1/places/').status_code, 200)
+            place = client.get(f'/api/v1/places/{PLACE_ID}').get_json()
+            db.session.remove()
+        self.assertEqual((place['review_count'], place['average_rating']), (2, 4.5))
+
+    def test_upgrade_is_idempotent(self):
+        self.start()
+        app = create_app(self.config)
+        with app.app_context():
+            self.assertEqual(upgrade_schema(db.engine, db.metadata.sorted_tables), {})
+            db.session.remove()
+
+
+if __name__ == '__main__':
+    unittest.main()
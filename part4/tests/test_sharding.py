@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from sqlalchemy import func, select
+
+import config
+from app import create_app, db
+from app.asgi import create_asgi_app
+from app.models import Place, Review
+from app.persistence.sharding import shard_bind, shard_index, shard_uris
+from app.services import facade
+
+
+class TestShardRouting(unittest.TestCase):
+    """ The sqlite-sharded backend stores places and reviews on the shard of their key """
+
+    shards = 3
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        test_config = type('ShardedConfig', (config.TestingConfig,), {
+            'PERSISTENCE_BACKEND': 'sqlite-sharded',
+            'SHARD_COUNT': self.shards,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(self.directory, 'global.db')})
+        self.app = create_app(test_config)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.owners = [facade.create_user({'first_name': 'Owner', 'last_name': 'ABCDEF'[i],
+                                           'email': f'owner{i}@shards.io', 'password': 'secret'})
+                       for i in range(6)]
+        self.places = [facade.create_place({'title': f'Place {i}', 'description': 'Sharded', 'price': 10.0,
+                                            'latitude': 1.0, 'longitude': 1.0, 'owner_id': owner.id})
+                       for i, owner in enumerate(self.owners)]
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def rows_on_shard(self, model, index):
+        with db.engines[shard_bind(index)].connect() as connection:
+            return set(connection.scalars(select(model.id)))
+
+    def test_shard_uris_sit_next_to_the_global_database(self):
+        self.assertEqual(shard_uris('sqlite:////data/hbnb.db', 2),
+                         ['sqlite:////data/hbnb-shard0.db', 'sqlite:////data/hbnb-shard1.db'])
+        for index in range(self.shards):
+            self.assertTrue(os.path.exists(os.path.join(self.directory, f'global-shard{index}.db')))
+
+    def test_rows_land_on_the_shard_of_their_key(self):
+        guest = self.owners[0]
+        reviews = [facade.create_review({'text': 'Good', 'rating': 4, 'user_id': guest.id, 'place_id': place.id})
+                   for place in self.places[1:]]
+        for place in self.places:
+            index = shard_index(place.owner_id, self.shards)
+            # L'id d'un lieu désigne le même shard que son propriétaire
+            self.assertEqual(shard_index(place.id, self.shards), index)
+            self.assertIn(place.id, self.rows_on_shard(Place, index))
+        for review in reviews:
+            index = shard_index(review.place_id, self.shards)
+            self.assertEqual(shard_index(review.id, self.shards), index)
+            self.assertIn(review.id, self.rows_on_shard(Review, index))
+        stored = set().union(*(self.rows_on_shard(Place, index) for index in range(self.shards)))
+        self.assertEqual(stored, {place.id for place in self.places})
+        # La base globale ne contient aucun lieu
+        with db.engine.connect() as connection:
+            self.assertFalse(db.inspect(connection).has_table('places'))
+
+    def test_get_all_and_get_page_merge_the_shards_in_id_order(self):
+        expected = sorted(place.id for place in self.places)
+        db.session.expunge_all()
+        self.assertEqual([place.id for place in facade.place_repo.get_all()], expected)
+        seen, cursor = [], None
+        while True:
+            page, cursor = facade.place_repo.get_page(4, cursor)
+            seen.extend(place.id for place in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_relationships_follow_their_shard(self):
+        wifi = facade.create_amenity({'name': 'WiFi'})
+        place = facade.create_place({'title': 'Equipped', 'description': 'Sharded', 'price': 10.0,
+                                     'latitude': 1.0, 'longitude': 1.0, 'owner_id': self.owners[2].id,
+                                     'amenities': [wifi.id]})
+        facade.create_review({'text': 'Fine', 'rating': 3, 'user_id': self.owners[0].id, 'place_id': place.id})
+        place_id, wifi_id, owner_id, guest_id = place.id, wifi.id, self.owners[2].id, self.owners[0].id
+        db.session.expunge_all()
+
+        place = facade.get_place(place_id)
+        self.assertEqual([review.rating for review in place.reviews], [3])
+        self.assertEqual(place.owner.id, owner_id)
+        self.assertEqual([amenity.name for amenity in place.amenities], ['WiFi'])
+        # Jointure d'un shard avec place_amenity, table de la base globale attachée
+        self.assertEqual({p.id for p in facade.get_amenity(wifi_id).places}, {place_id})
+        self.assertEqual({p.title for p in facade.get_user(owner_id).places}, {'Place 2', 'Equipped'})
+
+        # Chargements groupés (selectinload, joinedload) des lectures de la façade
+        db.session.expunge_all()
+        detail = facade.get_place_detail(place_id)
+        self.assertEqual((detail.owner.id, [a.id for a in detail.amenities]), (owner_id, [wifi_id]))
+        self.assertEqual({p.title for p in detail.owner.places}, {'Place 2', 'Equipped'})
+        listed = {item['id']: item for item in facade.get_all_places(50)[0]}
+        self.assertEqual(len(listed), len(self.places) + 1)
+        self.assertEqual([a['name'] for a in listed[place_id]['amenities']], ['WiFi'])
+        self.assertEqual([r['rating'] for r in listed[place_id]['reviews']], [3])
+        reviews, _ = facade.get_reviews_by_place(place_id, 10)
+        self.assertEqual([review.user.id for review in reviews], [guest_id])
+
+    def test_rating_aggregates_are_repaired_on_every_shard(self):
+        for place in self.places[1:]:
+            facade.create_review({'text': 'Good', 'rating': 5, 'user_id': self.owners[0].id, 'place_id': place.id})
+        first_place = self.places[0].id
+        for index in range(self.shards):
+            with db.engines[shard_bind(index)].begin() as connection:
+                connection.execute(Place.__table__.update().values(review_count=0, rating_sum=0))
+        db.session.expunge_all()
+        self.assertEqual(facade.repair_rating_aggregates(), 5)
+        self.assertEqual(sum(place.review_count for place in facade.place_repo.get_all()), 5)
+        with db.engines[shard_bind(0)].connect() as connection:
+            self.assertEqual(connection.scalar(select(func.count()).select_from(Place.__table__).where(
+                Place.review_count != 0)), len(self.rows_on_shard(Place, 0) - {first_place}))
+
+    def test_sharding_needs_a_database_file_and_the_sync_stack(self):
+        memory_config = type('ShardedMemoryConfig', (config.TestingConfig,), {
+            'PERSISTENCE_BACKEND': 'sqlite-sharded', 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+        with self.assertRaises(ValueError):
+            create_app(memory_config)
+        with self.assertRaises(ValueError):
+            create_asgi_app(self.app)
+
+
+if __name__ == '__main__':
+    unittest.main()
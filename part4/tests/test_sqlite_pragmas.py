@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask_jwt_extended import create_access_token
+
+import config
+from app import create_app, db
+from app.persistence.sqlite_pragmas import read_pragmas, verify_pragmas
+
+
+class TestProductionPragmas(unittest.TestCase):
+    """ ProductionConfig must apply its PRAGMA settings to every connection """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        production_config = type('ProductionFileConfig', (config.ProductionConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(self.directory, 'prod.db'),
+            'PERSISTENCE_BACKEND': 'sqlite'})
+        self.app = create_app(production_config)
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+
+    def test_every_pragma_is_applied(self):
+        results = verify_pragmas(db.engine, config.ProductionConfig.SQLITE_PRAGMAS)
+        self.assertTrue(all(result['ok'] for result in results.values()), results)
+        with db.engine.connect() as connection:
+            actual = read_pragmas(connection, ['journal_mode', 'synchronous', 'temp_store'])
+        self.assertEqual(actual, {'journal_mode': 'wal', 'synchronous': 1, 'temp_store': 2})
+
+    def test_mismatch_is_reported(self):
+        results = verify_pragmas(db.engine, {'synchronous': 'FULL', 'cache_size': -64000})
+        self.assertFalse(results['synchronous']['ok'])
+        self.assertTrue(results['cache_size']['ok'])
+
+    def test_admin_endpoint(self):
+        client = self.app.test_client()
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+        user = create_access_token(identity={'id': 'user', 'is_admin': False})
+
+        response = client.get('/api/v1/admin/database', headers={'Authorization': f'Bearer {user}'})
+        self.assertEqual(response.status_code, 403)
+
+        response = client.get('/api/v1/admin/database', headers={'Authorization': f'Bearer {admin}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json['ok'], response.json)
+        self.assertEqual(response.json['pragmas']['journal_mode']['actual'], 'wal')
+
+
+if __name__ == '__main__':
+    unittest.main()